@@ -0,0 +1,21 @@
+# asgi.py
+"""
+Punto de entrada de la API asíncrona (ver src/api/asincrono.py):
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8001
+"""
+import os
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from src.api.asincrono import create_asgi_app
+from src.config import DevConfig, ProdConfig
+
+
+def get_config():
+    env = os.getenv("FLASK_ENV", "development").lower()
+    return ProdConfig if env in ("prod", "production") else DevConfig
+
+
+app = create_asgi_app(get_config())
@@ -0,0 +1,38 @@
+"""add cambios (bandeja de salida del feed de cambios)
+
+Revision ID: 0c4f8e2a9d71
+Revises: f3b9c2d7a1e4
+Create Date: 2026-10-19 21:12:37.845120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c4f8e2a9d71'
+down_revision = 'f3b9c2d7a1e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cambios',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('entidad', sa.String(length=20), nullable=False),
+    sa.Column('entidad_id', sa.Uuid(), nullable=False),
+    sa.Column('operacion', sa.String(length=20), nullable=False),
+    sa.Column('datos', sa.JSON(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('cambios', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cambios_creado_en'), ['creado_en'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('cambios', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cambios_creado_en'))
+
+    op.drop_table('cambios')
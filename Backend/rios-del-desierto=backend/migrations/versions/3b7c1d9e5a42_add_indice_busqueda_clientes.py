@@ -0,0 +1,131 @@
+"""add indice busqueda clientes
+
+Revision ID: 3b7c1d9e5a42
+Revises: fe1722706f80
+Create Date: 2026-10-19 09:12:40.512310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1d9e5a42'
+down_revision = 'fe1722706f80'
+branch_labels = None
+depends_on = None
+
+
+# El rowid de clientes_fts es la clave de clientes_fts_claves (INTEGER PRIMARY KEY):
+# el rowid implícito de clientes cambia con un VACUUM o al recrear la tabla
+CLAVE_FTS = "(SELECT rowid FROM clientes_fts_claves WHERE cliente_id = {cliente})"
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS clientes_fts_claves (
+        rowid INTEGER PRIMARY KEY,
+        cliente_id NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+        nombre, apellido, correo_electronico, numero_documento,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ai AFTER INSERT ON clientes BEGIN
+        INSERT INTO clientes_fts_claves(cliente_id) VALUES (new.id);
+        INSERT INTO clientes_fts(rowid, nombre, apellido, correo_electronico, numero_documento)
+        VALUES ({CLAVE_FTS.format(cliente="new.id")},
+                new.nombre, new.apellido, new.correo_electronico, '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_au
+    AFTER UPDATE OF nombre, apellido, correo_electronico ON clientes BEGIN
+        UPDATE clientes_fts
+        SET nombre = new.nombre,
+            apellido = new.apellido,
+            correo_electronico = new.correo_electronico
+        WHERE rowid = {CLAVE_FTS.format(cliente="new.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ad AFTER DELETE ON clientes BEGIN
+        DELETE FROM clientes_fts WHERE rowid = {CLAVE_FTS.format(cliente="old.id")};
+        DELETE FROM clientes_fts_claves WHERE cliente_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ai AFTER INSERT ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = new.numero_documento
+        WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_au
+    AFTER UPDATE OF numero_documento ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = new.numero_documento
+        WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ad AFTER DELETE ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = ''
+        WHERE rowid = {CLAVE_FTS.format(cliente="old.cliente_id")};
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_nombre_trgm ON clientes USING gin (nombre gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_apellido_trgm ON clientes USING gin (apellido gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_correo_trgm ON clientes USING gin (correo_electronico gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_documentos_numero_trgm ON documentos USING gin (numero_documento gin_trgm_ops)",
+]
+
+
+def upgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'sqlite':
+        for sentencia in SQLITE_DDL:
+            op.execute(sentencia)
+        # Backfill de los clientes existentes
+        op.execute("INSERT INTO clientes_fts_claves(cliente_id) SELECT id FROM clientes")
+        op.execute("""
+            INSERT INTO clientes_fts(rowid, nombre, apellido, correo_electronico, numero_documento)
+            SELECT k.rowid, c.nombre, c.apellido, c.correo_electronico,
+                   coalesce(d.numero_documento, '')
+            FROM clientes_fts_claves k
+            JOIN clientes c ON c.id = k.cliente_id
+            LEFT JOIN documentos d ON d.cliente_id = c.id
+        """)
+    elif dialecto == 'postgresql':
+        for sentencia in POSTGRES_DDL:
+            op.execute(sentencia)
+
+
+def downgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'sqlite':
+        for trigger in (
+            'trg_documentos_fts_ad', 'trg_documentos_fts_au', 'trg_documentos_fts_ai',
+            'trg_clientes_fts_ad', 'trg_clientes_fts_au', 'trg_clientes_fts_ai',
+        ):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS clientes_fts')
+        op.execute('DROP TABLE IF EXISTS clientes_fts_claves')
+    elif dialecto == 'postgresql':
+        for indice in (
+            'ix_documentos_numero_trgm', 'ix_clientes_correo_trgm',
+            'ix_clientes_apellido_trgm', 'ix_clientes_nombre_trgm',
+        ):
+            op.execute(f'DROP INDEX IF EXISTS {indice}')
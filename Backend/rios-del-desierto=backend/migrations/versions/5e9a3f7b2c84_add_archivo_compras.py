@@ -0,0 +1,82 @@
+"""add archivo de compras y vistas historicas
+
+Revision ID: 5e9a3f7b2c84
+Revises: a2c8e6f0d4b9
+Create Date: 2026-10-19 12:02:18.640233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e9a3f7b2c84'
+down_revision = 'a2c8e6f0d4b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('compras_archivo',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('fecha', sa.DateTime(), nullable=False),
+    sa.Column('monto_total_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.Enum('COMPLETADA', 'CANCELADA', 'REEMBOLSADA', name='estado_compra_enum', native_enum=False), nullable=False),
+    sa.Column('cliente_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('compras_archivo', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_compras_archivo_cliente_id'), ['cliente_id'], unique=False)
+
+    op.create_table('detalles_compra_archivo',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('cantidad_compra', sa.Integer(), nullable=False),
+    sa.Column('precio_unitario_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('compra_id', sa.Uuid(), nullable=False),
+    sa.Column('producto_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['compra_id'], ['compras_archivo.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('detalles_compra_archivo', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_detalles_compra_archivo_compra_id'), ['compra_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_detalles_compra_archivo_producto_id'), ['producto_id'], unique=False)
+
+    with op.batch_alter_table('compras', schema=None) as batch_op:
+        batch_op.create_index('ix_compras_status_fecha', ['status', 'fecha'], unique=False)
+        batch_op.create_index('ix_compras_fecha', ['fecha'], unique=False)
+
+    op.execute("""
+        CREATE VIEW compras_historico AS
+        SELECT id, fecha, monto_total_centavos, status, cliente_id, 0 AS archivada FROM compras
+        UNION ALL
+        SELECT id, fecha, monto_total_centavos, status, cliente_id, 1 AS archivada FROM compras_archivo
+    """)
+    op.execute("""
+        CREATE VIEW detalles_compra_historico AS
+        SELECT id, cantidad_compra, precio_unitario_centavos, compra_id, producto_id, 0 AS archivada
+        FROM detalles_compra
+        UNION ALL
+        SELECT id, cantidad_compra, precio_unitario_centavos, compra_id, producto_id, 1 AS archivada
+        FROM detalles_compra_archivo
+    """)
+
+
+def downgrade():
+    op.execute('DROP VIEW IF EXISTS detalles_compra_historico')
+    op.execute('DROP VIEW IF EXISTS compras_historico')
+
+    with op.batch_alter_table('compras', schema=None) as batch_op:
+        batch_op.drop_index('ix_compras_fecha')
+        batch_op.drop_index('ix_compras_status_fecha')
+
+    with op.batch_alter_table('detalles_compra_archivo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_detalles_compra_archivo_producto_id'))
+        batch_op.drop_index(batch_op.f('ix_detalles_compra_archivo_compra_id'))
+
+    op.drop_table('detalles_compra_archivo')
+    with op.batch_alter_table('compras_archivo', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_compras_archivo_cliente_id'))
+
+    op.drop_table('compras_archivo')
@@ -0,0 +1,37 @@
+"""add migraciones_datos (progreso de las migraciones de datos por lotes)
+
+Revision ID: 6b1e9d3f7a20
+Revises: 9a4d7c1e2b58
+Create Date: 2026-10-20 10:14:37.205611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b1e9d3f7a20'
+down_revision = '9a4d7c1e2b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('migraciones_datos',
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('ultima_clave', sa.String(length=100), nullable=True),
+    sa.Column('filas_procesadas', sa.BigInteger(), nullable=False),
+    sa.Column('lotes', sa.Integer(), nullable=False),
+    sa.Column('propietario', sa.String(length=32), nullable=True),
+    sa.Column('bloqueada_hasta', sa.DateTime(), nullable=True),
+    sa.Column('iniciada_en', sa.DateTime(), nullable=True),
+    sa.Column('actualizada_en', sa.DateTime(), nullable=True),
+    sa.Column('completada_en', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+
+
+def downgrade():
+    op.drop_table('migraciones_datos')
@@ -0,0 +1,44 @@
+"""add cliente_estadisticas
+
+Revision ID: 7a0c6e1f4d25
+Revises: 5e9a3f7b2c84
+Create Date: 2026-10-19 13:40:05.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a0c6e1f4d25'
+down_revision = '5e9a3f7b2c84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cliente_estadisticas',
+    sa.Column('cliente_id', sa.Uuid(), nullable=False),
+    sa.Column('total_historico_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('total_30_dias_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('total_90_dias_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('total_365_dias_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('numero_compras', sa.Integer(), nullable=False),
+    sa.Column('fecha_ultima_compra', sa.DateTime(), nullable=True),
+    sa.Column('es_fidelizado', sa.Boolean(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cliente_id')
+    )
+    with op.batch_alter_table('cliente_estadisticas', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cliente_estadisticas_es_fidelizado'), ['es_fidelizado'], unique=False)
+
+    # El llenado inicial se hace con `flask --app run.py refrescar-estadisticas`
+    # (por lotes, con la API en línea).
+
+
+def downgrade():
+    with op.batch_alter_table('cliente_estadisticas', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cliente_estadisticas_es_fidelizado'))
+
+    op.drop_table('cliente_estadisticas')
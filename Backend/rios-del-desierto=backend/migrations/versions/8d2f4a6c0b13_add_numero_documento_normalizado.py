@@ -0,0 +1,80 @@
+"""add numero_documento_normalizado a documentos
+
+Revision ID: 8d2f4a6c0b13
+Revises: 3b7c1d9e5a42
+Create Date: 2026-10-19 10:05:12.874102
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4a6c0b13'
+down_revision = '3b7c1d9e5a42'
+branch_labels = None
+depends_on = None
+
+
+TAMANO_LOTE = 5000
+
+
+def _normalizar(tipo_documento, numero_documento):
+    # Copia de src.models.documento.normalizar_numero_documento al momento de la migración
+    numero = (numero_documento or '').strip().upper()
+    if tipo_documento in ('NIT', 'CEDULA'):
+        return re.sub(r'\D', '', numero)
+    return re.sub(r'[^0-9A-Z]', '', numero)
+
+
+def upgrade():
+    with op.batch_alter_table('documentos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('numero_documento_normalizado', sa.String(length=40), nullable=True))
+
+    # Backfill por lotes (keyset sobre id) para no cargar toda la tabla en memoria
+    conn = op.get_bind()
+    documentos = sa.table(
+        'documentos',
+        sa.column('id', sa.Uuid()),
+        sa.column('tipo_documento', sa.String()),
+        sa.column('numero_documento', sa.String()),
+        sa.column('numero_documento_normalizado', sa.String()),
+    )
+
+    ultimo_id = None
+    while True:
+        stmt = sa.select(
+            documentos.c.id, documentos.c.tipo_documento, documentos.c.numero_documento
+        ).order_by(documentos.c.id).limit(TAMANO_LOTE)
+        if ultimo_id is not None:
+            stmt = stmt.where(documentos.c.id > ultimo_id)
+
+        filas = conn.execute(stmt).all()
+        if not filas:
+            break
+
+        conn.execute(
+            documentos.update()
+            .where(documentos.c.id == sa.bindparam('b_id'))
+            .values(numero_documento_normalizado=sa.bindparam('b_normalizado')),
+            [
+                {'b_id': fila.id, 'b_normalizado': _normalizar(fila.tipo_documento, fila.numero_documento)}
+                for fila in filas
+            ],
+        )
+        ultimo_id = filas[-1].id
+
+    with op.batch_alter_table('documentos', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_doc_tipo_numero_normalizado',
+            ['tipo_documento', 'numero_documento_normalizado'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('documentos', schema=None) as batch_op:
+        batch_op.drop_index('ix_doc_tipo_numero_normalizado')
+        batch_op.drop_column('numero_documento_normalizado')
@@ -0,0 +1,39 @@
+"""add fidelizacion_marca y fidelizacion_clientes (reporte de fidelización incremental)
+
+Revision ID: 9a4d7c1e2b58
+Revises: 0c4f8e2a9d71
+Create Date: 2026-10-19 23:05:12.418903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4d7c1e2b58'
+down_revision = '0c4f8e2a9d71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('fidelizacion_marca',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cursor_cambios', sa.BigInteger(), nullable=False),
+    sa.Column('fecha_limite', sa.DateTime(), nullable=False),
+    sa.Column('monto_minimo_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('generado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('fidelizacion_clientes',
+    sa.Column('cliente_id', sa.Uuid(), nullable=False),
+    sa.Column('total_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('es_fidelizado', sa.Boolean(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cliente_id')
+    )
+
+
+def downgrade():
+    op.drop_table('fidelizacion_clientes')
+    op.drop_table('fidelizacion_marca')
@@ -0,0 +1,141 @@
+"""elimina los montos Float y fija NOT NULL + CHECK en los montos en centavos
+
+Revision ID: a2c8e6f0d4b9
+Revises: c41e7b2d9f60
+Create Date: 2026-10-19 11:48:05.927114
+
+Segunda parte del paso a centavos (ver c41e7b2d9f60); se aplica con la app ya
+desplegada escribiendo solo las columnas *_centavos.
+
+Antes de validar se completa el backfill: las filas que la app anterior insertó
+después del backfill de c41e7b2d9f60 (y antes del despliegue) solo tienen la
+columna Float.
+
+- PostgreSQL: sin recrear tablas. El CHECK y el NOT NULL se agregan como NOT VALID y
+  se validan aparte (VALIDATE no bloquea escrituras); SET NOT NULL usa el CHECK
+  validado y no vuelve a recorrer la tabla. DROP COLUMN solo cambia el catálogo.
+- SQLite: no admite estos cambios sin recrear la tabla (batch_alter_table). Las
+  columnas id se declaran como Uuid (CHAR(32), igual que las FK que las referencian)
+  en lugar de tomar el tipo reflejado: SQLite refleja UUID como NUMERIC y la copia
+  perdería la afinidad de texto, con lo que los JOIN por compra_id / producto_id
+  dejarían de usar sus índices.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2c8e6f0d4b9'
+down_revision = 'c41e7b2d9f60'
+branch_labels = None
+depends_on = None
+
+
+TAMANO_LOTE = 5000
+
+# (tabla, columna Float, columna centavos, nombre del CHECK, condición del CHECK sobre centavos)
+COLUMNAS_DINERO = [
+    ('compras', 'monto_total', 'monto_total_centavos',
+     'ck_compra_monto_no_negativo_ni_cero', 'monto_total_centavos > 0'),
+    ('detalles_compra', 'precio_unitario', 'precio_unitario_centavos',
+     'ck_detalle_precio_unitario_no_negativo', 'precio_unitario_centavos >= 0'),
+    ('productos', 'precio', 'precio_centavos',
+     'ck_producto_precio_no_negativo', 'precio_centavos >= 0'),
+]
+
+
+def _id_uuid():
+    return sa.Column('id', sa.Uuid(), primary_key=True, nullable=False)
+
+
+def _backfill(conn, tabla, origen, destino, expresion):
+    t = sa.table(tabla, sa.column('id', sa.Uuid()), sa.column(origen), sa.column(destino))
+
+    ultimo_id = None
+    while True:
+        stmt = sa.select(t.c.id).order_by(t.c.id).limit(TAMANO_LOTE)
+        if ultimo_id is not None:
+            stmt = stmt.where(t.c.id > ultimo_id)
+        ids = conn.execute(stmt).scalars().all()
+        if not ids:
+            break
+
+        conn.execute(
+            t.update().where(t.c.id.in_(ids)).values({destino: expresion(t.c[origen])})
+        )
+        ultimo_id = ids[-1]
+
+
+def _completar_backfill(conn, tabla, origen, destino):
+    # Filas con el monto Float y sin centavos, por lotes (cada UPDATE es una transacción)
+    t = sa.table(tabla, sa.column('id', sa.Uuid()), sa.column(origen), sa.column(destino))
+    pendientes = sa.select(t.c.id).where(t.c[destino].is_(None), t.c[origen].is_not(None)).limit(TAMANO_LOTE)
+
+    while True:
+        ids = conn.execute(pendientes).scalars().all()
+        if not ids:
+            break
+        conn.execute(
+            t.update()
+            .where(t.c.id.in_(ids))
+            .values({destino: sa.cast(sa.func.round(t.c[origen] * 100), sa.BigInteger)})
+        )
+
+
+def _upgrade_postgresql():
+    # Cada sentencia en su propia transacción: los bloqueos exclusivos son breves
+    with op.get_context().autocommit_block():
+        for tabla, columna, columna_centavos, check, condicion in COLUMNAS_DINERO:
+            no_nulo = f'ck_{tabla}_{columna_centavos}_no_nulo'
+            op.execute(f'ALTER TABLE {tabla} DROP CONSTRAINT IF EXISTS {check}')
+            op.execute(f'ALTER TABLE {tabla} ADD CONSTRAINT {check} CHECK ({condicion}) NOT VALID')
+            op.execute(f'ALTER TABLE {tabla} VALIDATE CONSTRAINT {check}')
+            op.execute(
+                f'ALTER TABLE {tabla} ADD CONSTRAINT {no_nulo} '
+                f'CHECK ({columna_centavos} IS NOT NULL) NOT VALID'
+            )
+            op.execute(f'ALTER TABLE {tabla} VALIDATE CONSTRAINT {no_nulo}')
+            op.execute(f'ALTER TABLE {tabla} ALTER COLUMN {columna_centavos} SET NOT NULL')
+            op.execute(f'ALTER TABLE {tabla} DROP CONSTRAINT {no_nulo}')
+            op.execute(f'ALTER TABLE {tabla} DROP COLUMN {columna}')
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    with op.get_context().autocommit_block():
+        for tabla, columna, columna_centavos, _, _ in COLUMNAS_DINERO:
+            _completar_backfill(conn, tabla, columna, columna_centavos)
+
+    if conn.dialect.name == 'postgresql':
+        _upgrade_postgresql()
+        return
+
+    for tabla, columna, columna_centavos, check, condicion in COLUMNAS_DINERO:
+        with op.batch_alter_table(tabla, schema=None, reflect_args=[_id_uuid()]) as batch_op:
+            batch_op.drop_constraint(check, type_='check')
+            batch_op.drop_column(columna)
+            batch_op.alter_column(columna_centavos, existing_type=sa.BigInteger(), nullable=False)
+            batch_op.create_check_constraint(check, condicion)
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    for tabla, columna, columna_centavos, _, _ in COLUMNAS_DINERO:
+        op.add_column(tabla, sa.Column(columna, sa.Float(), nullable=True))
+        _backfill(
+            conn, tabla, columna_centavos, columna,
+            lambda c: sa.cast(c, sa.Float) / 100,
+        )
+
+    for tabla, columna, columna_centavos, check, _ in COLUMNAS_DINERO:
+        condicion = f"{columna} > 0" if tabla == 'compras' else f"{columna} >= 0"
+        with op.batch_alter_table(tabla, schema=None, reflect_args=[_id_uuid()]) as batch_op:
+            batch_op.drop_constraint(check, type_='check')
+            batch_op.alter_column(columna_centavos, existing_type=sa.BigInteger(), nullable=True)
+            # Estado de c41e7b2d9f60: Float nullable solo en PostgreSQL
+            batch_op.alter_column(columna, existing_type=sa.Float(),
+                                  nullable=conn.dialect.name == 'postgresql')
+            batch_op.create_check_constraint(check, condicion)
@@ -0,0 +1,41 @@
+"""add cliente_puntajes_rfm
+
+Revision ID: b83d5f0a6e17
+Revises: 7a0c6e1f4d25
+Create Date: 2026-10-19 14:55:31.902466
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83d5f0a6e17'
+down_revision = '7a0c6e1f4d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cliente_puntajes_rfm',
+    sa.Column('cliente_id', sa.Uuid(), nullable=False),
+    sa.Column('recencia_dias', sa.Integer(), nullable=False),
+    sa.Column('frecuencia', sa.Integer(), nullable=False),
+    sa.Column('monto_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('puntaje_r', sa.Integer(), nullable=False),
+    sa.Column('puntaje_f', sa.Integer(), nullable=False),
+    sa.Column('puntaje_m', sa.Integer(), nullable=False),
+    sa.Column('puntaje_total', sa.Integer(), nullable=False),
+    sa.Column('calculado_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cliente_id')
+    )
+    with op.batch_alter_table('cliente_puntajes_rfm', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cliente_puntajes_rfm_puntaje_total'), ['puntaje_total'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('cliente_puntajes_rfm', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cliente_puntajes_rfm_puntaje_total'))
+
+    op.drop_table('cliente_puntajes_rfm')
@@ -0,0 +1,82 @@
+"""montos en centavos enteros (compras, detalles_compra, productos)
+
+Revision ID: c41e7b2d9f60
+Revises: 8d2f4a6c0b13
+Create Date: 2026-10-19 11:20:47.301955
+
+Primera parte (en línea) del paso de los montos Float a columnas *_centavos BigInteger:
+    1. Se agrega la columna nueva (nullable, sin copiar la tabla).
+    2. Se hace backfill por lotes (keyset sobre id), fuera de la transacción de la
+       migración: cada lote es una transacción corta.
+    3. En PostgreSQL la columna Float deja de ser NOT NULL (solo catálogo), para que
+       la app, que ya solo escribe la columna en centavos, pueda insertar.
+
+La segunda parte (a2c8e6f0d4b9) elimina las columnas Float y fija NOT NULL + CHECK
+en las nuevas; se aplica después de desplegar la app. En SQLite (desarrollo) ambas
+se aplican juntas con `flask db upgrade`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7b2d9f60'
+down_revision = '8d2f4a6c0b13'
+branch_labels = None
+depends_on = None
+
+
+TAMANO_LOTE = 5000
+
+# (tabla, columna Float, columna centavos)
+COLUMNAS_DINERO = [
+    ('compras', 'monto_total', 'monto_total_centavos'),
+    ('detalles_compra', 'precio_unitario', 'precio_unitario_centavos'),
+    ('productos', 'precio', 'precio_centavos'),
+]
+
+
+def _backfill(conn, tabla, origen, destino, expresion):
+    t = sa.table(tabla, sa.column('id', sa.Uuid()), sa.column(origen), sa.column(destino))
+
+    ultimo_id = None
+    while True:
+        stmt = sa.select(t.c.id).order_by(t.c.id).limit(TAMANO_LOTE)
+        if ultimo_id is not None:
+            stmt = stmt.where(t.c.id > ultimo_id)
+        ids = conn.execute(stmt).scalars().all()
+        if not ids:
+            break
+
+        conn.execute(
+            t.update().where(t.c.id.in_(ids)).values({destino: expresion(t.c[origen])})
+        )
+        ultimo_id = ids[-1]
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    for tabla, columna, columna_centavos in COLUMNAS_DINERO:
+        # ADD COLUMN nullable sin default: no recrea la tabla (tampoco en SQLite)
+        op.add_column(tabla, sa.Column(columna_centavos, sa.BigInteger(), nullable=True))
+        if conn.dialect.name == 'postgresql':
+            op.alter_column(tabla, columna, existing_type=sa.Float(), nullable=True)
+
+    # Cada UPDATE se confirma por separado: los bloqueos de fila duran un lote
+    with op.get_context().autocommit_block():
+        for tabla, columna, columna_centavos in COLUMNAS_DINERO:
+            _backfill(
+                conn, tabla, columna, columna_centavos,
+                lambda c: sa.cast(sa.func.round(c * 100), sa.BigInteger),
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    for tabla, columna, columna_centavos in COLUMNAS_DINERO:
+        if conn.dialect.name == 'postgresql':
+            op.alter_column(tabla, columna, existing_type=sa.Float(), nullable=False)
+        op.drop_column(tabla, columna_centavos)
@@ -0,0 +1,41 @@
+"""unique tipo_documento + numero_documento_normalizado
+
+Revision ID: d6e1a8c3f5b2
+Revises: b83d5f0a6e17
+Create Date: 2026-10-19 18:20:44.518330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e1a8c3f5b2'
+down_revision = 'b83d5f0a6e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La creación de clientes detecta los documentos duplicados por esta restricción
+    # (sin SELECT previo). Falla si ya existen documentos que solo difieren en el
+    # formato del número: deben depurarse antes de aplicar la migración.
+    # Índices fuera de batch_alter_table: en SQLite no se recrea la tabla y se
+    # conservan los triggers del índice de búsqueda (clientes_fts).
+    op.drop_index('ix_doc_tipo_numero_normalizado', table_name='documentos')
+    op.create_index(
+        'uq_doc_tipo_numero_normalizado',
+        'documentos',
+        ['tipo_documento', 'numero_documento_normalizado'],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index('uq_doc_tipo_numero_normalizado', table_name='documentos')
+    op.create_index(
+        'ix_doc_tipo_numero_normalizado',
+        'documentos',
+        ['tipo_documento', 'numero_documento_normalizado'],
+        unique=False,
+    )
@@ -0,0 +1,134 @@
+"""indexa numero_documento_normalizado en la búsqueda de clientes
+
+Revision ID: e4a9b2c6d8f1
+Revises: 6b1e9d3f7a20
+Create Date: 2026-10-20 16:02:51.330472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a9b2c6d8f1'
+down_revision = '6b1e9d3f7a20'
+branch_labels = None
+depends_on = None
+
+
+CLAVE_FTS = "(SELECT rowid FROM clientes_fts_claves WHERE cliente_id = {cliente})"
+
+TRIGGERS = (
+    'trg_documentos_fts_ad', 'trg_documentos_fts_au', 'trg_documentos_fts_ai',
+    'trg_clientes_fts_ad', 'trg_clientes_fts_au', 'trg_clientes_fts_ai',
+)
+
+
+def _sqlite_ddl(normalizado):
+    # Tabla FTS5 y triggers, con o sin la columna numero_documento_normalizado
+    # (FTS5 no admite ALTER TABLE ADD COLUMN: se recrea la tabla)
+    columnas = "nombre, apellido, correo_electronico, numero_documento"
+    valores_alta = "new.nombre, new.apellido, new.correo_electronico, ''"
+    documento = "numero_documento = new.numero_documento"
+    sin_documento = "numero_documento = ''"
+    if normalizado:
+        columnas += ", numero_documento_normalizado"
+        valores_alta += ", ''"
+        documento += ", numero_documento_normalizado = coalesce(new.numero_documento_normalizado, '')"
+        sin_documento += ", numero_documento_normalizado = ''"
+    cambio_documento = "numero_documento, numero_documento_normalizado" if normalizado else "numero_documento"
+
+    return [
+        f"""
+        CREATE VIRTUAL TABLE clientes_fts USING fts5(
+            {columnas},
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER trg_clientes_fts_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts_claves(cliente_id) VALUES (new.id);
+            INSERT INTO clientes_fts(rowid, {columnas})
+            VALUES ({CLAVE_FTS.format(cliente="new.id")}, {valores_alta});
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_clientes_fts_au
+        AFTER UPDATE OF nombre, apellido, correo_electronico ON clientes BEGIN
+            UPDATE clientes_fts
+            SET nombre = new.nombre,
+                apellido = new.apellido,
+                correo_electronico = new.correo_electronico
+            WHERE rowid = {CLAVE_FTS.format(cliente="new.id")};
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_clientes_fts_ad AFTER DELETE ON clientes BEGIN
+            DELETE FROM clientes_fts WHERE rowid = {CLAVE_FTS.format(cliente="old.id")};
+            DELETE FROM clientes_fts_claves WHERE cliente_id = old.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_documentos_fts_ai AFTER INSERT ON documentos BEGIN
+            UPDATE clientes_fts SET {documento}
+            WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_documentos_fts_au
+        AFTER UPDATE OF {cambio_documento} ON documentos BEGIN
+            UPDATE clientes_fts SET {documento}
+            WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_documentos_fts_ad AFTER DELETE ON documentos BEGIN
+            UPDATE clientes_fts SET {sin_documento}
+            WHERE rowid = {CLAVE_FTS.format(cliente="old.cliente_id")};
+        END
+        """,
+    ]
+
+
+def _recrear_sqlite(normalizado):
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS clientes_fts')
+    for sentencia in _sqlite_ddl(normalizado):
+        op.execute(sentencia)
+
+    # Se llena de nuevo desde clientes_fts_claves (los rowid no cambian)
+    columnas = "nombre, apellido, correo_electronico, numero_documento"
+    valores = "c.nombre, c.apellido, c.correo_electronico, coalesce(d.numero_documento, '')"
+    if normalizado:
+        columnas += ", numero_documento_normalizado"
+        valores += ", coalesce(d.numero_documento_normalizado, '')"
+    op.execute(f"""
+        INSERT INTO clientes_fts(rowid, {columnas})
+        SELECT k.rowid, {valores}
+        FROM clientes_fts_claves k
+        JOIN clientes c ON c.id = k.cliente_id
+        LEFT JOIN documentos d ON d.cliente_id = c.id
+    """)
+
+
+def upgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'sqlite':
+        _recrear_sqlite(normalizado=True)
+    elif dialecto == 'postgresql':
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_documentos_numero_normalizado_trgm ON documentos "
+            "USING gin (numero_documento_normalizado gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'sqlite':
+        _recrear_sqlite(normalizado=False)
+    elif dialecto == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_documentos_numero_normalizado_trgm')
@@ -0,0 +1,77 @@
+"""check numero_documento_normalizado no vacío
+
+Revision ID: f1c7d3a9e5b0
+Revises: e4a9b2c6d8f1
+Create Date: 2026-10-20 17:25:08.941736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7d3a9e5b0'
+down_revision = 'e4a9b2c6d8f1'
+branch_labels = None
+depends_on = None
+
+
+CLAVE_FTS = "(SELECT rowid FROM clientes_fts_claves WHERE cliente_id = {cliente})"
+
+# En SQLite batch_alter_table recrea documentos y se pierden sus triggers del índice
+# de búsqueda (copia de e4a9b2c6d8f1): se vuelven a crear
+SQLITE_TRIGGERS_DOCUMENTOS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ai AFTER INSERT ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = new.numero_documento,
+            numero_documento_normalizado = coalesce(new.numero_documento_normalizado, '')
+        WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_au
+    AFTER UPDATE OF numero_documento, numero_documento_normalizado ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = new.numero_documento,
+            numero_documento_normalizado = coalesce(new.numero_documento_normalizado, '')
+        WHERE rowid = {CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ad AFTER DELETE ON documentos BEGIN
+        UPDATE clientes_fts
+        SET numero_documento = '', numero_documento_normalizado = ''
+        WHERE rowid = {CLAVE_FTS.format(cliente="old.cliente_id")};
+    END
+    """,
+]
+
+
+def upgrade():
+    # Documentos sin dígitos (CEDULA/NIT) o sin letras ni dígitos (PASAPORTE) que ya
+    # se guardaron con el número normalizado vacío: dejan de coincidir en las
+    # búsquedas por documento (NULL no coincide con nada ni viola la unicidad)
+    op.execute(
+        "UPDATE documentos SET numero_documento_normalizado = NULL "
+        "WHERE numero_documento_normalizado = ''"
+    )
+
+    with op.batch_alter_table('documentos', schema=None) as batch_op:
+        batch_op.create_check_constraint(
+            'ck_doc_numero_normalizado_no_vacio',
+            'length(numero_documento_normalizado) > 0',
+        )
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for sentencia in SQLITE_TRIGGERS_DOCUMENTOS:
+            op.execute(sentencia)
+
+
+def downgrade():
+    with op.batch_alter_table('documentos', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_doc_numero_normalizado_no_vacio', type_='check')
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for sentencia in SQLITE_TRIGGERS_DOCUMENTOS:
+            op.execute(sentencia)
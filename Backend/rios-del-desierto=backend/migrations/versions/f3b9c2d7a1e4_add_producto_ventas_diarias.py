@@ -0,0 +1,51 @@
+"""add producto_ventas_diarias y productos.updated_at
+
+Revision ID: f3b9c2d7a1e4
+Revises: d6e1a8c3f5b2
+Create Date: 2026-10-19 20:05:12.402918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9c2d7a1e4'
+down_revision = 'd6e1a8c3f5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Versión del catálogo de productos en memoria: max(updated_at) + número de productos
+    op.add_column('productos', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE productos SET updated_at = created_at")
+
+    op.create_table('producto_ventas_diarias',
+    sa.Column('producto_id', sa.Uuid(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('ingresos_centavos', sa.BigInteger(), nullable=False),
+    sa.Column('numero_compras', sa.Integer(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('producto_id', 'dia')
+    )
+    # Reporte por ventana: recorre solo los días pedidos
+    op.create_index('ix_producto_ventas_diarias_dia', 'producto_ventas_diarias', ['dia'], unique=False)
+
+    # Las ventas por producto solo recalculan la partición de archivo si la ventana
+    # llega a la última compra archivada (max(fecha))
+    op.create_index('ix_compras_archivo_fecha', 'compras_archivo', ['fecha'], unique=False)
+
+    # El llenado inicial se hace con `flask --app run.py refrescar-ventas-productos`
+    # (por lotes, con la API en línea).
+
+
+def downgrade():
+    op.drop_index('ix_compras_archivo_fecha', table_name='compras_archivo')
+    op.drop_index('ix_producto_ventas_diarias_dia', table_name='producto_ventas_diarias')
+    op.drop_table('producto_ventas_diarias')
+
+    with op.batch_alter_table('productos', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,283 @@
+# src/api/admision.py
+"""
+Control de admisión de los endpoints costosos.
+
+- Límite de tasa por cliente (token bucket): cada cliente tiene por endpoint una
+  cubeta de `rafaga` tokens que se recarga a `por_minuto` tokens por minuto. Sin
+  tokens: 429 con Retry-After. Se configura en ADMISION_TASAS (endpoint de Flask ->
+  (rafaga, por_minuto)). El cliente es su X-API-Key solo si está en
+  ADMISION_CLAVES_API; una clave desconocida se ignora y cuenta la IP (si no, basta
+  con inventar claves para tener cubetas nuevas).
+- Cupos de concurrencia (ADMISION_CUPOS, nombre -> máximo): el código costoso corre
+  dentro de `with cupo("nombre")`; si todos los cupos están ocupados se rechaza de
+  inmediato con 503 y Retry-After (duración media de las ejecuciones), en lugar de
+  dejar que los reportes ocupen todos los workers y las búsquedas esperen.
+
+Los cupos y las cubetas son por proceso: con N workers (gunicorn -w N) el servidor
+admite hasta N veces cada cupo, y cada cliente N veces su tasa si el balanceo lo
+reparte entre workers. ADMISION_CUPOS se dimensiona por worker.
+
+El cupo se toma donde empieza el trabajo pesado y no al entrar al endpoint: las
+descargas idénticas coalescidas (services/coalescencia.py) esperan a la que ya está
+en curso sin ocupar un cupo propio.
+
+Los contadores se exponen en /api/v1/metricas, que como los demás endpoints
+internos (`@requiere_clave_api`) solo responde a una X-API-Key de ADMISION_CLAVES_API.
+"""
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import AbstractSet, Dict, Iterator, Optional, Tuple
+
+from flask import Flask, current_app, jsonify, request
+
+# Cubetas máximas por endpoint antes de descartar las que ya están llenas (clientes inactivos)
+MAXIMO_CUBETAS = 10_000
+
+
+class AdmisionRechazada(Exception):
+    """Solicitud rechazada por el control de admisión (429 o 503)."""
+
+    def __init__(self, status: int, mensaje: str, reintentar_en: float):
+        super().__init__(mensaje)
+        self.status = status
+        self.mensaje = mensaje
+        self.reintentar_en = reintentar_en
+
+
+class CubetaTokens:
+    """Token bucket: `capacidad` tokens, recarga continua de `tasa` tokens por segundo."""
+
+    __slots__ = ("capacidad", "tasa", "tokens", "actualizado")
+
+    def __init__(self, capacidad: float, tasa: float):
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.tokens = capacidad
+        self.actualizado = time.monotonic()
+
+    def _recargar(self, ahora: float) -> None:
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.actualizado) * self.tasa)
+        self.actualizado = ahora
+
+    def consumir(self) -> float:
+        """
+        Toma un token.
+
+        Returns:
+            0 si había token; si no, segundos hasta que haya uno
+        """
+        self._recargar(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.tasa
+
+    def llena(self) -> bool:
+        self._recargar(time.monotonic())
+        return self.tokens >= self.capacidad
+
+
+class LimiteTasa:
+    """Cubetas por cliente de un endpoint."""
+
+    def __init__(self, rafaga: int, por_minuto: float):
+        self.rafaga = rafaga
+        self.tasa = por_minuto / 60
+        self._cubetas: Dict[str, CubetaTokens] = {}
+        self._candado = threading.Lock()
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    def consumir(self, cliente: str) -> float:
+        with self._candado:
+            cubeta = self._cubetas.get(cliente)
+            if cubeta is None:
+                if len(self._cubetas) >= MAXIMO_CUBETAS:
+                    self._purgar()
+                cubeta = self._cubetas[cliente] = CubetaTokens(self.rafaga, self.tasa)
+            espera = cubeta.consumir()
+            if espera:
+                self.rechazadas += 1
+            else:
+                self.admitidas += 1
+            return espera
+
+    def _purgar(self) -> None:
+        # Una cubeta llena equivale a una nueva: se puede olvidar
+        for cliente in [c for c, cubeta in self._cubetas.items() if cubeta.llena()]:
+            del self._cubetas[cliente]
+
+    def metricas(self) -> Dict:
+        return {
+            "rafaga": self.rafaga,
+            "porMinuto": round(self.tasa * 60, 3),
+            "clientes": len(self._cubetas),
+            "admitidas": self.admitidas,
+            "rechazadas": self.rechazadas,
+        }
+
+
+class Cupo:
+    """
+    Semáforo no bloqueante con duración media de las ejecuciones (para Retry-After).
+    Es local al proceso: el límite real del servidor es `maximo` por worker.
+    """
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self.en_curso = 0
+        self._candado = threading.Lock()
+        self.duracion_media: Optional[float] = None
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    def tomar(self) -> bool:
+        with self._candado:
+            if self.en_curso >= self.maximo:
+                self.rechazadas += 1
+                return False
+            self.en_curso += 1
+            self.admitidas += 1
+            return True
+
+    def liberar(self, duracion: float) -> None:
+        with self._candado:
+            self.en_curso -= 1
+            # Media móvil exponencial
+            if self.duracion_media is None:
+                self.duracion_media = duracion
+            else:
+                self.duracion_media = 0.8 * self.duracion_media + 0.2 * duracion
+
+    def metricas(self) -> Dict:
+        return {
+            "maximo": self.maximo,
+            "enCurso": self.en_curso,
+            "admitidas": self.admitidas,
+            "rechazadas": self.rechazadas,
+            "duracionMediaSegundos": round(self.duracion_media, 3) if self.duracion_media is not None else None,
+        }
+
+
+class Admision:
+    """Límites de tasa y cupos de una app."""
+
+    def __init__(
+        self,
+        tasas: Dict[str, Tuple[int, float]],
+        cupos: Dict[str, int],
+        claves_api: AbstractSet[str] = frozenset(),
+    ):
+        self.tasas = {endpoint: LimiteTasa(*valores) for endpoint, valores in tasas.items()}
+        self.cupos = {nombre: Cupo(maximo) for nombre, maximo in cupos.items()}
+        self.claves_api = frozenset(claves_api)
+
+    def metricas(self) -> Dict:
+        return {
+            "clavesApi": len(self.claves_api),
+            "tasas": {endpoint: limite.metricas() for endpoint, limite in self.tasas.items()},
+            "cupos": {nombre: c.metricas() for nombre, c in self.cupos.items()},
+        }
+
+
+def _admision() -> Optional[Admision]:
+    return current_app.extensions.get("admision")
+
+
+def identificar_cliente(claves_api: AbstractSet[str]) -> str:
+    """
+    Clave del cliente para el límite de tasa: la X-API-Key si está en `claves_api`
+    (ADMISION_CLAVES_API) o, si no, la IP.
+    """
+    clave = request.headers.get("X-API-Key")
+    if clave and clave in claves_api:
+        return f"clave:{clave}"
+    return f"ip:{request.remote_addr}"
+
+
+@contextmanager
+def cupo(nombre: str) -> Iterator[None]:
+    """
+    Ejecuta el bloque ocupando un cupo de concurrencia `nombre` (ADMISION_CUPOS).
+
+    Raises:
+        AdmisionRechazada: (503) si no hay cupos libres
+    """
+    admision = _admision()
+    limite = admision.cupos.get(nombre) if admision is not None else None
+    if limite is None:
+        yield
+        return
+
+    if not limite.tomar():
+        raise AdmisionRechazada(
+            503,
+            "Servidor ocupado generando otras solicitudes de este tipo. Intente más tarde",
+            limite.duracion_media or current_app.config["ADMISION_REINTENTO_SEGUNDOS"],
+        )
+    inicio = time.monotonic()
+    try:
+        yield
+    finally:
+        limite.liberar(time.monotonic() - inicio)
+
+
+def requiere_clave_api(vista):
+    """
+    Decorador de endpoints internos: solo los atiende con una X-API-Key de
+    ADMISION_CLAVES_API (401 sin clave o con una desconocida; sin claves
+    configuradas el endpoint queda cerrado). No depende de ADMISION_HABILITADA.
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = request.headers.get("X-API-Key")
+        if not clave or clave not in current_app.config["ADMISION_CLAVES_API"]:
+            return jsonify({"error": "Se requiere una X-API-Key válida"}), 401
+        return vista(*args, **kwargs)
+    return envoltura
+
+
+def verificar_tasa():
+    """before_request: aplica el límite de tasa del endpoint, si tiene uno."""
+    admision = _admision()
+    limite = admision.tasas.get(request.endpoint) if admision is not None else None
+    if limite is None:
+        return None
+    espera = limite.consumir(identificar_cliente(admision.claves_api))
+    if espera:
+        return respuesta_rechazo(AdmisionRechazada(
+            429,
+            "Demasiadas solicitudes. Intente más tarde",
+            espera,
+        ))
+    return None
+
+
+def respuesta_rechazo(error: AdmisionRechazada):
+    response = jsonify({"error": error.mensaje, "reintentarEnSegundos": math.ceil(error.reintentar_en)})
+    response.status_code = error.status
+    response.headers["Retry-After"] = str(max(1, math.ceil(error.reintentar_en)))
+    return response
+
+
+def metricas() -> Dict:
+    admision = _admision()
+    if admision is None:
+        return {"habilitada": False}
+    return {"habilitada": True, **admision.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """Registra el control de admisión si ADMISION_HABILITADA."""
+    if not app.config.get("ADMISION_HABILITADA", True):
+        return
+    app.extensions["admision"] = Admision(
+        app.config["ADMISION_TASAS"],
+        app.config["ADMISION_CUPOS"],
+        app.config["ADMISION_CLAVES_API"],
+    )
+    app.before_request(verificar_tasa)
+    app.register_error_handler(AdmisionRechazada, respuesta_rechazo)
@@ -0,0 +1,342 @@
+# src/api/asincrono.py
+"""
+API asíncrona (ASGI) para las consultas de clientes de alta concurrencia (POS).
+
+Aplicación Starlette que comparte con la API Flask los modelos, las sentencias
+precompiladas de src/models/consultas.py (ejecutadas con un motor asíncrono de
+SQLAlchemy: aiosqlite / asyncpg), la validación de parámetros (api/parametros.py)
+y los ETags (api/respuestas.py). Mientras una consulta espera a la base de datos,
+el mismo proceso atiende otras conexiones.
+
+La búsqueda por documento pasa primero por el índice mmap, el filtro de documentos
+y la caché de búsquedas (services/busqueda_clientes.py) de una app Flask creada con
+la misma configuración (app.state.flask), igual que la API Flask: la mayoría de las
+búsquedas se responden sin consultar la base de datos. Son búsquedas en memoria y
+se hacen en el event loop; la excepción es el refresco del filtro (una consulta
+indexada de los documentos recientes, como mucho una vez por
+FILTRO_DOCUMENTOS_REFRESCO_SEGUNDOS). El filtro se construye al arrancar, en un
+hilo, antes de aceptar conexiones.
+
+Prueba de carga: flask benchmark-carga --url http://127.0.0.1:8001 (ver README).
+
+Endpoints (mismas respuestas que la API Flask):
+    GET/POST /api/v1/clientes/buscar       Búsqueda por tipo y número de documento
+    POST     /api/v1/clientes/buscar-lote  Búsqueda de varios documentos en una consulta
+    GET/POST /api/v1/clientes/exportar     Exportación CSV/TXT/Excel de un cliente
+    GET      /health
+
+Ejecutar con: uvicorn asgi:app --host 0.0.0.0 --port 8001
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import quote
+
+from flask import Flask
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+from src.app import create_app
+from src.config import INSTANCE_DIR, DevConfig
+from src.models import consultas
+from src.models.cliente_estadisticas import ClienteEstadisticas
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.api.parametros import (
+    documento_de, documento_faltante, validar_documentos_lote, validar_formato, validar_numero_documento,
+    validar_tipo_documento,
+)
+from src.api.respuestas import CACHE_CONTROL, coincidencia_etag, etag_fila_cliente
+from src.api.serializacion import MIMETYPE_JSON, cliente_json, crear_codificador
+from src.services import busqueda_clientes, exportacion_cliente, filtro_documentos
+from src.services.coalescencia import VueloUnicoAsincrono
+
+# Documentos máximos por request en /clientes/buscar-lote
+MAXIMO_LOTE = 100
+
+# Controladores síncronos de la URL de Flask -> controladores asíncronos
+DRIVERS_ASINCRONOS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def url_asincrona(url: str) -> URL:
+    """
+    Convierte la URL de SQLALCHEMY_DATABASE_URI a su controlador asíncrono
+    (sqlite:///app.db -> sqlite+aiosqlite:///app.db).
+
+    Las rutas relativas de SQLite se resuelven dentro de instance/, igual que
+    hace Flask-SQLAlchemy, para que ambas apps usen el mismo archivo.
+    """
+    url_sa = make_url(url)
+    if url_sa.drivername in DRIVERS_ASINCRONOS:
+        url_sa = url_sa.set(drivername=DRIVERS_ASINCRONOS[url_sa.drivername])
+    if url_sa.get_backend_name() == "sqlite" and url_sa.database and url_sa.database != ":memory:":
+        if not Path(url_sa.database).is_absolute():
+            url_sa = url_sa.set(database=(INSTANCE_DIR / url_sa.database).as_posix())
+    return url_sa
+
+
+# --------------------
+# Utilidades
+# --------------------
+def _json(request: Request, obj: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(request.app.state.codificar(obj), status_code=status, media_type=MIMETYPE_JSON, headers=headers)
+
+
+def _error(request: Request, mensaje: str, status: int) -> Response:
+    return _json(request, {"error": mensaje}, status)
+
+
+async def _parametros(request: Request) -> Dict[str, Any]:
+    """Parámetros del request: JSON (POST) o query string (GET), como en la API Flask."""
+    if request.method == "POST" and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            datos = await request.json()
+        except ValueError:
+            return {}
+        return datos if isinstance(datos, dict) else {}
+    return dict(request.query_params)
+
+
+def _etag_coincidente(request: Request, etag: str) -> Optional[str]:
+    """respuestas.etag_coincidente con el If-None-Match del request de Starlette."""
+    return coincidencia_etag(parse_etags(request.headers.get("if-none-match")), etag)
+
+
+def _cabeceras_cache(etag: str) -> Dict[str, str]:
+    return {"ETag": f'"{etag}"', "Cache-Control": CACHE_CONTROL}
+
+
+async def _buscar_fila(conexion: AsyncConnection, tipo_documento: TipoDocumentoEnum, numero_documento: str):
+    resultado = await conexion.execute(
+        consultas.CLIENTE_POR_DOCUMENTO,
+        {
+            "tipo_documento": tipo_documento,
+            "numero_normalizado": normalizar_numero_documento(tipo_documento, numero_documento),
+        },
+    )
+    return resultado.first()
+
+
+async def _cliente_por_documento(request: Request, tipo_documento: TipoDocumentoEnum, numero_documento: str):
+    """
+    Búsqueda por documento: índice mmap, filtro y caché de la app Flask (ver
+    services/busqueda_clientes.py) y, si no la resuelven, consulta coalescida (las
+    solicitudes concurrentes comparten la consulta).
+    """
+    numero_normalizado = normalizar_numero_documento(tipo_documento, numero_documento)
+    app_flask: Flask = request.app.state.flask
+    with app_flask.app_context():
+        resuelta, fila = busqueda_clientes.en_memoria(tipo_documento, numero_normalizado)
+    if resuelta:
+        return fila
+
+    motor: AsyncEngine = request.app.state.motor
+
+    async def consulta():
+        async with motor.connect() as conexion:
+            return await _buscar_fila(conexion, tipo_documento, numero_documento)
+
+    busquedas: Optional[VueloUnicoAsincrono] = request.app.state.busquedas
+    if busquedas is None:
+        fila = await consulta()
+    else:
+        fila = await busquedas.ejecutar((tipo_documento, numero_normalizado), consulta)
+
+    with app_flask.app_context():
+        busqueda_clientes.registrar_consulta(tipo_documento, numero_normalizado, fila)
+    return fila
+
+
+# --------------------
+# Endpoints
+# --------------------
+async def buscar_cliente_por_documento(request: Request) -> Response:
+    """Equivalente asíncrono de GET/POST /api/v1/clientes/buscar."""
+    tipo_documento_str, numero_documento = documento_de(await _parametros(request))
+
+    error = documento_faltante(tipo_documento_str, numero_documento)
+    if error:
+        return _error(request, error, 400)
+
+    tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+    if error:
+        return _error(request, error, 400)
+    _, error = validar_numero_documento(tipo_documento, numero_documento)
+    if error:
+        return _error(request, error, 400)
+
+    incluir_estadisticas = (request.query_params.get("estadisticas") or "").lower() in ("1", "true", "si")
+
+    # Conexión Core (sin sesión ORM); la sesión solo se abre para las estadísticas
+    fila = await _cliente_por_documento(request, tipo_documento, numero_documento.strip())
+    if not fila:
+        return _error(request, "Cliente no encontrado", 404)
+
+    estadisticas = None
+    if incluir_estadisticas:
+        async with AsyncSession(request.app.state.motor) as sesion:
+            estadisticas = await sesion.get(ClienteEstadisticas, fila.id)
+
+    if incluir_estadisticas:
+        etag = etag_fila_cliente(fila, "estadisticas", estadisticas.actualizado_en if estadisticas else "")
+    else:
+        etag = etag_fila_cliente(fila)
+    coincidente = _etag_coincidente(request, etag)
+    if coincidente:
+        return Response(status_code=304, headers=_cabeceras_cache(coincidente))
+
+    cuerpo = cliente_json(
+        fila,
+        estadisticas=(
+            (estadisticas.to_dict() if estadisticas else ClienteEstadisticas.vacias())
+            if incluir_estadisticas else None
+        ),
+    )
+    return _json(request, cuerpo, headers=_cabeceras_cache(etag))
+
+
+async def buscar_clientes_por_lote(request: Request) -> Response:
+    """
+    POST /api/v1/clientes/buscar-lote
+
+    Body (JSON):
+        documentos: Lista de {tipoDocumento, numeroDocumento} (máximo MAXIMO_LOTE)
+
+    Returns:
+        200: {"resultados": [clientes encontrados], "noEncontrados": [documentos sin cliente]}
+        400: Body inválido
+    """
+    datos = await _parametros(request)
+    solicitados, error = validar_documentos_lote(datos.get("documentos"), MAXIMO_LOTE)
+    if error:
+        return _error(request, error, 400)
+
+    async with request.app.state.motor.connect() as conexion:
+        filas = (await conexion.execute(
+            consultas.CLIENTES_POR_DOCUMENTOS,
+            consultas.parametros_documentos((tipo, numero) for tipo, numero, _ in solicitados),
+        )).all()
+
+    encontrados = {(fila.tipo_documento, fila.numero_documento_normalizado): fila for fila in filas}
+    resultados, no_encontrados, vistos = [], [], set()
+    for tipo_documento, numero_documento, original in solicitados:
+        clave = (tipo_documento, normalizar_numero_documento(tipo_documento, numero_documento))
+        fila = encontrados.get(clave)
+        if fila is None:
+            no_encontrados.append(original)
+        elif clave not in vistos:
+            resultados.append(cliente_json(fila))
+        vistos.add(clave)
+
+    return _json(request, {"resultados": resultados, "noEncontrados": no_encontrados})
+
+
+async def exportar_cliente(request: Request) -> Response:
+    """Equivalente asíncrono de GET/POST /api/v1/clientes/exportar."""
+    datos = await _parametros(request)
+    tipo_documento_str, numero_documento = documento_de(datos)
+
+    error = documento_faltante(tipo_documento_str, numero_documento)
+    if error:
+        return _error(request, error, 400)
+
+    formato, error = validar_formato(request.query_params.get("formato") or datos.get("formato"))
+    if error:
+        return _error(request, error, 400)
+
+    tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+    if error:
+        return _error(request, error, 400)
+    _, error = validar_numero_documento(tipo_documento, numero_documento)
+    if error:
+        return _error(request, error, 400)
+
+    fila = await _cliente_por_documento(request, tipo_documento, numero_documento.strip())
+    if not fila:
+        return _error(request, "Cliente no encontrado", 404)
+
+    etag = etag_fila_cliente(fila, formato)
+    coincidente = _etag_coincidente(request, etag)
+    if coincidente:
+        return Response(status_code=304, headers=_cabeceras_cache(coincidente))
+
+    # Generar el archivo (pandas/openpyxl, CPU) fuera del event loop
+    contenido = await asyncio.to_thread(
+        exportacion_cliente.construir_exportacion,
+        exportacion_cliente.datos_exportacion(fila),
+        formato,
+    )
+    nombre = exportacion_cliente.nombre_archivo(fila, formato)
+    return Response(
+        contenido,
+        media_type=exportacion_cliente.MIMETYPES[formato],
+        headers={
+            **_cabeceras_cache(etag),
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(nombre)}",
+        },
+    )
+
+
+async def health(request: Request) -> Response:
+    return _json(request, {"status": "ok"})
+
+
+def _preparar_filtro(app_flask: Flask) -> None:
+    with app_flask.app_context():
+        filtro_documentos.preparar()
+
+
+def create_asgi_app(config_object=DevConfig) -> Starlette:
+    """
+    Crea la aplicación ASGI.
+
+    Config usada: SQLALCHEMY_DATABASE_URI (convertida a su controlador asíncrono),
+    ASYNC_POOL_SIZE, JSON_PROVEEDOR, COALESCENCIA_HABILITADA y COMPRESION_MIN_BYTES,
+    además de la de la app Flask que aporta el índice mmap, el filtro y la caché.
+    """
+    app_flask = create_app(config_object)
+    url = url_asincrona(config_object.SQLALCHEMY_DATABASE_URI)
+    opciones_motor: Dict[str, Any] = {}
+    if url.database != ":memory:":
+        opciones_motor["pool_size"] = config_object.ASYNC_POOL_SIZE
+        opciones_motor["max_overflow"] = config_object.ASYNC_POOL_SIZE
+    motor: AsyncEngine = create_async_engine(url, **opciones_motor)
+
+    rutas = [
+        Route("/api/v1/clientes/buscar", buscar_cliente_por_documento, methods=["GET", "POST"]),
+        Route("/api/v1/clientes/buscar-lote", buscar_clientes_por_lote, methods=["POST"]),
+        Route("/api/v1/clientes/exportar", exportar_cliente, methods=["GET", "POST"]),
+        Route("/health", health),
+    ]
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app: Starlette):
+        # Filtro de documentos: recorre la tabla, fuera del event loop
+        await asyncio.to_thread(_preparar_filtro, app_flask)
+        yield
+        await motor.dispose()
+
+    app = Starlette(
+        routes=rutas,
+        middleware=[Middleware(GZipMiddleware, minimum_size=config_object.COMPRESION_MIN_BYTES)],
+        lifespan=ciclo_de_vida,
+    )
+    app.state.motor = motor
+    app.state.flask = app_flask
+    app.state.busquedas = VueloUnicoAsincrono() if config_object.COALESCENCIA_HABILITADA else None
+    app.state.codificar = crear_codificador(config_object.JSON_PROVEEDOR)
+    return app
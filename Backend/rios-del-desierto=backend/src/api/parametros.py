@@ -0,0 +1,103 @@
+# src/api/parametros.py
+"""
+Lectura y validación de los parámetros de las consultas de clientes, compartidas
+por la API Flask (api/v1/clientes_routes.py) y la asíncrona (api/asincrono.py):
+mismos nombres aceptados (snake_case o camelCase) y mismos mensajes de error.
+
+Las funciones de validación devuelven (valor, None) o (None, mensaje de error);
+cada API arma la respuesta 400 con su propio framework.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.services import exportacion_cliente
+
+ERROR_FORMATO_REQUERIDO = "El parámetro 'formato' es requerido. Valores válidos: CSV, TXT, Excel"
+ERROR_FORMATO_INVALIDO = "Formato inválido. Valores válidos: CSV, TXT, Excel"
+ERROR_DOCUMENTOS_REQUERIDOS = "El campo 'documentos' es requerido (lista de {tipoDocumento, numeroDocumento})"
+
+
+def documento_de(datos: Mapping[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Tipo y número de documento de un dict de parámetros (snake_case o camelCase)."""
+    tipo_documento = datos.get("tipo_documento") or datos.get("tipoDocumento")
+    numero_documento = datos.get("numero_documento") or datos.get("numeroDocumento")
+    return tipo_documento, numero_documento
+
+
+def documento_faltante(tipo_documento: Optional[str], numero_documento: Optional[str]) -> Optional[str]:
+    """Mensaje de error si falta el tipo o el número de documento, o None."""
+    if not tipo_documento:
+        return "El parámetro 'tipo_documento' es requerido"
+    if not numero_documento:
+        return "El parámetro 'numero_documento' es requerido"
+    return None
+
+
+def validar_tipo_documento(valor: Any) -> Tuple[Optional[TipoDocumentoEnum], Optional[str]]:
+    """Tipo de documento (sin distinguir mayúsculas) o el mensaje con los valores válidos."""
+    try:
+        return TipoDocumentoEnum(str(valor or "").upper()), None
+    except ValueError:
+        valores_validos = [e.value for e in TipoDocumentoEnum]
+        return None, f"Tipo de documento inválido. Valores válidos: {', '.join(valores_validos)}"
+
+
+def validar_numero_documento(
+    tipo_documento: TipoDocumentoEnum, numero_documento: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Número de documento normalizado, o el mensaje de error si queda vacío (p. ej. una
+    CEDULA "abc" sin dígitos): un número vacío coincidiría con cualquier otro número
+    sin dígitos.
+    """
+    numero_normalizado = normalizar_numero_documento(tipo_documento, numero_documento)
+    if not numero_normalizado:
+        caracteres = "letras o dígitos" if tipo_documento == TipoDocumentoEnum.PASAPORTE else "dígitos"
+        return None, f"Número de documento inválido: un {tipo_documento.value} debe contener {caracteres}"
+    return numero_normalizado, None
+
+
+def validar_formato(formato: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Formato de exportación en mayúsculas (CSV, TXT o EXCEL) o el mensaje de error."""
+    if not formato:
+        return None, ERROR_FORMATO_REQUERIDO
+    formato = formato.upper()
+    if formato not in exportacion_cliente.FORMATOS:
+        return None, ERROR_FORMATO_INVALIDO
+    return formato, None
+
+
+def validar_documentos_lote(
+    documentos: Any, maximo: int
+) -> Tuple[Optional[List[Tuple[TipoDocumentoEnum, str, Dict]]], Optional[str]]:
+    """
+    Lista de documentos de las solicitudes por lote.
+
+    Args:
+        documentos: Valor del campo "documentos" del body
+        maximo: Documentos máximos por solicitud
+
+    Returns:
+        ([(tipo, número sin espacios, documento original), ...], None) o (None, mensaje de error)
+    """
+    if not isinstance(documentos, list) or not documentos:
+        return None, ERROR_DOCUMENTOS_REQUERIDOS
+    if len(documentos) > maximo:
+        return None, f"Máximo {maximo} documentos por solicitud"
+
+    solicitados = []
+    for documento in documentos:
+        if not isinstance(documento, dict):
+            return None, "Cada documento debe ser un objeto {tipoDocumento, numeroDocumento}"
+        tipo_documento_str, numero_documento = documento_de(documento)
+        tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+        if error:
+            return None, error
+        if not numero_documento:
+            return None, "Cada documento requiere 'numeroDocumento'"
+        _, error = validar_numero_documento(tipo_documento, str(numero_documento))
+        if error:
+            return None, error
+        solicitados.append((tipo_documento, str(numero_documento).strip(), documento))
+    return solicitados, None
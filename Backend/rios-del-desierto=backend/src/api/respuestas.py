@@ -0,0 +1,165 @@
+# src/api/respuestas.py
+"""
+Utilidades HTTP compartidas por los blueprints:
+
+- Compresión gzip (y brotli si está instalado) negociada con Accept-Encoding
+  para JSON y exportaciones de texto (CSV/TXT) generadas en memoria. Los archivos
+  servidos desde disco con Range (artefactos de reportes) no se comprimen.
+- ETags fuertes por cliente (derivados de Cliente.updated_at) y respuestas 304.
+  La API asíncrona (api/asincrono.py) usa las mismas funciones de ETag.
+"""
+import gzip
+import hashlib
+from typing import Optional
+
+from flask import Flask, Response, current_app, request
+from werkzeug.datastructures import ETags
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+
+# Cache-Control de las respuestas con ETag: el navegador siempre revalida
+CACHE_CONTROL = "private, no-cache"
+
+TIPOS_COMPRIMIBLES = {
+    "application/json",
+    "text/csv",
+    "text/plain",
+    "text/html",
+}
+
+
+def codificaciones_disponibles():
+    """Codificaciones soportadas, en orden de preferencia del servidor."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def _comprimir(datos: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return brotli.compress(datos, quality=current_app.config["COMPRESION_NIVEL_BROTLI"])
+    return gzip.compress(datos, compresslevel=current_app.config["COMPRESION_NIVEL_GZIP"])
+
+
+def comprimir_respuesta(response: Response) -> Response:
+    """
+    after_request: comprime la respuesta si el cliente lo acepta y el tipo de
+    contenido lo justifica. Si la respuesta tiene ETag se le agrega el sufijo
+    de la codificación (una representación distinta debe tener otro ETag).
+
+    No se comprimen las respuestas que admiten Range (send_file con
+    conditional=True, p. ej. los artefactos en disco): los rangos se refieren a los
+    bytes sin comprimir y leer el archivo a memoria anularía el envío con sendfile.
+    Las exportaciones en memoria usan send_file(..., conditional=False).
+    """
+    if (
+        response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in TIPOS_COMPRIMIBLES
+        or response.accept_ranges
+        # Respuestas generadas por streaming: no se bufferizan
+        or (response.is_streamed and not response.direct_passthrough)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    codificacion = request.accept_encodings.best_match(codificaciones_disponibles())
+    if not codificacion:
+        return response
+
+    response.direct_passthrough = False
+    datos = response.get_data()
+    if len(datos) < current_app.config["COMPRESION_MIN_BYTES"]:
+        return response
+
+    response.set_data(_comprimir(datos, codificacion))
+    response.headers["Content-Encoding"] = codificacion
+
+    etag, debil = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{codificacion}", weak=debil)
+
+    return response
+
+
+def etag_cliente(cliente, *variantes) -> str:
+    """
+    ETag fuerte para la representación de un cliente.
+
+    Cambia cuando cambia Cliente.updated_at o el documento, y con cada variante
+    (por ejemplo el formato de exportación).
+    """
+    documento = cliente.documento
+    return _etag(
+        cliente.id,
+        cliente.updated_at,
+        documento.tipo_documento if documento else None,
+        documento.numero_documento if documento else None,
+        variantes,
+    )
+
+
+def etag_fila_cliente(fila, *variantes) -> str:
+    """ETag de un cliente leído como fila (ver models/consultas.py); igual al de etag_cliente."""
+    return _etag(fila.id, fila.updated_at, fila.tipo_documento, fila.numero_documento, variantes)
+
+
+def _etag(cliente_id, updated_at, tipo_documento, numero_documento, variantes) -> str:
+    partes = [
+        str(cliente_id),
+        updated_at.isoformat() if updated_at else "",
+        tipo_documento.value if tipo_documento else "",
+        numero_documento or "",
+        *[str(v) for v in variantes],
+    ]
+    return hashlib.sha1("|".join(partes).encode("utf-8")).hexdigest()
+
+
+def etag_coincidente(etag: str) -> Optional[str]:
+    """
+    Busca el ETag en el If-None-Match del request, aceptando el sufijo de
+    codificación que haya agregado comprimir_respuesta.
+
+    Returns:
+        El ETag tal como lo envió el cliente, o None si no coincide
+    """
+    return coincidencia_etag(request.if_none_match, etag)
+
+
+def coincidencia_etag(if_none_match: ETags, etag: str) -> Optional[str]:
+    """
+    Igual que etag_coincidente, con el If-None-Match ya parseado
+    (werkzeug.http.parse_etags) para usarlo fuera de un request de Flask.
+    """
+    if if_none_match.star_tag:
+        return etag
+    for candidato in if_none_match:
+        if candidato == etag or candidato.startswith(f"{etag}-"):
+            return candidato
+    return None
+
+
+def no_modificado(etag: str) -> Response:
+    """Respuesta 304 con el ETag y las cabeceras de caché."""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def con_etag(response: Response, etag: str) -> Response:
+    """
+    Agrega ETag y Cache-Control a una respuesta 200. `no-cache` obliga al navegador
+    a revalidar, así que las consultas repetidas reciben 304 sin cuerpo.
+    """
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def init_app(app: Flask) -> None:
+    app.after_request(comprimir_respuesta)
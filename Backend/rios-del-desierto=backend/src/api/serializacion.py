@@ -0,0 +1,258 @@
+# src/api/serializacion.py
+"""
+Serialización JSON de las respuestas de la API.
+
+- ProveedorJSONRapido: proveedor JSON de Flask que usa orjson o msgspec si están
+  instalados (JSON_PROVEEDOR = auto | orjson | msgspec | stdlib). Produce la misma
+  salida que el proveedor por defecto (claves ordenadas, Decimal como texto, fechas
+  en formato HTTP), salvo que los caracteres no ASCII van en UTF-8 sin escapar y
+  que con msgspec las fechas van en ISO 8601.
+- ClienteJSON / codificar_cliente / transmitir_clientes: serializador tipado de
+  Cliente + Documento (dataclass con slots que orjson y msgspec codifican de forma
+  nativa) a partir del objeto ORM o de la fila de consultas.cliente_por_documento,
+  sin armar el dict intermedio de to_dict().
+"""
+import json
+import uuid
+from dataclasses import dataclass, fields, is_dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec es opcional
+    msgspec = None
+
+MIMETYPE_JSON = "application/json"
+
+
+def motores_disponibles():
+    """Motores JSON instalados, en orden de preferencia."""
+    motores = []
+    if orjson is not None:
+        motores.append("orjson")
+    if msgspec is not None:
+        motores.append("msgspec")
+    motores.append("stdlib")
+    return motores
+
+
+def _elegir_motor(preferido: str) -> str:
+    disponibles = motores_disponibles()
+    if preferido == "auto":
+        return disponibles[0]
+    if preferido not in disponibles:
+        raise ValueError(
+            f"Motor JSON '{preferido}' no disponible. Instalados: {', '.join(disponibles)}"
+        )
+    return preferido
+
+
+def _codificador(motor: str, default: Callable[[Any], Any]) -> Callable[[Any], bytes]:
+    """Función que codifica un objeto a bytes JSON con claves ordenadas (igual que Flask)."""
+    if motor == "orjson":
+        # Las fechas sueltas pasan por `default` para conservar el formato de Flask;
+        # los dataclasses (ClienteJSON) se codifican de forma nativa
+        opciones = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+        def codificar(obj: Any) -> bytes:
+            return orjson.dumps(obj, default=default, option=opciones)
+
+        return codificar
+
+    if motor == "msgspec":
+        return msgspec.json.Encoder(enc_hook=default, order="sorted").encode
+
+    def default_stdlib(obj: Any) -> Any:
+        # Dataclasses a dict superficial: dataclasses.asdict copia todo en profundidad
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return {nombre: getattr(obj, nombre) for nombre in _nombres_campos(type(obj))}
+        return default(obj)
+
+    def codificar_stdlib(obj: Any) -> bytes:
+        return json.dumps(obj, default=default_stdlib, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    return codificar_stdlib
+
+
+def crear_codificador(motor: str = "auto") -> Callable[[Any], bytes]:
+    """
+    Codificador JSON (bytes, claves ordenadas) con las mismas conversiones que el
+    proveedor de Flask, para usar fuera de una app Flask (p. ej. la API asíncrona).
+    """
+    return _codificador(_elegir_motor(motor), DefaultJSONProvider.default)
+
+
+@lru_cache(maxsize=None)
+def _nombres_campos(clase: type) -> tuple:
+    return tuple(campo.name for campo in fields(clase))
+
+
+def _decodificar_msgspec(s) -> Any:
+    # Flask espera ValueError para responder 400 ante un JSON inválido
+    try:
+        return msgspec.json.decode(s)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+class ProveedorJSONRapido(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask respaldado por orjson o msgspec (o por json de la
+    biblioteca estándar si no hay ninguno instalado).
+
+    En modo debug con salida indentada (o con argumentos extra en dumps) se usa el
+    proveedor por defecto, que es el que sabe indentar.
+    """
+
+    def __init__(self, app: Flask, motor: str = "auto"):
+        super().__init__(app)
+        self.motor = _elegir_motor(motor)
+        self.codificar = _codificador(self.motor, self.default)
+        if self.motor == "orjson":
+            self._decodificar = orjson.loads
+        elif self.motor == "msgspec":
+            self._decodificar = _decodificar_msgspec
+        else:
+            self._decodificar = json.loads
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.codificar(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._decodificar(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.codificar(obj) + b"\n", mimetype=self.mimetype)
+
+
+# --------------------------------------
+# Serializador de Cliente + Documento
+# --------------------------------------
+@dataclass(slots=True)
+class DocumentoJSON:
+    numeroDocumento: str
+    tipoDocumento: str
+
+
+@dataclass(slots=True)
+class ClienteJSON:
+    """Representación JSON de un cliente con su documento (campos en orden alfabético)."""
+    apellido: str
+    correoElectronico: str
+    documento: Optional[DocumentoJSON]
+    fechaNacimiento: Optional[str]
+    id: uuid.UUID
+    nombre: str
+    telefonoCelular: str
+
+
+@dataclass(slots=True)
+class ClienteEstadisticasJSON(ClienteJSON):
+    estadisticas: dict
+
+
+@dataclass(slots=True)
+class ResultadoBusquedaJSON(ClienteJSON):
+    puntaje: float
+
+
+@dataclass(slots=True)
+class ResultadoBusquedaEstadisticasJSON(ResultadoBusquedaJSON):
+    estadisticas: dict
+
+
+def cliente_json(cliente, estadisticas: Optional[dict] = None, puntaje: Optional[float] = None) -> ClienteJSON:
+    """
+    Arma la representación tipada de un cliente, equivalente a to_dict() + "documento".
+
+    Args:
+        cliente: Cliente (ORM) o fila de consultas.cliente_por_documento
+        estadisticas: Dict de estadísticas a incluir (opcional)
+        puntaje: Puntaje de relevancia a incluir (opcional, búsqueda por texto)
+    """
+    if hasattr(cliente, "tipo_documento"):
+        documento = DocumentoJSON(cliente.numero_documento, cliente.tipo_documento.value)
+    elif cliente.documento is not None:
+        documento = DocumentoJSON(cliente.documento.numero_documento, cliente.documento.tipo_documento.value)
+    else:
+        documento = None
+
+    fecha_nacimiento = cliente.fecha_nacimiento
+    campos = (
+        cliente.apellido,
+        cliente.correo_electronico,
+        documento,
+        fecha_nacimiento.isoformat() if fecha_nacimiento else None,
+        cliente.id,
+        cliente.nombre,
+        cliente.telefono_celular,
+    )
+    if puntaje is not None:
+        if estadisticas is not None:
+            return ResultadoBusquedaEstadisticasJSON(*campos, puntaje, estadisticas)
+        return ResultadoBusquedaJSON(*campos, puntaje)
+    if estadisticas is not None:
+        return ClienteEstadisticasJSON(*campos, estadisticas)
+    return ClienteJSON(*campos)
+
+
+def codificar(obj: Any) -> bytes:
+    """Codifica a bytes JSON con el proveedor de la aplicación (orjson/msgspec si está activo)."""
+    proveedor = current_app.json
+    if isinstance(proveedor, ProveedorJSONRapido):
+        return proveedor.codificar(obj)
+    return proveedor.dumps(obj).encode("utf-8")
+
+
+def codificar_cliente(cliente, estadisticas: Optional[dict] = None, puntaje: Optional[float] = None) -> bytes:
+    """Bytes JSON de un cliente con su documento (ver cliente_json)."""
+    return codificar(cliente_json(cliente, estadisticas=estadisticas, puntaje=puntaje))
+
+
+def transmitir_clientes(clientes: Iterable, separador: bytes = b",") -> Iterator[bytes]:
+    """
+    Codifica clientes uno por uno para respuestas en streaming (el llamador agrega
+    los delimitadores externos, p. ej. b"[" y b"]", o usa separador=b"\\n" para NDJSON).
+
+    Args:
+        clientes: Clientes (ORM) o filas de consultas
+
+    Yields:
+        Bytes de cada cliente, precedidos por el separador desde el segundo
+    """
+    proveedor = current_app.json
+    codificador = proveedor.codificar if isinstance(proveedor, ProveedorJSONRapido) else codificar
+    primero = True
+    for cliente in clientes:
+        cuerpo = codificador(cliente_json(cliente))
+        if primero:
+            primero = False
+            yield cuerpo
+        else:
+            yield separador + cuerpo
+
+
+def respuesta_json(cuerpo: bytes, status: int = 200) -> Response:
+    """Respuesta con un cuerpo JSON ya codificado."""
+    return Response(cuerpo, status=status, mimetype=MIMETYPE_JSON)
+
+
+def init_app(app: Flask) -> None:
+    """Instala ProveedorJSONRapido según JSON_PROVEEDOR (auto, orjson, msgspec o stdlib)."""
+    app.json = ProveedorJSONRapido(app, motor=app.config.get("JSON_PROVEEDOR", "auto"))
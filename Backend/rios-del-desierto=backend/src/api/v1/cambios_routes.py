@@ -0,0 +1,57 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from src.api.admision import AdmisionRechazada, cupo
+from src.services import cambios
+
+bp = Blueprint("cambios", __name__)
+
+
+@bp.get("/cambios")
+def obtener_cambios():
+    """
+    Feed de cambios de clientes y compras (bandeja de salida), en orden, para que
+    los sistemas externos (CRM, data lake) sincronicen de forma incremental.
+
+    El consumidor guarda el `cursor` de la respuesta y lo envía como `desde` en la
+    siguiente solicitud. Si no hay cambios nuevos, la solicitud espera (long polling)
+    hasta `espera` segundos a que aparezcan.
+
+    Query parameters:
+        desde: Cursor del último cambio recibido (por defecto 0: desde el principio
+            de la retención, CAMBIOS_RETENCION_DIAS)
+        limite: Máximo de cambios (por defecto CAMBIOS_LIMITE, máximo CAMBIOS_LIMITE_MAX)
+        espera: Segundos de espera si no hay cambios (por defecto y máximo
+            CAMBIOS_ESPERA_MAX_SEGUNDOS; 0 responde de inmediato)
+
+    Returns:
+        200: cambios (cursor, entidad, id, operacion, fecha, datos), cursor para la
+            siguiente solicitud y hayMas (hay más cambios disponibles: pedir de nuevo
+            sin esperar; False si la lectura se detuvo antes de un cambio que aún
+            puede estar en una transacción sin confirmar)
+        400: Parámetros inválidos
+    """
+    config = current_app.config
+    try:
+        desde = int(request.args.get("desde") or 0)
+        limite = int(request.args.get("limite") or config["CAMBIOS_LIMITE"])
+        espera = float(request.args.get("espera") or config["CAMBIOS_ESPERA_MAX_SEGUNDOS"])
+    except ValueError:
+        return jsonify({"error": "Los parámetros 'desde', 'limite' y 'espera' deben ser numéricos"}), 400
+    if desde < 0 or limite < 1 or espera < 0:
+        return jsonify({"error": "Los parámetros 'desde', 'limite' y 'espera' no pueden ser negativos"}), 400
+    limite = min(limite, config["CAMBIOS_LIMITE_MAX"])
+    espera = min(espera, config["CAMBIOS_ESPERA_MAX_SEGUNDOS"])
+
+    # Cada espera ocupa un hilo del worker: con los cupos de espera ocupados se
+    # responde de inmediato (el consumidor vuelve a pedir) en lugar de rechazar
+    try:
+        with cupo("cambios_espera"):
+            lista, hay_mas = cambios.leer_o_esperar(desde, limite, espera)
+    except AdmisionRechazada:
+        lista, hay_mas = cambios.leer(desde, limite)
+
+    return jsonify({
+        "cambios": [cambio.to_dict() for cambio in lista],
+        "cursor": lista[-1].id if lista else desde,
+        "hayMas": hay_mas,
+    })
@@ -1,18 +1,64 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
 from datetime import datetime
-from sqlalchemy import select
-from io import BytesIO, StringIO
-import pandas as pd
-from openpyxl.utils import get_column_letter
+from io import BytesIO
+from sqlalchemy.exc import IntegrityError
 
+from src.models import consultas
 from src.models.cliente import Cliente
-from src.models.documento import Documento
+from src.models.cliente_estadisticas import ClienteEstadisticas
+from src.models.documento import Documento, normalizar_numero_documento
+from src.models.restricciones import restriccion_violada
 from src.models.enums import TipoDocumentoEnum
 from src.extensions import db
+from src.api.parametros import (
+    documento_de, documento_faltante, validar_documentos_lote, validar_formato, validar_numero_documento,
+    validar_tipo_documento,
+)
+from src.api.respuestas import etag_fila_cliente, etag_coincidente, no_modificado, con_etag
+from src.services import busqueda_clientes, coalescencia, exportacion_cliente, filtro_documentos
+from src.api.serializacion import cliente_json, codificar, codificar_cliente, respuesta_json
 
 bp = Blueprint("clientes", __name__)
 
 
+def _incluir_estadisticas() -> bool:
+    """Query param opcional ?estadisticas=1 para agregar las estadísticas de compra."""
+    return (request.args.get("estadisticas") or "").lower() in ("1", "true", "si")
+
+
+def _cliente_por_documento(tipo_documento: TipoDocumentoEnum, numero_documento: str):
+    """
+    consultas.cliente_por_documento con índice mmap, filtro y caché (ver
+    services/busqueda_clientes.py) y coalescencia: las búsquedas concurrentes del
+    mismo documento (tipo + número normalizado) comparten una sola consulta.
+    """
+    numero_normalizado = normalizar_numero_documento(tipo_documento, numero_documento)
+    resuelta, fila = busqueda_clientes.en_memoria(tipo_documento, numero_normalizado)
+    if resuelta:
+        return fila
+
+    fila = coalescencia.ejecutar(
+        "busquedas_cliente",
+        (tipo_documento, numero_normalizado),
+        lambda: consultas.cliente_por_documento(tipo_documento, numero_documento),
+    )
+    busqueda_clientes.registrar_consulta(tipo_documento, numero_normalizado, fila)
+    return fila
+
+
+def _documento_del_request():
+    """
+    Tipo y número de documento del request (prioridad: JSON > Form > Query params).
+    React normalmente envía JSON con Content-Type: application/json.
+    """
+    if request.is_json:
+        return documento_de(request.get_json() or {})
+    if request.method == "POST" and request.form:
+        # Form data (formulario HTML tradicional)
+        return documento_de(request.form)
+    # GET: Query parameters
+    return request.args.get("tipo_documento"), request.args.get("numero_documento")
+
 
 @bp.post("/clientes")
 def crear_cliente():
@@ -70,34 +116,12 @@ def crear_cliente():
             return jsonify({"error": "El campo 'documento.numeroDocumento' es requerido"}), 400
         
         # Validar tipo de documento
-        try:
-            tipo_documento = TipoDocumentoEnum(tipo_documento_str.upper())
-        except ValueError:
-            valores_validos = [e.value for e in TipoDocumentoEnum]
-            return jsonify({
-                "error": f"Tipo de documento inválido. Valores válidos: {', '.join(valores_validos)}"
-            }), 400
-        
-        # Validar que el correo no exista
-        existing_cliente = db.session.scalar(
-            select(Cliente).where(Cliente.correo_electronico == correo_electronico.strip().lower())
-        )
-        if existing_cliente:
-            return jsonify({
-                "error": f"Ya existe un cliente con el correo electrónico '{correo_electronico}'"
-            }), 409
-        
-        # Validar que el documento no exista
-        existing_documento = db.session.scalar(
-            select(Documento).where(
-                Documento.tipo_documento == tipo_documento,
-                Documento.numero_documento == numero_documento.strip()
-            )
-        )
-        if existing_documento:
-            return jsonify({
-                "error": f"Ya existe un documento con tipo '{tipo_documento.value}' y número '{numero_documento}'"
-            }), 409
+        tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+        if error:
+            return jsonify({"error": error}), 400
+        _, error = validar_numero_documento(tipo_documento, numero_documento)
+        if error:
+            return jsonify({"error": error}), 400
         
         # Parsear fecha de nacimiento si existe
         fecha_nacimiento = None
@@ -125,19 +149,36 @@ def crear_cliente():
             cliente=cliente
         )
         
-        # Guardar en la base de datos
+        # Guardar en la base de datos: sin SELECT previos, los duplicados (correo o
+        # documento) los detectan las restricciones únicas en la misma transacción,
+        # también cuando dos requests concurrentes crean el mismo cliente
         db.session.add(cliente)
         db.session.add(documento)
-        db.session.commit()
+        try:
+            db.session.flush()
+        except IntegrityError as e:
+            db.session.rollback()
+            restriccion = restriccion_violada(e)
+            if restriccion == "ix_clientes_correo_electronico":
+                return jsonify({
+                    "error": f"Ya existe un cliente con el correo electrónico '{correo_electronico}'"
+                }), 409
+            if restriccion in ("uq_doc_tipo_numero", "uq_doc_tipo_numero_normalizado"):
+                return jsonify({
+                    "error": f"Ya existe un documento con tipo '{tipo_documento.value}' y número '{numero_documento}'"
+                }), 409
+            raise
+        
+        # El documento ya está reservado por la restricción única: desde ahora el
+        # filtro de búsquedas no debe descartarlo (aunque el commit aún no ocurra)
+        filtro_documentos.agregar(tipo_documento, documento.numero_documento_normalizado)
         
-        # Preparar respuesta
-        response = cliente.to_dict()
-        response["documento"] = {
-            "tipoDocumento": documento.tipo_documento.value,
-            "numeroDocumento": documento.numero_documento
-        }
+        # Preparar respuesta (antes del commit, que expira los atributos y obligaría a recargarlos)
+        cuerpo = codificar_cliente(cliente)
         
-        return jsonify(response), 201
+        db.session.commit()
+        
+        return respuesta_json(cuerpo, 201)
         
     except Exception as e:
         db.session.rollback()
@@ -160,58 +201,95 @@ def buscar_cliente_por_documento():
     Parámetros:
         tipo_documento: Tipo de documento (NIT, CEDULA, PASAPORTE)
         numero_documento: Número del documento
+        estadisticas: Query param opcional (1/true) para incluir las estadísticas de compra
     
     Returns:
-        200: Cliente encontrado
+        200: Cliente encontrado (con ETag)
+        304: El cliente no ha cambiado desde el ETag enviado en If-None-Match
         400: Parámetros inválidos o faltantes
         404: Cliente no encontrado
     """
-    # Intentar obtener datos desde diferentes fuentes (prioridad: JSON > Form > Query params)
-    # React normalmente envía JSON con Content-Type: application/json
-    if request.is_json:
-        data = request.get_json() or {}
-        tipo_documento_str = data.get("tipo_documento") or data.get("tipoDocumento")
-        numero_documento = data.get("numero_documento") or data.get("numeroDocumento")
-    elif request.method == "POST" and request.form:
-        # Form data (formulario HTML tradicional)
-        tipo_documento_str = request.form.get("tipo_documento") or request.form.get("tipoDocumento")
-        numero_documento = request.form.get("numero_documento") or request.form.get("numeroDocumento")
-    else:
-        # GET: Query parameters
-        tipo_documento_str = request.args.get("tipo_documento")
-        numero_documento = request.args.get("numero_documento")
+    tipo_documento_str, numero_documento = _documento_del_request()
     
     # Validar que los parámetros estén presentes
-    if not tipo_documento_str:
-        return jsonify({"error": "El parámetro 'tipo_documento' es requerido"}), 400
-    
-    if not numero_documento:
-        return jsonify({"error": "El parámetro 'numero_documento' es requerido"}), 400
+    error = documento_faltante(tipo_documento_str, numero_documento)
+    if error:
+        return jsonify({"error": error}), 400
     
     # Validar que el tipo de documento sea válido
-    try:
-        tipo_documento = TipoDocumentoEnum(tipo_documento_str.upper())
-    except ValueError:
-        valores_validos = [e.value for e in TipoDocumentoEnum]
-        return jsonify({
-            "error": f"Tipo de documento inválido. Valores válidos: {', '.join(valores_validos)}"
-        }), 400
+    tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+    if error:
+        return jsonify({"error": error}), 400
+    _, error = validar_numero_documento(tipo_documento, numero_documento)
+    if error:
+        return jsonify({"error": error}), 400
     
-    # Buscar el cliente
-    cliente = Cliente.buscar_por_documento(tipo_documento, numero_documento.strip())
+    # Buscar el cliente (consulta precompilada, fila sin objetos ORM; coalescida)
+    fila = _cliente_por_documento(tipo_documento, numero_documento.strip())
     
-    if not cliente:
+    if not fila:
         return jsonify({"error": "Cliente no encontrado"}), 404
+
+    incluir_estadisticas = _incluir_estadisticas()
+
+    # Si el cliente no cambió desde la última consulta, 304 sin cuerpo
+    if incluir_estadisticas:
+        estadisticas = db.session.get(ClienteEstadisticas, fila.id)
+        etag = etag_fila_cliente(fila, "estadisticas", estadisticas.actualizado_en if estadisticas else "")
+    else:
+        etag = etag_fila_cliente(fila)
+    coincidente = etag_coincidente(etag)
+    if coincidente:
+        return no_modificado(coincidente)
     
     # Retornar el cliente con su documento
-    response = cliente.to_dict()
-    if cliente.documento:
-        response["documento"] = {
-            "tipoDocumento": cliente.documento.tipo_documento.value,
-            "numeroDocumento": cliente.documento.numero_documento
-        }
+    cuerpo = codificar_cliente(
+        fila,
+        estadisticas=(
+            (estadisticas.to_dict() if estadisticas else ClienteEstadisticas.vacias())
+            if incluir_estadisticas else None
+        ),
+    )
     
-    return jsonify(response), 200
+    return con_etag(respuesta_json(cuerpo), etag), 200
+
+
+@bp.get("/clientes/busqueda")
+def buscar_clientes_por_texto():
+    """
+    Busca clientes por coincidencia parcial (prefijo) de nombre, apellido,
+    correo electrónico o número de documento.
+
+    Query parameters:
+        q: Texto a buscar (requerido, mínimo 2 caracteres)
+        limite: Número máximo de resultados (opcional, por defecto 20, máximo 100)
+        estadisticas: Incluir las estadísticas de compra de cada cliente (opcional, 1/true)
+
+    Returns:
+        200: Lista de clientes ordenada por relevancia (puede estar vacía)
+        400: Parámetros inválidos o faltantes
+    """
+    texto = (request.args.get("q") or "").strip()
+    if len(texto) < 2:
+        return jsonify({"error": "El parámetro 'q' es requerido (mínimo 2 caracteres)"}), 400
+
+    try:
+        limite = int(request.args.get("limite", 20))
+    except ValueError:
+        return jsonify({"error": "El parámetro 'limite' debe ser un número entero"}), 400
+    limite = max(1, min(limite, 100))
+
+    incluir_estadisticas = _incluir_estadisticas()
+
+    resultados = []
+    clientes = Cliente.buscar_por_texto(texto, limite=limite, con_estadisticas=incluir_estadisticas)
+    for cliente, puntaje in clientes:
+        estadisticas = None
+        if incluir_estadisticas:
+            estadisticas = cliente.estadisticas.to_dict() if cliente.estadisticas else ClienteEstadisticas.vacias()
+        resultados.append(cliente_json(cliente, estadisticas=estadisticas, puntaje=round(puntaje, 4)))
+
+    return respuesta_json(codificar({"resultados": resultados, "total": len(resultados)})), 200
 
 
 @bp.route("/clientes/exportar", methods=["GET", "POST"])
@@ -227,22 +305,14 @@ def exportar_cliente():
     También acepta POST con JSON o form data (igual que el endpoint de búsqueda).
     
     Returns:
-        200: Archivo descargable con la información del cliente
+        200: Archivo descargable con la información del cliente (con ETag)
+        304: El cliente no ha cambiado desde el ETag enviado en If-None-Match
         400: Parámetros inválidos o faltantes
         404: Cliente no encontrado
     """
     try:
         # Obtener parámetros de búsqueda (misma lógica que buscar_cliente_por_documento)
-        if request.is_json:
-            data = request.get_json() or {}
-            tipo_documento_str = data.get("tipo_documento") or data.get("tipoDocumento")
-            numero_documento = data.get("numero_documento") or data.get("numeroDocumento")
-        elif request.method == "POST" and request.form:
-            tipo_documento_str = request.form.get("tipo_documento") or request.form.get("tipoDocumento")
-            numero_documento = request.form.get("numero_documento") or request.form.get("numeroDocumento")
-        else:
-            tipo_documento_str = request.args.get("tipo_documento")
-            numero_documento = request.args.get("numero_documento")
+        tipo_documento_str, numero_documento = _documento_del_request()
         
         # Obtener formato de exportación
         formato = request.args.get("formato") or request.form.get("formato")
@@ -251,119 +321,47 @@ def exportar_cliente():
             formato = formato or data.get("formato")
         
         # Validar parámetros requeridos
-        if not tipo_documento_str:
-            return jsonify({"error": "El parámetro 'tipo_documento' es requerido"}), 400
-        
-        if not numero_documento:
-            return jsonify({"error": "El parámetro 'numero_documento' es requerido"}), 400
-        
-        if not formato:
-            return jsonify({"error": "El parámetro 'formato' es requerido. Valores válidos: CSV, TXT, Excel"}), 400
+        error = documento_faltante(tipo_documento_str, numero_documento)
+        if error:
+            return jsonify({"error": error}), 400
         
         # Validar formato
-        formato = formato.upper()
-        if formato not in ["CSV", "TXT", "EXCEL"]:
-            return jsonify({
-                "error": f"Formato inválido. Valores válidos: CSV, TXT, Excel"
-            }), 400
+        formato, error = validar_formato(formato)
+        if error:
+            return jsonify({"error": error}), 400
         
         # Validar tipo de documento
-        try:
-            tipo_documento = TipoDocumentoEnum(tipo_documento_str.upper())
-        except ValueError:
-            valores_validos = [e.value for e in TipoDocumentoEnum]
-            return jsonify({
-                "error": f"Tipo de documento inválido. Valores válidos: {', '.join(valores_validos)}"
-            }), 400
+        tipo_documento, error = validar_tipo_documento(tipo_documento_str)
+        if error:
+            return jsonify({"error": error}), 400
+        _, error = validar_numero_documento(tipo_documento, numero_documento)
+        if error:
+            return jsonify({"error": error}), 400
         
-        # Buscar el cliente
-        cliente = Cliente.buscar_por_documento(tipo_documento, numero_documento.strip())
+        # Buscar el cliente (consulta precompilada, fila sin objetos ORM; coalescida)
+        cliente = _cliente_por_documento(tipo_documento, numero_documento.strip())
         
         if not cliente:
             return jsonify({"error": "Cliente no encontrado"}), 404
-        
-        # Preparar datos del cliente
-        datos_cliente = {
-            "ID": str(cliente.id),
-            "Nombre": cliente.nombre,
-            "Apellido": cliente.apellido,
-            "Correo Electrónico": cliente.correo_electronico,
-            "Teléfono Celular": cliente.telefono_celular,
-            "Fecha de Nacimiento": cliente.fecha_nacimiento.isoformat() if cliente.fecha_nacimiento else "N/A",
-            "Tipo Documento": cliente.documento.tipo_documento.value if cliente.documento else "N/A",
-            "Número Documento": cliente.documento.numero_documento if cliente.documento else "N/A",
-            "Fecha Creación": cliente.created_at.isoformat() if cliente.created_at else "N/A",
-            "Fecha Actualización": cliente.updated_at.isoformat() if cliente.updated_at else "N/A"
-        }
+
+        etag = etag_fila_cliente(cliente, formato)
+        coincidente = etag_coincidente(etag)
+        if coincidente:
+            return no_modificado(coincidente)
         
         # Generar archivo según el formato
-        fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nombre_base = f"cliente_{cliente.nombre}_{cliente.apellido}_{fecha_str}"
-        
-        if formato == "CSV":
-            # Generar CSV
-            df = pd.DataFrame([datos_cliente])
-            output = BytesIO()
-            df.to_csv(output, index=False, encoding='utf-8-sig')
-            output.seek(0)
-            
-            return send_file(
-                output,
-                mimetype='text/csv',
-                as_attachment=True,
-                download_name=f"{nombre_base}.csv"
-            )
-        
-        elif formato == "TXT":
-            # Generar TXT
-            output = StringIO()
-            output.write("=" * 50 + "\n")
-            output.write("INFORMACIÓN DEL CLIENTE\n")
-            output.write("=" * 50 + "\n\n")
-            
-            for clave, valor in datos_cliente.items():
-                output.write(f"{clave}: {valor}\n")
-            
-            output.write("\n" + "=" * 50 + "\n")
-            output.seek(0)
-            
-            txt_bytes = BytesIO(output.getvalue().encode('utf-8'))
-            
-            return send_file(
-                txt_bytes,
-                mimetype='text/plain',
-                as_attachment=True,
-                download_name=f"{nombre_base}.txt"
-            )
+        contenido = exportacion_cliente.construir_exportacion(
+            exportacion_cliente.datos_exportacion(cliente), formato
+        )
         
-        elif formato == "EXCEL":
-            # Generar Excel
-            df = pd.DataFrame([datos_cliente])
-            output = BytesIO()
-            
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Información Cliente', index=False)
-                
-                # Formatear la hoja
-                worksheet = writer.sheets['Información Cliente']
-                
-                # Ajustar ancho de columnas
-                for idx, col in enumerate(df.columns, 1):
-                    max_length = max(
-                        df[col].astype(str).map(len).max(),
-                        len(col)
-                    ) + 2
-                    col_letter = get_column_letter(idx)
-                    worksheet.column_dimensions[col_letter].width = min(max_length, 50)
-            
-            output.seek(0)
-            
-            return send_file(
-                output,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                as_attachment=True,
-                download_name=f"{nombre_base}.xlsx"
-            )
+        return con_etag(send_file(
+            BytesIO(contenido),
+            mimetype=exportacion_cliente.MIMETYPES[formato],
+            as_attachment=True,
+            download_name=exportacion_cliente.nombre_archivo(cliente, formato),
+            # Sin Range: la exportación es pequeña y se comprime (ver respuestas.py)
+            conditional=False,
+        ), etag)
         
     except Exception as e:
         return jsonify({
@@ -371,3 +369,55 @@ def exportar_cliente():
             "message": str(e)
         }), 500
 
+
+@bp.post("/clientes/exportar-lote")
+def exportar_clientes_lote():
+    """
+    Exporta varios clientes en un solo archivo (o un zip con un archivo por cliente).
+
+    Los documentos se resuelven con una sola consulta y el archivo se genera en
+    streaming a medida que se leen los clientes: la descarga empieza antes de
+    resolver todo el lote.
+
+    Body (JSON):
+        documentos: Lista de {tipoDocumento, numeroDocumento} (máximo EXPORTACION_LOTE_MAXIMO)
+        formato: CSV, TXT o Excel (requerido; también como query parameter)
+        empaquetado: ARCHIVO (por defecto: un CSV/Excel con una fila por cliente, o un
+            TXT con un bloque por cliente) o ZIP (el archivo de /clientes/exportar de
+            cada cliente)
+
+    Returns:
+        200: Archivo descargable. Los documentos sin cliente se listan al final del
+            TXT y en no_encontrados.txt dentro del zip
+        400: Parámetros inválidos o faltantes
+        429: Límite de solicitudes del cliente agotado (con Retry-After)
+    """
+    data = request.get_json(silent=True) or {}
+    empaquetado = (request.args.get("empaquetado") or data.get("empaquetado") or "ARCHIVO").upper()
+
+    formato, error = validar_formato(request.args.get("formato") or data.get("formato"))
+    if error:
+        return jsonify({"error": error}), 400
+    if empaquetado not in exportacion_cliente.EMPAQUETADOS:
+        return jsonify({"error": "Empaquetado inválido. Valores válidos: ARCHIVO, ZIP"}), 400
+
+    documentos, error = validar_documentos_lote(data.get("documentos"), current_app.config["EXPORTACION_LOTE_MAXIMO"])
+    if error:
+        return jsonify({"error": error}), 400
+    solicitados = [(tipo_documento, numero_documento) for tipo_documento, numero_documento, _ in documentos]
+
+    # Una sola consulta; las filas se leen mientras se escribe la respuesta
+    filas = consultas.clientes_por_documentos(solicitados)
+    contenido = exportacion_cliente.transmitir_lote(filas, solicitados, formato, empaquetado)
+
+    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if empaquetado == "ZIP":
+        mimetype, extension = "application/zip", "zip"
+    else:
+        mimetype, extension = exportacion_cliente.MIMETYPES[formato], exportacion_cliente.EXTENSIONES[formato]
+
+    return Response(
+        stream_with_context(contenido),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=clientes_lote_{fecha_str}.{extension}"},
+    )
@@ -0,0 +1,51 @@
+from flask import Blueprint, current_app, jsonify
+
+from src.api import admision
+from src.services import (
+    artefactos_reporte, cache_busquedas, cambios, catalogo_productos, filtro_documentos, indice_memoria, indice_mmap,
+    precalentamiento,
+)
+
+bp = Blueprint("metricas", __name__)
+
+
+@bp.get("/metricas")
+@admision.requiere_clave_api
+def obtener_metricas():
+    """
+    Métricas internas del proceso (cada worker reporta las suyas). Requiere una
+    X-API-Key de ADMISION_CLAVES_API: incluyen rutas de archivos del servidor.
+
+    Returns:
+        200: filtroDocumentos (filtro de Bloom: tamaño, tasa de falsos positivos
+            objetivo/estimada/observada, descartes), cacheBusquedas (entradas y
+            tasa de aciertos), indiceMemoria (índice completo: entradas, aciertos y
+            clientes actualizados), indiceMmap (versión cargada y aciertos),
+            catalogoProductos (productos cargados, recargas y aciertos), cambios
+            (solicitudes del feed esperando y avisos de commits), artefactosReporte
+            (archivos de reporte en disco, generados y reutilizados),
+            precalentamiento, admision (admitidas/rechazadas por límite de tasa y
+            por cupo) y coalescencia (ejecuciones reales
+            y compartidas por grupo)
+        401: Sin X-API-Key o con una clave desconocida
+    """
+    coalescencia = {
+        grupo: {
+            "ejecutadas": vuelo.ejecutadas,
+            "compartidas": vuelo.compartidas,
+            "enCurso": vuelo.en_curso(),
+        }
+        for grupo, vuelo in current_app.extensions["coalescencia"].items()
+    }
+    return jsonify({
+        "filtroDocumentos": filtro_documentos.metricas(),
+        "cacheBusquedas": cache_busquedas.metricas(),
+        "indiceMemoria": indice_memoria.metricas(),
+        "indiceMmap": indice_mmap.metricas(),
+        "catalogoProductos": catalogo_productos.metricas(),
+        "cambios": cambios.metricas(),
+        "artefactosReporte": artefactos_reporte.metricas(),
+        "precalentamiento": precalentamiento.estado_app().to_dict(),
+        "admision": admision.metricas(),
+        "coalescencia": coalescencia,
+    })
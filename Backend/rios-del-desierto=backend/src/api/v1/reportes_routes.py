@@ -1,24 +1,163 @@
-from flask import Blueprint, send_file, jsonify
+from flask import Blueprint, send_file, jsonify, request, current_app, url_for
+import tempfile
 from io import BytesIO
 from datetime import datetime, timedelta
-from sqlalchemy import select, func
+from typing import Optional, Union
 
-import pandas as pd
-
-from src.models.cliente import Cliente
-from src.models.compra import Compra
-from src.models.enums import EstadoCompraEnum
-from src.extensions import db
+from src.api.admision import AdmisionRechazada, cupo
+from src.models.producto_ventas import ProductoVentasDiarias
+from src.services import (
+    artefactos_reporte, catalogo_productos, coalescencia, reporte_fidelizacion, reporte_fidelizacion_delta,
+)
+from src.services.artefactos_reporte import Artefacto
+from src.services.reporte_fidelizacion_delta import ConflictoMarca
 
 bp = Blueprint("reportes", __name__)
 
+# Tipos de artefacto: prefijo del nombre de descarga
+TIPO_FIDELIZACION = "reporte_clientes_fidelizacion"
+TIPO_FIDELIZACION_DELTA = "reporte_clientes_fidelizacion_delta"
+
+
+def _generar_reporte(modo: str, formato: str, trabajadores: int) -> Optional[bytes]:
+    """
+    Contenido del reporte de fidelización (xlsx, o zip en modo paralelo), sin
+    almacén de artefactos.
+
+    Returns:
+        Bytes del archivo, o None si ningún cliente cumple el criterio
+    """
+    # Cupo de generaciones concurrentes (503 si están todos ocupados)
+    with cupo("reporte_fidelizacion"):
+        if modo == "paralelo":
+            # Obtener los detalles de compra de los clientes elegibles (productos del catálogo)
+            filas = reporte_fidelizacion.obtener_filas(monto_minimo_total=5_000_000)
+            if not filas:
+                return None
+            return reporte_fidelizacion.construir_zip_paralelo(filas, trabajadores, formato)
+
+        # Modo normal: el Excel se escribe en streaming en un temporal del sistema
+        with tempfile.TemporaryFile() as archivo:
+            if not reporte_fidelizacion.escribir_reporte_excel(archivo, monto_minimo_total=5_000_000):
+                return None
+            archivo.seek(0)
+            return archivo.read()
+
+
+def _generar_artefacto(modo: str, formato: str, trabajadores: int, clave: tuple) -> Union[Artefacto, bytes, None]:
+    """
+    Genera el reporte y lo guarda como artefacto en disco (si el almacén está habilitado).
+    En modo normal el Excel se escribe directamente en el archivo del almacén.
+
+    Returns:
+        Artefacto guardado, bytes del archivo si no hay almacén, o None si ningún
+        cliente cumple el criterio
+    """
+    almacen = artefactos_reporte.almacen()
+    if almacen is None:
+        return _generar_reporte(modo, formato, trabajadores)
+
+    if modo == "normal":
+        with cupo("reporte_fidelizacion"):
+            return almacen.guardar_desde(
+                clave, "xlsx",
+                lambda archivo: reporte_fidelizacion.escribir_reporte_excel(archivo, monto_minimo_total=5_000_000) > 0,
+                tipo=TIPO_FIDELIZACION,
+            )
+
+    contenido = _generar_reporte(modo, formato, trabajadores)
+    if contenido is None:
+        return None
+    return almacen.guardar(clave, contenido, "zip", tipo=TIPO_FIDELIZACION)
+
+
+def _generar_delta(formato: str, completo: bool) -> Union[Artefacto, bytes]:
+    """
+    Genera el reporte delta (avanza la marca de agua). Si el almacén está habilitado,
+    el archivo se guarda como artefacto antes de confirmar la marca: si la descarga
+    se corta, el delta sigue disponible en /reportes/artefactos/<nombre>. Nunca se
+    reutiliza un delta anterior: cada generación informa los cambios desde la anterior.
+
+    Returns:
+        Artefacto guardado, o bytes del archivo si no hay almacén
+    """
+    almacen = artefactos_reporte.almacen()
+    extension = "csv" if formato == "CSV" else "xlsx"
+
+    def guardar(contenido: bytes, cursor: int) -> Artefacto:
+        return almacen.guardar(("delta", cursor, formato), contenido, extension, tipo=TIPO_FIDELIZACION_DELTA)
+
+    with cupo("reporte_fidelizacion"):
+        resultado = reporte_fidelizacion_delta.generar_delta(
+            monto_minimo_total=5_000_000,
+            formato=formato,
+            completo=completo,
+            guardar=guardar if almacen is not None else None,
+        )
+    return resultado.guardado if almacen is not None else resultado.contenido
+
+
+def _reporte_delta(formato: str, completo: bool):
+    """Respuesta de POST /reportes/clientes-fidelizacion?modo=delta."""
+    try:
+        # Solicitudes delta idénticas concurrentes reciben el mismo archivo (una sola generación)
+        contenido = coalescencia.ejecutar(
+            "reportes_fidelizacion",
+            ("delta", formato, completo),
+            lambda: _generar_delta(formato, completo),
+        )
+    except ConflictoMarca as e:
+        return jsonify({"error": str(e)}), 409
+
+    if isinstance(contenido, Artefacto):
+        return _enviar_artefacto(contenido)
+
+    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if formato == "CSV":
+        return send_file(
+            BytesIO(contenido),
+            mimetype="text/csv",
+            as_attachment=True,
+            download_name=f"{TIPO_FIDELIZACION_DELTA}_{fecha_str}.csv",
+            # Desde memoria y comprimible: sin Range (ver respuestas.py)
+            conditional=False,
+        )
+    return send_file(
+        BytesIO(contenido),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=f"{TIPO_FIDELIZACION_DELTA}_{fecha_str}.xlsx",
+    )
+
+
+def _enviar_artefacto(artefacto: Artefacto):
+    """
+    Envía un artefacto desde disco: Accept-Ranges/Range (206), If-Range e
+    If-None-Match con el hash del contenido como ETag. Content-Location indica la
+    URL estable del archivo para reanudar la descarga. El nombre de descarga sale
+    del tipo guardado con el artefacto.
+    """
+    prefijo = artefacto.tipo or TIPO_FIDELIZACION
+    fecha_str = datetime.fromtimestamp(artefacto.creado).strftime("%Y%m%d_%H%M%S")
+    response = send_file(
+        artefacto.ruta,
+        mimetype=artefacto.mimetype,
+        as_attachment=True,
+        download_name=f"{prefijo}_{fecha_str}.{artefacto.extension}",
+        conditional=True,
+        etag=artefacto.hash,
+        last_modified=artefacto.creado,
+    )
+    response.headers["Content-Location"] = url_for("reportes.descargar_artefacto", nombre=artefacto.nombre)
+    return response
+
 
 @bp.get("/reportes/clientes-fidelizacion")
 def generar_reporte_clientes_fidelizacion():
     """
     Genera un reporte en Excel con los productos comprados por clientes que superan 5'000.000 COP
     en compras del último mes. Cada producto comprado se muestra en una fila separada.
-    
+
     El reporte incluye:
         - Datos básicos del cliente (nombre, apellido, correo, teléfono)
         - Tipo y número de documento
@@ -27,168 +166,226 @@ def generar_reporte_clientes_fidelizacion():
         - Cantidad comprada
         - Precio unitario
         - Subtotal (cantidad * precio unitario)
-    
+
+    Query parameters (opcionales):
+        modo: "normal" (por defecto, un solo .xlsx), "paralelo" (zip con una parte por shard
+            de clientes, renderizadas en procesos separados). El modo "delta" avanza la
+            marca de agua y se genera con POST (ver generar_reporte_fidelizacion_delta)
+        formato: En modo paralelo, EXCEL (por defecto) o CSV
+        trabajadores: En modo paralelo, número de procesos/shards (por defecto REPORTE_TRABAJADORES)
+
+    El archivo se guarda en disco y se reutiliza para los mismos parámetros durante
+    REPORTES_ARTEFACTOS_FRESCURA_SEGUNDOS. Admite Range (descargas por partes o
+    reanudadas); Content-Location indica la URL del archivo
+    (/reportes/artefactos/<nombre>) para pedir las partes siguientes.
+
     Returns:
-        Archivo Excel (.xlsx) con el reporte
+        Archivo Excel (.xlsx) con el reporte, o zip en modo paralelo
+        206: Parte del archivo pedida con Range
+        400: Modo, formato o trabajadores inválidos (CSV solo en modo paralelo)
+        304: El archivo no cambió (If-None-Match con el ETag, hash del contenido)
+        405: modo=delta con GET (use POST)
+        429: Límite de solicitudes del cliente agotado (con Retry-After)
+        503: Todos los cupos de generación ocupados (con Retry-After)
     """
     try:
-        # Obtener todos los detalles de compra con productos usando el join
-        detalles_compras = Compra.obtener_detalles_compras_con_productos_ultimo_mes(
-            monto_minimo_total=5_000_000
-        )
-        
-        if not detalles_compras:
+        modo = (request.args.get("modo") or "normal").lower()
+        if modo not in ("normal", "paralelo", "delta"):
+            return jsonify({"error": "Modo inválido. Valores válidos: normal, paralelo, delta"}), 400
+        if modo == "delta":
+            # Una solicitud segura (reintentos, prefetch, proxies) no debe avanzar la marca
+            response = jsonify({"error": "El modo delta avanza la marca de agua: use POST"})
+            response.headers["Allow"] = "POST"
+            return response, 405
+
+        formato = (request.args.get("formato") or "EXCEL").upper()
+        if formato not in ("EXCEL", "CSV"):
+            return jsonify({"error": "Formato inválido. Valores válidos: EXCEL, CSV"}), 400
+
+        if modo == "normal" and formato != "EXCEL":
+            return jsonify({"error": "El modo normal solo genera EXCEL; use modo=paralelo o modo=delta para CSV"}), 400
+
+        try:
+            trabajadores = int(request.args.get("trabajadores") or current_app.config["REPORTE_TRABAJADORES"])
+        except ValueError:
+            return jsonify({"error": "El parámetro 'trabajadores' debe ser un número entero"}), 400
+        trabajadores = max(1, min(trabajadores, current_app.config["REPORTE_TRABAJADORES_MAX"]))
+
+        # Reutilizar el archivo generado con los mismos parámetros si aún está fresco;
+        # si no, generarlo. Las descargas idénticas concurrentes (mismo modo, formato
+        # y shards) comparten una sola generación
+        if modo == "paralelo":
+            clave = (modo, formato, trabajadores)
+        else:
+            clave = (modo,)
+        almacen = artefactos_reporte.almacen()
+        contenido = almacen.vigente(clave) if almacen is not None else None
+        if contenido is None:
+            contenido = coalescencia.ejecutar(
+                "reportes_fidelizacion",
+                clave,
+                lambda: _generar_artefacto(modo, formato, trabajadores, clave),
+            )
+
+        if contenido is None:
             return jsonify({
                 "message": "No hay clientes que cumplan el criterio de fidelización (monto > 5'000.000 COP en el último mes)"
             }), 404
-        
-        # Preparar datos para el DataFrame
-        datos_reporte = []
-        
-        for compra, detalle, producto in detalles_compras:
-            # Obtener información del cliente
-            cliente = compra.cliente
-            
-            # Obtener información del documento
-            tipo_documento = cliente.documento.tipo_documento.value if cliente.documento else "N/A"
-            numero_documento = cliente.documento.numero_documento if cliente.documento else "N/A"
-            
-            # Formatear fecha de compra
-            fecha_str = compra.fecha.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Calcular subtotal
-            subtotal = detalle.cantidad_compra * detalle.precio_unitario
-            
-            datos_reporte.append({
-                "Nombre": cliente.nombre,
-                "Apellido": cliente.apellido,
-                "Correo Electrónico": cliente.correo_electronico,
-                "Teléfono": cliente.telefono_celular,
-                "Tipo Documento": tipo_documento,
-                "Número Documento": numero_documento,
-                "Fecha Compra": fecha_str,
-                "Producto": producto.nombre,
-                "Cantidad": detalle.cantidad_compra,
-                "Precio Unitario (COP)": detalle.precio_unitario,
-                "Subtotal (COP)": subtotal,
-            })
-        
-        # Crear DataFrame
-        df = pd.DataFrame(datos_reporte)
-        
-        if df.empty:
-            return jsonify({
-                "message": "No hay productos que cumplan el criterio de fidelización"
-            }), 404
-        
-        # Ordenar por cliente y luego por fecha de compra descendente
-        df = df.sort_values(["Nombre", "Apellido", "Fecha Compra"], ascending=[True, True, False])
-        
-        # Agrupar por cliente y agregar filas de total por cliente
-        filas_finales = []
-        filas_totales_indices = []  # Para formatear después (índices en el DataFrame final)
-        fila_actual = 0
-        
-        # Agrupar por cliente (usando Nombre + Apellido como identificador único)
-        for (nombre, apellido), grupo in df.groupby(["Nombre", "Apellido"]):
-            # Agregar todas las filas del cliente
-            filas_finales.append(grupo)
-            fila_actual += len(grupo)
-            
-            # Calcular el total del cliente
-            total_cliente = grupo["Subtotal (COP)"].sum()
-            
-            # Crear fila de total para este cliente
-            fila_total = pd.DataFrame([{
-                "Nombre": "",
-                "Apellido": "",
-                "Correo Electrónico": "",
-                "Teléfono": "",
-                "Tipo Documento": "",
-                "Número Documento": "",
-                "Fecha Compra": "",
-                "Producto": f"TOTAL {nombre} {apellido}",
-                "Cantidad": "",
-                "Precio Unitario (COP)": "",
-                "Subtotal (COP)": total_cliente,
-            }])
-            
-            filas_finales.append(fila_total)
-            filas_totales_indices.append(fila_actual)  # Índice de la fila de total en el DataFrame
-            fila_actual += 1
-        
-        # Concatenar todas las filas
-        df_final = pd.concat(filas_finales, ignore_index=True)
-        
-        # Crear archivo Excel en memoria
-        output = BytesIO()
-
-        # Escribir el DataFrame en el archivo Excel:
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Escribir el DataFrame empezando en la fila 2 (fila 1 es el header, fila 2 son los encabezados)
-            df_final.to_excel(writer, sheet_name='Clientes Fidelización', index=False, startrow=1)
-            
-            # Obtener la hoja para formatear
-            worksheet = writer.sheets['Clientes Fidelización']
-            
-            # Agregar header con título grande ANTES de los encabezados
-            from openpyxl.utils import get_column_letter
-            from openpyxl.styles import Font, PatternFill, Alignment
-            
-            # Insertar una fila al inicio para el header
-            worksheet.insert_rows(1)
-            
-            # Obtener el número de columnas
-            num_columnas = len(df_final.columns)
-            
-            # Combinar celdas para el header (de la columna 1 a la última)
-            worksheet.merge_cells(start_row=1, start_column=1, end_row=1, end_column=num_columnas)
-            
-            # Agregar el texto del header
-            header_cell = worksheet.cell(row=1, column=1)
-            header_cell.value = "Reporte de Fidelización Clientes - Rios del Desierto S.A.S."
-            header_cell.font = Font(size=18, bold=True)
-            header_cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            # Ajustar altura de la fila del header
-            worksheet.row_dimensions[1].height = 30
-            
-            # Ajustar ancho de columnas
-            for idx, col in enumerate(df_final.columns, 1):
-                max_length = max(
-                    df_final[col].astype(str).map(len).max(),
-                    len(col)
-                ) + 2
-                col_letter = get_column_letter(idx)
-                worksheet.column_dimensions[col_letter].width = min(max_length, 50)
-            
-            # Formatear las filas de total por cliente
-            # +2 porque: 1 fila header, 1 fila encabezados de columnas
-            fila_inicio_datos = 4  # Fila 1: header, Fila 2: encabezados, Fila 3: datos
-            
-            # Aplicar formato a todas las filas de total por cliente
-            for idx_total in filas_totales_indices:
-                fila_excel = fila_inicio_datos + idx_total
-                for col_idx in range(1, len(df_final.columns) + 1):
-                    cell = worksheet.cell(row=fila_excel, column=col_idx)
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-        
-        output.seek(0)
-        
-        # Generar nombre del archivo con fecha
+
+        if isinstance(contenido, Artefacto):
+            return _enviar_artefacto(contenido)
+
+        # Sin almacén de artefactos: se envía desde memoria
         fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nombre_archivo = f"reporte_clientes_fidelizacion_{fecha_str}.xlsx"
-        
+
+        if modo == "paralelo":
+            return send_file(
+                BytesIO(contenido),
+                mimetype='application/zip',
+                as_attachment=True,
+                download_name=f"{TIPO_FIDELIZACION}_{fecha_str}.zip"
+            )
+
+        nombre_archivo = f"{TIPO_FIDELIZACION}_{fecha_str}.xlsx"
+
         return send_file(
-            output,
+            BytesIO(contenido),
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=nombre_archivo
         )
-        
+
+    except AdmisionRechazada:
+        raise
+    except Exception as e:
+        return jsonify({
+            "error": "Error al generar el reporte",
+            "message": str(e)
+        }), 500
+
+
+@bp.post("/reportes/clientes-fidelizacion")
+def generar_reporte_fidelizacion_delta():
+    """
+    Genera el reporte de fidelización delta: solo los clientes cuya elegibilidad o
+    total cambió desde la generación delta anterior (ver
+    services/reporte_fidelizacion_delta.py). Avanza la marca de agua, por eso no es
+    GET. Con el almacén de artefactos habilitado el archivo queda en disco antes de
+    avanzar la marca; Content-Location indica dónde volver a descargarlo.
+
+    Query parameters (opcionales):
+        modo: "delta" (único modo por POST)
+        formato: EXCEL (por defecto) o CSV
+        completo: 1 para recalcular todos los clientes
+
+    Returns:
+        Archivo Excel (.xlsx) o CSV con los cambios
+        400: Modo o formato inválidos
+        409: Otra generación delta avanzó la marca al mismo tiempo
+        429: Límite de solicitudes del cliente agotado (con Retry-After)
+        503: Todos los cupos de generación ocupados (con Retry-After)
+    """
+    try:
+        if (request.args.get("modo") or "delta").lower() != "delta":
+            return jsonify({"error": "Por POST solo se genera el modo delta; use GET para normal o paralelo"}), 400
+
+        formato = (request.args.get("formato") or "EXCEL").upper()
+        if formato not in ("EXCEL", "CSV"):
+            return jsonify({"error": "Formato inválido. Valores válidos: EXCEL, CSV"}), 400
+
+        completo = (request.args.get("completo") or "").lower() in ("1", "true", "si")
+        return _reporte_delta(formato, completo)
+
+    except AdmisionRechazada:
+        raise
     except Exception as e:
         return jsonify({
             "error": "Error al generar el reporte",
             "message": str(e)
         }), 500
+
+
+@bp.get("/reportes/artefactos/<nombre>")
+def descargar_artefacto(nombre: str):
+    """
+    Descarga (o reanuda con Range/If-Range) un reporte ya generado, por su nombre
+    (`<sha256 del contenido>.<xlsx|zip|csv>`, ver Content-Location del reporte).
+    No genera nada ni consume el límite de tasa de los reportes.
+
+    Returns:
+        200/206: Archivo (completo o la parte pedida)
+        404: El archivo no existe o superó REPORTES_ARTEFACTOS_RETENCION_SEGUNDOS
+    """
+    almacen = artefactos_reporte.almacen()
+    artefacto = almacen.obtener(nombre) if almacen is not None else None
+    if artefacto is None:
+        return jsonify({"error": "El reporte no existe o ya expiró. Genérelo de nuevo"}), 404
+    return _enviar_artefacto(artefacto)
+
+
+@bp.get("/reportes/productos")
+def reporte_ventas_productos():
+    """
+    Unidades vendidas, ingresos y número de compras por producto en una ventana de días
+    (UTC), de mayor a menor ingreso. Solo compras completadas, incluidas las archivadas.
+
+    Se calcula sumando las ventas diarias por producto (producto_ventas_diarias, mantenida
+    en cada escritura de compras), sin recorrer los detalles de compra; los nombres salen
+    del catálogo de productos en memoria.
+
+    Query parameters (opcionales):
+        dias: Tamaño de la ventana hasta hoy (por defecto REPORTE_PRODUCTOS_DIAS)
+        desde: Primer día (YYYY-MM-DD); con `hasta` reemplaza a `dias`
+        hasta: Último día (YYYY-MM-DD, por defecto hoy)
+
+    Returns:
+        200: desde, hasta, productos (productoId, nombre, unidades, ingresos,
+            numeroCompras) y totales (unidades e ingresos; una compra con varios
+            productos cuenta en cada uno, así que no se suma numeroCompras)
+        400: Parámetros inválidos o ventana mayor a REPORTE_PRODUCTOS_DIAS_MAX
+    """
+    dias_max = current_app.config["REPORTE_PRODUCTOS_DIAS_MAX"]
+    try:
+        hasta_str = request.args.get("hasta")
+        hasta = datetime.strptime(hasta_str, "%Y-%m-%d").date() if hasta_str else datetime.utcnow().date()
+
+        desde_str = request.args.get("desde")
+        if desde_str:
+            desde = datetime.strptime(desde_str, "%Y-%m-%d").date()
+        else:
+            dias = int(request.args.get("dias") or current_app.config["REPORTE_PRODUCTOS_DIAS"])
+            if dias < 1:
+                raise ValueError
+            desde = hasta - timedelta(days=dias - 1)
+    except ValueError:
+        return jsonify({
+            "error": "Parámetros inválidos. Use dias (entero positivo) o desde/hasta (YYYY-MM-DD)"
+        }), 400
+
+    if desde > hasta:
+        return jsonify({"error": "'desde' debe ser anterior o igual a 'hasta'"}), 400
+    if (hasta - desde).days + 1 > dias_max:
+        return jsonify({"error": f"La ventana no puede superar {dias_max} días"}), 400
+
+    productos = []
+    total_unidades, total_ingresos = 0, 0
+    for producto_id, unidades, ingresos, numero_compras in ProductoVentasDiarias.totales_por_producto(desde, hasta):
+        productos.append({
+            "productoId": str(producto_id),
+            "nombre": catalogo_productos.nombre(producto_id),
+            "unidades": int(unidades),
+            "ingresos": float(ingresos),
+            "numeroCompras": int(numero_compras),
+        })
+        total_unidades += unidades
+        total_ingresos += ingresos
+
+    return jsonify({
+        "desde": desde.isoformat(),
+        "hasta": hasta.isoformat(),
+        "productos": productos,
+        "totales": {
+            "unidades": int(total_unidades),
+            "ingresos": float(total_ingresos),
+        },
+    })
@@ -12,19 +12,76 @@ def create_app(config_object=DevConfig) -> Flask:
     migrate.init_app(app, db)
 
     # CORS: permite que el frontend consuma la API:
-    cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
+    cors.init_app(
+        app,
+        resources={r"/api/*": {"origins": "*"}},
+        # Descargas de reportes por partes (Range) desde el navegador
+        expose_headers=["Content-Disposition", "Content-Location", "Content-Range", "Accept-Ranges", "ETag"],
+    )
+
+    # Serialización JSON rápida (orjson/msgspec si están instalados):
+    from .api import serializacion
+    serializacion.init_app(app)
+
+    # Compresión gzip/brotli de respuestas:
+    from .api import respuestas
+    respuestas.init_app(app)
+
+    # Control de admisión (límites de tasa y cupos de concurrencia):
+    from .api import admision
+    admision.init_app(app)
+
+    # Coalescencia de búsquedas y reportes idénticos concurrentes:
+    from .services import coalescencia
+    coalescencia.init_app(app)
+
+    # Filtro de Bloom de documentos (búsquedas de documentos no registrados):
+    from .services import filtro_documentos
+    filtro_documentos.init_app(app)
+
+    # Caché de búsquedas de clientes por documento:
+    from .services import cache_busquedas
+    cache_busquedas.init_app(app)
+
+    # Índice completo en memoria de clientes por documento (PRECALENTAMIENTO_INDICE_COMPLETO):
+    from .services import indice_memoria
+    indice_memoria.init_app(app)
+
+    # Índice mmap de clientes por documento (INDICE_MMAP_MODO):
+    from .services import indice_mmap
+    indice_mmap.init_app(app)
+
+    # Catálogo de productos en memoria (nombres y precios sin JOIN):
+    from .services import catalogo_productos
+    catalogo_productos.init_app(app)
+
+    # Archivos de reporte generados (reutilización y descargas con Range):
+    from .services import artefactos_reporte
+    artefactos_reporte.init_app(app)
 
     # Registrar blueprints (rutas)
     # Nota: estos imports van aquí para evitar imports circulares
     from .api.v1.clientes_routes import bp as clientes_bp
     from .api.v1.reportes_routes import bp as reportes_bp
+    from .api.v1.metricas_routes import bp as metricas_bp
+    from .api.v1.cambios_routes import bp as cambios_bp
 
     app.register_blueprint(clientes_bp, url_prefix="/api/v1")
     app.register_blueprint(reportes_bp, url_prefix="/api/v1")
+    app.register_blueprint(metricas_bp, url_prefix="/api/v1")
+    app.register_blueprint(cambios_bp, url_prefix="/api/v1")
 
     # Importar modelos para migraciones del ORM:
     from . import models
 
+    # Comandos de mantenimiento (flask --app run.py <comando>)
+    from .cli import registrar_comandos
+    registrar_comandos(app)
+
+    # Precalentamiento en segundo plano (filtro, caché e índice en memoria), si está habilitado:
+    from .services import precalentamiento
+    precalentamiento.init_app(app)
+
     # Endpoint de entrada basico:
     @app.get("/")
     def home():
@@ -35,6 +92,14 @@ def create_app(config_object=DevConfig) -> Flask:
     def health():
         return {"status": "ok"}
 
+    # Readiness: 503 hasta que termine el precalentamiento
+    @app.get("/ready")
+    def ready():
+        estado = precalentamiento.estado_app()
+        if not estado.listo.is_set():
+            return jsonify({"status": "warming", **estado.to_dict()}), 503
+        return jsonify({"status": "ready", **estado.to_dict()})
+
     # Manejo de Errores básicos:
     @app.errorhandler(404)
     def not_found(_):
@@ -0,0 +1,500 @@
+# src/cli.py
+import click
+from flask import Flask, current_app
+
+
+def registrar_comandos(app: Flask) -> None:
+    """Registra los comandos de mantenimiento en `flask --app run.py <comando>`."""
+
+    @app.cli.command("archivar-compras")
+    @click.option("--horizonte-dias", type=int, default=None,
+                  help="Antigüedad mínima (días) de las compras a archivar.")
+    @click.option("--tamano-lote", type=int, default=None,
+                  help="Compras movidas por transacción.")
+    @click.option("--pausa", type=float, default=0.0,
+                  help="Segundos de pausa entre lotes.")
+    def archivar_compras_command(horizonte_dias, tamano_lote, pausa):
+        """Mueve las compras antiguas a las tablas de archivo."""
+        from src.services.archivo import archivar_compras
+
+        resultado = archivar_compras(
+            horizonte_dias=horizonte_dias or current_app.config["ARCHIVO_HORIZONTE_DIAS"],
+            tamano_lote=tamano_lote or current_app.config["ARCHIVO_TAMANO_LOTE"],
+            pausa_segundos=pausa,
+        )
+        click.echo(
+            f"Compras archivadas: {resultado['compras']} "
+            f"(detalles: {resultado['detalles']})"
+        )
+
+    @app.cli.command("reconstruir-indice-busqueda")
+    def reconstruir_indice_busqueda_command():
+        """Reconstruye el índice FTS5 de búsqueda de clientes (solo SQLite)."""
+        from src.extensions import db
+        from src.models.busqueda import reconstruir_indice_sqlite
+
+        if db.engine.dialect.name != "sqlite":
+            raise click.ClickException("El índice FTS5 solo existe en SQLite (PostgreSQL usa pg_trgm)")
+        total = reconstruir_indice_sqlite(db.session)
+        db.session.commit()
+        click.echo(f"Índice de búsqueda reconstruido para {total} clientes")
+
+    @app.cli.command("benchmark-busqueda")
+    @click.option("--clientes", type=int, default=5_000_000, help="Clientes sintéticos.")
+    @click.option("--consultas", type=int, default=200, help="Consultas medidas por tipo de consulta.")
+    @click.option("--url", default=None,
+                  help="Base SQLite del benchmark (por defecto instance/benchmark_busqueda.db; "
+                       "nunca la de la app). Se reutiliza si ya tiene --clientes clientes.")
+    def benchmark_busqueda_command(clientes, consultas, url):
+        """Mide la latencia de la búsqueda de texto de clientes (FTS5) frente al objetivo de p99."""
+        from src.config import INSTANCE_DIR
+        from src.services.benchmark_busqueda import benchmark_busqueda
+
+        url = url or f"sqlite:///{INSTANCE_DIR / 'benchmark_busqueda.db'}"
+        if url == current_app.config["SQLALCHEMY_DATABASE_URI"]:
+            raise click.ClickException("El benchmark no puede usar la base de datos de la app")
+
+        def al_cargar(cargados):
+            if cargados % 500_000 == 0 or cargados == clientes:
+                click.echo(f"  {cargados} clientes cargados")
+
+        try:
+            resultado = benchmark_busqueda(url, clientes=clientes, consultas_por_tipo=consultas,
+                                           al_cargar=al_cargar)
+        except ValueError as error:
+            raise click.ClickException(str(error))
+
+        for tipo, datos in resultado["tipos"].items():
+            latencia = datos["latenciaMs"]
+            click.echo(f"{tipo:>22}: p50 {latencia['p50']:.2f} ms, p99 {latencia['p99']:.2f} ms, "
+                       f"máxima {latencia['max']:.2f} ms ({datos['resultadosPromedio']:.1f} resultados)")
+        latencia = resultado["total"]["latenciaMs"]
+        estado = "cumple" if resultado["cumpleObjetivo"] else "NO cumple"
+        click.echo(f"Total ({resultado['clientes']} clientes): p50 {latencia['p50']:.2f} ms, "
+                   f"p99 {latencia['p99']:.2f} ms; {estado} el objetivo de p99 < {resultado['objetivoP99Ms']:g} ms")
+
+    @app.cli.command("benchmark-montos")
+    @click.option("--filas", type=int, default=1_000_000, help="Compras sintéticas.")
+    @click.option("--clientes", type=int, default=20_000, help="Clientes distintos.")
+    @click.option("--clientes-frontera", type=int, default=500,
+                  help="Clientes cuyas compras suman exactamente el umbral.")
+    @click.option("--url", default=None,
+                  help="Base SQLite del benchmark (por defecto instance/benchmark_montos.db; "
+                       "nunca la de la app).")
+    def benchmark_montos_command(filas, clientes, clientes_frontera, url):
+        """Compara la agregación de fidelización con montos Float y en centavos enteros."""
+        from src.config import INSTANCE_DIR
+        from src.services.benchmark_montos import benchmark_montos
+
+        url = url or f"sqlite:///{INSTANCE_DIR / 'benchmark_montos.db'}"
+        if url == current_app.config["SQLALCHEMY_DATABASE_URI"]:
+            raise click.ClickException("El benchmark no puede usar la base de datos de la app")
+
+        resultado = benchmark_montos(url, filas=filas, clientes=clientes, clientes_frontera=clientes_frontera)
+
+        click.echo(f"{resultado['filas']} compras, {resultado['clientes']} clientes "
+                   f"({resultado['clientesFrontera']} en la frontera), "
+                   f"{resultado['elegiblesExactos']} elegibles según la suma exacta")
+        for nombre in ("float", "centavos"):
+            datos = resultado[nombre]
+            click.echo(f"{nombre}: {datos['segundos'] * 1000:.1f} ms, {datos['elegibles']} elegibles, "
+                       f"{datos['fronteraMalClasificada']} de la frontera mal clasificados, "
+                       f"{datos['faltantes']} faltantes / {datos['sobrantes']} sobrantes, "
+                       f"{datos['totalesDistintos']} totales distintos del exacto (al centavo)")
+
+    @app.cli.command("benchmark-ids")
+    @click.option("--filas", type=int, default=10_000_000,
+                  help="Detalles de compra insertados por tipo de id.")
+    @click.option("--directorio", type=click.Path(file_okay=False), default=None,
+                  help="Directorio de las bases del benchmark (por defecto instance/).")
+    @click.option("--tamano-lote", type=int, default=50_000, help="Filas por transacción.")
+    @click.option("--cache-mb", type=int, default=64, help="Caché de páginas de SQLite (MB).")
+    def benchmark_ids_command(filas, directorio, tamano_lote, cache_mb):
+        """Compara inserción y tamaño de índices de detalles_compra con ids uuid4 y uuid7."""
+        from src.config import INSTANCE_DIR
+        from src.services.benchmark_ids import benchmark_ids
+
+        def al_avanzar(variante, insertadas, tasa):
+            click.echo(f"  {variante}: {insertadas} filas ({tasa:.0f} filas/s en el último tramo)")
+
+        resultados = benchmark_ids(directorio or INSTANCE_DIR, filas=filas, tamano_lote=tamano_lote,
+                                   cache_mb=cache_mb, al_avanzar=al_avanzar)
+
+        for variante, resultado in resultados.items():
+            click.echo(f"{variante}: {filas} filas en {resultado['segundos']:.1f} s "
+                       f"({resultado['filasPorSegundo']:.0f} filas/s; último tramo "
+                       f"{resultado['tramos'][-1]:.0f} filas/s), archivo "
+                       f"{resultado['bytesArchivo'] / 2**20:.0f} MiB")
+            for nombre, indice in resultado["indices"].items():
+                click.echo(f"    {nombre}: {indice['bytes'] / 2**20:.0f} MiB, "
+                           f"{indice['paginas']} páginas, llenado {indice['llenado']:.0%}")
+
+    @app.cli.command("benchmark-respuestas")
+    @click.option("--clientes", type=int, default=20, help="Documentos distintos consultados.")
+    @click.option("--repeticiones", type=int, default=25, help="Solicitudes por URL y codificación.")
+    @click.option("--mbps", type=float, default=10.0,
+                  help="Ancho de banda (Mbit/s) para estimar la transferencia.")
+    def benchmark_respuestas_command(clientes, repeticiones, mbps):
+        """Mide bytes transferidos y latencia de búsqueda y exportación por Accept-Encoding."""
+        from src.services.benchmark_respuestas import benchmark_respuestas
+
+        resultados = benchmark_respuestas(current_app._get_current_object(), clientes=clientes,
+                                          repeticiones=repeticiones, mbps=mbps)
+        if resultados is None:
+            raise click.ClickException("No hay clientes registrados (ejecute el seed)")
+
+        for endpoint, variantes in resultados.items():
+            click.echo(endpoint)
+            for variante, datos in variantes.items():
+                click.echo(f"    {variante:>8}: {datos['bytes']:>9.0f} bytes, "
+                           f"p50 {datos['latenciaMs']['p50']:.2f} ms / p99 {datos['latenciaMs']['p99']:.2f} ms, "
+                           f"transferencia {datos['transferenciaMs']:.2f} ms a {mbps:g} Mbit/s")
+
+    @app.cli.command("benchmark-consultas")
+    @click.option("--documentos", type=int, default=100, help="Documentos distintos consultados.")
+    @click.option("--repeticiones", type=int, default=20, help="Repeticiones de cada consulta.")
+    def benchmark_consultas_command(documentos, repeticiones):
+        """Compara la CPU por llamada de las consultas precompiladas (Core) con el ORM."""
+        from src.services.benchmark_consultas import benchmark_consultas
+
+        resultados = benchmark_consultas(current_app._get_current_object(), documentos=documentos,
+                                         repeticiones=repeticiones)
+        if resultados is None:
+            raise click.ClickException("No hay clientes registrados (ejecute el seed)")
+
+        for consulta, datos in resultados.items():
+            click.echo(f"{consulta} (ahorro de CPU {datos['ahorroCpu']:.0%})")
+            for variante in ("orm", "core"):
+                medida = datos[variante]
+                click.echo(f"    {variante:>4}: CPU {medida['cpuUs']:.0f} µs/llamada, "
+                           f"p50 {medida['latenciaUs']['p50']:.0f} µs / p99 {medida['latenciaUs']['p99']:.0f} µs")
+
+    @app.cli.command("benchmark-reporte-paralelo")
+    @click.option("--clientes", type=int, default=20_000, help="Clientes sintéticos.")
+    @click.option("--detalles", type=int, default=10, help="Filas de detalle por cliente.")
+    @click.option("--trabajadores", default="1,2,4,8",
+                  help="Números de trabajadores a medir, separados por coma.")
+    @click.option("--formato", type=click.Choice(["EXCEL", "CSV"], case_sensitive=False), default="EXCEL")
+    def benchmark_reporte_paralelo_command(clientes, detalles, trabajadores, formato):
+        """Mide el escalamiento del reporte de fidelización en modo paralelo (filas sintéticas)."""
+        from src.services.benchmark_reporte import benchmark_reporte_paralelo
+
+        try:
+            numeros = [int(numero) for numero in trabajadores.split(",")]
+        except ValueError:
+            raise click.BadParameter("Use enteros separados por coma, p. ej. 1,2,4,8", param_hint="--trabajadores")
+
+        resultado = benchmark_reporte_paralelo(clientes=clientes, detalles_por_cliente=detalles,
+                                               trabajadores=numeros, formato=formato.upper())
+        click.echo(f"{resultado['filas']} filas, {resultado['nucleos']} núcleos, "
+                   f"pool de {resultado['tamanoPool']} procesos")
+        for numero, datos in resultado["trabajadores"].items():
+            click.echo(f"  {numero} trabajadores: {datos['segundos']:.2f} s "
+                       f"({datos['filasPorSegundo']:.0f} filas/s, speedup {datos['speedup']:.2f}x)")
+
+    @app.cli.command("benchmark-carga")
+    @click.option("--url", default="http://127.0.0.1:8001",
+                  help="URL base del servidor ya levantado (Flask o uvicorn asgi:app).")
+    @click.option("--conexiones", type=int, default=1000, help="Conexiones concurrentes.")
+    @click.option("--solicitudes", type=int, default=5, help="Solicitudes por conexión (keep-alive).")
+    @click.option("--documentos", type=int, default=100,
+                  help="Documentos registrados distintos consultados (de la base de la app).")
+    @click.option("--inexistentes", type=float, default=0.2,
+                  help="Fracción de solicitudes con documentos que no existen.")
+    def benchmark_carga_command(url, conexiones, solicitudes, documentos, inexistentes):
+        """Prueba de carga de /clientes/buscar con N conexiones concurrentes."""
+        from sqlalchemy import select
+
+        from src.extensions import db
+        from src.models.documento import Documento
+        from src.services.benchmark_carga import benchmark_carga
+
+        registrados = [
+            (tipo.value, numero)
+            for tipo, numero in db.session.execute(
+                select(Documento.tipo_documento, Documento.numero_documento).limit(documentos)
+            )
+        ]
+        db.session.remove()
+        resultado = benchmark_carga(url, registrados, conexiones=conexiones, solicitudes=solicitudes,
+                                    inexistentes=inexistentes)
+
+        click.echo(f"{resultado['solicitudes']} solicitudes en {resultado['segundos']:.1f} s "
+                   f"({resultado['solicitudesPorSegundo']:.0f}/s) con {conexiones} conexiones")
+        if "latenciaMs" in resultado:
+            latencia = resultado["latenciaMs"]
+            click.echo(f"Latencia: p50 {latencia['p50']:.0f} ms, p99 {latencia['p99']:.0f} ms, "
+                       f"máxima {latencia['max']:.0f} ms")
+        click.echo(f"Estados: {resultado['estados']}")
+        if resultado["errores"]:
+            click.echo(f"Errores: {resultado['errores']}")
+
+    @app.cli.command("benchmark-creacion")
+    @click.option("--solicitudes", type=int, default=2000, help="Creaciones enviadas por estrategia.")
+    @click.option("--hilos", type=int, default=16, help="Hilos (conexiones) concurrentes.")
+    @click.option("--duplicados", type=float, default=0.3,
+                  help="Fracción de solicitudes que repiten el correo o el documento de otra.")
+    @click.option("--url", default=None,
+                  help="Base del benchmark (por defecto instance/benchmark_creacion.db; nunca la de la app). "
+                       "Se recrean las tablas clientes y documentos.")
+    def benchmark_creacion_command(solicitudes, hilos, duplicados, url):
+        """Creación concurrente de clientes duplicados: SELECT previos frente a restricciones únicas."""
+        from src.config import INSTANCE_DIR
+        from src.services.benchmark_creacion import benchmark_creacion
+
+        url = url or f"sqlite:///{INSTANCE_DIR / 'benchmark_creacion.db'}"
+        if url == current_app.config["SQLALCHEMY_DATABASE_URI"]:
+            raise click.ClickException("El benchmark no puede usar la base de datos de la app")
+
+        resultado = benchmark_creacion(url, solicitudes=solicitudes, hilos=hilos, duplicados=duplicados)
+
+        click.echo(f"{resultado['solicitudes']} solicitudes por estrategia con {resultado['hilos']} hilos")
+        for estrategia, datos in resultado["estrategias"].items():
+            latencia = datos["latenciaMs"]
+            click.echo(f"  {estrategia:>7}: {datos['creacionesPorSegundo']:.0f} solicitudes/s, "
+                       f"p50 {latencia['p50']:.1f} ms, p99 {latencia['p99']:.1f} ms, "
+                       f"máxima {latencia['max']:.1f} ms")
+            consistencia = "" if datos["consistente"] else " (NO coincide con los creados)"
+            click.echo(f"           resultados {datos['resultados']}, "
+                       f"{datos['clientesGuardados']} clientes guardados{consistencia}")
+        click.echo(f"Speedup después/antes: {resultado['speedup']:.2f}x")
+
+    @app.cli.command("refrescar-estadisticas")
+    @click.option("--tamano-lote", type=int, default=1000,
+                  help="Clientes recalculados por transacción.")
+    def refrescar_estadisticas_command(tamano_lote):
+        """Recalcula las estadísticas de compra de todos los clientes (vencimiento de ventanas)."""
+        from src.models.cliente_estadisticas import ClienteEstadisticas
+
+        procesados = ClienteEstadisticas.refrescar(tamano_lote=tamano_lote)
+        click.echo(f"Estadísticas recalculadas para {procesados} clientes")
+
+    @app.cli.command("refrescar-ventas-productos")
+    @click.option("--tamano-lote", type=int, default=500,
+                  help="Productos recalculados por transacción.")
+    def refrescar_ventas_productos_command(tamano_lote):
+        """Recalcula las ventas diarias de todos los productos (llenado inicial o corrección)."""
+        from src.models.producto_ventas import ProductoVentasDiarias
+
+        procesados = ProductoVentasDiarias.refrescar(tamano_lote=tamano_lote)
+        click.echo(f"Ventas diarias recalculadas para {procesados} productos")
+
+    @app.cli.command("reporte-fidelizacion-delta")
+    @click.option("--salida", type=click.Path(dir_okay=False), required=True,
+                  help="Archivo del reporte (.xlsx o .csv).")
+    @click.option("--formato", type=click.Choice(["EXCEL", "CSV"], case_sensitive=False), default="EXCEL",
+                  help="Formato del reporte.")
+    @click.option("--completo", is_flag=True, default=False,
+                  help="Recalcular todos los clientes en lugar de solo los afectados.")
+    def reporte_fidelizacion_delta_command(salida, formato, completo):
+        """Genera el reporte de fidelización con los clientes que cambiaron desde la generación anterior."""
+        from src.services.reporte_fidelizacion_delta import ConflictoMarca, generar_delta
+
+        def escribir(contenido, cursor):
+            # Antes de avanzar la marca: si no se puede escribir, la marca no avanza
+            with open(salida, "wb") as archivo:
+                archivo.write(contenido)
+
+        try:
+            resultado = generar_delta(formato=formato.upper(), completo=completo, guardar=escribir)
+        except ConflictoMarca as error:
+            raise click.ClickException(str(error))
+
+        tipo = "completa" if resultado.completo else "incremental"
+        click.echo(
+            f"Generación {tipo}: {resultado.clientes_recalculados} clientes recalculados, "
+            f"{len(resultado.filas)} cambios escritos en {salida}"
+        )
+
+    @app.cli.command("purgar-cambios")
+    @click.option("--dias", type=int, default=None,
+                  help="Antigüedad mínima (días) de los cambios a borrar.")
+    def purgar_cambios_command(dias):
+        """Borra los cambios del feed más antiguos que la retención."""
+        from src.models.cambio import Cambio
+
+        borrados = Cambio.purgar(dias or current_app.config["CAMBIOS_RETENCION_DIAS"])
+        click.echo(f"Cambios borrados: {borrados}")
+
+    @app.cli.command("consumir-cambios")
+    @click.option("--desde", type=int, default=0, help="Cursor inicial.")
+    @click.option("--limite", type=int, default=None, help="Cambios por lectura.")
+    @click.option("--duracion", type=float, default=30.0,
+                  help="Segundos de consumo antes de reportar.")
+    def consumir_cambios_command(desde, limite, duracion):
+        """Consumidor local del feed de cambios: mide rendimiento y retraso."""
+        import statistics
+        import time
+        from datetime import datetime
+
+        from src.services import cambios
+
+        limite = limite or current_app.config["CAMBIOS_LIMITE"]
+        cursor = desde
+        retrasos = []
+        lecturas = 0
+        inicio = time.monotonic()
+        ultimo_lote = inicio
+        while (restante := duracion - (time.monotonic() - inicio)) > 0:
+            lista, _ = cambios.leer_o_esperar(cursor, limite, min(restante, 5.0))
+            lecturas += 1
+            ahora = datetime.utcnow()
+            for cambio in lista:
+                retrasos.append((ahora - cambio.creado_en).total_seconds() * 1000)
+            if lista:
+                cursor = lista[-1].id
+                ultimo_lote = time.monotonic()
+        # Rendimiento hasta el último lote recibido (sin contar la espera final)
+        activo = max(ultimo_lote - inicio, 1e-6)
+
+        click.echo(f"Cambios: {len(retrasos)} en {activo:.2f} s "
+                   f"({len(retrasos) / activo:.0f}/s, {lecturas} lecturas), cursor final {cursor}")
+        if retrasos:
+            retrasos.sort()
+            p99 = retrasos[min(len(retrasos) - 1, int(len(retrasos) * 0.99))]
+            click.echo(f"Retraso (ms): p50 {statistics.median(retrasos):.1f}, "
+                       f"p99 {p99:.1f}, máximo {retrasos[-1]:.1f}")
+
+    @app.cli.command("calcular-rfm")
+    @click.option("--dias", type=int, default=None,
+                  help="Ventana de compras consideradas (días).")
+    def calcular_rfm_command(dias):
+        """Recalcula el puntaje RFM de todos los clientes (proceso nocturno)."""
+        from src.services.puntaje_rfm import calcular_puntajes_rfm
+
+        total = calcular_puntajes_rfm(dias=dias or current_app.config["RFM_VENTANA_DIAS"])
+        click.echo(f"Puntaje RFM calculado para {total} clientes")
+
+    @app.cli.command("exportar-indice")
+    @click.option("--destino", type=click.Path(dir_okay=False), default=None,
+                  help="Archivo de índice (por defecto INDICE_MMAP_RUTA).")
+    def exportar_indice_command(destino):
+        """Genera el índice mmap de clientes por documento (reemplazo atómico)."""
+        from src.services.indice_mmap import exportar_indice
+
+        destino = destino or current_app.config["INDICE_MMAP_RUTA"]
+        total = exportar_indice(destino)
+        click.echo(f"Índice de {total} clientes escrito en {destino}")
+
+    @app.cli.command("migrar-datos")
+    @click.argument("nombre")
+    @click.option("--tamano-lote", type=int, default=None,
+                  help="Filas por lote (máximo).")
+    @click.option("--segundos-por-lote", type=float, default=None,
+                  help="Duración objetivo de cada lote (0: tamaño fijo).")
+    @click.option("--pausa", type=float, default=None,
+                  help="Segundos de pausa entre lotes.")
+    @click.option("--max-lotes", type=int, default=None,
+                  help="Detenerse tras este número de lotes (se reanuda en la siguiente ejecución).")
+    @click.option("--reiniciar", is_flag=True, default=False,
+                  help="Empezar desde el principio aunque haya progreso guardado.")
+    def migrar_datos_command(nombre, tamano_lote, segundos_por_lote, pausa, max_lotes, reiniciar):
+        """Ejecuta (o reanuda) una migración de datos por lotes con la API en línea."""
+        from src.services import migraciones_datos
+
+        if nombre not in migraciones_datos.MIGRACIONES:
+            raise click.ClickException(
+                f"Migración desconocida: {nombre}. "
+                f"Disponibles: {', '.join(sorted(migraciones_datos.MIGRACIONES))}"
+            )
+        config = current_app.config
+
+        def al_avanzar(progreso):
+            if progreso["lotes"] % 100 == 0:
+                click.echo(f"  {progreso['filas']} filas, {progreso['lotes']} lotes "
+                           f"(lote actual {progreso['tamanoLote']}, {progreso['segundos']:.1f} s)")
+
+        try:
+            resultado = migraciones_datos.ejecutar_por_nombre(
+                nombre,
+                tamano_lote=tamano_lote or config["MIGRACIONES_DATOS_TAMANO_LOTE"],
+                segundos_por_lote=(config["MIGRACIONES_DATOS_SEGUNDOS_POR_LOTE"]
+                                   if segundos_por_lote is None else segundos_por_lote),
+                pausa_segundos=config["MIGRACIONES_DATOS_PAUSA_SEGUNDOS"] if pausa is None else pausa,
+                max_lotes=max_lotes,
+                reiniciar=reiniciar,
+                al_avanzar=al_avanzar,
+            )
+        except migraciones_datos.MigracionEnCurso as error:
+            raise click.ClickException(str(error))
+
+        click.echo(f"Migración {nombre}: {resultado['estado']} "
+                   f"({resultado['filas']} filas en {resultado['lotes']} lotes, "
+                   f"{resultado['segundos']:.1f} s)")
+
+    @app.cli.command("migraciones-datos")
+    def migraciones_datos_command():
+        """Lista las migraciones de datos registradas y su progreso."""
+        from src.services import migraciones_datos
+
+        for nombre, progreso in migraciones_datos.estado().items():
+            descripcion = migraciones_datos.MIGRACIONES[nombre].descripcion
+            if progreso is None:
+                click.echo(f"{nombre}: sin ejecutar - {descripcion}")
+                continue
+            linea = (f"{nombre}: {progreso['estado']}, {progreso['filasProcesadas']} filas "
+                     f"en {progreso['lotes']} lotes, última clave {progreso['ultimaClave']}")
+            if progreso["error"]:
+                linea += f" (error: {progreso['error']})"
+            click.echo(linea)
+
+    @app.cli.command("benchmark-migracion-datos")
+    @click.option("--filas", type=int, default=10_000_000,
+                  help="Detalles de compra sintéticos.")
+    @click.option("--url", default=None,
+                  help="Base SQLite del benchmark (por defecto instance/benchmark_migracion.db; "
+                       "nunca la de la app).")
+    @click.option("--tamano-lote", type=int, default=None,
+                  help="Filas por lote (máximo).")
+    @click.option("--segundos-por-lote", type=float, default=None,
+                  help="Duración objetivo de cada lote (0: tamaño fijo).")
+    @click.option("--pausa", type=float, default=None,
+                  help="Segundos de pausa entre lotes.")
+    @click.option("--wal", is_flag=True, default=False,
+                  help="Usar journal_mode=WAL en la base del benchmark.")
+    def benchmark_migracion_datos_command(filas, url, tamano_lote, segundos_por_lote, pausa, wal):
+        """Rellena una columna nueva en N detalles de compra mientras se simula la API."""
+        from src.config import INSTANCE_DIR
+        from src.services.benchmark_migraciones import benchmark_detalles_compra
+
+        config = current_app.config
+        url = url or f"sqlite:///{INSTANCE_DIR / 'benchmark_migracion.db'}"
+        if url == config["SQLALCHEMY_DATABASE_URI"]:
+            raise click.ClickException("El benchmark no puede usar la base de datos de la app")
+
+        siguiente_aviso = [filas // 10]
+
+        def al_cargar(insertadas):
+            if insertadas >= siguiente_aviso[0]:
+                click.echo(f"  carga: {insertadas} filas")
+                siguiente_aviso[0] = insertadas + filas // 10
+
+        def al_avanzar(progreso):
+            if progreso["lotes"] % 200 == 0:
+                click.echo(f"  migración: {progreso['filas']} filas "
+                           f"(lote actual {progreso['tamanoLote']}, {progreso['segundos']:.1f} s)")
+
+        resultado = benchmark_detalles_compra(
+            url,
+            filas=filas,
+            tamano_lote=tamano_lote or config["MIGRACIONES_DATOS_TAMANO_LOTE"],
+            segundos_por_lote=(config["MIGRACIONES_DATOS_SEGUNDOS_POR_LOTE"]
+                               if segundos_por_lote is None else segundos_por_lote),
+            pausa_segundos=config["MIGRACIONES_DATOS_PAUSA_SEGUNDOS"] if pausa is None else pausa,
+            wal=wal,
+            al_cargar=al_cargar,
+            al_avanzar=al_avanzar,
+        )
+
+        migracion = resultado["migracion"]
+        click.echo(f"Carga: {resultado['filas']} filas en {resultado['segundosCarga']:.1f} s")
+        click.echo(f"Migración: {migracion['filas']} filas en {migracion['segundos']:.1f} s "
+                   f"({migracion['filasPorSegundo']:.0f} filas/s, {migracion['lotes']} lotes)")
+        for nombre, clave in (("Lecturas", "lecturasMs"), ("Escrituras", "escriturasMs")):
+            latencia = resultado[clave]
+            if latencia["n"]:
+                click.echo(f"{nombre} concurrentes (ms): {latencia['n']} ops, p50 {latencia['p50']:.2f}, "
+                           f"p99 {latencia['p99']:.2f}, máximo {latencia['max']:.2f}")
+        click.echo(f"Errores de la API simulada: {resultado['errores']}")
+        click.echo(f"Verificación: {resultado['sinMigrar']} filas sin migrar, "
+                   f"{resultado['incorrectas']} con subtotal incorrecto")
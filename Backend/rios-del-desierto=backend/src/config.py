@@ -21,6 +21,120 @@ class Config:
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
 
+    # Compresión de respuestas (JSON y exportaciones de texto)
+    COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "256"))
+    COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+    COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "5"))
+
+    # Motor JSON de las respuestas: auto (orjson > msgspec > stdlib), orjson, msgspec o stdlib
+    JSON_PROVEEDOR = os.getenv("JSON_PROVEEDOR", "auto")
+
+    # Coalescencia de solicitudes idénticas concurrentes (búsqueda de cliente y reporte)
+    COALESCENCIA_HABILITADA = os.getenv("COALESCENCIA_HABILITADA", "1").lower() in ("1", "true", "si")
+
+    # Filtro de Bloom de documentos registrados (404 sin consultar la base de datos)
+    FILTRO_DOCUMENTOS_HABILITADO = os.getenv("FILTRO_DOCUMENTOS_HABILITADO", "1").lower() in ("1", "true", "si")
+    FILTRO_DOCUMENTOS_TASA_FP = float(os.getenv("FILTRO_DOCUMENTOS_TASA_FP", "0.01"))
+    FILTRO_DOCUMENTOS_CAPACIDAD = int(os.getenv("FILTRO_DOCUMENTOS_CAPACIDAD", "1000000"))
+    FILTRO_DOCUMENTOS_MEMORIA_MAX_MB = float(os.getenv("FILTRO_DOCUMENTOS_MEMORIA_MAX_MB", "16"))
+    FILTRO_DOCUMENTOS_REFRESCO_SEGUNDOS = float(os.getenv("FILTRO_DOCUMENTOS_REFRESCO_SEGUNDOS", "1"))
+
+    # Caché de búsquedas de clientes por documento (LRU con vencimiento)
+    CACHE_BUSQUEDAS_HABILITADO = os.getenv("CACHE_BUSQUEDAS_HABILITADO", "1").lower() in ("1", "true", "si")
+    CACHE_BUSQUEDAS_MAX_ENTRADAS = int(os.getenv("CACHE_BUSQUEDAS_MAX_ENTRADAS", "50000"))
+    CACHE_BUSQUEDAS_TTL_SEGUNDOS = float(os.getenv("CACHE_BUSQUEDAS_TTL_SEGUNDOS", "300"))
+
+    # Precalentamiento al iniciar (hilo en segundo plano; /ready responde 503 mientras tanto)
+    PRECALENTAMIENTO_HABILITADO = os.getenv("PRECALENTAMIENTO_HABILITADO", "0").lower() in ("1", "true", "si")
+    PRECALENTAMIENTO_CLIENTES = int(os.getenv("PRECALENTAMIENTO_CLIENTES", "5000"))
+    # Índice completo en memoria (todos los clientes, sin vencimiento; ver services/indice_memoria.py)
+    PRECALENTAMIENTO_INDICE_COMPLETO = os.getenv("PRECALENTAMIENTO_INDICE_COMPLETO", "0").lower() in ("1", "true", "si")
+    PRECALENTAMIENTO_INDICE_REFRESCO_SEGUNDOS = float(os.getenv("PRECALENTAMIENTO_INDICE_REFRESCO_SEGUNDOS", "1"))
+
+    # Índice mmap de clientes por documento (flask exportar-indice): no, primero o solo
+    INDICE_MMAP_MODO = os.getenv("INDICE_MMAP_MODO", "no")
+    INDICE_MMAP_RUTA = os.getenv("INDICE_MMAP_RUTA", str(INSTANCE_DIR / "indice_clientes.idx"))
+    INDICE_MMAP_VERIFICAR_SEGUNDOS = float(os.getenv("INDICE_MMAP_VERIFICAR_SEGUNDOS", "1"))
+
+    # Catálogo de productos en memoria (services/catalogo_productos.py)
+    CATALOGO_PRODUCTOS_HABILITADO = os.getenv("CATALOGO_PRODUCTOS_HABILITADO", "1").lower() in ("1", "true", "si")
+    CATALOGO_PRODUCTOS_VERIFICAR_SEGUNDOS = float(os.getenv("CATALOGO_PRODUCTOS_VERIFICAR_SEGUNDOS", "5"))
+
+    # Archivos de reporte generados (reutilización y descargas reanudables con Range)
+    REPORTES_ARTEFACTOS_HABILITADO = os.getenv("REPORTES_ARTEFACTOS_HABILITADO", "1").lower() in ("1", "true", "si")
+    REPORTES_ARTEFACTOS_DIR = os.getenv("REPORTES_ARTEFACTOS_DIR", str(INSTANCE_DIR / "reportes"))
+    REPORTES_ARTEFACTOS_FRESCURA_SEGUNDOS = float(os.getenv("REPORTES_ARTEFACTOS_FRESCURA_SEGUNDOS", "300"))
+    REPORTES_ARTEFACTOS_RETENCION_SEGUNDOS = float(os.getenv("REPORTES_ARTEFACTOS_RETENCION_SEGUNDOS", "3600"))
+
+    # Reporte de ventas por producto (/reportes/productos): ventana por defecto y máxima
+    REPORTE_PRODUCTOS_DIAS = int(os.getenv("REPORTE_PRODUCTOS_DIAS", "30"))
+    REPORTE_PRODUCTOS_DIAS_MAX = int(os.getenv("REPORTE_PRODUCTOS_DIAS_MAX", "366"))
+
+    # Feed de cambios (GET /api/v1/cambios, long polling sobre la tabla cambios)
+    CAMBIOS_LIMITE = int(os.getenv("CAMBIOS_LIMITE", "500"))
+    CAMBIOS_LIMITE_MAX = int(os.getenv("CAMBIOS_LIMITE_MAX", "5000"))
+    CAMBIOS_ESPERA_MAX_SEGUNDOS = float(os.getenv("CAMBIOS_ESPERA_MAX_SEGUNDOS", "25"))
+    # Consulta de cambios de otros procesos durante la espera
+    CAMBIOS_SONDEO_SEGUNDOS = float(os.getenv("CAMBIOS_SONDEO_SEGUNDOS", "1"))
+    # Huecos de ids más recientes que esto pueden ser transacciones aún sin confirmar
+    CAMBIOS_MARGEN_SEGUNDOS = float(os.getenv("CAMBIOS_MARGEN_SEGUNDOS", "5"))
+    # Antigüedad de los cambios que borra `flask purgar-cambios`
+    CAMBIOS_RETENCION_DIAS = int(os.getenv("CAMBIOS_RETENCION_DIAS", "7"))
+
+    # Exportación de varios clientes (/clientes/exportar-lote): documentos por solicitud
+    EXPORTACION_LOTE_MAXIMO = int(os.getenv("EXPORTACION_LOTE_MAXIMO", "1000"))
+
+    # Control de admisión (src/api/admision.py)
+    ADMISION_HABILITADA = os.getenv("ADMISION_HABILITADA", "1").lower() in ("1", "true", "si")
+    # Claves X-API-Key reconocidas (separadas por comas); cualquier otra se ignora y cuenta la IP
+    ADMISION_CLAVES_API = frozenset(
+        clave.strip() for clave in os.getenv("ADMISION_CLAVES_API", "").split(",") if clave.strip()
+    )
+    # Límite de tasa por cliente (X-API-Key o IP): endpoint -> (ráfaga, solicitudes por minuto)
+    ADMISION_TASAS = {
+        "reportes.generar_reporte_clientes_fidelizacion": (
+            int(os.getenv("ADMISION_REPORTES_RAFAGA", "3")),
+            float(os.getenv("ADMISION_REPORTES_POR_MINUTO", "6")),
+        ),
+        "reportes.generar_reporte_fidelizacion_delta": (
+            int(os.getenv("ADMISION_REPORTES_RAFAGA", "3")),
+            float(os.getenv("ADMISION_REPORTES_POR_MINUTO", "6")),
+        ),
+        "clientes.exportar_clientes_lote": (
+            int(os.getenv("ADMISION_EXPORTACION_LOTE_RAFAGA", "5")),
+            float(os.getenv("ADMISION_EXPORTACION_LOTE_POR_MINUTO", "10")),
+        ),
+    }
+    # Generaciones concurrentes máximas POR PROCESO (503 si están todas ocupadas): con N
+    # workers, el máximo del servidor es N veces este valor
+    ADMISION_CUPOS = {
+        "reporte_fidelizacion": int(os.getenv("ADMISION_CUPOS_REPORTES", "2")),
+        # Solicitudes del feed de cambios esperando a la vez (las demás no esperan)
+        "cambios_espera": int(os.getenv("ADMISION_CUPOS_CAMBIOS_ESPERA", "4")),
+    }
+    # Retry-After de un 503 mientras aún no hay duración media medida
+    ADMISION_REINTENTO_SEGUNDOS = float(os.getenv("ADMISION_REINTENTO_SEGUNDOS", "5"))
+
+    # API asíncrona (src/api/asincrono.py): conexiones del pool del motor asíncrono
+    ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "20"))
+
+    # Reporte de fidelización en modo paralelo (procesos por shard de clientes)
+    REPORTE_TRABAJADORES = int(os.getenv("REPORTE_TRABAJADORES", str(min(4, os.cpu_count() or 1))))
+    REPORTE_TRABAJADORES_MAX = int(os.getenv("REPORTE_TRABAJADORES_MAX", "8"))
+
+    # Puntaje RFM (flask calcular-rfm)
+    RFM_VENTANA_DIAS = int(os.getenv("RFM_VENTANA_DIAS", "365"))
+
+    # Archivo de compras antiguas (flask archivar-compras)
+    ARCHIVO_HORIZONTE_DIAS = int(os.getenv("ARCHIVO_HORIZONTE_DIAS", "365"))
+    ARCHIVO_TAMANO_LOTE = int(os.getenv("ARCHIVO_TAMANO_LOTE", "1000"))
+
+    # Migraciones de datos por lotes (flask migrar-datos)
+    MIGRACIONES_DATOS_TAMANO_LOTE = int(os.getenv("MIGRACIONES_DATOS_TAMANO_LOTE", "5000"))
+    # Duración objetivo de cada lote (transacción); el tamaño se reduce si se supera
+    MIGRACIONES_DATOS_SEGUNDOS_POR_LOTE = float(os.getenv("MIGRACIONES_DATOS_SEGUNDOS_POR_LOTE", "0.25"))
+    MIGRACIONES_DATOS_PAUSA_SEGUNDOS = float(os.getenv("MIGRACIONES_DATOS_PAUSA_SEGUNDOS", "0.05"))
+
 
 class DevConfig(Config):
     DEBUG = True
@@ -4,3 +4,11 @@ from .documento import Documento
 from .producto import Producto
 from .compra import Compra
 from .detalle_compra import DetalleCompra
+from . import busqueda
+from .archivo import CompraArchivo, DetalleCompraArchivo
+from .cliente_estadisticas import ClienteEstadisticas
+from .cliente_puntaje_rfm import ClientePuntajeRFM
+from .producto_ventas import ProductoVentasDiarias
+from .cambio import Cambio
+from .reporte_fidelizacion_delta import FidelizacionCliente, FidelizacionMarca
+from .migracion_datos import MigracionDatos
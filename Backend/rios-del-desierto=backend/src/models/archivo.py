@@ -0,0 +1,85 @@
+# src/models/archivo.py
+"""
+Partición fría de compras.
+
+Las compras con fecha anterior al horizonte de archivo (ARCHIVO_HORIZONTE_DIAS)
+se mueven por lotes de `compras`/`detalles_compra` a `compras_archivo`/
+`detalles_compra_archivo` (ver src/services/archivo.py). Así las consultas por
+ventana (últimos 30 días) recorren solo la partición caliente.
+
+Para análisis histórico existen las vistas `compras_historico` y
+`detalles_compra_historico` (UNION ALL de ambas particiones).
+"""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DDL, DateTime, Enum, ForeignKey, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.extensions import db
+from .enums import EstadoCompraEnum
+from .tipos import Dinero
+
+
+class CompraArchivo(db.Model):
+    __tablename__ = "compras_archivo"
+
+    id: Mapped[uuid.UUID] = mapped_column(db.Uuid, primary_key=True)
+    # Índice: las ventas por producto consultan la fecha más reciente archivada
+    fecha: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    monto_total: Mapped[Decimal] = mapped_column("monto_total_centavos", Dinero, nullable=False)
+    status: Mapped[EstadoCompraEnum] = mapped_column(
+        Enum(EstadoCompraEnum, name="estado_compra_enum", native_enum=False),
+        nullable=False,
+    )
+    cliente_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("clientes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+
+class DetalleCompraArchivo(db.Model):
+    __tablename__ = "detalles_compra_archivo"
+
+    id: Mapped[uuid.UUID] = mapped_column(db.Uuid, primary_key=True)
+    cantidad_compra: Mapped[int] = mapped_column(Integer, nullable=False)
+    precio_unitario: Mapped[Decimal] = mapped_column("precio_unitario_centavos", Dinero, nullable=False)
+    compra_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("compras_archivo.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    producto_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("productos.id", ondelete="RESTRICT"),
+        nullable=False,
+        index=True,
+    )
+
+
+VISTA_COMPRAS_HISTORICO = """
+    CREATE VIEW compras_historico AS
+    SELECT id, fecha, monto_total_centavos, status, cliente_id, 0 AS archivada FROM compras
+    UNION ALL
+    SELECT id, fecha, monto_total_centavos, status, cliente_id, 1 AS archivada FROM compras_archivo
+"""
+
+VISTA_DETALLES_COMPRA_HISTORICO = """
+    CREATE VIEW detalles_compra_historico AS
+    SELECT id, cantidad_compra, precio_unitario_centavos, compra_id, producto_id, 0 AS archivada
+    FROM detalles_compra
+    UNION ALL
+    SELECT id, cantidad_compra, precio_unitario_centavos, compra_id, producto_id, 1 AS archivada
+    FROM detalles_compra_archivo
+"""
+
+event.listen(CompraArchivo.__table__, "after_create", DDL(VISTA_COMPRAS_HISTORICO))
+event.listen(DetalleCompraArchivo.__table__, "after_create", DDL(VISTA_DETALLES_COMPRA_HISTORICO))
+event.listen(CompraArchivo.__table__, "before_drop", DDL("DROP VIEW IF EXISTS compras_historico"))
+event.listen(
+    DetalleCompraArchivo.__table__, "before_drop", DDL("DROP VIEW IF EXISTS detalles_compra_historico")
+)
@@ -0,0 +1,228 @@
+# src/models/busqueda.py
+"""
+Índice de búsqueda de texto para clientes.
+
+- SQLite: tabla virtual FTS5 `clientes_fts` (nombre, apellido, correo y número de
+  documento, tal como se ingresó y normalizado) mantenida incrementalmente con
+  triggers sobre `clientes` y `documentos`.
+  El rowid de `clientes_fts` es la clave de `clientes_fts_claves` (INTEGER PRIMARY
+  KEY, cliente_id): a diferencia del rowid implícito de `clientes` (tabla sin
+  INTEGER PRIMARY KEY), no cambia con un VACUUM ni al recrear la tabla.
+- PostgreSQL: índices GIN de trigramas (pg_trgm) sobre las mismas columnas.
+
+Un texto que parece un número de documento ("900.123.456-7", "9001234567",
+"123.456") se normaliza como el documento (termino_documento) y se busca también
+en `numero_documento_normalizado`, así que se encuentra con cualquier formato.
+
+Los DDL se registran como eventos `after_create` para que `db.create_all()`
+(tests, seed) construya el índice igual que la migración.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, Float, column, event, text
+
+from .cliente import Cliente
+from .documento import Documento, normalizar_numero_documento
+from .enums import TipoDocumentoEnum
+
+
+FTS_TABLA = "clientes_fts"
+FTS_CLAVES = "clientes_fts_claves"
+
+# Pesos bm25 por columna: (nombre, apellido, correo_electronico, numero_documento,
+# numero_documento_normalizado)
+PESOS_BM25 = (10.0, 10.0, 5.0, 8.0, 8.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Letras, dígitos y los separadores habituales de un número de documento
+_DOCUMENTO_RE = re.compile(r"^[0-9A-Za-z.\-\s]+$")
+
+
+# Rowid de clientes_fts de un cliente
+_CLAVE_FTS = "(SELECT rowid FROM " + FTS_CLAVES + " WHERE cliente_id = {cliente})"
+
+SQLITE_DDL_CLIENTES = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {FTS_CLAVES} (
+        rowid INTEGER PRIMARY KEY,
+        cliente_id NOT NULL UNIQUE
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLA} USING fts5(
+        nombre, apellido, correo_electronico, numero_documento, numero_documento_normalizado,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ai AFTER INSERT ON clientes BEGIN
+        INSERT INTO {FTS_CLAVES}(cliente_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLA}(rowid, nombre, apellido, correo_electronico, numero_documento,
+                                numero_documento_normalizado)
+        VALUES ({_CLAVE_FTS.format(cliente="new.id")},
+                new.nombre, new.apellido, new.correo_electronico, '', '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_au
+    AFTER UPDATE OF nombre, apellido, correo_electronico ON clientes BEGIN
+        UPDATE {FTS_TABLA}
+        SET nombre = new.nombre,
+            apellido = new.apellido,
+            correo_electronico = new.correo_electronico
+        WHERE rowid = {_CLAVE_FTS.format(cliente="new.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ad AFTER DELETE ON clientes BEGIN
+        DELETE FROM {FTS_TABLA} WHERE rowid = {_CLAVE_FTS.format(cliente="old.id")};
+        DELETE FROM {FTS_CLAVES} WHERE cliente_id = old.id;
+    END
+    """,
+]
+
+SQLITE_DDL_DOCUMENTOS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ai AFTER INSERT ON documentos BEGIN
+        UPDATE {FTS_TABLA}
+        SET numero_documento = new.numero_documento,
+            numero_documento_normalizado = coalesce(new.numero_documento_normalizado, '')
+        WHERE rowid = {_CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_au
+    AFTER UPDATE OF numero_documento, numero_documento_normalizado ON documentos BEGIN
+        UPDATE {FTS_TABLA}
+        SET numero_documento = new.numero_documento,
+            numero_documento_normalizado = coalesce(new.numero_documento_normalizado, '')
+        WHERE rowid = {_CLAVE_FTS.format(cliente="new.cliente_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_documentos_fts_ad AFTER DELETE ON documentos BEGIN
+        UPDATE {FTS_TABLA}
+        SET numero_documento = '', numero_documento_normalizado = ''
+        WHERE rowid = {_CLAVE_FTS.format(cliente="old.cliente_id")};
+    END
+    """,
+]
+
+POSTGRES_DDL_CLIENTES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_nombre_trgm ON clientes USING gin (nombre gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_apellido_trgm ON clientes USING gin (apellido gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_clientes_correo_trgm ON clientes USING gin (correo_electronico gin_trgm_ops)",
+]
+
+POSTGRES_DDL_DOCUMENTOS = [
+    "CREATE INDEX IF NOT EXISTS ix_documentos_numero_trgm ON documentos USING gin (numero_documento gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_documentos_numero_normalizado_trgm ON documentos "
+    "USING gin (numero_documento_normalizado gin_trgm_ops)",
+]
+
+
+def _registrar_ddl(tabla, sentencias, dialecto):
+    for sentencia in sentencias:
+        event.listen(tabla, "after_create", DDL(sentencia).execute_if(dialect=dialecto))
+
+
+_registrar_ddl(Cliente.__table__, SQLITE_DDL_CLIENTES, "sqlite")
+_registrar_ddl(Documento.__table__, SQLITE_DDL_DOCUMENTOS, "sqlite")
+_registrar_ddl(Cliente.__table__, POSTGRES_DDL_CLIENTES, "postgresql")
+_registrar_ddl(Documento.__table__, POSTGRES_DDL_DOCUMENTOS, "postgresql")
+
+
+def tokenizar(texto: str) -> List[str]:
+    """
+    Separa el texto en términos alfanuméricos, igual que el tokenizer unicode61
+    (un correo "juan.perez@x.com" produce juan, perez, x, com).
+    """
+    return _TOKEN_RE.findall(texto or "")
+
+
+def termino_documento(texto: str) -> Optional[str]:
+    """
+    Forma normalizada del texto si parece un número de documento: tiene dígitos y
+    solo letras, dígitos, puntos, guiones o espacios. Sin letras se normaliza como
+    CEDULA/NIT (solo dígitos: "900.123.456-7" -> "9001234567"); con letras, como
+    PASAPORTE (letras y dígitos en mayúscula).
+
+    Returns:
+        Número normalizado, o None si el texto no parece un documento
+    """
+    texto = (texto or "").strip()
+    if not _DOCUMENTO_RE.match(texto) or not any(caracter.isdigit() for caracter in texto):
+        return None
+    tipo = TipoDocumentoEnum.PASAPORTE if any(caracter.isalpha() for caracter in texto) else TipoDocumentoEnum.CEDULA
+    return normalizar_numero_documento(tipo, texto) or None
+
+
+def construir_consulta_fts(texto: str) -> str:
+    """
+    Construye una expresión MATCH de FTS5 donde cada término es un prefijo
+    y todos los términos deben aparecer (AND implícito). Si el texto parece un
+    número de documento, también coincide el prefijo de su forma normalizada en
+    `numero_documento_normalizado`.
+
+    Returns:
+        Expresión MATCH, o cadena vacía si el texto no tiene términos
+    """
+    consulta = " ".join(f'"{termino}"*' for termino in tokenizar(texto))
+    documento = termino_documento(texto)
+    if consulta and documento:
+        return f'({consulta}) OR (numero_documento_normalizado : "{documento}"*)'
+    return consulta
+
+
+def puntajes_fts(session, texto: str, limite: int) -> List[Tuple[object, float]]:
+    """
+    Clientes que coinciden con el texto en `clientes_fts`, de mayor a menor relevancia.
+
+    Returns:
+        Lista de (id del cliente, puntaje); el puntaje es bm25 con el signo invertido
+    """
+    consulta = construir_consulta_fts(texto)
+    if not consulta:
+        return []
+
+    pesos = ", ".join(str(p) for p in PESOS_BM25)
+    stmt = text(f"""
+        SELECT k.cliente_id AS id, bm25({FTS_TABLA}, {pesos}) AS rank
+        FROM {FTS_TABLA}
+        JOIN {FTS_CLAVES} k ON k.rowid = {FTS_TABLA}.rowid
+        WHERE {FTS_TABLA} MATCH :consulta
+        ORDER BY rank
+        LIMIT :limite
+    """).columns(column("id", Cliente.id.type), column("rank", Float))
+
+    filas = session.execute(stmt, {"consulta": consulta, "limite": limite}).all()
+    # bm25 es menor cuanto más relevante: se invierte el signo para el puntaje
+    return [(fila.id, -fila.rank) for fila in filas]
+
+
+def reconstruir_indice_sqlite(session) -> int:
+    """
+    Reconstruye `clientes_fts` y `clientes_fts_claves` desde cero a partir de
+    `clientes` y `documentos` (flask reconstruir-indice-busqueda). Repara el índice
+    si quedó desincronizado, por ejemplo tras cargar datos con los triggers
+    deshabilitados.
+
+    Returns:
+        Número de clientes indexados
+    """
+    session.execute(text(f"DELETE FROM {FTS_TABLA}"))
+    session.execute(text(f"DELETE FROM {FTS_CLAVES}"))
+    session.execute(text(f"INSERT INTO {FTS_CLAVES}(cliente_id) SELECT id FROM clientes"))
+    session.execute(text(f"""
+        INSERT INTO {FTS_TABLA}(rowid, nombre, apellido, correo_electronico, numero_documento,
+                                numero_documento_normalizado)
+        SELECT k.rowid, c.nombre, c.apellido, c.correo_electronico,
+               coalesce(d.numero_documento, ''), coalesce(d.numero_documento_normalizado, '')
+        FROM {FTS_CLAVES} k
+        JOIN clientes c ON c.id = k.cliente_id
+        LEFT JOIN documentos d ON d.cliente_id = c.id
+    """))
+    return session.scalar(text(f"SELECT count(*) FROM {FTS_CLAVES}"))
@@ -0,0 +1,232 @@
+# src/models/cambio.py
+"""
+Bandeja de salida (outbox) de cambios de clientes y compras.
+
+Cada flush que crea, modifica o borra clientes (o sus documentos) y compras (o
+sus detalles) inserta, en la misma transacción, una fila por entidad afectada con
+la foto de sus datos. Si la transacción se revierte, los cambios desaparecen con
+ella: el feed nunca publica algo que no quedó guardado ni se pierde algo que sí.
+
+El id autoincremental es el cursor del feed (GET /api/v1/cambios?desde=<cursor>).
+Con escrituras concurrentes (PostgreSQL) un id menor puede hacerse visible después
+de uno mayor; `leer` se detiene antes de un hueco reciente (menos de
+CAMBIOS_MARGEN_SEGUNDOS) para que el consumidor no lo salte. Las transacciones que
+escriben clientes o compras deben confirmarse dentro de ese margen.
+
+El archivo de compras antiguas (services/archivo.py) no genera cambios: mueve filas
+sin modificarlas.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, DateTime, Integer, JSON, String, delete, event, func, insert, select
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column
+
+from src.extensions import db
+
+# Marca en session.info de que la transacción escribió cambios (ver services/cambios.py)
+CLAVE_ESCRITOS = "cambios_escritos"
+
+
+class Cambio(db.Model):
+    __tablename__ = "cambios"
+
+    # Cursor del feed (rowid en SQLite)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+
+    entidad: Mapped[str] = mapped_column(String(20), nullable=False)
+    entidad_id: Mapped[uuid.UUID] = mapped_column(db.Uuid, nullable=False)
+    # crear, actualizar o eliminar
+    operacion: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Foto de la entidad después del cambio (None al eliminar)
+    datos: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    creado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    # AUTOINCREMENT en SQLite: sin él, al purgar los cambios más recientes sus ids
+    # se reutilizarían y un consumidor con ese cursor se saltaría los nuevos
+    __table_args__ = (
+        {"sqlite_autoincrement": True},
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "cursor": self.id,
+            "entidad": self.entidad,
+            "id": str(self.entidad_id),
+            "operacion": self.operacion,
+            "fecha": self.creado_en.isoformat(),
+            "datos": self.datos,
+        }
+
+    @classmethod
+    def leer(cls, conn, desde: int, limite: int, margen_segundos: float) -> Tuple[List["Cambio"], bool]:
+        """
+        Cambios posteriores al cursor `desde`, en orden.
+
+        Se detiene antes de un hueco en los ids si la fila siguiente al hueco tiene
+        menos de `margen_segundos`: el id que falta puede ser de una transacción que
+        todavía no se confirma (los huecos viejos son de transacciones revertidas).
+        En ese caso hay_mas es False: lo que sigue no se puede entregar todavía y el
+        consumidor debe esperar (long polling), no volver a pedir de inmediato.
+
+        Args:
+            conn: Conexión de lectura
+            desde: Cursor del último cambio recibido (0 para empezar desde el principio)
+            limite: Máximo de cambios a devolver
+            margen_segundos: Antigüedad mínima para saltar un hueco
+
+        Returns:
+            Tupla (cambios, hay_mas)
+        """
+        tabla = cls.__table__
+        filas = conn.execute(
+            select(tabla).where(tabla.c.id > desde).order_by(tabla.c.id).limit(limite + 1)
+        ).all()
+
+        recientes = datetime.utcnow() - timedelta(seconds=margen_segundos)
+        cambios = []
+        anterior = desde
+        for fila in filas[:limite]:
+            if fila.id != anterior + 1 and anterior and fila.creado_en > recientes:
+                return cambios, False
+            cambios.append(cls(**fila._mapping))
+            anterior = fila.id
+        return cambios, len(filas) > limite
+
+    @classmethod
+    def cursor_asentado(cls, conn, margen_segundos: float) -> int:
+        """
+        Mayor id de los cambios con más de `margen_segundos` (0 si no hay): punto de
+        partida de quien relee la tabla por cursor sin saltar transacciones tardías
+        (filtro de documentos e índice en memoria).
+        """
+        tabla = cls.__table__
+        limite = datetime.utcnow() - timedelta(seconds=margen_segundos)
+        return conn.execute(select(func.max(tabla.c.id)).where(tabla.c.creado_en < limite)).scalar() or 0
+
+    @classmethod
+    def purgar(cls, dias: int) -> int:
+        """
+        Borra los cambios con más de `dias` de antigüedad.
+
+        Returns:
+            Número de cambios borrados
+        """
+        limite = datetime.utcnow() - timedelta(days=dias)
+        resultado = db.session.execute(delete(cls).where(cls.creado_en < limite))
+        db.session.commit()
+        return resultado.rowcount
+
+
+# --------------------------------------
+# Escritura en la misma transacción
+# --------------------------------------
+def _datos_cliente(cliente) -> Dict:
+    datos = cliente.to_dict()
+    documento = cliente.documento
+    datos["documento"] = {
+        "tipoDocumento": documento.tipo_documento.value,
+        "numeroDocumento": documento.numero_documento,
+    } if documento is not None else None
+    return datos
+
+
+def _datos_compra(compra) -> Dict:
+    return {
+        "id": str(compra.id),
+        "clienteId": str(compra.cliente_id),
+        "fecha": compra.fecha.isoformat(),
+        "status": compra.status.value,
+        "montoTotal": float(compra.monto_total),
+        "detalles": [
+            {
+                "productoId": str(detalle.producto_id),
+                "cantidad": detalle.cantidad_compra,
+                "precioUnitario": float(detalle.precio_unitario),
+            }
+            for detalle in compra.detalles_compra
+        ],
+    }
+
+
+def _cambios_del_flush(session: Session) -> List[Dict]:
+    from .cliente import Cliente
+    from .compra import Compra
+    from .detalle_compra import DetalleCompra
+    from .documento import Documento
+
+    # (entidad, id) -> operación; el orden de inserción es el orden del feed
+    operaciones: Dict[Tuple[str, uuid.UUID], str] = {}
+
+    def anotar(entidad: str, entidad_id, operacion: str) -> None:
+        if entidad_id is None:
+            return
+        clave = (entidad, entidad_id)
+        actual = operaciones.get(clave)
+        # crear o eliminar prevalecen sobre actualizar (p. ej. cliente nuevo + su documento)
+        if actual is None or actual == "actualizar":
+            operaciones[clave] = operacion
+
+    def id_de(obj):
+        identidad = attributes.instance_state(obj).identity
+        return identidad[0] if identidad else None
+
+    for obj in session.new:
+        if isinstance(obj, Cliente):
+            anotar("cliente", obj.id, "crear")
+        elif isinstance(obj, Compra):
+            anotar("compra", obj.id, "crear")
+    # Las compras de un cliente borrado las borra la base de datos en cascada: el
+    # consumidor solo recibe la eliminación del cliente
+    for obj in session.deleted:
+        if isinstance(obj, Cliente):
+            anotar("cliente", id_de(obj), "eliminar")
+        elif isinstance(obj, Compra):
+            anotar("compra", id_de(obj), "eliminar")
+    for obj in session.dirty:
+        if isinstance(obj, (Cliente, Compra)) and session.is_modified(obj, include_collections=False):
+            anotar("cliente" if isinstance(obj, Cliente) else "compra", obj.id, "actualizar")
+    # Documentos y detalles cambian la foto de su cliente o compra
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Documento):
+            anotar("cliente", obj.cliente_id, "actualizar")
+        elif isinstance(obj, DetalleCompra):
+            anotar("compra", obj.compra_id, "actualizar")
+
+    if not operaciones:
+        return []
+
+    ahora = datetime.utcnow()
+    filas = []
+    for (entidad, entidad_id), operacion in operaciones.items():
+        datos = None
+        if operacion != "eliminar":
+            modelo = Cliente if entidad == "cliente" else Compra
+            obj = session.get(modelo, entidad_id)
+            if obj is None:
+                continue
+            datos = _datos_cliente(obj) if entidad == "cliente" else _datos_compra(obj)
+        filas.append({
+            "entidad": entidad,
+            "entidad_id": entidad_id,
+            "operacion": operacion,
+            "datos": datos,
+            "creado_en": ahora,
+        })
+    return filas
+
+
+@event.listens_for(Session, "after_flush")
+def _escribir_cambios(session: Session, flush_context) -> None:
+    """Inserta en la misma transacción los cambios de clientes y compras del flush."""
+    with session.no_autoflush:
+        filas = _cambios_del_flush(session)
+    if filas:
+        session.connection().execute(insert(Cambio.__table__), filas)
+        session.info[CLAVE_ESCRITOS] = True
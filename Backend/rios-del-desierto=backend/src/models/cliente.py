@@ -1,18 +1,20 @@
 # src/models/cliente.py
 import uuid
+from decimal import Decimal
 from datetime import datetime, date, timedelta
-from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import select, func
+from typing import Optional, List, Tuple, TYPE_CHECKING
+from sqlalchemy import select, func, or_, literal, union_all
 
-from sqlalchemy.orm import Mapped, mapped_column, validates, relationship
+from sqlalchemy.orm import Mapped, mapped_column, validates, relationship, selectinload
 from sqlalchemy import String, Date, DateTime, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 
 from src.extensions import db
-from .enums import TipoDocumentoEnum
+from .ids import uuid7
 
 if TYPE_CHECKING:
     from src.models.compra import Compra
+    from src.models.cliente_estadisticas import ClienteEstadisticas
 
 
 class Cliente(db.Model):
@@ -22,7 +24,7 @@ class Cliente(db.Model):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
     # Datos básicos
@@ -73,6 +75,14 @@ class Cliente(db.Model):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+
+    # Estadísticas precalculadas (tabla mantenida por SQL, ver cliente_estadisticas.py).
+    # Para listados cargar con selectinload(Cliente.estadisticas) y evitar N+1.
+    estadisticas: Mapped[Optional["ClienteEstadisticas"]] = relationship(
+        "ClienteEstadisticas",
+        uselist=False,
+        viewonly=True,
+    )
     # Constraints de la tabla clientes:
     __table_args__ = (
         # Strings no vacíos
@@ -119,8 +129,8 @@ class Cliente(db.Model):
             raise ValueError("fecha_nacimiento no puede ser futura")
         return value
 
-    def to_dict(self):
-        return {
+    def to_dict(self, incluir_estadisticas: bool = False):
+        data = {
             "id": str(self.id),
             "nombre": self.nombre,
             "apellido": self.apellido,
@@ -128,31 +138,138 @@ class Cliente(db.Model):
             "telefonoCelular": self.telefono_celular,
             "fechaNacimiento": self.fecha_nacimiento.isoformat() if self.fecha_nacimiento else None,
         }
+        if incluir_estadisticas:
+            from .cliente_estadisticas import ClienteEstadisticas
+
+            data["estadisticas"] = (
+                self.estadisticas.to_dict() if self.estadisticas else ClienteEstadisticas.vacias()
+            )
+        return data
 
     @classmethod
-    def buscar_por_documento(cls, tipo_documento: TipoDocumentoEnum, numero_documento: str) -> Optional["Cliente"]:
+    def buscar_por_texto(
+        cls, texto: str, limite: int = 20, con_estadisticas: bool = False
+    ) -> List[Tuple["Cliente", float]]:
         """
-        Busca un cliente por su tipo y número de documento.
-        
+        Busca clientes por coincidencia parcial de nombre, apellido, correo electrónico
+        o número de documento, ordenados por relevancia.
+
+        - SQLite: índice FTS5 `clientes_fts` (prefijos, ranking bm25)
+        - PostgreSQL: índices de trigramas (pg_trgm, ranking por similitud)
+        - Otros motores: prefijo con ILIKE (sin ranking)
+
+        Un texto que parece un número de documento se compara además, normalizado,
+        con numero_documento_normalizado (ver busqueda.termino_documento).
+
         Args:
-            tipo_documento: Tipo de documento (NIT, CEDULA, PASAPORTE)
-            numero_documento: Número del documento
-            
+            texto: Texto libre ingresado por el usuario
+            limite: Número máximo de resultados
+            con_estadisticas: Cargar también las estadísticas de compra (una consulta para todos)
+
         Returns:
-            Cliente si se encuentra, None si no existe
+            Lista de tuplas (Cliente, puntaje), de mayor a menor relevancia
         """
         from .documento import Documento
-        
-        documento = db.session.query(Documento).filter(
-            Documento.tipo_documento == tipo_documento,
-            Documento.numero_documento == numero_documento
-        ).first()
-        
+        from .busqueda import puntajes_fts, termino_documento
+
+        texto = (texto or "").strip()
+        if not texto:
+            return []
+
+        opciones = [selectinload(cls.documento)]
+        if con_estadisticas:
+            opciones.append(selectinload(cls.estadisticas))
+
+        dialecto = db.session.get_bind().dialect.name
+
+        if dialecto == "sqlite":
+            puntajes = dict(puntajes_fts(db.session, texto, limite))
+            if not puntajes:
+                return []
+
+            clientes = db.session.scalars(
+                select(cls)
+                .options(*opciones)
+                .where(cls.id.in_(list(puntajes)))
+            ).all()
+            clientes = sorted(clientes, key=lambda c: puntajes[c.id], reverse=True)
+            return [(cliente, puntajes[cliente.id]) for cliente in clientes]
+
+        patron = texto.lower()
+        documento = termino_documento(texto)
+
+        if dialecto == "postgresql":
+            # Una subconsulta por tabla para que cada una use sus índices de trigramas
+            # (un OR sobre columnas de clientes y documentos en un join no puede)
+            por_cliente = select(
+                cls.id.label("id"),
+                func.greatest(
+                    func.similarity(cls.nombre, patron),
+                    func.similarity(cls.apellido, patron),
+                    func.similarity(cls.correo_electronico, patron),
+                ).label("puntaje"),
+            ).where(or_(
+                cls.nombre.op("%")(patron),
+                cls.apellido.op("%")(patron),
+                cls.correo_electronico.op("%")(patron),
+                cls.correo_electronico.ilike(f"{patron}%"),
+            ))
+            # Número tal como se ingresó (sin distinguir mayúsculas) y normalizado
+            similitud = func.similarity(Documento.numero_documento, patron)
+            condiciones = [
+                Documento.numero_documento.op("%")(patron),
+                Documento.numero_documento.ilike(f"{texto}%"),
+            ]
+            if documento:
+                similitud = func.greatest(similitud, func.similarity(Documento.numero_documento_normalizado, documento))
+                condiciones += [
+                    Documento.numero_documento_normalizado.op("%")(documento),
+                    Documento.numero_documento_normalizado.startswith(documento),
+                ]
+            por_documento = select(
+                Documento.cliente_id.label("id"),
+                similitud.label("puntaje"),
+            ).where(or_(*condiciones))
+            candidatos = union_all(por_cliente, por_documento).subquery()
+            mejor = func.max(candidatos.c.puntaje)
+            filas = db.session.execute(
+                select(candidatos.c.id, mejor.label("puntaje"))
+                .group_by(candidatos.c.id)
+                .order_by(mejor.desc())
+                .limit(limite)
+            ).all()
+            puntajes = {fila.id: float(fila.puntaje) for fila in filas}
+
+            clientes = db.session.scalars(
+                select(cls)
+                .options(*opciones)
+                .where(cls.id.in_(list(puntajes)))
+            ).all()
+            clientes = sorted(clientes, key=lambda c: puntajes[c.id], reverse=True)
+            return [(cliente, puntajes[cliente.id]) for cliente in clientes]
+
+        puntaje = literal(1.0)
+        condiciones = [
+            cls.nombre.ilike(f"{patron}%"),
+            cls.apellido.ilike(f"{patron}%"),
+            cls.correo_electronico.ilike(f"{patron}%"),
+            Documento.numero_documento.ilike(f"{texto}%"),
+        ]
         if documento:
-            return documento.cliente
-        return None
+            condiciones.append(Documento.numero_documento_normalizado.startswith(documento))
+        condicion = or_(*condiciones)
 
-    def calcular_total_compras_ultimo_mes(self) -> float:
+        stmt = (
+            select(cls, puntaje.label("puntaje"))
+            .outerjoin(Documento, Documento.cliente_id == cls.id)
+            .options(*opciones)
+            .where(condicion)
+            .order_by(puntaje.desc())
+            .limit(limite)
+        )
+        return [(cliente, float(valor)) for cliente, valor in db.session.execute(stmt).all()]
+
+    def calcular_total_compras_ultimo_mes(self) -> Decimal:
         """
         Calcula el monto total de compras del cliente en el último mes (últimos 30 días).
         
@@ -170,39 +287,54 @@ class Cliente(db.Model):
             Compra.status == EstadoCompraEnum.COMPLETADA
         )
         
-        total = db.session.scalar(stmt) or 0.0
-        return float(total)
+        # La suma se hace en centavos enteros en la base de datos (ver tipos.Dinero)
+        return db.session.scalar(stmt) or Decimal("0.00")
 
     @classmethod
-    def obtener_clientes_fidelizacion(cls, monto_minimo: float = 5_000_000) -> List["Cliente"]:
+    def obtener_clientes_fidelizacion(
+        cls,
+        monto_minimo: float = 5_000_000,
+        politica: str = "monto",
+        puntaje_rfm_minimo: int = 12,
+    ) -> List["Cliente"]:
         """
-        Obtiene los clientes que superan el monto mínimo de compras en el último mes.
+        Obtiene los clientes elegibles para el programa de fidelización.
+
+        Políticas:
+            - "monto": superan el monto mínimo de compras en el último mes
+            - "rfm": su puntaje RFM (calculado cada noche, ver services/puntaje_rfm.py)
+              es mayor o igual a `puntaje_rfm_minimo`
         
         Args:
-            monto_minimo: Monto mínimo en COP (por defecto 5'000.000)
+            monto_minimo: Monto mínimo en COP (por defecto 5'000.000), política "monto"
+            politica: Política de elegibilidad ("monto" o "rfm")
+            puntaje_rfm_minimo: Puntaje RFM total mínimo (3 a 15), política "rfm"
             
         Returns:
-            Lista de clientes que superan el monto mínimo en el último mes
+            Lista de clientes elegibles
+
+        Raises:
+            ValueError: Si la política no existe
         """
-        from .compra import Compra
-        from .enums import EstadoCompraEnum
-        
-        fecha_limite = datetime.utcnow() - timedelta(days=30)
+        if politica == "rfm":
+            from .cliente_puntaje_rfm import ClientePuntajeRFM
+
+            stmt = select(cls).join(
+                ClientePuntajeRFM, ClientePuntajeRFM.cliente_id == cls.id
+            ).where(ClientePuntajeRFM.puntaje_total >= puntaje_rfm_minimo)
+            return list(db.session.scalars(stmt).all())
+
+        if politica != "monto":
+            raise ValueError(f"Política de fidelización desconocida: {politica}")
         
-        # Subconsulta para obtener el total por cliente
-        subquery = select(
-            Compra.cliente_id,
-            func.sum(Compra.monto_total).label('total')
-        ).where(
-            Compra.fecha >= fecha_limite,
-            Compra.status == EstadoCompraEnum.COMPLETADA
-        ).group_by(Compra.cliente_id).having(
-            func.sum(Compra.monto_total) > monto_minimo
-        ).subquery()
+        from .consultas import TOTALES_FIDELIZACION_SUBCONSULTA, parametros_fidelizacion
+
+        # Subconsulta precompilada con el total por cliente (ver consultas.py)
+        subquery = TOTALES_FIDELIZACION_SUBCONSULTA
         
         # Obtener los clientes que cumplen la condición
         stmt = select(cls).join(
             subquery, cls.id == subquery.c.cliente_id
         )
         
-        return list(db.session.scalars(stmt).all())
+        return list(db.session.scalars(stmt, parametros_fidelizacion(monto_minimo)).all())
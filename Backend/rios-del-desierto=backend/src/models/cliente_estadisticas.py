@@ -0,0 +1,191 @@
+# src/models/cliente_estadisticas.py
+"""
+Estadísticas de compra precalculadas por cliente (tabla materializada).
+
+Se actualizan:
+    - Incrementalmente, en la misma transacción, cuando se escriben compras
+      (listener after_flush: se recalculan solo los clientes afectados).
+    - Con un barrido periódico (`flask refrescar-estadisticas`), necesario porque
+      las ventanas de 30/90/365 días cambian con el paso del tiempo aunque no
+      haya compras nuevas.
+
+Los totales incluyen las compras archivadas (vista compras_historico).
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Boolean, DateTime, ForeignKey, Integer, case, column, delete, event, func, literal,
+    select, table,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column
+
+from src.extensions import db
+from .enums import EstadoCompraEnum
+from .tipos import Dinero
+
+# Monto mínimo (COP) de compras en los últimos 30 días para ser cliente fidelizado
+UMBRAL_FIDELIZACION = 5_000_000
+
+
+class ClienteEstadisticas(db.Model):
+    __tablename__ = "cliente_estadisticas"
+
+    cliente_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("clientes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    total_historico: Mapped[Decimal] = mapped_column("total_historico_centavos", Dinero, nullable=False, default=0)
+    total_30_dias: Mapped[Decimal] = mapped_column("total_30_dias_centavos", Dinero, nullable=False, default=0)
+    total_90_dias: Mapped[Decimal] = mapped_column("total_90_dias_centavos", Dinero, nullable=False, default=0)
+    total_365_dias: Mapped[Decimal] = mapped_column("total_365_dias_centavos", Dinero, nullable=False, default=0)
+    numero_compras: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fecha_ultima_compra: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    es_fidelizado: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, index=True)
+
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "totalHistorico": float(self.total_historico),
+            "total30Dias": float(self.total_30_dias),
+            "total90Dias": float(self.total_90_dias),
+            "total365Dias": float(self.total_365_dias),
+            "numeroCompras": self.numero_compras,
+            "fechaUltimaCompra": self.fecha_ultima_compra.isoformat() if self.fecha_ultima_compra else None,
+            "esFidelizado": self.es_fidelizado,
+        }
+
+    @staticmethod
+    def vacias() -> dict:
+        """Representación para un cliente sin compras (sin fila en la tabla)."""
+        return {
+            "totalHistorico": 0.0,
+            "total30Dias": 0.0,
+            "total90Dias": 0.0,
+            "total365Dias": 0.0,
+            "numeroCompras": 0,
+            "fechaUltimaCompra": None,
+            "esFidelizado": False,
+        }
+
+    @classmethod
+    def recalcular(cls, conn, cliente_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Recalcula las estadísticas de los clientes dados con una sola consulta
+        agregada: INSERT ... SELECT ... ON CONFLICT (cliente_id) DO UPDATE, y borra
+        las filas de los clientes que quedaron sin compras completadas.
+
+        Args:
+            conn: Conexión sobre la que se ejecuta (misma transacción que la escritura)
+            cliente_ids: Clientes a recalcular
+        """
+        cliente_ids = list(cliente_ids)
+        if not cliente_ids:
+            return
+
+        ahora = datetime.utcnow()
+        compras = table(
+            "compras_historico",
+            column("cliente_id", db.Uuid),
+            column("fecha", DateTime),
+            column("monto_total_centavos"),
+            column("status"),
+        )
+        monto = compras.c.monto_total_centavos
+
+        def total_desde(dias: int):
+            limite = ahora - timedelta(days=dias)
+            return func.coalesce(func.sum(case((compras.c.fecha >= limite, monto), else_=0)), 0)
+
+        total_30 = total_desde(30)
+        completadas = (
+            compras.c.status == EstadoCompraEnum.COMPLETADA.value,
+            compras.c.cliente_id.in_(cliente_ids),
+        )
+        agregado = (
+            select(
+                compras.c.cliente_id,
+                func.coalesce(func.sum(monto), 0),
+                total_30,
+                total_desde(90),
+                total_desde(365),
+                func.count(),
+                func.max(compras.c.fecha),
+                case((total_30 > literal(UMBRAL_FIDELIZACION, Dinero), True), else_=False),
+                literal(ahora, DateTime),
+            )
+            .where(*completadas)
+            .group_by(compras.c.cliente_id)
+        )
+
+        tabla = cls.__table__
+        dialecto = postgresql if conn.dialect.name == "postgresql" else sqlite
+        stmt = dialecto.insert(tabla).from_select([c.name for c in tabla.c], agregado)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabla.c.cliente_id],
+            set_={c.name: stmt.excluded[c.name] for c in tabla.c if not c.primary_key},
+        )
+        conn.execute(stmt)
+
+        conn.execute(delete(tabla).where(
+            tabla.c.cliente_id.in_(cliente_ids),
+            tabla.c.cliente_id.not_in(select(compras.c.cliente_id).where(*completadas)),
+        ))
+
+    @classmethod
+    def refrescar(cls, tamano_lote: int = 1000) -> int:
+        """
+        Barrido completo: recalcula las estadísticas de todos los clientes por lotes
+        (una transacción por lote). Corrige los totales por ventana que vencen con el tiempo.
+
+        Returns:
+            Número de clientes procesados
+        """
+        from .cliente import Cliente
+
+        procesados = 0
+        ultimo_id = None
+        while True:
+            stmt = select(Cliente.id).order_by(Cliente.id).limit(tamano_lote)
+            if ultimo_id is not None:
+                stmt = stmt.where(Cliente.id > ultimo_id)
+            ids = db.session.scalars(stmt).all()
+            if not ids:
+                break
+
+            cls.recalcular(db.session.connection(), ids)
+            db.session.commit()
+
+            procesados += len(ids)
+            ultimo_id = ids[-1]
+
+        return procesados
+
+
+def _clientes_afectados(session: Session):
+    from .compra import Compra
+
+    afectados = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Compra):
+            continue
+        afectados.add(obj.cliente_id)
+        # Si la compra cambió de cliente, también se recalcula el anterior
+        afectados.update(attributes.get_history(obj, "cliente_id").deleted or ())
+    afectados.discard(None)
+    return afectados
+
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_estadisticas(session: Session, flush_context) -> None:
+    """Recalcula en la misma transacción las estadísticas de los clientes con compras escritas."""
+    afectados = _clientes_afectados(session)
+    if afectados:
+        # session.connection() no dispara autoflush (estamos dentro de un flush)
+        ClienteEstadisticas.recalcular(session.connection(), afectados)
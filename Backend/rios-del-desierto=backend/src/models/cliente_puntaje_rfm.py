@@ -0,0 +1,38 @@
+# src/models/cliente_puntaje_rfm.py
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.extensions import db
+from .tipos import Dinero
+
+
+class ClientePuntajeRFM(db.Model):
+    """
+    Puntaje RFM (recencia, frecuencia, monto) por cliente, calculado cada noche
+    por src/services/puntaje_rfm.py. Cada componente va de 1 (peor) a 5 (mejor)
+    según el quintil del cliente; puntaje_total es la suma (3 a 15).
+    """
+    __tablename__ = "cliente_puntajes_rfm"
+
+    cliente_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("clientes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # Valores crudos
+    recencia_dias: Mapped[int] = mapped_column(Integer, nullable=False)
+    frecuencia: Mapped[int] = mapped_column(Integer, nullable=False)
+    monto: Mapped[Decimal] = mapped_column("monto_centavos", Dinero, nullable=False)
+
+    # Puntajes por quintil (1-5)
+    puntaje_r: Mapped[int] = mapped_column(Integer, nullable=False)
+    puntaje_f: Mapped[int] = mapped_column(Integer, nullable=False)
+    puntaje_m: Mapped[int] = mapped_column(Integer, nullable=False)
+    puntaje_total: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+
+    calculado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
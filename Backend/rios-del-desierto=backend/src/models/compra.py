@@ -1,14 +1,17 @@
 # src/models/compra.py
 import uuid
+from decimal import Decimal
 from datetime import datetime, timedelta
-from typing import List, TYPE_CHECKING, Tuple
+from typing import Iterator, List, TYPE_CHECKING
 
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import DateTime, Float, Enum, ForeignKey, CheckConstraint, select
-from sqlalchemy.orm import Mapped, mapped_column, relationship, joinedload
+from sqlalchemy import DateTime, Enum, ForeignKey, CheckConstraint, Index, Row, select
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.extensions import db
+from .ids import uuid7
 from .enums import EstadoCompraEnum
+from .tipos import Dinero
 
 if TYPE_CHECKING:
     from .detalle_compra import DetalleCompra
@@ -20,12 +23,13 @@ class Compra(db.Model):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
     fecha: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
-    monto_total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Guardado en centavos (ver tipos.Dinero)
+    monto_total: Mapped[Decimal] = mapped_column("monto_total_centavos", Dinero, nullable=False, default=0)
 
     status: Mapped[EstadoCompraEnum] = mapped_column(
         Enum(EstadoCompraEnum, name="estado_compra_enum", native_enum=False),
@@ -53,13 +57,20 @@ class Compra(db.Model):
     )
 
     __table_args__ = (
-        CheckConstraint("monto_total > 0", name="ck_compra_monto_no_negativo_ni_cero"),
+        CheckConstraint("monto_total_centavos > 0", name="ck_compra_monto_no_negativo_ni_cero"),
+        # Consultas por ventana (últimos 30 días) sobre la partición caliente
+        Index("ix_compras_status_fecha", "status", "fecha"),
+        # Archivo por lotes por fecha, sin filtro de estado (services/archivo.py)
+        Index("ix_compras_fecha", "fecha"),
     )
 
     @classmethod
     def obtener_compras_mayores_a(cls, monto_minimo: float = 5_000_000) -> List["Compra"]:
         """
         Obtiene todas las compras cuyo monto_total es mayor al monto mínimo especificado.
+
+        Solo consulta la partición caliente (`compras`); las compras archivadas
+        están en la vista `compras_historico` (ver models/archivo.py).
         
         Args:
             monto_minimo: Monto mínimo en COP (por defecto 5'000.000)
@@ -119,19 +130,13 @@ class Compra(db.Model):
         """
         from .detalle_compra import DetalleCompra
         from .producto import Producto
-        from sqlalchemy import func
+        from .consultas import TOTALES_FIDELIZACION_SUBCONSULTA, parametros_fidelizacion
         
-        fecha_limite = datetime.utcnow() - timedelta(days=30)
+        parametros = parametros_fidelizacion(monto_minimo_total)
+        fecha_limite = parametros["fecha_limite"]
         
-        # Subconsulta para obtener clientes que cumplen el criterio
-        subquery_clientes = select(
-            Compra.cliente_id
-        ).where(
-            Compra.fecha >= fecha_limite,
-            Compra.status == EstadoCompraEnum.COMPLETADA
-        ).group_by(Compra.cliente_id).having(
-            func.sum(Compra.monto_total) > monto_minimo_total
-        ).subquery()
+        # Subconsulta precompilada con los clientes que cumplen el criterio (ver consultas.py)
+        subquery_clientes = TOTALES_FIDELIZACION_SUBCONSULTA
         
         # Query principal: obtener todas las compras de esos clientes con sus detalles y productos
         stmt = (
@@ -146,4 +151,62 @@ class Compra(db.Model):
             .order_by(Compra.fecha.desc(), Producto.nombre)
         )
         
-        return list(db.session.execute(stmt).all())
+        return list(db.session.execute(stmt, parametros).all())
+
+    @classmethod
+    def iterar_detalles_ultimo_mes(
+        cls, monto_minimo_total: float = 5_000_000, tamano_lote: int = 1000
+    ) -> Iterator[Row]:
+        """
+        Igual que obtener_detalles_compras_con_productos_ultimo_mes pero sin el JOIN
+        con productos (el nombre se resuelve con el catálogo en memoria,
+        services/catalogo_productos.py) y leído en streaming: filas de columnas
+        (sin objetos ORM) en lotes de `tamano_lote` con yield_per.
+
+        Las filas vienen en el orden del reporte: cliente (nombre, apellido) y
+        dentro de cada cliente de la compra más reciente a la más antigua.
+
+        Args:
+            monto_minimo_total: Monto mínimo total de compras del cliente en el último mes
+            tamano_lote: Filas leídas de la base de datos por lote
+
+        Yields:
+            Filas con cliente_id, nombre, apellido, correo_electronico, telefono_celular,
+            tipo_documento, numero_documento (None sin documento), fecha, producto_id,
+            cantidad_compra y precio_unitario
+        """
+        from .cliente import Cliente
+        from .detalle_compra import DetalleCompra
+        from .documento import Documento
+        from .consultas import TOTALES_FIDELIZACION_SUBCONSULTA, parametros_fidelizacion
+
+        parametros = parametros_fidelizacion(monto_minimo_total)
+        subquery_clientes = TOTALES_FIDELIZACION_SUBCONSULTA
+
+        stmt = (
+            select(
+                Cliente.id.label("cliente_id"),
+                Cliente.nombre,
+                Cliente.apellido,
+                Cliente.correo_electronico,
+                Cliente.telefono_celular,
+                Documento.tipo_documento,
+                Documento.numero_documento,
+                Compra.fecha,
+                DetalleCompra.producto_id,
+                DetalleCompra.cantidad_compra,
+                DetalleCompra.precio_unitario,
+            )
+            .join(DetalleCompra, Compra.id == DetalleCompra.compra_id)
+            .join(subquery_clientes, Compra.cliente_id == subquery_clientes.c.cliente_id)
+            .join(Cliente, Cliente.id == Compra.cliente_id)
+            .outerjoin(Documento, Documento.cliente_id == Cliente.id)
+            .where(
+                Compra.fecha >= parametros["fecha_limite"],
+                Compra.status == EstadoCompraEnum.COMPLETADA
+            )
+            .order_by(Cliente.nombre, Cliente.apellido, Compra.fecha.desc())
+            .execution_options(yield_per=tamano_lote)
+        )
+
+        yield from db.session.execute(stmt, parametros)
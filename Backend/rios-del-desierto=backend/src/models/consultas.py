@@ -0,0 +1,177 @@
+# src/models/consultas.py
+"""
+Sentencias Core precompiladas para las consultas más frecuentes.
+
+Las sentencias se construyen una sola vez (al importar el módulo) con parámetros
+`bindparam`, así cada llamada solo envía los valores: no se vuelve a armar el
+`select(...)` y la clave de caché de compilación de SQLAlchemy es siempre la misma.
+
+Se ejecutan directamente sobre la conexión de la sesión y devuelven filas (tuplas
+con nombre) en lugar de objetos ORM: sin identity map, sin eventos de carga y sin
+unit of work para lecturas que no modifican nada.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import DateTime, Row, bindparam, func, select, tuple_
+
+from src.extensions import db
+from .cliente import Cliente
+from .compra import Compra
+from .documento import Documento, normalizar_numero_documento
+from .enums import EstadoCompraEnum, TipoDocumentoEnum
+from .producto import Producto
+from .tipos import Dinero
+
+_clientes = Cliente.__table__
+_documentos = Documento.__table__
+_compras = Compra.__table__
+_productos = Producto.__table__
+
+# Cliente + documento por tipo y número normalizado (búsqueda y exportación)
+CLIENTE_POR_DOCUMENTO = (
+    select(
+        _clientes.c.id,
+        _clientes.c.nombre,
+        _clientes.c.apellido,
+        _clientes.c.correo_electronico,
+        _clientes.c.telefono_celular,
+        _clientes.c.fecha_nacimiento,
+        _clientes.c.created_at,
+        _clientes.c.updated_at,
+        _documentos.c.tipo_documento,
+        _documentos.c.numero_documento,
+    )
+    .join_from(_clientes, _documentos, _documentos.c.cliente_id == _clientes.c.id)
+    .where(
+        _documentos.c.tipo_documento == bindparam("tipo_documento"),
+        _documentos.c.numero_documento_normalizado == bindparam("numero_normalizado"),
+    )
+    .limit(1)
+)
+
+# Búsqueda por lote: varios (tipo, número normalizado) en una sola consulta
+CLIENTES_POR_DOCUMENTOS = (
+    select(
+        *CLIENTE_POR_DOCUMENTO.selected_columns,
+        _documentos.c.numero_documento_normalizado,
+    )
+    .join_from(_clientes, _documentos, _documentos.c.cliente_id == _clientes.c.id)
+    .where(
+        tuple_(_documentos.c.tipo_documento, _documentos.c.numero_documento_normalizado).in_(
+            bindparam("documentos", expanding=True)
+        )
+    )
+)
+
+# Todos los clientes con su documento (índice completo del precalentamiento)
+CLIENTES_CON_DOCUMENTO = select(
+    *CLIENTE_POR_DOCUMENTO.selected_columns,
+    _documentos.c.numero_documento_normalizado,
+).join_from(_clientes, _documentos, _documentos.c.cliente_id == _clientes.c.id)
+
+# Los `limite` clientes con la compra más reciente (precalentamiento de la caché),
+# del menos al más reciente: así los más recientes son los últimos en salir del LRU
+_ULTIMAS_COMPRAS = (
+    select(
+        _compras.c.cliente_id,
+        func.max(_compras.c.fecha).label("ultima_compra"),
+    )
+    .group_by(_compras.c.cliente_id)
+    .order_by(func.max(_compras.c.fecha).desc())
+    .limit(bindparam("limite"))
+    .subquery("ultimas_compras")
+)
+CLIENTES_RECIENTES = (
+    CLIENTES_CON_DOCUMENTO
+    .join(_ULTIMAS_COMPRAS, _ULTIMAS_COMPRAS.c.cliente_id == _clientes.c.id)
+    .order_by(_ULTIMAS_COMPRAS.c.ultima_compra)
+)
+
+# Catálogo de productos en memoria (services/catalogo_productos.py): filas y versión.
+# La versión cambia al crear o borrar productos (número) o al modificarlos (updated_at)
+CATALOGO_PRODUCTOS = select(_productos.c.id, _productos.c.nombre, _productos.c.precio_centavos)
+VERSION_CATALOGO_PRODUCTOS = select(
+    func.count(),
+    func.max(func.coalesce(_productos.c.updated_at, _productos.c.created_at)),
+)
+
+# Total de compras completadas por cliente desde `fecha_limite`, solo clientes que
+# superan `monto_minimo`. Subconsulta de los métodos ORM (Cliente.obtener_clientes_fidelizacion,
+# Compra.obtener_detalles_compras_con_productos_ultimo_mes, Compra.iterar_detalles_ultimo_mes).
+TOTALES_FIDELIZACION_SUBCONSULTA = (
+    select(
+        _compras.c.cliente_id,
+        func.sum(_compras.c.monto_total_centavos).label("total"),
+    )
+    .where(
+        _compras.c.fecha >= bindparam("fecha_limite", type_=DateTime),
+        _compras.c.status == EstadoCompraEnum.COMPLETADA,
+    )
+    .group_by(_compras.c.cliente_id)
+    .having(func.sum(_compras.c.monto_total_centavos) > bindparam("monto_minimo", type_=Dinero))
+    .subquery("totales_fidelizacion")
+)
+
+
+def parametros_fidelizacion(monto_minimo: float = 5_000_000, dias: int = 30) -> dict:
+    """Valores de los parámetros de TOTALES_FIDELIZACION_SUBCONSULTA."""
+    return {
+        "fecha_limite": datetime.utcnow() - timedelta(days=dias),
+        "monto_minimo": monto_minimo,
+    }
+
+
+def cliente_por_documento(tipo_documento: TipoDocumentoEnum, numero_documento: str) -> Optional[Row]:
+    """
+    Busca un cliente con su documento por tipo y número de documento.
+
+    Args:
+        tipo_documento: Tipo de documento (NIT, CEDULA, PASAPORTE)
+        numero_documento: Número del documento (se normaliza según el tipo)
+
+    Returns:
+        Fila con id, nombre, apellido, correo_electronico, telefono_celular,
+        fecha_nacimiento, created_at, updated_at, tipo_documento y numero_documento,
+        o None si no existe
+    """
+    return db.session.connection().execute(
+        CLIENTE_POR_DOCUMENTO,
+        {
+            "tipo_documento": tipo_documento,
+            "numero_normalizado": normalizar_numero_documento(tipo_documento, numero_documento),
+        },
+    ).first()
+
+
+def parametros_documentos(documentos: Iterable[Tuple[TipoDocumentoEnum, str]]) -> dict:
+    """Valores del parámetro de CLIENTES_POR_DOCUMENTOS (números normalizados, sin repetidos)."""
+    pares = {
+        (tipo_documento, normalizar_numero_documento(tipo_documento, numero_documento))
+        for tipo_documento, numero_documento in documentos
+    }
+    return {"documentos": list(pares)}
+
+
+def clientes_por_documentos(
+    documentos: Iterable[Tuple[TipoDocumentoEnum, str]],
+    tamano_lote: int = 500,
+) -> Iterator[Row]:
+    """
+    Clientes de varios documentos con una sola consulta (CLIENTES_POR_DOCUMENTOS).
+    Las filas se leen de la base de datos por partes (stream_results) a medida que
+    se consumen, sin cargar el resultado completo.
+
+    Args:
+        documentos: Pares (tipo de documento, número de documento)
+        tamano_lote: Filas leídas del cursor por vez
+
+    Yields:
+        Filas como las de cliente_por_documento, más numero_documento_normalizado,
+        en el orden de la base de datos (los documentos sin cliente se omiten)
+    """
+    yield from db.session.connection().execute(
+        CLIENTES_POR_DOCUMENTOS,
+        parametros_documentos(documentos),
+        execution_options={"stream_results": True, "yield_per": tamano_lote},
+    )
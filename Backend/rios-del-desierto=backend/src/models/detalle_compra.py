@@ -1,12 +1,14 @@
 # src/models/detalle_compra.py
 import uuid
-from typing import Optional
+from decimal import Decimal
 
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Float, Integer, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import Integer, ForeignKey, CheckConstraint, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.extensions import db
+from .ids import uuid7
+from .tipos import Dinero
 
 
 class DetalleCompra(db.Model):
@@ -16,12 +18,13 @@ class DetalleCompra(db.Model):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
     cantidad_compra: Mapped[int] = mapped_column(Integer, nullable=False)
 
-    precio_unitario: Mapped[float] = mapped_column(Float, nullable=False)
+    # Guardado en centavos (ver tipos.Dinero)
+    precio_unitario: Mapped[Decimal] = mapped_column("precio_unitario_centavos", Dinero, nullable=False)
 
     # FK a Compra (parte de la composición)
     compra_id: Mapped[uuid.UUID] = mapped_column(
@@ -45,7 +48,7 @@ class DetalleCompra(db.Model):
 
     __table_args__ = (
         CheckConstraint("cantidad_compra > 0", name="ck_detalle_cantidad_mayor_que_cero"),
-        CheckConstraint("precio_unitario >= 0", name="ck_detalle_precio_unitario_no_negativo"),
+        CheckConstraint("precio_unitario_centavos >= 0", name="ck_detalle_precio_unitario_no_negativo"),
         # No puede estar repetido el mismo producto en el mismo detalle de la compra.
         # Para eso se usa el atributo cantidad:
         UniqueConstraint("compra_id", "producto_id", name="uq_detalle_compra_producto"),
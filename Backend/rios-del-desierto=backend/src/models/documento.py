@@ -1,19 +1,46 @@
+import re
 import uuid
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Enum, ForeignKey, UniqueConstraint, String, CheckConstraint
+from sqlalchemy import Enum, ForeignKey, UniqueConstraint, String, CheckConstraint, Index
 from .enums import TipoDocumentoEnum
 
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.dialects.postgresql import UUID
 
 from src.extensions import db
+from .ids import uuid7
 
 
 if TYPE_CHECKING:
     from .cliente import Cliente
 
 
+_NO_DIGITOS_RE = re.compile(r"\D")
+_NO_ALFANUMERICOS_RE = re.compile(r"[^0-9A-Z]")
+
+
+def normalizar_numero_documento(tipo_documento: TipoDocumentoEnum, numero_documento: str) -> str:
+    """
+    Obtiene la forma canónica de un número de documento según su tipo, para que
+    "900.123.456-7", "900123456-7" y "9001234567" sean el mismo NIT.
+
+    - NIT y CEDULA: solo dígitos (se eliminan puntos, guiones y espacios)
+    - PASAPORTE: letras y dígitos en mayúscula
+
+    Args:
+        tipo_documento: Tipo de documento (NIT, CEDULA, PASAPORTE)
+        numero_documento: Número del documento tal como lo ingresó el usuario
+
+    Returns:
+        Número de documento normalizado
+    """
+    numero = (numero_documento or "").strip().upper()
+    if tipo_documento in (TipoDocumentoEnum.NIT, TipoDocumentoEnum.CEDULA):
+        return _NO_DIGITOS_RE.sub("", numero)
+    return _NO_ALFANUMERICOS_RE.sub("", numero)
+
+
 class Documento(db.Model):
     __tablename__ = "documentos"
 
@@ -21,10 +48,12 @@ class Documento(db.Model):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
     numero_documento: Mapped[str] = mapped_column(String(40), nullable=False)
+    # Forma canónica usada en las búsquedas (ver normalizar_numero_documento)
+    numero_documento_normalizado: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
     tipo_documento: Mapped[TipoDocumentoEnum] = mapped_column(
         Enum(TipoDocumentoEnum, name="tipo_documento_enum", native_enum=False),
         nullable=False,
@@ -47,6 +76,38 @@ class Documento(db.Model):
     __table_args__ = (
         # No vacíos
         CheckConstraint("length(numero_documento) > 0", name="ck_doc_numero_no_vacio"),
+        # Un número que se normaliza a "" coincidiría con cualquier otro sin dígitos
+        CheckConstraint("length(numero_documento_normalizado) > 0", name="ck_doc_numero_normalizado_no_vacio"),
         # Búsqueda principal: tipo + numero únicos
         UniqueConstraint("tipo_documento", "numero_documento", name="uq_doc_tipo_numero"),
+        # Tipo + número normalizado únicos: "900.123.456-7" y "9001234567" no pueden coexistir
+        Index(
+            "uq_doc_tipo_numero_normalizado",
+            "tipo_documento",
+            "numero_documento_normalizado",
+            unique=True,
+        ),
     )
+
+    # --------------------
+    # Validaciones simples
+    # --------------------
+    def _normalizar(self, tipo_documento: TipoDocumentoEnum, numero_documento: str) -> None:
+        normalizado = normalizar_numero_documento(tipo_documento, numero_documento)
+        if not normalizado:
+            tipo = getattr(tipo_documento, "value", tipo_documento)
+            raise ValueError(f"numero_documento inválido para {tipo}: '{numero_documento}'")
+        self.numero_documento_normalizado = normalizado
+
+    @validates("numero_documento")
+    def validate_numero_documento(self, key, value: str):
+        value = (value or "").strip()
+        if self.tipo_documento is not None:
+            self._normalizar(self.tipo_documento, value)
+        return value
+
+    @validates("tipo_documento")
+    def validate_tipo_documento(self, key, value: TipoDocumentoEnum):
+        if self.numero_documento is not None:
+            self._normalizar(value, self.numero_documento)
+        return value
@@ -0,0 +1,51 @@
+# src/models/migracion_datos.py
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.extensions import db
+
+
+class MigracionDatos(db.Model):
+    """
+    Progreso de una migración de datos por lotes (src/services/migraciones_datos.py).
+
+    Cada lote confirma, en la misma transacción que sus cambios, la última clave
+    procesada: si el proceso se interrumpe, la siguiente ejecución continúa desde
+    ahí sin repetir ni saltar filas.
+
+    `propietario` y `bloqueada_hasta` son el arriendo del proceso que la ejecuta:
+    mientras esté vigente ningún otro proceso puede tomarla. Se renueva en cada lote.
+    """
+    __tablename__ = "migraciones_datos"
+
+    nombre: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # pendiente | en_curso | completada | fallida
+    estado: Mapped[str] = mapped_column(String(20), nullable=False, default="pendiente")
+    # Última clave procesada (texto; None: aún no se procesó ningún lote)
+    ultima_clave: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    filas_procesadas: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    lotes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    propietario: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    bloqueada_hasta: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    iniciada_en: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    actualizada_en: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completada_en: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "nombre": self.nombre,
+            "estado": self.estado,
+            "ultimaClave": self.ultima_clave,
+            "filasProcesadas": self.filas_procesadas,
+            "lotes": self.lotes,
+            "iniciadaEn": self.iniciada_en.isoformat() if self.iniciada_en else None,
+            "actualizadaEn": self.actualizada_en.isoformat() if self.actualizada_en else None,
+            "completadaEn": self.completada_en.isoformat() if self.completada_en else None,
+            "error": self.error,
+        }
@@ -1,14 +1,17 @@
 # src/models/producto.py
 import uuid
+from decimal import Decimal
 
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
-from sqlalchemy import String, Float, DateTime, CheckConstraint
+from sqlalchemy import String, DateTime, CheckConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.extensions import db
+from .ids import uuid7
+from .tipos import Dinero
 
 if TYPE_CHECKING:
     from src.models.detalle_compra import DetalleCompra
@@ -20,13 +23,18 @@ class Producto(db.Model):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4
+        default=uuid7
     )
 
     nombre: Mapped[str] = mapped_column(String(120), nullable=False)
-    precio: Mapped[float] = mapped_column(Float, nullable=False)
+    # Guardado en centavos (ver tipos.Dinero)
+    precio: Mapped[Decimal] = mapped_column("precio_centavos", Dinero, nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    # Versión del catálogo en memoria (ver services/catalogo_productos.py)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     # Backref a detalles (un producto puede estar en muchos detalles)
     detalles_compra: Mapped[List["DetalleCompra"]] = relationship(
@@ -37,5 +45,5 @@ class Producto(db.Model):
 
     __table_args__ = (
         CheckConstraint("length(nombre) > 0", name="ck_producto_nombre_no_vacio"),
-        CheckConstraint("precio >= 0", name="ck_producto_precio_no_negativo"),
+        CheckConstraint("precio_centavos >= 0", name="ck_producto_precio_no_negativo"),
     )
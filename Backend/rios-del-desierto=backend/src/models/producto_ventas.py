@@ -0,0 +1,356 @@
+# src/models/producto_ventas.py
+"""
+Ventas por producto y día (tabla de agregados mantenida incrementalmente).
+
+Cada fila resume las compras completadas de un producto en un día (UTC): unidades,
+ingresos y número de compras distintas (no de detalles: los detalles archivados no
+tienen la restricción única (compra_id, producto_id)). El reporte de productos (/reportes/productos) suma
+solo las filas de la ventana pedida, sin recorrer detalles_compra.
+
+Se actualizan:
+    - En la misma transacción que las escrituras de compras y detalles (listeners
+      before_flush/after_flush), con deltas: se leen las ventas de las compras
+      escritas antes y después del flush, y la diferencia por producto y día se
+      suma con INSERT ... ON CONFLICT (producto_id, dia) DO UPDATE SET
+      unidades = unidades + excluded.unidades, ... Los borrados, cambios de estado
+      (p. ej. una compra anulada) y cambios de fecha o de producto dan deltas
+      negativos; las filas que quedan sin compras se borran.
+    - Con `flask refrescar-ventas-productos` (llenado inicial o corrección completa,
+      DELETE + INSERT ... SELECT con recalcular).
+
+Incluyen las compras archivadas (compras_archivo y detalles_compra_archivo), así que
+archivar compras no cambia los totales.
+"""
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Date, DateTime, ForeignKey, Index, Integer, cast, delete, event, func, insert, literal, select,
+    tuple_, union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column
+
+from src.extensions import db
+from .enums import EstadoCompraEnum
+from .tipos import Dinero
+
+# Ventas de las compras escritas antes del flush (session.info)
+_CLAVE_ANTES = "ventas_productos_antes"
+
+# Compras por consulta al leer sus ventas
+_TAMANO_LOTE_COMPRAS = 500
+
+# (producto_id, dia) -> [unidades, ingresos, numero_compras]
+Ventas = Dict[Tuple[uuid.UUID, date], List]
+
+
+class ProductoVentasDiarias(db.Model):
+    __tablename__ = "producto_ventas_diarias"
+
+    producto_id: Mapped[uuid.UUID] = mapped_column(
+        db.Uuid,
+        ForeignKey("productos.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    unidades: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    ingresos: Mapped[Decimal] = mapped_column("ingresos_centavos", Dinero, nullable=False, default=0)
+    numero_compras: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Reporte por ventana: recorre solo los días pedidos
+        Index("ix_producto_ventas_diarias_dia", "dia"),
+    )
+
+    @classmethod
+    def recalcular(
+        cls,
+        conn,
+        producto_ids: Iterable[uuid.UUID],
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+    ) -> None:
+        """
+        Recalcula (DELETE + INSERT ... SELECT) las filas de los productos dados entre
+        `desde` y `hasta` (inclusive; sin límites, todo el historial).
+
+        Args:
+            conn: Conexión sobre la que se ejecuta (la de la transacción de la escritura)
+            producto_ids: Productos a recalcular
+            desde: Primer día a recalcular (opcional)
+            hasta: Último día a recalcular (opcional)
+        """
+        producto_ids = list(producto_ids)
+        if not producto_ids:
+            return
+
+        from .archivo import CompraArchivo, DetalleCompraArchivo
+        from .compra import Compra
+        from .detalle_compra import DetalleCompra
+
+        tabla = cls.__table__
+        borrar = delete(tabla).where(tabla.c.producto_id.in_(producto_ids))
+        if desde is not None:
+            borrar = borrar.where(tabla.c.dia >= desde)
+        if hasta is not None:
+            borrar = borrar.where(tabla.c.dia <= hasta)
+
+        # Cada partición con su propio JOIN (sobre las vistas UNION ALL no se usan los
+        # índices). Con ventana, los detalles se filtran además con IN (compras de la
+        # ventana): así se recorren los detalles del producto por índice y se descartan
+        # con un filtro barato, en lugar de buscar los detalles de cada compra del día.
+        # En SQLite compras.id (NUMERIC) y detalles_compra.compra_id (texto) tienen
+        # afinidades distintas y el índice de compra_id no sirve para el JOIN.
+        particiones = [(Compra.__table__, DetalleCompra.__table__)]
+        if desde is None or cls._hay_archivo_desde(conn, desde):
+            particiones.append((CompraArchivo.__table__, DetalleCompraArchivo.__table__))
+
+        partes = []
+        for compras, detalles in particiones:
+            en_ventana = [compras.c.status == EstadoCompraEnum.COMPLETADA]
+            if desde is not None:
+                en_ventana.append(compras.c.fecha >= datetime.combine(desde, time.min))
+            if hasta is not None:
+                en_ventana.append(compras.c.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+
+            condiciones = [detalles.c.producto_id.in_(producto_ids), *en_ventana]
+            if desde is not None or hasta is not None:
+                condiciones.append(detalles.c.compra_id.in_(select(compras.c.id).where(*en_ventana)))
+
+            partes.append(
+                select(
+                    detalles.c.producto_id,
+                    compras.c.id.label("compra_id"),
+                    compras.c.fecha,
+                    detalles.c.cantidad_compra,
+                    detalles.c.precio_unitario_centavos,
+                )
+                .select_from(detalles.join(compras, compras.c.id == detalles.c.compra_id))
+                .where(*condiciones)
+            )
+        ventas = union_all(*partes).subquery("ventas")
+
+        # Día de la compra: en SQLite DATE() devuelve 'AAAA-MM-DD', el mismo texto
+        # con el que se guarda una columna Date
+        if conn.dialect.name == "sqlite":
+            dia = func.date(ventas.c.fecha)
+        else:
+            dia = cast(ventas.c.fecha, Date)
+
+        stmt = (
+            select(
+                ventas.c.producto_id,
+                dia,
+                func.sum(ventas.c.cantidad_compra),
+                func.sum(ventas.c.cantidad_compra * ventas.c.precio_unitario_centavos),
+                func.count(ventas.c.compra_id.distinct()),
+                literal(datetime.utcnow(), DateTime),
+            )
+            .group_by(ventas.c.producto_id, dia)
+        )
+
+        conn.execute(borrar)
+        conn.execute(insert(tabla).from_select([c.name for c in tabla.c], stmt))
+
+    @classmethod
+    def sumar(cls, conn, deltas: Ventas) -> None:
+        """
+        Suma deltas (positivos o negativos) a las filas de cada producto y día:
+        INSERT ... ON CONFLICT (producto_id, dia) DO UPDATE, y borra las filas que
+        quedan sin compras.
+
+        Args:
+            conn: Conexión sobre la que se ejecuta (la de la transacción de la escritura)
+            deltas: (producto_id, dia) -> [unidades, ingresos, numero_compras]
+        """
+        if not deltas:
+            return
+
+        tabla = cls.__table__
+        ahora = datetime.utcnow()
+        dialecto = postgresql if conn.dialect.name == "postgresql" else sqlite
+        stmt = dialecto.insert(tabla)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabla.c.producto_id, tabla.c.dia],
+            set_={
+                "unidades": tabla.c.unidades + stmt.excluded.unidades,
+                "ingresos_centavos": tabla.c.ingresos_centavos + stmt.excluded.ingresos_centavos,
+                "numero_compras": tabla.c.numero_compras + stmt.excluded.numero_compras,
+                "actualizado_en": stmt.excluded.actualizado_en,
+            },
+        )
+        conn.execute(stmt, [
+            {
+                "producto_id": producto_id,
+                "dia": dia,
+                "unidades": unidades,
+                "ingresos_centavos": ingresos,
+                "numero_compras": numero_compras,
+                "actualizado_en": ahora,
+            }
+            for (producto_id, dia), (unidades, ingresos, numero_compras) in deltas.items()
+        ])
+
+        restadas = [clave for clave, (_, _, numero_compras) in deltas.items() if numero_compras < 0]
+        if restadas:
+            conn.execute(delete(tabla).where(
+                tuple_(tabla.c.producto_id, tabla.c.dia).in_(restadas),
+                tabla.c.numero_compras <= 0,
+            ))
+
+    @staticmethod
+    def _hay_archivo_desde(conn, desde: date) -> bool:
+        """True si hay compras archivadas desde el día `desde` (índice de compras_archivo.fecha)."""
+        from .archivo import CompraArchivo
+
+        ultima = conn.execute(select(func.max(CompraArchivo.fecha))).scalar()
+        return ultima is not None and ultima >= datetime.combine(desde, time.min)
+
+    @classmethod
+    def refrescar(cls, tamano_lote: int = 500) -> int:
+        """
+        Recalcula todo el historial de todos los productos por lotes (una
+        transacción por lote).
+
+        Returns:
+            Número de productos procesados
+        """
+        from .producto import Producto
+
+        procesados = 0
+        ultimo_id = None
+        while True:
+            stmt = select(Producto.id).order_by(Producto.id).limit(tamano_lote)
+            if ultimo_id is not None:
+                stmt = stmt.where(Producto.id > ultimo_id)
+            ids = db.session.scalars(stmt).all()
+            if not ids:
+                break
+
+            cls.recalcular(db.session.connection(), ids)
+            db.session.commit()
+
+            procesados += len(ids)
+            ultimo_id = ids[-1]
+
+        return procesados
+
+    @classmethod
+    def totales_por_producto(cls, desde: date, hasta: date) -> List[Tuple[uuid.UUID, int, Decimal, int]]:
+        """
+        Unidades, ingresos y compras por producto entre `desde` y `hasta` (inclusive).
+
+        Returns:
+            Lista de tuplas (producto_id, unidades, ingresos, numero_compras),
+            de mayor a menor ingreso
+        """
+        ingresos = func.sum(cls.ingresos)
+        stmt = (
+            select(cls.producto_id, func.sum(cls.unidades), ingresos, func.sum(cls.numero_compras))
+            .where(cls.dia >= desde, cls.dia <= hasta)
+            .group_by(cls.producto_id)
+            .order_by(ingresos.desc())
+        )
+        return [tuple(fila) for fila in db.session.execute(stmt)]
+
+
+# --------------------------------------
+# Mantenimiento incremental
+# --------------------------------------
+def _ventas_de_compras(conn, compra_ids: Set[uuid.UUID]) -> Ventas:
+    """
+    Ventas (detalles de compras completadas) de las compras dadas, por producto y
+    día. Cada compra cuenta una vez por producto y día aunque tenga varios detalles
+    del producto, así que las ventas de compras distintas se pueden sumar y restar.
+    """
+    from .compra import Compra
+    from .detalle_compra import DetalleCompra
+
+    compras, detalles = Compra.__table__, DetalleCompra.__table__
+    compra_ids = list(compra_ids)
+    ventas: Ventas = {}
+    compras_por_clave: Dict[Tuple[uuid.UUID, date], Set[uuid.UUID]] = {}
+    for inicio in range(0, len(compra_ids), _TAMANO_LOTE_COMPRAS):
+        filas = conn.execute(
+            select(detalles.c.producto_id, compras.c.id, compras.c.fecha, detalles.c.cantidad_compra,
+                   detalles.c.precio_unitario_centavos)
+            .select_from(detalles.join(compras, compras.c.id == detalles.c.compra_id))
+            .where(
+                compras.c.id.in_(compra_ids[inicio:inicio + _TAMANO_LOTE_COMPRAS]),
+                compras.c.status == EstadoCompraEnum.COMPLETADA,
+            )
+        )
+        for producto_id, compra_id, fecha, cantidad, precio_unitario in filas:
+            clave = (producto_id, fecha.date())
+            venta = ventas.setdefault(clave, [0, Decimal(0), 0])
+            venta[0] += cantidad
+            venta[1] += cantidad * precio_unitario
+            compras_por_clave.setdefault(clave, set()).add(compra_id)
+    for clave, ids in compras_por_clave.items():
+        ventas[clave][2] = len(ids)
+    return ventas
+
+
+def _compras_escritas(objetos: Iterable) -> Set[uuid.UUID]:
+    """Compras cuyas ventas pueden cambiar con los objetos del flush (y la anterior, si un detalle cambió de compra)."""
+    from .compra import Compra
+    from .detalle_compra import DetalleCompra
+
+    compra_ids: Set[uuid.UUID] = set()
+    for obj in objetos:
+        if isinstance(obj, Compra):
+            compra_ids.add(obj.id)
+        elif isinstance(obj, DetalleCompra):
+            compra = obj.__dict__.get("compra")
+            compra_ids.add(compra.id if compra is not None else obj.compra_id)
+            compra_ids.update(attributes.get_history(obj, "compra_id").deleted or ())
+    compra_ids.discard(None)
+    return compra_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _leer_ventas_antes(session: Session, flush_context, instances) -> None:
+    """
+    Lee las ventas de las compras escritas antes del flush, mientras la base de
+    datos tiene su estado anterior (y los detalles que borra en cascada con la
+    compra todavía existen). Incluye las compras de los detalles nuevos: pueden
+    agregarse a una compra que ya tenía ventas.
+    """
+    # Lectura de un flush anterior que falló antes de after_flush
+    session.info.pop(_CLAVE_ANTES, None)
+    with session.no_autoflush:
+        compra_ids = _compras_escritas(list(session.new) + list(session.dirty) + list(session.deleted))
+        if compra_ids:
+            session.info[_CLAVE_ANTES] = (compra_ids, _ventas_de_compras(session.connection(), compra_ids))
+
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_ventas_productos(session: Session, flush_context) -> None:
+    """
+    Suma en la misma transacción la diferencia entre las ventas de las compras
+    escritas después y antes del flush.
+
+    Las altas se leen después del flush, cuando ya tienen ids y fecha por defecto
+    (session.new/dirty y el historial siguen con el estado previo).
+    """
+    compra_ids, antes = session.info.pop(_CLAVE_ANTES, (set(), {}))
+    with session.no_autoflush:
+        compra_ids = compra_ids | _compras_escritas(list(session.new) + list(session.dirty))
+        if not compra_ids:
+            return
+        despues = _ventas_de_compras(session.connection(), compra_ids)
+
+    deltas: Ventas = {}
+    for clave in antes.keys() | despues.keys():
+        anterior = antes.get(clave, [0, Decimal(0), 0])
+        nueva = despues.get(clave, [0, Decimal(0), 0])
+        delta = [nueva[0] - anterior[0], nueva[1] - anterior[1], nueva[2] - anterior[2]]
+        if any(delta):
+            deltas[clave] = delta
+    ProductoVentasDiarias.sumar(session.connection(), deltas)
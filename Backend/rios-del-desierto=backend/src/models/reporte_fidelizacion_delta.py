@@ -0,0 +1,42 @@
+# src/models/reporte_fidelizacion_delta.py
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.extensions import db
+from .tipos import Dinero
+
+
+class FidelizacionMarca(db.Model):
+    """
+    Marca de agua del reporte de fidelización incremental
+    (src/services/reporte_fidelizacion_delta.py). Una sola fila (id 1): hasta qué
+    cambio del feed (cursor de la tabla cambios) y desde qué fecha de inicio de la
+    ventana de 30 días se calculó la última generación.
+    """
+    __tablename__ = "fidelizacion_marca"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cursor_cambios: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    fecha_limite: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    monto_minimo: Mapped[Decimal] = mapped_column("monto_minimo_centavos", Dinero, nullable=False)
+    generado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class FidelizacionCliente(db.Model):
+    """
+    Total de compras de la ventana y elegibilidad de cada cliente según la última
+    generación del reporte incremental (solo clientes con compras en la ventana).
+
+    Sin FK a clientes: si el cliente se borra, la fila queda hasta la siguiente
+    generación, que lo informa como baja.
+    """
+    __tablename__ = "fidelizacion_clientes"
+
+    cliente_id: Mapped[uuid.UUID] = mapped_column(db.Uuid, primary_key=True)
+    total: Mapped[Decimal] = mapped_column("total_centavos", Dinero, nullable=False)
+    es_fidelizado: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,56 @@
+# src/models/restricciones.py
+"""
+Identificación de la restricción única violada en un IntegrityError.
+
+PostgreSQL y MySQL informan el nombre de la restricción; SQLite solo informa las
+columnas ("UNIQUE constraint failed: tabla.col1, tabla.col2"), así que cada
+restricción se registra con ambos.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+# Nombre de la restricción -> columnas tal como las reporta SQLite
+RESTRICCIONES_UNICAS = {
+    "ix_clientes_correo_electronico": "clientes.correo_electronico",
+    "uq_doc_tipo_numero": "documentos.tipo_documento, documentos.numero_documento",
+    "uq_doc_tipo_numero_normalizado": "documentos.tipo_documento, documentos.numero_documento_normalizado",
+}
+
+_POR_COLUMNAS = {columnas: nombre for nombre, columnas in RESTRICCIONES_UNICAS.items()}
+
+_SQLITE_RE = re.compile(r"UNIQUE constraint failed: (.+)$", re.MULTILINE)
+_MYSQL_RE = re.compile(r"for key '(?:[^.']+\.)?([^']+)'")
+
+
+def restriccion_violada(error: IntegrityError) -> Optional[str]:
+    """
+    Obtiene el nombre de la restricción única que produjo el error.
+
+    Args:
+        error: Excepción lanzada por el flush/commit
+
+    Returns:
+        Nombre de la restricción (clave de RESTRICCIONES_UNICAS), o None si el error
+        no corresponde a una restricción única conocida
+    """
+    original = error.orig
+
+    # psycopg2 / psycopg 3
+    diagnostico = getattr(original, "diag", None)
+    nombre = getattr(diagnostico, "constraint_name", None)
+    if nombre:
+        return nombre if nombre in RESTRICCIONES_UNICAS else None
+
+    mensaje = str(original)
+
+    coincidencia = _SQLITE_RE.search(mensaje)
+    if coincidencia:
+        return _POR_COLUMNAS.get(coincidencia.group(1).strip())
+
+    coincidencia = _MYSQL_RE.search(mensaje)
+    if coincidencia and coincidencia.group(1) in RESTRICCIONES_UNICAS:
+        return coincidencia.group(1)
+
+    return None
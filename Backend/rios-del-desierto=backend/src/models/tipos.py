@@ -0,0 +1,28 @@
+# src/models/tipos.py
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class Dinero(TypeDecorator):
+    """
+    Monto en COP almacenado como entero de centavos (BigInteger).
+
+    En Python se expone como Decimal con 2 decimales. Las sumas (func.sum) y
+    comparaciones (monto_total > 5_000_000) se hacen sobre enteros en la base
+    de datos, sin error de redondeo de Float.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        centavos = (Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP)
+        return int(centavos)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-2)
@@ -0,0 +1,104 @@
+# src/services/archivo.py
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import select, insert, delete
+
+from src.extensions import db
+from src.models.compra import Compra
+from src.models.detalle_compra import DetalleCompra
+from src.models.archivo import CompraArchivo, DetalleCompraArchivo
+
+# Las consultas de fidelización miran los últimos 30 días: el horizonte de archivo
+# nunca puede ser menor, o esas consultas perderían compras.
+VENTANA_MINIMA_DIAS = 30
+
+
+def _columnas(tabla):
+    return [columna.name for columna in tabla.c]
+
+
+def archivar_compras(
+    horizonte_dias: int = 365,
+    tamano_lote: int = 1000,
+    pausa_segundos: float = 0.0,
+) -> Dict[str, int]:
+    """
+    Mueve por lotes las compras (y sus detalles) anteriores al horizonte a las
+    tablas de archivo. Cada lote es una transacción corta, por lo que puede
+    ejecutarse con la API en línea y reanudarse si se interrumpe.
+
+    Args:
+        horizonte_dias: Antigüedad (en días) a partir de la cual una compra se archiva
+        tamano_lote: Número de compras movidas por transacción
+        pausa_segundos: Pausa entre lotes para no saturar la base de datos
+
+    Returns:
+        Diccionario con el número de compras y detalles archivados
+
+    Raises:
+        ValueError: Si el horizonte es menor que la ventana de fidelización
+    """
+    if horizonte_dias < VENTANA_MINIMA_DIAS:
+        raise ValueError(f"El horizonte de archivo debe ser de al menos {VENTANA_MINIMA_DIAS} días")
+
+    fecha_limite = datetime.utcnow() - timedelta(days=horizonte_dias)
+    compras = Compra.__table__
+    detalles = DetalleCompra.__table__
+    columnas_compra = _columnas(CompraArchivo.__table__)
+    columnas_detalle = _columnas(DetalleCompraArchivo.__table__)
+
+    total_compras = 0
+    total_detalles = 0
+    # Keyset por fecha (índice ix_compras_fecha): cada lote empieza donde terminó el
+    # anterior, sin volver a recorrer las entradas de las compras ya borradas
+    desde = None
+
+    while True:
+        stmt = (
+            select(compras.c.id, compras.c.fecha)
+            .where(compras.c.fecha < fecha_limite)
+            .order_by(compras.c.fecha)
+            .limit(tamano_lote)
+        )
+        if desde is not None:
+            stmt = stmt.where(compras.c.fecha >= desde)
+        filas = db.session.execute(stmt).all()
+        if not filas:
+            break
+        ids = [fila.id for fila in filas]
+        desde = filas[-1].fecha
+
+        try:
+            db.session.execute(
+                insert(CompraArchivo.__table__).from_select(
+                    columnas_compra,
+                    select(*[compras.c[nombre] for nombre in columnas_compra]).where(compras.c.id.in_(ids)),
+                )
+            )
+            resultado = db.session.execute(
+                insert(DetalleCompraArchivo.__table__).from_select(
+                    columnas_detalle,
+                    select(*[detalles.c[nombre] for nombre in columnas_detalle]).where(
+                        detalles.c.compra_id.in_(ids)
+                    ),
+                )
+            )
+            total_detalles += resultado.rowcount or 0
+
+            # Se borran los detalles explícitamente: SQLite no aplica ON DELETE CASCADE
+            # si no está activo PRAGMA foreign_keys.
+            db.session.execute(delete(detalles).where(detalles.c.compra_id.in_(ids)))
+            db.session.execute(delete(compras).where(compras.c.id.in_(ids)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        total_compras += len(ids)
+
+        if pausa_segundos:
+            time.sleep(pausa_segundos)
+
+    return {"compras": total_compras, "detalles": total_detalles}
@@ -0,0 +1,260 @@
+# src/services/artefactos_reporte.py
+"""
+Archivos de reporte generados, guardados en disco con el hash de su contenido.
+
+Cada reporte generado se escribe en REPORTES_ARTEFACTOS_DIR como
+`<sha256 del contenido>.<extensión>`. Junto a él, un índice por parámetros
+(`parametros-<hash de los parámetros>.json`) apunta al último archivo generado
+con esos parámetros, y `<nombre>.json` guarda el tipo de reporte del archivo
+(prefijo del nombre de descarga). Así:
+
+    - Las descargas con los mismos parámetros reutilizan el archivo mientras tenga
+      menos de REPORTES_ARTEFACTOS_FRESCURA_SEGUNDOS, también entre workers.
+    - El archivo se sirve desde disco (send_file: Range/206, If-Range, ETag y
+      wsgi.file_wrapper, que con gunicorn usa sendfile sin copiar a Python) y se
+      puede reanudar en /reportes/artefactos/<nombre> mientras no supere
+      REPORTES_ARTEFACTOS_RETENCION_SEGUNDOS, aunque ya exista uno más nuevo.
+
+Los archivos y los índices se escriben en un temporal y se publican con
+os.replace: un lector nunca ve un archivo a medio escribir. Con `guardar_desde`
+el generador escribe el reporte directamente en ese temporal, sin tenerlo
+completo en memoria.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Hashable, NamedTuple, Optional
+
+from flask import Flask, current_app
+
+_NOMBRE_ARTEFACTO = re.compile(r"^[0-9a-f]{64}\.(xlsx|zip|csv)$")
+_NOMBRE_METADATOS = re.compile(r"^[0-9a-f]{64}\.(xlsx|zip|csv)\.json$")
+
+MIMETYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+    "csv": "text/csv",
+}
+
+
+class Artefacto(NamedTuple):
+    nombre: str
+    ruta: Path
+    hash: str
+    extension: str
+    creado: float
+    tamano: int
+    # Tipo de reporte con el que se guardó (None en archivos sin metadatos)
+    tipo: Optional[str] = None
+
+    @property
+    def mimetype(self) -> str:
+        return MIMETYPES[self.extension]
+
+
+def _escribir_atomico(destino: Path, contenido: bytes) -> None:
+    descriptor, temporal = tempfile.mkstemp(dir=destino.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, destino)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+class AlmacenArtefactos:
+    """
+    Artefactos de reporte de un directorio.
+
+    Args:
+        directorio: Directorio de los archivos (se crea si no existe)
+        frescura_segundos: Vida de un artefacto para reutilizarlo con los mismos parámetros
+        retencion_segundos: Vida de un archivo en disco (reanudación de descargas)
+    """
+
+    def __init__(self, directorio, frescura_segundos: float = 300, retencion_segundos: float = 3600):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.frescura_segundos = frescura_segundos
+        self.retencion_segundos = max(retencion_segundos, frescura_segundos)
+        self._candado = threading.Lock()
+        self.reutilizados = 0
+        self.generados = 0
+
+    def _ruta_indice(self, parametros: Hashable) -> Path:
+        clave = hashlib.sha256(repr(parametros).encode("utf-8")).hexdigest()[:32]
+        return self.directorio / f"parametros-{clave}.json"
+
+    def obtener(self, nombre: str) -> Optional[Artefacto]:
+        """
+        Artefacto por nombre de archivo (`<sha256>.<extensión>`), o None si el nombre
+        no es válido, no existe o ya superó la retención.
+        """
+        if not _NOMBRE_ARTEFACTO.match(nombre):
+            return None
+        ruta = self.directorio / nombre
+        try:
+            estado = ruta.stat()
+        except FileNotFoundError:
+            return None
+        if time.time() - estado.st_mtime > self.retencion_segundos:
+            return None
+        try:
+            tipo = json.loads(ruta.with_name(f"{nombre}.json").read_text(encoding="utf-8"))["tipo"]
+        except (FileNotFoundError, ValueError, KeyError):
+            tipo = None
+        hash_contenido, extension = nombre.split(".")
+        return Artefacto(nombre, ruta, hash_contenido, extension, estado.st_mtime, estado.st_size, tipo)
+
+    def vigente(self, parametros: Hashable) -> Optional[Artefacto]:
+        """Último artefacto generado con estos parámetros si aún está fresco."""
+        try:
+            indice = json.loads(self._ruta_indice(parametros).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if time.time() - indice["creado"] > self.frescura_segundos:
+            return None
+        artefacto = self.obtener(indice["nombre"])
+        if artefacto is not None:
+            self.reutilizados += 1
+            artefacto = artefacto._replace(creado=indice["creado"])
+        return artefacto
+
+    def guardar(
+        self, parametros: Hashable, contenido: bytes, extension: str, tipo: Optional[str] = None
+    ) -> Artefacto:
+        """
+        Guarda el contenido de un reporte recién generado con estos parámetros.
+
+        Args:
+            parametros: Parámetros del reporte (clave del índice)
+            contenido: Bytes del archivo
+            extension: Extensión del archivo
+            tipo: Tipo de reporte (se guarda con el archivo, ver Artefacto.tipo)
+
+        Returns:
+            Artefacto guardado
+        """
+        hash_contenido = hashlib.sha256(contenido).hexdigest()
+        return self._publicar(
+            parametros, hash_contenido, extension, len(contenido), tipo,
+            lambda ruta: _escribir_atomico(ruta, contenido),
+        )
+
+    def guardar_desde(
+        self, parametros: Hashable, extension: str, escribir: Callable[[BinaryIO], bool],
+        tipo: Optional[str] = None,
+    ) -> Optional[Artefacto]:
+        """
+        Como guardar, pero `escribir` escribe el reporte directamente en un archivo
+        temporal del directorio (el contenido nunca está completo en memoria).
+
+        Args:
+            parametros: Parámetros del reporte (clave del índice)
+            extension: Extensión del archivo
+            escribir: Función que escribe el reporte en el archivo recibido; devuelve
+                False si no hay nada que guardar
+            tipo: Tipo de reporte (se guarda con el archivo, ver Artefacto.tipo)
+
+        Returns:
+            Artefacto guardado, o None si `escribir` devolvió False
+        """
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix=".tmp-")
+        try:
+            with os.fdopen(descriptor, "w+b") as archivo:
+                if not escribir(archivo):
+                    return None
+                archivo.flush()
+                os.fsync(archivo.fileno())
+                archivo.seek(0)
+                hash_contenido = hashlib.file_digest(archivo, "sha256").hexdigest()
+                tamano = archivo.tell()
+            return self._publicar(
+                parametros, hash_contenido, extension, tamano, tipo,
+                lambda ruta: os.replace(temporal, ruta),
+            )
+        finally:
+            # Sin contenido, con error o con el mismo contenido ya guardado, el temporal sobra
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+
+    def _publicar(
+        self, parametros: Hashable, hash_contenido: str, extension: str, tamano: int,
+        tipo: Optional[str], escribir: Callable[[Path], None],
+    ) -> Artefacto:
+        """Escribe el archivo si no existe (o renueva su retención), sus metadatos y el índice."""
+        nombre = f"{hash_contenido}.{extension}"
+        ruta = self.directorio / nombre
+        creado = time.time()
+
+        with self._candado:
+            self._purgar(creado)
+            if ruta.exists():
+                # Mismo contenido ya guardado: se renueva su retención
+                os.utime(ruta, (creado, creado))
+            else:
+                escribir(ruta)
+            if tipo is not None:
+                _escribir_atomico(ruta.with_name(f"{nombre}.json"), json.dumps({"tipo": tipo}).encode("utf-8"))
+            indice = json.dumps({"nombre": nombre, "creado": creado, "parametros": repr(parametros)})
+            _escribir_atomico(self._ruta_indice(parametros), indice.encode("utf-8"))
+            self.generados += 1
+
+        return Artefacto(nombre, ruta, hash_contenido, extension, creado, tamano, tipo)
+
+    def _purgar(self, ahora: float) -> None:
+        """Borra los archivos (con sus metadatos e índices) que superaron la retención."""
+        for ruta in self.directorio.iterdir():
+            nombre = ruta.name
+            if not (nombre.startswith("parametros-") or _NOMBRE_ARTEFACTO.match(nombre)
+                    or _NOMBRE_METADATOS.match(nombre)):
+                continue
+            try:
+                if ahora - ruta.stat().st_mtime > self.retencion_segundos:
+                    ruta.unlink()
+            except FileNotFoundError:
+                pass
+
+    def metricas(self) -> Dict:
+        archivos = [ruta for ruta in self.directorio.iterdir() if _NOMBRE_ARTEFACTO.match(ruta.name)]
+        return {
+            "archivos": len(archivos),
+            "bytes": sum(ruta.stat().st_size for ruta in archivos),
+            "frescuraSegundos": self.frescura_segundos,
+            "retencionSegundos": self.retencion_segundos,
+            "generados": self.generados,
+            "reutilizados": self.reutilizados,
+        }
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def almacen() -> Optional[AlmacenArtefactos]:
+    return current_app.extensions.get("artefactos_reporte")
+
+
+def metricas() -> Dict:
+    actual = almacen()
+    if actual is None:
+        return {"habilitado": False}
+    return {"habilitado": True, **actual.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """Crea el almacén de artefactos si REPORTES_ARTEFACTOS_HABILITADO."""
+    if not app.config.get("REPORTES_ARTEFACTOS_HABILITADO", True):
+        return
+    app.extensions["artefactos_reporte"] = AlmacenArtefactos(
+        app.config["REPORTES_ARTEFACTOS_DIR"],
+        frescura_segundos=app.config["REPORTES_ARTEFACTOS_FRESCURA_SEGUNDOS"],
+        retencion_segundos=app.config["REPORTES_ARTEFACTOS_RETENCION_SEGUNDOS"],
+    )
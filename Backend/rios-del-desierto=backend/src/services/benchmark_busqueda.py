@@ -0,0 +1,214 @@
+# src/services/benchmark_busqueda.py
+"""
+Benchmark de la búsqueda de texto de clientes (flask benchmark-busqueda).
+
+Crea en una base SQLite aparte (nunca la de la app) copias de `clientes` y
+`documentos` con el índice FTS5 y los triggers de models/busqueda.py, y carga N
+clientes sintéticos (5 millones por defecto) con documentos de los tres tipos y en
+varios formatos ("900.123.456-7", "9001234567", "AB-123456"). Si la base ya tiene
+esa cantidad de clientes se reutiliza sin recargar.
+
+Después ejecuta consultas de cada tipo (prefijo de nombre, nombre y apellido,
+prefijo de correo, documento con formato, documento normalizado y texto sin
+coincidencias) con las mismas dos consultas de Cliente.buscar_por_texto: el
+ranking bm25 (busqueda.puntajes_fts) y la lectura de los clientes con su
+documento. Informa la latencia p50/p99/máxima por tipo y total frente al objetivo
+de p99 (20 ms).
+"""
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from src.models.busqueda import SQLITE_DDL_CLIENTES, SQLITE_DDL_DOCUMENTOS, puntajes_fts
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.models.ids import uuid7
+
+OBJETIVO_P99_MS = 20.0
+
+_LOTE_CARGA = 50_000
+
+_NOMBRES = [
+    "Juan", "María", "Carlos", "Ana", "Luis", "Sofía", "Andrés", "Camila", "Jorge", "Valentina",
+    "Pedro", "Daniela", "Santiago", "Laura", "Felipe", "Paula", "Diego", "Natalia", "Miguel", "Carolina",
+    "Alejandro", "Isabel", "Sebastián", "Juliana", "Ricardo", "Mónica", "Fernando", "Lucía", "Óscar", "Gabriela",
+]
+_APELLIDOS = [
+    "Gómez", "Rodríguez", "Martínez", "López", "García", "Hernández", "Pérez", "Sánchez", "Ramírez", "Torres",
+    "Díaz", "Vargas", "Moreno", "Rojas", "Jiménez", "Castro", "Ortiz", "Ruiz", "Álvarez", "Romero",
+    "Suárez", "Herrera", "Medina", "Aguilar", "Castillo", "Mejía", "Restrepo", "Cárdenas", "Osorio", "Zapata",
+]
+
+_DDL_TABLAS = [
+    """
+    CREATE TABLE IF NOT EXISTS clientes (
+        id CHAR(32) NOT NULL PRIMARY KEY,
+        nombre VARCHAR(80) NOT NULL,
+        apellido VARCHAR(80) NOT NULL,
+        correo_electronico VARCHAR(120) NOT NULL UNIQUE,
+        telefono_celular VARCHAR(30) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS documentos (
+        id CHAR(32) NOT NULL PRIMARY KEY,
+        numero_documento VARCHAR(40) NOT NULL,
+        numero_documento_normalizado VARCHAR(40),
+        tipo_documento VARCHAR(9) NOT NULL,
+        cliente_id CHAR(32) NOT NULL UNIQUE
+    )
+    """,
+]
+
+_CLIENTES_POR_ID = """
+    SELECT c.id, c.nombre, c.apellido, c.correo_electronico, c.telefono_celular,
+           d.tipo_documento, d.numero_documento
+    FROM clientes c LEFT JOIN documentos d ON d.cliente_id = c.id
+    WHERE c.id IN ({marcadores})
+"""
+
+
+def _documento(numero: int) -> Tuple[TipoDocumentoEnum, str]:
+    """Documento sintético del cliente `numero`, con el formato variando entre clientes."""
+    if numero % 10 < 6:
+        cedula = str(10_000_000 + numero)
+        return TipoDocumentoEnum.CEDULA, f"{int(cedula):,}".replace(",", ".") if numero % 2 else cedula
+    if numero % 10 < 9:
+        nit = str(800_000_000 + numero)
+        return TipoDocumentoEnum.NIT, f"{nit}-{numero % 10}" if numero % 2 else f"{nit}{numero % 10}"
+    return TipoDocumentoEnum.PASAPORTE, f"{chr(65 + numero % 26)}{chr(65 + numero // 26 % 26)}-{numero:07d}"
+
+
+def _cargar(engine, clientes: int, al_cargar: Optional[Callable[[int], None]]) -> None:
+    with engine.begin() as conn:
+        for sentencia in _DDL_TABLAS + SQLITE_DDL_CLIENTES + SQLITE_DDL_DOCUMENTOS:
+            conn.exec_driver_sql(sentencia)
+
+    cargados = 0
+    while cargados < clientes:
+        filas_clientes, filas_documentos = [], []
+        for numero in range(cargados, min(cargados + _LOTE_CARGA, clientes)):
+            cliente_id = uuid7().hex
+            nombre, apellido = random.choice(_NOMBRES), random.choice(_APELLIDOS)
+            tipo, documento = _documento(numero)
+            filas_clientes.append((cliente_id, nombre, apellido, f"cliente{numero}@example.com", f"300{numero:07d}"))
+            filas_documentos.append((uuid7().hex, documento, normalizar_numero_documento(tipo, documento),
+                                     tipo.value, cliente_id))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO clientes (id, nombre, apellido, correo_electronico, telefono_celular) "
+                "VALUES (?, ?, ?, ?, ?)",
+                filas_clientes,
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO documentos (id, numero_documento, numero_documento_normalizado, tipo_documento, "
+                "cliente_id) VALUES (?, ?, ?, ?, ?)",
+                filas_documentos,
+            )
+        cargados += len(filas_clientes)
+        if al_cargar is not None:
+            al_cargar(cargados)
+
+
+def _consultas(clientes: int, por_tipo: int) -> Dict[str, List[str]]:
+    """Textos de búsqueda por tipo de consulta."""
+    numeros = [random.randrange(clientes) for _ in range(por_tipo)]
+    documentos = [_documento(numero) for numero in numeros]
+    return {
+        "prefijoNombre": [random.choice(_NOMBRES)[:3] for _ in range(por_tipo)],
+        "nombreApellido": [f"{random.choice(_NOMBRES)} {random.choice(_APELLIDOS)[:4]}" for _ in range(por_tipo)],
+        "prefijoCorreo": [f"cliente{numero}@" for numero in numeros],
+        "documentoConFormato": [documento for _, documento in documentos],
+        "documentoNormalizado": [normalizar_numero_documento(tipo, documento) for tipo, documento in documentos],
+        "sinCoincidencias": [f"zq{random.randrange(10**6)}x" for _ in range(por_tipo)],
+    }
+
+
+def _latencias(latencias: List[float]) -> Dict:
+    latencias = sorted(latencias)
+    return {
+        "p50": statistics.median(latencias),
+        "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+        "max": latencias[-1],
+    }
+
+
+def benchmark_busqueda(
+    url: str,
+    clientes: int = 5_000_000,
+    consultas_por_tipo: int = 200,
+    limite: int = 20,
+    cache_mb: int = 256,
+    al_cargar: Optional[Callable[[int], None]] = None,
+) -> Dict:
+    """
+    Ejecuta el benchmark sobre la base SQLite de `url`.
+
+    Args:
+        url: URL SQLAlchemy de la base de datos del benchmark (SQLite)
+        clientes: Clientes sintéticos
+        consultas_por_tipo: Consultas medidas por tipo de consulta
+        limite: Resultados por consulta (como el parámetro `limite` de la API)
+        cache_mb: Caché de páginas de SQLite (MB)
+        al_cargar: Función llamada con los clientes insertados durante la carga
+
+    Returns:
+        Diccionario con los clientes, si se recargaron, el objetivo de p99 y, por
+        tipo de consulta y en total, latencia p50/p99/max (ms) y resultados promedio
+    """
+    engine = create_engine(url)
+    if engine.dialect.name != "sqlite":
+        raise ValueError("El benchmark de búsqueda usa el índice FTS5 de SQLite")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(conexion, _):
+        conexion.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+
+    with engine.connect() as conn:
+        existe = conn.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'clientes'"
+        ).scalar()
+        existentes = conn.exec_driver_sql("SELECT count(*) FROM clientes").scalar() if existe else 0
+    recargada = existentes != clientes
+    if recargada:
+        with engine.begin() as conn:
+            for tabla in ("clientes_fts", "clientes_fts_claves", "documentos", "clientes"):
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {tabla}")
+        _cargar(engine, clientes, al_cargar)
+
+    resultados: Dict[str, Dict] = {}
+    todas: List[float] = []
+    with Session(engine) as session:
+        for tipo, textos in _consultas(clientes, consultas_por_tipo).items():
+            latencias, encontrados = [], 0
+            for texto in textos:
+                inicio = time.perf_counter()
+                ids = [cliente_id for cliente_id, _ in puntajes_fts(session, texto, limite)]
+                if ids:
+                    marcadores = ", ".join(f":id{posicion}" for posicion in range(len(ids)))
+                    session.execute(
+                        text(_CLIENTES_POR_ID.format(marcadores=marcadores)),
+                        {f"id{posicion}": cliente_id.hex for posicion, cliente_id in enumerate(ids)},
+                    ).all()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                encontrados += len(ids)
+            todas.extend(latencias)
+            resultados[tipo] = {
+                "latenciaMs": _latencias(latencias),
+                "resultadosPromedio": encontrados / len(textos),
+            }
+    engine.dispose()
+
+    total = _latencias(todas)
+    return {
+        "clientes": clientes,
+        "recargada": recargada,
+        "objetivoP99Ms": OBJETIVO_P99_MS,
+        "cumpleObjetivo": total["p99"] < OBJETIVO_P99_MS,
+        "total": {"latenciaMs": total},
+        "tipos": resultados,
+    }
@@ -0,0 +1,160 @@
+# src/services/benchmark_carga.py
+"""
+Prueba de carga HTTP de la búsqueda por documento (flask benchmark-carga).
+
+Abre `conexiones` conexiones TCP concurrentes (1000 por defecto) contra un servidor
+ya levantado (la API Flask o la asíncrona, ver asgi.py) y en cada una envía
+`solicitudes` GET /api/v1/clientes/buscar seguidos con keep-alive. Los documentos
+se reparten entre documentos registrados (leídos de la base de datos de la app) y
+una fracción de documentos inexistentes, que ejercitan el filtro de documentos.
+
+Cliente HTTP/1.1 mínimo sobre asyncio (sin dependencias): lee la línea de estado,
+las cabeceras y el cuerpo (Content-Length o chunked); si el servidor cierra la
+conexión (HTTP/1.0 o Connection: close) se reabre para la siguiente solicitud.
+
+Informa solicitudes por segundo, latencia p50/p99/máxima, códigos de estado y
+errores (conexiones rechazadas, timeouts).
+"""
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+async def _leer_respuesta(lector: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Lee una respuesta completa. Returns: (código de estado, True si el servidor cierra la conexión)."""
+    linea_estado = await lector.readline()
+    if not linea_estado:
+        raise ConnectionError("Conexión cerrada por el servidor")
+    version, estado = linea_estado.split(b" ", 2)[:2]
+
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    if cabeceras.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            tamano = int((await lector.readline()).split(b";")[0], 16)
+            await lector.readexactly(tamano + 2)
+            if tamano == 0:
+                break
+    elif "content-length" in cabeceras:
+        await lector.readexactly(int(cabeceras["content-length"]))
+
+    cierra = version == b"HTTP/1.0" or cabeceras.get("connection", "").lower() == "close"
+    return int(estado), cierra
+
+
+async def _conexion(host: str, puerto: int, peticiones: Sequence[bytes], timeout: float,
+                    latencias: List[float], estados: Counter, errores: Counter) -> None:
+    lector = escritor = None
+    for peticion in peticiones:
+        inicio = time.perf_counter()
+        try:
+            if escritor is None:
+                lector, escritor = await asyncio.wait_for(asyncio.open_connection(host, puerto), timeout)
+            escritor.write(peticion)
+            estado, cierra = await asyncio.wait_for(_leer_respuesta(lector), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as error:
+            errores[type(error).__name__] += 1
+            if escritor is not None:
+                escritor.close()
+            lector = escritor = None
+            continue
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        estados[estado] += 1
+        if cierra:
+            escritor.close()
+            lector = escritor = None
+    if escritor is not None:
+        escritor.close()
+
+
+def _peticion(host: str, ruta: str) -> bytes:
+    return (
+        f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: identity\r\n"
+        f"Connection: keep-alive\r\n\r\n"
+    ).encode("latin-1")
+
+
+async def _ejecutar(host: str, puerto: int, rutas: Sequence[str], conexiones: int, solicitudes: int,
+                    timeout: float) -> Dict:
+    latencias: List[float] = []
+    estados: Counter = Counter()
+    errores: Counter = Counter()
+    peticiones = [_peticion(host, ruta) for ruta in rutas]
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _conexion(host, puerto, [random.choice(peticiones) for _ in range(solicitudes)], timeout,
+                  latencias, estados, errores)
+        for _ in range(conexiones)
+    ))
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    resultado = {
+        "conexiones": conexiones,
+        "solicitudes": len(latencias),
+        "segundos": segundos,
+        "solicitudesPorSegundo": len(latencias) / segundos,
+        "estados": dict(estados),
+        "errores": dict(errores),
+    }
+    if latencias:
+        resultado["latenciaMs"] = {
+            "p50": statistics.median(latencias),
+            "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+            "max": latencias[-1],
+        }
+    return resultado
+
+
+def benchmark_carga(
+    url: str,
+    documentos: Sequence[Tuple[str, str]],
+    conexiones: int = 1000,
+    solicitudes: int = 5,
+    inexistentes: float = 0.2,
+    timeout: float = 30.0,
+) -> Dict:
+    """
+    Ejecuta la prueba de carga contra `url`.
+
+    Args:
+        url: URL base del servidor (p. ej. http://127.0.0.1:8001)
+        documentos: Pares (tipo, número) de documentos registrados
+        conexiones: Conexiones concurrentes
+        solicitudes: Solicitudes por conexión (keep-alive)
+        inexistentes: Fracción de rutas con documentos que no existen (404)
+        timeout: Segundos máximos por conexión y por respuesta
+
+    Returns:
+        Diccionario con solicitudes completadas, solicitudes por segundo, latencia
+        p50/p99/max (ms), conteo por código de estado y errores por tipo
+    """
+    partes = urlsplit(url)
+    host, puerto = partes.hostname, partes.port or 80
+    base = partes.path.rstrip("/")
+
+    rutas = [
+        f"{base}/api/v1/clientes/buscar?" + urlencode({"tipo_documento": tipo, "numero_documento": numero})
+        for tipo, numero in documentos
+    ]
+    cantidad_inexistentes = round(len(rutas) * inexistentes / max(1 - inexistentes, 1e-9))
+    rutas += [
+        f"{base}/api/v1/clientes/buscar?"
+        + urlencode({"tipo_documento": "CEDULA", "numero_documento": str(random.randint(10**11, 10**12))})
+        for _ in range(cantidad_inexistentes)
+    ]
+    if not rutas:
+        raise ValueError("Se necesita al menos un documento")
+
+    return asyncio.run(_ejecutar(host, puerto, rutas, conexiones, solicitudes, timeout))
@@ -0,0 +1,159 @@
+# src/services/benchmark_consultas.py
+"""
+Benchmark de CPU por llamada de las consultas precompiladas (flask benchmark-consultas).
+
+Compara, sobre la base de la app (solo lecturas), cada consulta frecuente de
+models/consultas.py con su equivalente ORM, que vuelve a construir el
+`select(...)` en cada llamada y carga objetos en el identity map:
+
+    - documento: Cliente + documento por tipo y número (/clientes/buscar)
+    - totalesFidelizacion: total del último mes por cliente fidelizado
+
+Cada llamada se mide por separado con time.process_time (CPU del proceso) y
+time.perf_counter (latencia); la sesión se vacía entre llamadas ORM, como al
+terminar cada solicitud. Informa la CPU promedio por llamada (µs), la latencia
+p50/p99 (µs) y el ahorro de CPU de la variante Core.
+"""
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager
+
+from src.extensions import db
+from src.models import consultas
+from src.models.cliente import Cliente
+from src.models.compra import Compra
+from src.models.documento import Documento, normalizar_numero_documento
+from src.models.enums import EstadoCompraEnum
+
+_TOTALES_FIDELIZACION = select(*consultas.TOTALES_FIDELIZACION_SUBCONSULTA.c)
+
+
+def _documento_orm(tipo_documento, numero_documento):
+    """Búsqueda por documento con el ORM (la que usaba /clientes/buscar antes de consultas.cliente_por_documento)."""
+    stmt = (
+        select(Cliente)
+        .join(Documento, Documento.cliente_id == Cliente.id)
+        .options(contains_eager(Cliente.documento))
+        .where(
+            Documento.tipo_documento == tipo_documento,
+            Documento.numero_documento_normalizado == normalizar_numero_documento(
+                tipo_documento, numero_documento
+            ),
+        )
+    )
+    cliente = db.session.scalars(stmt).first()
+    return cliente.id if cliente else None
+
+
+def _documento_core(tipo_documento, numero_documento):
+    fila = consultas.cliente_por_documento(tipo_documento, numero_documento)
+    return fila.id if fila else None
+
+
+def _totales_orm(monto_minimo):
+    parametros = consultas.parametros_fidelizacion(monto_minimo)
+    stmt = (
+        select(Compra.cliente_id, func.sum(Compra.monto_total))
+        .where(
+            Compra.fecha >= parametros["fecha_limite"],
+            Compra.status == EstadoCompraEnum.COMPLETADA,
+        )
+        .group_by(Compra.cliente_id)
+        .having(func.sum(Compra.monto_total) > monto_minimo)
+    )
+    return sorted(cliente_id for cliente_id, _ in db.session.execute(stmt))
+
+
+def _totales_core(monto_minimo):
+    filas = db.session.connection().execute(
+        _TOTALES_FIDELIZACION, consultas.parametros_fidelizacion(monto_minimo)
+    )
+    return sorted(cliente_id for cliente_id, _ in filas)
+
+
+def _medir(funcion: Callable, argumentos: List[tuple], repeticiones: int, vaciar: bool) -> Dict:
+    for args in argumentos:
+        funcion(*args)
+    if vaciar:
+        db.session.expunge_all()
+
+    cpu: List[float] = []
+    latencias: List[float] = []
+    for _ in range(repeticiones):
+        for args in argumentos:
+            inicio_cpu, inicio = time.process_time(), time.perf_counter()
+            funcion(*args)
+            latencias.append((time.perf_counter() - inicio) * 1_000_000)
+            cpu.append((time.process_time() - inicio_cpu) * 1_000_000)
+            if vaciar:
+                db.session.expunge_all()
+
+    latencias.sort()
+    return {
+        "cpuUs": statistics.fmean(cpu),
+        "latenciaUs": {
+            "p50": statistics.median(latencias),
+            "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+        },
+    }
+
+
+def benchmark_consultas(
+    app: Flask,
+    documentos: int = 100,
+    repeticiones: int = 20,
+    monto_minimo: float = 5_000_000,
+) -> Optional[Dict]:
+    """
+    Ejecuta el benchmark con los primeros `documentos` documentos registrados.
+
+    Args:
+        app: Aplicación Flask (se usa su base de datos)
+        documentos: Documentos distintos consultados
+        repeticiones: Veces que se repite cada consulta
+        monto_minimo: Monto mínimo del agregado de fidelización
+
+    Returns:
+        Diccionario consulta -> {"orm", "core", "ahorroCpu"} con la CPU promedio
+        por llamada y la latencia p50/p99 (µs) de cada variante, o None si no hay
+        clientes
+
+    Raises:
+        RuntimeError: Si las dos variantes de una consulta no devuelven lo mismo
+    """
+    with app.app_context():
+        registrados = db.session.execute(
+            select(Documento.tipo_documento, Documento.numero_documento)
+            .order_by(Documento.id)
+            .limit(documentos)
+        ).all()
+        if not registrados:
+            return None
+
+        variantes = {
+            "documento": (_documento_orm, _documento_core, [tuple(fila) for fila in registrados], repeticiones),
+            # Una sola consulta agregada: se repite tantas veces como búsquedas por documento
+            "totalesFidelizacion": (_totales_orm, _totales_core, [(monto_minimo,)],
+                                    repeticiones * len(registrados)),
+        }
+
+        resultados: Dict[str, Dict] = {}
+        for nombre, (orm, core, argumentos, veces) in variantes.items():
+            for args in argumentos:
+                if orm(*args) != core(*args):
+                    raise RuntimeError(f"Las variantes ORM y Core de '{nombre}' no coinciden")
+            db.session.expunge_all()
+
+            medidas = {
+                "orm": _medir(orm, argumentos, veces, vaciar=True),
+                "core": _medir(core, argumentos, veces, vaciar=False),
+            }
+            medidas["ahorroCpu"] = 1 - medidas["core"]["cpuUs"] / medidas["orm"]["cpuUs"]
+            resultados[nombre] = medidas
+        db.session.remove()
+
+    return resultados
@@ -0,0 +1,209 @@
+# src/services/benchmark_creacion.py
+"""
+Benchmark de la creación concurrente de clientes duplicados (flask benchmark-creacion).
+
+Recrea en una base aparte (nunca la de la app) las tablas `clientes` y `documentos`
+del modelo, con sus restricciones únicas y los triggers del índice de búsqueda, y
+envía `solicitudes` creaciones desde `hilos` hilos, cada uno con su conexión. Una
+fracción `duplicados` de las solicitudes repite el correo o el documento de otra
+(con otro formato del mismo número), así que solicitudes concurrentes compiten por
+el mismo cliente.
+
+Se ejecutan las dos estrategias de POST /clientes, cada una sobre tablas vacías:
+
+    - antes: SELECT del correo y del documento y, si no existen, los dos INSERT
+    - despues: solo los dos INSERT; el duplicado lo detecta la restricción única
+      (restricciones.restriccion_violada), como crear_cliente
+
+Informa creaciones por segundo, latencia p50/p99/máxima y el resultado de cada
+solicitud: creado (201), duplicado detectado (409), IntegrityError no previsto por
+la estrategia (la carrera entre el SELECT y el INSERT: 500 en la API) y bloqueos
+de la base. Verifica al final que los clientes guardados son los creados.
+"""
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from src.models.cliente import Cliente
+from src.models.documento import Documento, normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.models.restricciones import restriccion_violada
+
+_clientes = Cliente.__table__
+_documentos = Documento.__table__
+
+ESTRATEGIAS = ("antes", "despues")
+
+
+def _solicitudes(solicitudes: int, duplicados: float) -> List[Dict]:
+    """Cuerpos de las solicitudes; los duplicados repiten el correo o el documento de uno anterior."""
+    cuerpos: List[Dict] = []
+    for numero in range(solicitudes):
+        cuerpo = {
+            "nombre": "Cliente",
+            "apellido": f"Benchmark {numero}",
+            "correo_electronico": f"cliente{numero}@example.com",
+            "telefono_celular": f"300{numero:07d}",
+            "numero_documento": str(10_000_000 + numero),
+        }
+        if cuerpos and random.random() < duplicados:
+            original = random.choice(cuerpos)
+            if random.random() < 0.5:
+                cuerpo["correo_electronico"] = original["correo_electronico"]
+            else:
+                # Mismo número con otro formato: lo detecta uq_doc_tipo_numero_normalizado
+                numero_original = int(original["numero_documento"].replace(".", ""))
+                cuerpo["numero_documento"] = f"{numero_original:,}".replace(",", ".")
+        cuerpos.append(cuerpo)
+    random.shuffle(cuerpos)
+    return cuerpos
+
+
+def _insertar(conn, cuerpo: Dict) -> None:
+    cliente_id = conn.execute(
+        insert(_clientes).values(
+            nombre=cuerpo["nombre"],
+            apellido=cuerpo["apellido"],
+            correo_electronico=cuerpo["correo_electronico"],
+            telefono_celular=cuerpo["telefono_celular"],
+        )
+    ).inserted_primary_key[0]
+    conn.execute(
+        insert(_documentos).values(
+            tipo_documento=TipoDocumentoEnum.CEDULA,
+            numero_documento=cuerpo["numero_documento"],
+            numero_documento_normalizado=normalizar_numero_documento(
+                TipoDocumentoEnum.CEDULA, cuerpo["numero_documento"]
+            ),
+            cliente_id=cliente_id,
+        )
+    )
+
+
+def _crear_antes(conn, cuerpo: Dict) -> str:
+    """SELECT previos del correo y del documento; un IntegrityError es una carrera perdida."""
+    with conn.begin():
+        existe_correo = conn.execute(
+            select(_clientes.c.id).where(_clientes.c.correo_electronico == cuerpo["correo_electronico"]).limit(1)
+        ).first()
+        if existe_correo:
+            return "duplicado"
+        existe_documento = conn.execute(
+            select(_documentos.c.id).where(
+                _documentos.c.tipo_documento == TipoDocumentoEnum.CEDULA,
+                _documentos.c.numero_documento_normalizado == normalizar_numero_documento(
+                    TipoDocumentoEnum.CEDULA, cuerpo["numero_documento"]
+                ),
+            ).limit(1)
+        ).first()
+        if existe_documento:
+            return "duplicado"
+        _insertar(conn, cuerpo)
+    return "creado"
+
+
+def _crear_despues(conn, cuerpo: Dict) -> str:
+    """Solo los INSERT; el duplicado se reconoce por la restricción violada."""
+    try:
+        with conn.begin():
+            _insertar(conn, cuerpo)
+    except IntegrityError as error:
+        if restriccion_violada(error) is None:
+            raise
+        return "duplicado"
+    return "creado"
+
+
+def _ejecutar(engine, estrategia: str, cuerpos: Sequence[Dict], hilos: int) -> Dict:
+    crear = _crear_antes if estrategia == "antes" else _crear_despues
+    resultados: Counter = Counter()
+    latencias: List[float] = []
+    bloqueo = threading.Lock()
+
+    def trabajador(parte: Sequence[Dict]) -> None:
+        with engine.connect() as conn:
+            for cuerpo in parte:
+                inicio = time.perf_counter()
+                try:
+                    resultado = crear(conn, cuerpo)
+                except IntegrityError:
+                    resultado = "errorIntegridad"
+                except OperationalError:
+                    resultado = "bloqueo"
+                with bloqueo:
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    resultados[resultado] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        list(ejecutor.map(trabajador, [cuerpos[hilo::hilos] for hilo in range(hilos)]))
+    segundos = time.perf_counter() - inicio
+
+    with engine.connect() as conn:
+        guardados = conn.execute(select(func.count()).select_from(_clientes)).scalar()
+
+    latencias.sort()
+    return {
+        "segundos": segundos,
+        "creacionesPorSegundo": len(cuerpos) / segundos,
+        "latenciaMs": {
+            "p50": statistics.median(latencias),
+            "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+            "max": latencias[-1],
+        },
+        "resultados": dict(resultados),
+        "clientesGuardados": guardados,
+        "consistente": guardados == resultados["creado"],
+    }
+
+
+def benchmark_creacion(
+    url: str,
+    solicitudes: int = 2000,
+    hilos: int = 16,
+    duplicados: float = 0.3,
+) -> Dict:
+    """
+    Ejecuta el benchmark con las dos estrategias sobre la base de `url` (se recrean las tablas).
+
+    Args:
+        url: URL SQLAlchemy de la base de datos del benchmark
+        solicitudes: Creaciones enviadas por estrategia
+        hilos: Hilos (y conexiones) concurrentes
+        duplicados: Fracción de solicitudes que repiten el correo o el documento de otra
+
+    Returns:
+        Diccionario con las solicitudes, los hilos y, por estrategia, creaciones por
+        segundo, latencia p50/p99/max (ms), resultados por tipo y verificación final
+    """
+    engine = create_engine(url, pool_size=hilos, max_overflow=0)
+
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _pragmas(conexion, _):
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA busy_timeout=5000")
+
+    cuerpos = _solicitudes(solicitudes, duplicados)
+    resultado: Dict = {"solicitudes": solicitudes, "hilos": hilos, "estrategias": {}}
+    for estrategia in ESTRATEGIAS:
+        with engine.begin() as conn:
+            for tabla in ("clientes_fts", "clientes_fts_claves", "documentos", "clientes"):
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS {tabla}")
+        # Tablas del modelo: after_create agrega el índice de búsqueda (models/busqueda.py)
+        _clientes.create(engine)
+        _documentos.create(engine)
+
+        resultado["estrategias"][estrategia] = _ejecutar(engine, estrategia, cuerpos, hilos)
+    engine.dispose()
+
+    antes, despues = resultado["estrategias"]["antes"], resultado["estrategias"]["despues"]
+    resultado["speedup"] = despues["creacionesPorSegundo"] / antes["creacionesPorSegundo"]
+    return resultado
@@ -0,0 +1,161 @@
+# src/services/benchmark_ids.py
+"""
+Benchmark de claves uuid4 frente a uuid7 (flask benchmark-ids).
+
+Para cada tipo de id crea una base SQLite aparte (nunca la de la app) con una copia
+de detalles_compra (PK id, índices de compra_id y producto_id) e inserta N filas en
+lotes, con ids y compra_id generados con ese tipo. La caché de páginas se limita
+(`cache_mb`) para que, como en producción, los índices no quepan en memoria.
+
+Mide el rendimiento de inserción (total y por tramo del 10%: con uuid4 cae a
+medida que crece el índice) y, con la tabla virtual dbstat, el tamaño y el
+llenado de las páginas de la tabla y de cada índice.
+"""
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+
+from src.models.ids import uuid7
+
+GENERADORES = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+_PRODUCTOS = 1000
+
+_INDICES = {
+    "tabla": "detalles_compra",
+    "pk": "sqlite_autoindex_detalles_compra_1",
+    "compra_id": "ix_detalles_compra_compra_id",
+    "producto_id": "ix_detalles_compra_producto_id",
+}
+
+
+def _tamanos(conn) -> Dict[str, Dict]:
+    tamanos = {}
+    for clave, nombre in _INDICES.items():
+        paginas, bytes_totales, sin_usar = conn.exec_driver_sql(
+            "SELECT count(*), coalesce(sum(pgsize), 0), coalesce(sum(unused), 0) "
+            "FROM dbstat WHERE name = ?",
+            (nombre,),
+        ).one()
+        tamanos[clave] = {
+            "paginas": paginas,
+            "bytes": bytes_totales,
+            "llenado": 1 - sin_usar / bytes_totales if bytes_totales else 0.0,
+        }
+    return tamanos
+
+
+def _insertar(engine, generar: Callable[[], uuid.UUID], filas: int, tamano_lote: int,
+              al_avanzar: Optional[Callable[[int, float], None]]) -> Dict:
+    productos = [generar().hex for _ in range(_PRODUCTOS)]
+    sql = (
+        "INSERT INTO detalles_compra (id, cantidad_compra, precio_unitario_centavos, "
+        "compra_id, producto_id) VALUES (?, ?, ?, ?, ?)"
+    )
+    tramo = max(filas // 10, 1)
+    tramos: List[float] = []
+    segundos = 0.0
+    segundos_tramo = 0.0
+    filas_tramo = 0
+    insertadas = 0
+    compra = generar().hex
+
+    while insertadas < filas:
+        lote = []
+        for _ in range(min(tamano_lote, filas - insertadas)):
+            if random.random() < 0.35:
+                compra = generar().hex
+            lote.append((generar().hex, random.randint(1, 10), random.randint(100, 500_000),
+                         compra, random.choice(productos)))
+
+        # Solo se mide la inserción (la generación de los datos queda fuera)
+        inicio = time.perf_counter()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql, lote)
+        duracion = time.perf_counter() - inicio
+
+        insertadas += len(lote)
+        segundos += duracion
+        segundos_tramo += duracion
+        filas_tramo += len(lote)
+        if filas_tramo >= tramo or insertadas == filas:
+            tramos.append(filas_tramo / max(segundos_tramo, 1e-9))
+            if al_avanzar is not None:
+                al_avanzar(insertadas, tramos[-1])
+            segundos_tramo = 0.0
+            filas_tramo = 0
+
+    return {"segundos": segundos, "filasPorSegundo": filas / max(segundos, 1e-9), "tramos": tramos}
+
+
+def benchmark_ids(
+    directorio,
+    filas: int = 10_000_000,
+    tamano_lote: int = 50_000,
+    cache_mb: int = 64,
+    variantes: tuple = ("uuid4", "uuid7"),
+    al_avanzar: Optional[Callable[[str, int, float], None]] = None,
+) -> Dict[str, Dict]:
+    """
+    Ejecuta el benchmark para cada tipo de id.
+
+    Args:
+        directorio: Directorio de las bases del benchmark (benchmark_ids_<tipo>.db,
+            se recrean)
+        filas: Detalles de compra insertados por tipo de id
+        tamano_lote: Filas por transacción
+        cache_mb: Caché de páginas de SQLite (MB)
+        variantes: Tipos de id a comparar (claves de GENERADORES)
+        al_avanzar: Función llamada por tramo con (tipo, filas insertadas, filas/s del tramo)
+
+    Returns:
+        Diccionario por tipo de id con el rendimiento de inserción, el tamaño del
+        archivo y el tamaño y llenado de la tabla y de cada índice
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    resultados = {}
+
+    for variante in variantes:
+        ruta = directorio / f"benchmark_ids_{variante}.db"
+        for sufijo in ("", "-journal", "-wal", "-shm"):
+            try:
+                os.unlink(f"{ruta}{sufijo}")
+            except FileNotFoundError:
+                pass
+
+        engine = create_engine(f"sqlite:///{ruta}")
+
+        @event.listens_for(engine, "connect")
+        def _pragmas(conexion, _):
+            conexion.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "CREATE TABLE detalles_compra ("
+                " id CHAR(32) NOT NULL PRIMARY KEY,"
+                " cantidad_compra INTEGER NOT NULL,"
+                " precio_unitario_centavos BIGINT NOT NULL,"
+                " compra_id CHAR(32) NOT NULL,"
+                " producto_id CHAR(32) NOT NULL)"
+            )
+            conn.exec_driver_sql("CREATE INDEX ix_detalles_compra_compra_id ON detalles_compra (compra_id)")
+            conn.exec_driver_sql("CREATE INDEX ix_detalles_compra_producto_id ON detalles_compra (producto_id)")
+
+        avance = None
+        if al_avanzar is not None:
+            avance = lambda insertadas, tasa, variante=variante: al_avanzar(variante, insertadas, tasa)
+        resultado = _insertar(engine, GENERADORES[variante], filas, tamano_lote, avance)
+
+        with engine.connect() as conn:
+            resultado["indices"] = _tamanos(conn)
+        engine.dispose()
+        resultado["bytesArchivo"] = ruta.stat().st_size
+        resultados[variante] = resultado
+
+    return resultados
@@ -0,0 +1,226 @@
+# src/services/benchmark_migraciones.py
+"""
+Benchmark del ejecutor de migraciones de datos (flask benchmark-migracion-datos).
+
+Crea en una base de datos aparte (nunca la de la app) una copia de detalles_compra
+con N filas sintéticas y la columna nueva `subtotal_centavos` vacía, como quedaría
+tras la migración de Alembic que la agrega. Luego la rellena con el ejecutor
+(subtotal = cantidad × precio unitario) mientras un hilo simula la API: lecturas
+puntuales por id e inserciones de detalles nuevos (que ya traen el subtotal).
+
+Mide el rendimiento de la migración y la latencia de la carga concurrente, y
+comprueba al final que todas las filas quedaron migradas.
+"""
+import random
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import (
+    BigInteger, Column, Integer, MetaData, Table, Uuid, create_engine, event, func, select, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.models.ids import uuid7
+from src.models.migracion_datos import MigracionDatos
+from .migraciones_datos import Migracion, ejecutar
+
+_PRODUCTOS = 1000
+_LOTE_CARGA = 50_000
+
+
+def _tabla_detalles(metadata: MetaData) -> Table:
+    return Table(
+        "detalles_compra", metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("cantidad_compra", Integer, nullable=False),
+        Column("precio_unitario_centavos", BigInteger, nullable=False),
+        Column("compra_id", Uuid, nullable=False, index=True),
+        Column("producto_id", Uuid, nullable=False, index=True),
+        # Columna nueva (nullable, sin default) que rellena la migración
+        Column("subtotal_centavos", BigInteger, nullable=True),
+    )
+
+
+class _RellenarSubtotales(Migracion):
+    nombre = "benchmark-subtotales-detalles"
+
+    def __init__(self, tabla: Table):
+        self._tabla = tabla
+
+    def tabla(self) -> Table:
+        return self._tabla
+
+    def pendientes(self, tabla: Table) -> Optional[ColumnElement]:
+        return tabla.c.subtotal_centavos.is_(None)
+
+    def migrar_lote(self, conn: Connection, tabla: Table, condicion: ColumnElement) -> int:
+        resultado = conn.execute(
+            update(tabla)
+            .where(condicion)
+            .values(subtotal_centavos=tabla.c.cantidad_compra * tabla.c.precio_unitario_centavos)
+        )
+        return resultado.rowcount
+
+
+def _percentiles(valores: List[float]) -> Dict[str, float]:
+    if not valores:
+        return {"n": 0}
+    valores = sorted(valores)
+    return {
+        "n": len(valores),
+        "p50": statistics.median(valores),
+        "p99": valores[min(len(valores) - 1, int(len(valores) * 0.99))],
+        "max": valores[-1],
+    }
+
+
+def _cargar(engine, filas: int, muestra: List[str],
+            al_avanzar: Optional[Callable[[int], None]]) -> None:
+    """Inserta `filas` detalles sintéticos (ids uuid7 en orden, varios por compra)."""
+    productos = [uuid7().hex for _ in range(_PRODUCTOS)]
+    sql = (
+        "INSERT INTO detalles_compra (id, cantidad_compra, precio_unitario_centavos, "
+        "compra_id, producto_id) VALUES (?, ?, ?, ?, ?)"
+    )
+    insertadas = 0
+    compra = uuid7().hex
+    while insertadas < filas:
+        lote = []
+        for _ in range(min(_LOTE_CARGA, filas - insertadas)):
+            if random.random() < 0.35:
+                compra = uuid7().hex
+            lote.append((uuid7().hex, random.randint(1, 10), random.randint(100, 500_000),
+                         compra, random.choice(productos)))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql, lote)
+        muestra.extend(fila[0] for fila in lote[::1000])
+        insertadas += len(lote)
+        if al_avanzar is not None:
+            al_avanzar(insertadas)
+
+
+def _carga_api(engine, muestra: List[str], detener: threading.Event,
+               lecturas: List[float], escrituras: List[float], errores: List[str]) -> None:
+    """Simula la API: 9 lecturas puntuales por id por cada inserción de un detalle."""
+    leer = "SELECT id, cantidad_compra, precio_unitario_centavos FROM detalles_compra WHERE id = ?"
+    insertar = (
+        "INSERT INTO detalles_compra (id, cantidad_compra, precio_unitario_centavos, "
+        "compra_id, producto_id, subtotal_centavos) VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    operacion = 0
+    while not detener.is_set():
+        operacion += 1
+        inicio = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                if operacion % 10:
+                    conn.exec_driver_sql(leer, (random.choice(muestra),)).first()
+                    destino = lecturas
+                else:
+                    cantidad, precio = random.randint(1, 10), random.randint(100, 500_000)
+                    conn.exec_driver_sql(insertar, (uuid7().hex, cantidad, precio, uuid7().hex,
+                                                    uuid7().hex, cantidad * precio))
+                    destino = escrituras
+        except OperationalError as error:
+            errores.append(str(error.orig))
+            continue
+        destino.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(0.001)
+
+
+def benchmark_detalles_compra(
+    url: str,
+    filas: int = 10_000_000,
+    tamano_lote: int = 5000,
+    segundos_por_lote: float = 0.25,
+    pausa_segundos: float = 0.0,
+    wal: bool = False,
+    al_cargar: Optional[Callable[[int], None]] = None,
+    al_avanzar: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Ejecuta el benchmark sobre la base SQLite de `url` (se recrea la tabla).
+
+    Args:
+        url: URL SQLAlchemy de la base de datos del benchmark
+        filas: Detalles de compra sintéticos
+        tamano_lote: Filas por lote de la migración (máximo)
+        segundos_por_lote: Duración objetivo de cada lote
+        pausa_segundos: Pausa entre lotes
+        wal: Usar journal_mode=WAL (lectores sin bloqueo durante las escrituras)
+        al_cargar: Función llamada con las filas insertadas durante la carga
+        al_avanzar: Función llamada después de cada lote de la migración
+
+    Returns:
+        Diccionario con la carga, la migración, la latencia de la API simulada y
+        la verificación final
+    """
+    engine = create_engine(url)
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(conexion, _):
+        if wal:
+            conexion.execute("PRAGMA journal_mode=WAL")
+        # Igual que el timeout por defecto de pysqlite: la API espera el bloqueo
+        conexion.execute("PRAGMA busy_timeout=5000")
+
+    metadata = MetaData()
+    tabla = _tabla_detalles(metadata)
+    progreso = MigracionDatos.__table__.to_metadata(metadata)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    muestra: List[str] = []
+    inicio = time.monotonic()
+    _cargar(engine, filas, muestra, al_cargar)
+    segundos_carga = time.monotonic() - inicio
+
+    lecturas: List[float] = []
+    escrituras: List[float] = []
+    errores: List[str] = []
+    detener = threading.Event()
+    hilo = threading.Thread(target=_carga_api, args=(engine, muestra, detener, lecturas, escrituras, errores),
+                            daemon=True)
+    hilo.start()
+    try:
+        resultado = ejecutar(
+            _RellenarSubtotales(tabla),
+            engine=engine,
+            tamano_lote=tamano_lote,
+            segundos_por_lote=segundos_por_lote,
+            pausa_segundos=pausa_segundos,
+            reiniciar=True,
+            al_avanzar=al_avanzar,
+        )
+    finally:
+        detener.set()
+        hilo.join()
+
+    with engine.connect() as conn:
+        sin_migrar = conn.scalar(select(func.count()).where(tabla.c.subtotal_centavos.is_(None)))
+        incorrectas = conn.scalar(
+            select(func.count()).where(
+                tabla.c.subtotal_centavos != tabla.c.cantidad_compra * tabla.c.precio_unitario_centavos
+            )
+        )
+        lotes_guardados = conn.scalar(select(progreso.c.lotes))
+    engine.dispose()
+
+    return {
+        "filas": filas,
+        "segundosCarga": segundos_carga,
+        "migracion": {
+            **resultado,
+            "filasPorSegundo": resultado["filas"] / max(resultado["segundos"], 1e-6),
+            "lotesGuardados": lotes_guardados,
+        },
+        "lecturasMs": _percentiles(lecturas),
+        "escriturasMs": _percentiles(escrituras),
+        "errores": len(errores),
+        "sinMigrar": sin_migrar,
+        "incorrectas": incorrectas,
+    }
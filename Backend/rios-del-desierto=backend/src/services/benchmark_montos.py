@@ -0,0 +1,144 @@
+# src/services/benchmark_montos.py
+"""
+Benchmark de montos Float frente a centavos enteros (flask benchmark-montos).
+
+Crea en una base de datos aparte (nunca la de la app) una tabla de compras con el
+mismo monto guardado dos veces: `monto_total` (REAL, como antes de c41e7b2d9f60) y
+`monto_total_centavos` (INTEGER, como ahora). Una parte de los clientes ("frontera")
+tiene compras que suman exactamente el umbral de fidelización.
+
+Para cada representación mide la agregación del reporte (SUM por cliente con
+HAVING >= umbral) y la compara con la suma exacta calculada en Python con enteros:
+clientes con total distinto y clientes de la frontera mal clasificados.
+"""
+import random
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import create_engine, text
+
+_LOTE_CARGA = 50_000
+
+
+def _montos_frontera(compras: int, umbral_centavos: int) -> list:
+    """Montos en centavos (con fracciones que Float no representa) que suman el umbral."""
+    base = umbral_centavos // compras
+    montos = [base + random.randint(-base // 2, base // 2) for _ in range(compras - 1)]
+    montos.append(umbral_centavos - sum(montos))
+    return montos
+
+
+def benchmark_montos(
+    url: str,
+    filas: int = 1_000_000,
+    clientes: int = 20_000,
+    clientes_frontera: int = 500,
+    umbral: Decimal = Decimal("5000000"),
+    repeticiones: int = 3,
+    al_cargar: Optional[Callable[[int], None]] = None,
+) -> Dict:
+    """
+    Ejecuta el benchmark sobre la base SQLite de `url` (se recrea la tabla).
+
+    Args:
+        url: URL SQLAlchemy de la base de datos del benchmark
+        filas: Compras sintéticas (incluidas las de los clientes de frontera)
+        clientes: Clientes distintos
+        clientes_frontera: Clientes cuyas compras suman exactamente el umbral
+        umbral: Monto mínimo de fidelización (COP)
+        repeticiones: Ejecuciones de cada agregación (se informa la mejor)
+        al_cargar: Función llamada con las filas insertadas durante la carga
+
+    Returns:
+        Diccionario con, para "float" y "centavos", segundos de la agregación,
+        clientes elegibles, totales distintos del exacto y clientes de frontera
+        mal clasificados
+    """
+    umbral_centavos = int(umbral * 100)
+    engine = create_engine(url)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS compras_benchmark")
+        conn.exec_driver_sql(
+            "CREATE TABLE compras_benchmark ("
+            " id INTEGER PRIMARY KEY, cliente INTEGER NOT NULL,"
+            " monto_total REAL NOT NULL, monto_total_centavos INTEGER NOT NULL)"
+        )
+
+    exactos: Dict[int, int] = {}
+    pendientes = []
+
+    def escribir(forzar=False):
+        if pendientes and (forzar or len(pendientes) >= _LOTE_CARGA):
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "INSERT INTO compras_benchmark (cliente, monto_total, monto_total_centavos) "
+                    "VALUES (?, ?, ?)",
+                    pendientes,
+                )
+            pendientes.clear()
+            if al_cargar is not None:
+                al_cargar(insertadas)
+
+    # Clientes de frontera: 0 .. clientes_frontera-1
+    compras_frontera = max(2, filas // (clientes * 2))
+    insertadas = 0
+    for cliente in range(clientes_frontera):
+        for centavos in _montos_frontera(compras_frontera, umbral_centavos):
+            pendientes.append((cliente, centavos / 100, centavos))
+            exactos[cliente] = exactos.get(cliente, 0) + centavos
+            insertadas += 1
+            escribir()
+
+    # Resto: montos aleatorios con centavos
+    while insertadas < filas:
+        cliente = random.randrange(clientes_frontera, clientes)
+        centavos = random.randint(1_000, 20_000_000)
+        pendientes.append((cliente, centavos / 100, centavos))
+        exactos[cliente] = exactos.get(cliente, 0) + centavos
+        insertadas += 1
+        escribir()
+    escribir(forzar=True)
+
+    elegibles_exactos = {cliente for cliente, total in exactos.items() if total >= umbral_centavos}
+    consultas = {
+        "float": (
+            "SELECT cliente, SUM(monto_total) FROM compras_benchmark "
+            "GROUP BY cliente HAVING SUM(monto_total) >= :umbral",
+            float(umbral),
+            lambda total: round(Decimal(total) * 100),
+        ),
+        "centavos": (
+            "SELECT cliente, SUM(monto_total_centavos) FROM compras_benchmark "
+            "GROUP BY cliente HAVING SUM(monto_total_centavos) >= :umbral",
+            umbral_centavos,
+            int,
+        ),
+    }
+
+    resultado = {"filas": filas, "clientes": clientes, "clientesFrontera": clientes_frontera,
+                 "elegiblesExactos": len(elegibles_exactos)}
+    with engine.connect() as conn:
+        for nombre, (sql, umbral_sql, a_centavos) in consultas.items():
+            mejor = None
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                filas_resultado = conn.execute(text(sql), {"umbral": umbral_sql}).all()
+                duracion = time.perf_counter() - inicio
+                mejor = duracion if mejor is None else min(mejor, duracion)
+
+            elegibles = {cliente for cliente, _ in filas_resultado}
+            distintos = sum(1 for cliente, total in filas_resultado if a_centavos(total) != exactos[cliente])
+            resultado[nombre] = {
+                "segundos": mejor,
+                "elegibles": len(elegibles),
+                "totalesDistintos": distintos,
+                "fronteraMalClasificada": sum(
+                    1 for cliente in range(clientes_frontera) if cliente not in elegibles
+                ),
+                "faltantes": len(elegibles_exactos - elegibles),
+                "sobrantes": len(elegibles - elegibles_exactos),
+            }
+    engine.dispose()
+    return resultado
@@ -0,0 +1,98 @@
+# src/services/benchmark_reporte.py
+"""
+Benchmark de escalamiento del reporte de fidelización en modo paralelo
+(flask benchmark-reporte-paralelo).
+
+Genera filas sintéticas con la misma forma que obtener_filas (sin base de datos)
+y renderiza el zip con 1, 2, 4, 8... shards sobre el pool compartido. Antes de
+medir se hace una ejecución de calentamiento para que el arranque de los procesos
+(spawn) no cuente en la primera medición.
+
+El speedup está acotado por los núcleos del equipo (os.cpu_count()) y por
+REPORTE_TRABAJADORES_MAX (tamaño del pool).
+"""
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from flask import current_app
+
+from src.services.reporte_fidelizacion import construir_zip_paralelo
+
+_PRODUCTOS = ["Arroz 5kg", "Aceite 3L", "Café 2.5kg", "Televisor 55\"", "Nevera 420L", "Lavadora 18kg"]
+
+
+def filas_sinteticas(clientes: int, detalles_por_cliente: int) -> List[Tuple[int, Dict]]:
+    """Filas (hash del cliente, fila) como las de obtener_filas, con datos aleatorios."""
+    ahora = datetime.now()
+    filas = []
+    for numero in range(clientes):
+        hash_cliente = random.getrandbits(128)
+        for _ in range(detalles_por_cliente):
+            cantidad = random.randint(1, 10)
+            precio = random.randint(1_000, 5_000_000)
+            filas.append((hash_cliente, {
+                "Nombre": f"Nombre{numero}",
+                "Apellido": f"Apellido{numero}",
+                "Correo Electrónico": f"cliente{numero}@example.com",
+                "Teléfono": f"300{numero:07d}",
+                "Tipo Documento": "CEDULA",
+                "Número Documento": str(10_000_000 + numero),
+                "Fecha Compra": (ahora - timedelta(minutes=random.randint(0, 43_200))).strftime("%Y-%m-%d %H:%M:%S"),
+                "Producto": random.choice(_PRODUCTOS),
+                "Cantidad": cantidad,
+                "Precio Unitario (COP)": precio,
+                "Subtotal (COP)": cantidad * precio,
+            }))
+    return filas
+
+
+def benchmark_reporte_paralelo(
+    clientes: int = 20_000,
+    detalles_por_cliente: int = 10,
+    trabajadores: Sequence[int] = (1, 2, 4, 8),
+    formato: str = "EXCEL",
+    repeticiones: int = 3,
+) -> Dict:
+    """
+    Mide el tiempo de construir_zip_paralelo con cada número de trabajadores.
+
+    Args:
+        clientes: Clientes sintéticos
+        detalles_por_cliente: Filas de detalle por cliente
+        trabajadores: Números de trabajadores (shards) a medir
+        formato: EXCEL o CSV
+        repeticiones: Ejecuciones por número de trabajadores (se informa la mejor)
+
+    Returns:
+        Diccionario con las filas, los núcleos, el tamaño del pool y, por número de
+        trabajadores, segundos, filas por segundo y speedup frente al primero
+    """
+    filas = filas_sinteticas(clientes, detalles_por_cliente)
+    # Calentamiento: arranca los procesos del pool
+    construir_zip_paralelo(filas[:1000], max(trabajadores), formato)
+
+    resultados = {}
+    base = None
+    for numero in trabajadores:
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            construir_zip_paralelo(filas, numero, formato)
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        base = base or mejor
+        resultados[numero] = {
+            "segundos": mejor,
+            "filasPorSegundo": len(filas) / mejor,
+            "speedup": base / mejor,
+        }
+
+    return {
+        "filas": len(filas),
+        "nucleos": os.cpu_count(),
+        "tamanoPool": current_app.config["REPORTE_TRABAJADORES_MAX"],
+        "trabajadores": resultados,
+    }
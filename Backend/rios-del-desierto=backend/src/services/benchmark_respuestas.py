@@ -0,0 +1,108 @@
+# src/services/benchmark_respuestas.py
+"""
+Benchmark de compresión y ETags de la API (flask benchmark-respuestas).
+
+Con el cliente de pruebas de Flask (sin red) pide varias veces la búsqueda por
+documento y la exportación CSV/TXT/Excel de clientes reales de la base de la app
+(solo lecturas), con cada Accept-Encoding (identity, gzip y br si está instalado),
+y además la revalidación con If-None-Match (304 sin cuerpo).
+
+Para cada combinación informa los bytes del cuerpo (lo que viaja por la red),
+la latencia del servidor (p50/p99) y el tiempo estimado de transferencia a
+`mbps` megabits por segundo.
+"""
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import select
+
+from src.api.respuestas import codificaciones_disponibles
+from src.extensions import db
+from src.models.documento import Documento
+
+
+def _percentiles(valores: List[float]) -> Dict[str, float]:
+    valores = sorted(valores)
+    return {
+        "p50": statistics.median(valores),
+        "p99": valores[min(len(valores) - 1, int(len(valores) * 0.99))],
+    }
+
+
+def _solicitudes(documentos) -> Dict[str, List[str]]:
+    """URL de cada endpoint medido, una por documento."""
+    solicitudes = {"buscar": []}
+    for tipo, numero in documentos:
+        parametros = f"tipo_documento={tipo.value}&numero_documento={numero}"
+        solicitudes["buscar"].append(f"/api/v1/clientes/buscar?{parametros}")
+        for formato in ("CSV", "TXT", "EXCEL"):
+            solicitudes.setdefault(f"exportar-{formato}", []).append(
+                f"/api/v1/clientes/exportar?{parametros}&formato={formato}"
+            )
+    return solicitudes
+
+
+def benchmark_respuestas(
+    app: Flask,
+    clientes: int = 20,
+    repeticiones: int = 25,
+    mbps: float = 10.0,
+) -> Optional[Dict[str, Dict]]:
+    """
+    Ejecuta el benchmark sobre los primeros `clientes` documentos registrados.
+
+    Args:
+        app: Aplicación Flask (se usa su test_client y su base de datos)
+        clientes: Documentos distintos consultados
+        repeticiones: Veces que se pide cada URL por codificación
+        mbps: Ancho de banda (megabits por segundo) para estimar la transferencia
+
+    Returns:
+        Diccionario endpoint -> variante (identity, gzip, br, 304) con bytes
+        promedio, latencia p50/p99 (ms) y transferencia estimada (ms), o None si
+        no hay clientes
+    """
+    with app.app_context():
+        documentos = db.session.execute(
+            select(Documento.tipo_documento, Documento.numero_documento)
+            .order_by(Documento.id)
+            .limit(clientes)
+        ).all()
+    if not documentos:
+        return None
+
+    cliente_http = app.test_client()
+    variantes = ["identity", *reversed(codificaciones_disponibles())]
+    resultados: Dict[str, Dict] = {}
+
+    for endpoint, urls in _solicitudes(documentos).items():
+        resultados[endpoint] = {}
+        etags = {}
+        for variante in [*variantes, "304"]:
+            tamanos: List[int] = []
+            latencias: List[float] = []
+            for _ in range(repeticiones):
+                for url in urls:
+                    cabeceras = {"Accept-Encoding": "identity" if variante == "304" else variante}
+                    if variante == "304":
+                        cabeceras["If-None-Match"] = etags[url]
+
+                    inicio = time.perf_counter()
+                    respuesta = cliente_http.get(url, headers=cabeceras)
+                    cuerpo = respuesta.get_data()
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+
+                    tamanos.append(len(cuerpo))
+                    etags.setdefault(url, respuesta.headers.get("ETag", "*"))
+                    respuesta.close()
+
+            promedio = sum(tamanos) / len(tamanos)
+            resultados[endpoint][variante] = {
+                "bytes": promedio,
+                "latenciaMs": _percentiles(latencias),
+                "transferenciaMs": promedio * 8 / (mbps * 1_000_000) * 1000,
+            }
+
+    return resultados
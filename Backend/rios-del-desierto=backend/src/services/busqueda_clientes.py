@@ -0,0 +1,64 @@
+# src/services/busqueda_clientes.py
+"""
+Resolución en memoria de la búsqueda de clientes por documento, compartida por la
+API Flask (api/v1/clientes_routes.py) y la asíncrona (api/asincrono.py):
+
+1. Índice mmap (INDICE_MMAP_MODO): si el cliente está ahí, no se consulta la base
+   de datos; en modo "solo", tampoco si no está.
+2. Índice completo en memoria (PRECALENTAMIENTO_INDICE_COMPLETO).
+3. Filtro de documentos: los documentos que el filtro de Bloom descarta no existen.
+4. Caché de búsquedas: clientes encontrados recientemente.
+
+Si nada de eso resuelve la búsqueda, cada API ejecuta la consulta con su propia
+coalescencia (hilos o asyncio) y registra el resultado con registrar_consulta.
+Todas las funciones usan las estructuras de la app Flask activa (current_app).
+"""
+from typing import Any, Optional, Tuple
+
+from src.models.enums import TipoDocumentoEnum
+from src.services import cache_busquedas, filtro_documentos, indice_memoria, indice_mmap
+
+
+def en_memoria(tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> Tuple[bool, Optional[Any]]:
+    """
+    Busca el documento en el índice mmap, el índice en memoria, el filtro y la caché.
+
+    Returns:
+        (True, fila o None) si la búsqueda quedó resuelta sin consultar la base de
+        datos; (False, None) si hay que consultarla
+    """
+    indice = indice_mmap.indice_app()
+    if indice is not None:
+        fila = indice.buscar(tipo_documento, numero_normalizado)
+        if fila is not None or (indice.solo and indice.version() is not None):
+            return True, fila
+
+    completo = indice_memoria.indice_app()
+    if completo is not None:
+        fila = completo.obtener(tipo_documento, numero_normalizado)
+        if fila is not None:
+            return True, fila
+
+    if filtro_documentos.descarta(tipo_documento, numero_normalizado):
+        return True, None
+
+    cache = cache_busquedas.cache_app()
+    if cache is not None:
+        fila = cache.obtener((tipo_documento, numero_normalizado))
+        if fila is not None:
+            return True, fila
+
+    return False, None
+
+
+def registrar_consulta(tipo_documento: TipoDocumentoEnum, numero_normalizado: str, fila) -> None:
+    """
+    Registra el resultado de una consulta a la base de datos: cuenta el falso
+    positivo del filtro si no hubo cliente y guarda el cliente en la caché.
+    """
+    if fila is None:
+        filtro_documentos.registrar_falso_positivo()
+        return
+    cache = cache_busquedas.cache_app()
+    if cache is not None:
+        cache.guardar((tipo_documento, numero_normalizado), fila)
@@ -0,0 +1,123 @@
+# src/services/cache_busquedas.py
+"""
+Caché en memoria de la búsqueda de clientes por documento: (tipo, número
+normalizado) -> fila de consultas.CLIENTE_POR_DOCUMENTO.
+
+Es un diccionario hash con desalojo LRU y vencimiento: una fila vive como máximo
+CACHE_BUSQUEDAS_TTL_SEGUNDOS, así que los cambios hechos fuera de la API (seed, CLI,
+otros procesos) se ven como mucho con ese retraso. Solo se guardan clientes
+encontrados; los documentos inexistentes los resuelve el filtro de documentos.
+
+El precalentamiento (services/precalentamiento.py) la llena al iniciar con los
+clientes de compra más reciente.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from flask import Flask, current_app
+
+
+class CacheBusquedas:
+    """
+    LRU con vencimiento por entrada, segura entre hilos.
+
+    Args:
+        max_entradas: Entradas máximas (se desaloja la menos usada)
+        ttl_segundos: Vida de cada entrada
+    """
+
+    def __init__(self, max_entradas: int = 50_000, ttl_segundos: float = 300):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.precargadas = 0
+
+    def obtener(self, clave: Hashable):
+        """Fila guardada para la clave, o None si no está o ya venció."""
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            vence, fila = entrada
+            if vence < time.monotonic():
+                del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return fila
+
+    def guardar(self, clave: Hashable, fila) -> None:
+        with self._candado:
+            self._guardar(clave, fila, time.monotonic() + self.ttl_segundos)
+
+    def precargar(self, entradas: Iterable[Tuple[Hashable, object]]) -> int:
+        """
+        Guarda varias filas de una vez (precalentamiento).
+
+        Returns:
+            Número de filas guardadas
+        """
+        vence = time.monotonic() + self.ttl_segundos
+        total = 0
+        with self._candado:
+            for clave, fila in entradas:
+                self._guardar(clave, fila, vence)
+                total += 1
+            self.precargadas += total
+        return total
+
+    def _guardar(self, clave: Hashable, fila, vence: float) -> None:
+        self._entradas[clave] = (vence, fila)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def descartar(self, clave: Hashable) -> None:
+        with self._candado:
+            self._entradas.pop(clave, None)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def metricas(self) -> Dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "maxEntradas": self.max_entradas,
+            "ttlSegundos": self.ttl_segundos,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasaAciertos": round(self.aciertos / consultas, 4) if consultas else None,
+            "precargadas": self.precargadas,
+        }
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def cache_app() -> Optional[CacheBusquedas]:
+    return current_app.extensions.get("cache_busquedas")
+
+
+def metricas() -> Dict:
+    cache = cache_app()
+    if cache is None:
+        return {"habilitado": False}
+    return {"habilitado": True, **cache.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """Crea la caché de la app si CACHE_BUSQUEDAS_HABILITADO."""
+    if not app.config.get("CACHE_BUSQUEDAS_HABILITADO", True):
+        return
+    app.extensions["cache_busquedas"] = CacheBusquedas(
+        max_entradas=app.config["CACHE_BUSQUEDAS_MAX_ENTRADAS"],
+        ttl_segundos=app.config["CACHE_BUSQUEDAS_TTL_SEGUNDOS"],
+    )
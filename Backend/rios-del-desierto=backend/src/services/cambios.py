@@ -0,0 +1,103 @@
+# src/services/cambios.py
+"""
+Feed de cambios con long polling sobre la bandeja de salida (models/cambio.py).
+
+Si no hay cambios después del cursor, la solicitud espera hasta `espera` segundos
+a que aparezcan:
+    - Los commits de este proceso que escribieron cambios despiertan a los que
+      esperan de inmediato (evento after_commit).
+    - Los de otros procesos o workers se detectan consultando la tabla cada
+      CAMBIOS_SONDEO_SEGUNDOS.
+
+Cada consulta usa una conexión propia que se devuelve al pool durante la espera:
+un consumidor esperando no retiene una conexión ni una transacción abierta.
+"""
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.extensions import db
+from src.models.cambio import CLAVE_ESCRITOS, Cambio
+
+
+class AvisoCambios:
+    """Despierta a las solicitudes en espera cuando este proceso confirma cambios."""
+
+    def __init__(self):
+        self._condicion = threading.Condition()
+        self._generacion = 0
+        self.esperando = 0
+
+    def notificar(self) -> None:
+        with self._condicion:
+            self._generacion += 1
+            self._condicion.notify_all()
+
+    def generacion(self) -> int:
+        return self._generacion
+
+    def esperar(self, generacion: int, segundos: float) -> None:
+        """Espera hasta `segundos` a un aviso posterior a `generacion`."""
+        with self._condicion:
+            if self._generacion != generacion:
+                return
+            self.esperando += 1
+            try:
+                self._condicion.wait(segundos)
+            finally:
+                self.esperando -= 1
+
+
+_aviso = AvisoCambios()
+
+
+@event.listens_for(Session, "after_commit")
+def _avisar_commit(session: Session) -> None:
+    if session.info.pop(CLAVE_ESCRITOS, False):
+        _aviso.notificar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_marca(session: Session) -> None:
+    session.info.pop(CLAVE_ESCRITOS, None)
+
+
+def leer(desde: int, limite: int) -> Tuple[List[Cambio], bool]:
+    """Cambios posteriores a `desde` (sin esperar). Ver Cambio.leer."""
+    with db.engine.connect() as conexion:
+        return Cambio.leer(conexion, desde, limite, current_app.config["CAMBIOS_MARGEN_SEGUNDOS"])
+
+
+def leer_o_esperar(desde: int, limite: int, espera: float) -> Tuple[List[Cambio], bool]:
+    """
+    Cambios posteriores a `desde`; si no hay, espera hasta `espera` segundos a que
+    aparezcan.
+
+    Args:
+        desde: Cursor del último cambio recibido
+        limite: Máximo de cambios a devolver
+        espera: Segundos máximos de espera (0 responde de inmediato)
+
+    Returns:
+        Tupla (cambios, hay_mas); lista vacía si se agotó la espera
+    """
+    sondeo = current_app.config["CAMBIOS_SONDEO_SEGUNDOS"]
+    fin = time.monotonic() + espera
+    while True:
+        # La generación se toma antes de leer: un commit entre la lectura y la
+        # espera no se pierde
+        generacion = _aviso.generacion()
+        cambios, hay_mas = leer(desde, limite)
+        restante = fin - time.monotonic()
+        # Sin cambios (o detenido antes de un hueco reciente): se sigue esperando
+        if cambios or restante <= 0:
+            return cambios, hay_mas
+        _aviso.esperar(generacion, min(sondeo, restante))
+
+
+def metricas() -> Dict:
+    return {"esperando": _aviso.esperando, "avisos": _aviso.generacion()}
@@ -0,0 +1,150 @@
+# src/services/catalogo_productos.py
+"""
+Catálogo de productos en memoria: Producto.id -> (nombre, precio).
+
+Los productos son pocos y cambian poco, pero el reporte de fidelización los
+necesitaba en cada fila (JOIN con productos). Con el catálogo, el reporte de
+fidelización y el reporte de productos consultan solo las compras y detalles y
+resuelven el nombre y el precio en memoria.
+
+El catálogo se carga completo la primera vez que se usa y se recarga cuando cambia
+su versión (consultas.VERSION_CATALOGO_PRODUCTOS: número de productos y el
+updated_at más reciente). La versión se consulta como mucho cada
+CATALOGO_PRODUCTOS_VERIFICAR_SEGUNDOS; un id que no está en el catálogo (producto
+recién creado) fuerza la verificación. Los cambios hechos con SQL directo que no
+actualicen updated_at no se detectan: hay que reiniciar el worker.
+"""
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from flask import Flask, current_app
+
+from src.extensions import db
+from src.models import consultas
+
+
+class ProductoCatalogo(NamedTuple):
+    id: uuid.UUID
+    nombre: str
+    precio: Decimal
+
+
+class CatalogoProductos:
+    """
+    Catálogo de una app, seguro entre hilos.
+
+    Args:
+        verificar_segundos: Intervalo mínimo entre consultas de la versión
+    """
+
+    def __init__(self, verificar_segundos: float = 5):
+        self.verificar_segundos = verificar_segundos
+        self._productos: Dict[uuid.UUID, ProductoCatalogo] = {}
+        self._version: Optional[Tuple] = None
+        self._ultima_verificacion = float("-inf")
+        self._candado = threading.Lock()
+        self.cargas = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _verificar(self, forzar: bool = False) -> None:
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_verificacion < self.verificar_segundos:
+            return
+        with self._candado:
+            if not forzar and ahora - self._ultima_verificacion < self.verificar_segundos:
+                return
+            conexion = db.session.connection()
+            version = tuple(conexion.execute(consultas.VERSION_CATALOGO_PRODUCTOS).one())
+            if version != self._version:
+                self._productos = {
+                    fila.id: ProductoCatalogo(fila.id, fila.nombre, fila.precio_centavos)
+                    for fila in conexion.execute(consultas.CATALOGO_PRODUCTOS)
+                }
+                self._version = version
+                self.cargas += 1
+            self._ultima_verificacion = time.monotonic()
+
+    def obtener(self, producto_id: uuid.UUID) -> Optional[ProductoCatalogo]:
+        """
+        Producto del catálogo, o None si no existe.
+
+        Args:
+            producto_id: Id del producto
+        """
+        self._verificar()
+        producto = self._productos.get(producto_id)
+        if producto is None:
+            self._verificar(forzar=True)
+            producto = self._productos.get(producto_id)
+        if producto is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return producto
+
+    def __len__(self) -> int:
+        return len(self._productos)
+
+    def metricas(self) -> Dict:
+        return {
+            "productos": len(self._productos),
+            "verificarSegundos": self.verificar_segundos,
+            "cargas": self.cargas,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def catalogo() -> Optional[CatalogoProductos]:
+    return current_app.extensions.get("catalogo_productos")
+
+
+def obtener(producto_id: uuid.UUID) -> Optional[ProductoCatalogo]:
+    """
+    Producto por id: del catálogo o, si está deshabilitado, de la base de datos.
+
+    Args:
+        producto_id: Id del producto
+
+    Returns:
+        ProductoCatalogo o None si no existe
+    """
+    actual = catalogo()
+    if actual is not None:
+        return actual.obtener(producto_id)
+
+    from src.models.producto import Producto
+
+    producto = db.session.get(Producto, producto_id)
+    if producto is None:
+        return None
+    return ProductoCatalogo(producto.id, producto.nombre, producto.precio)
+
+
+def nombre(producto_id: uuid.UUID) -> str:
+    """Nombre del producto ("" si ya no existe)."""
+    producto = obtener(producto_id)
+    return producto.nombre if producto is not None else ""
+
+
+def metricas() -> Dict:
+    actual = catalogo()
+    if actual is None:
+        return {"habilitado": False}
+    return {"habilitado": True, **actual.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """Crea el catálogo de la app si CATALOGO_PRODUCTOS_HABILITADO (se carga al primer uso)."""
+    if not app.config.get("CATALOGO_PRODUCTOS_HABILITADO", True):
+        return
+    app.extensions["catalogo_productos"] = CatalogoProductos(
+        verificar_segundos=app.config["CATALOGO_PRODUCTOS_VERIFICAR_SEGUNDOS"],
+    )
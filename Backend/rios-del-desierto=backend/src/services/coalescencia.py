@@ -0,0 +1,137 @@
+# src/services/coalescencia.py
+"""
+Coalescencia de solicitudes idénticas concurrentes ("single flight").
+
+Si varias solicitudes piden lo mismo (misma clave) mientras la primera todavía se
+está resolviendo, solo la primera ejecuta la consulta o el cálculo; las demás
+esperan y reciben su mismo resultado (o su misma excepción). No es una caché: en
+cuanto la ejecución termina, la clave se libera y la siguiente solicitud vuelve a
+consultar la base de datos.
+
+- VueloUnico: para la app Flask (un hilo por request)
+- VueloUnicoAsincrono: para la API asíncrona (src/api/asincrono.py)
+
+Grupos de la app Flask (init_app): "busquedas_cliente" (cliente por tipo + número
+normalizado) y "reportes_fidelizacion" (contenido del reporte por modo/formato/shards).
+Se desactivan con COALESCENCIA_HABILITADA = False.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from flask import Flask, current_app
+
+T = TypeVar("T")
+
+
+class VueloUnico:
+    """Coalescencia entre hilos: una sola ejecución en curso por clave."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._en_curso: Dict[Hashable, Future] = {}
+        # Contadores: ejecuciones reales y solicitudes que reusaron una en curso
+        self.ejecutadas = 0
+        self.compartidas = 0
+
+    def ejecutar(self, clave: Hashable, funcion: Callable[[], T]) -> T:
+        """
+        Ejecuta `funcion` o, si ya hay una ejecución en curso con la misma clave,
+        espera su resultado.
+
+        Args:
+            clave: Identifica solicitudes equivalentes
+            funcion: Cálculo a ejecutar (sin argumentos)
+
+        Returns:
+            El resultado de la ejecución (compartido entre todas las solicitudes)
+        """
+        with self._candado:
+            futuro = self._en_curso.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._en_curso[clave] = futuro
+            else:
+                self.compartidas += 1
+        if not lider:
+            return futuro.result()
+
+        try:
+            resultado = funcion()
+        except BaseException as e:
+            self._liberar(clave)
+            futuro.set_exception(e)
+            raise
+        self._liberar(clave)
+        futuro.set_result(resultado)
+        return resultado
+
+    def _liberar(self, clave: Hashable) -> None:
+        # Antes de publicar el resultado: una solicitud que llegue después ya no lo reusa
+        with self._candado:
+            del self._en_curso[clave]
+            self.ejecutadas += 1
+
+    def en_curso(self) -> int:
+        """Número de claves con una ejecución en curso."""
+        with self._candado:
+            return len(self._en_curso)
+
+
+class VueloUnicoAsincrono:
+    """
+    Coalescencia entre tareas de un mismo event loop. La ejecución corre en su
+    propia tarea: si la solicitud que la inició se cancela (cliente desconectado),
+    las demás siguen esperando el resultado.
+    """
+
+    def __init__(self):
+        self._en_curso: Dict[Hashable, asyncio.Task] = {}
+        self.ejecutadas = 0
+        self.compartidas = 0
+
+    async def ejecutar(self, clave: Hashable, funcion: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Equivalente asíncrono de VueloUnico.ejecutar.
+
+        Args:
+            clave: Identifica solicitudes equivalentes
+            funcion: Corrutina a ejecutar (sin argumentos)
+        """
+        tarea = self._en_curso.get(clave)
+        if tarea is not None:
+            self.compartidas += 1
+        else:
+            tarea = asyncio.ensure_future(funcion())
+            self._en_curso[clave] = tarea
+            tarea.add_done_callback(lambda _: self._terminar(clave))
+        return await asyncio.shield(tarea)
+
+    def _terminar(self, clave: Hashable) -> None:
+        del self._en_curso[clave]
+        self.ejecutadas += 1
+
+    def en_curso(self) -> int:
+        return len(self._en_curso)
+
+
+GRUPOS = ("busquedas_cliente", "reportes_fidelizacion")
+
+
+def ejecutar(grupo: str, clave: Hashable, funcion: Callable[[], T]) -> T:
+    """
+    Ejecuta `funcion` coalesciendo con las solicitudes en curso del mismo grupo y
+    clave en la app actual (o directamente, si la coalescencia está desactivada).
+    """
+    vuelo = current_app.extensions["coalescencia"].get(grupo)
+    if vuelo is None:
+        return funcion()
+    return vuelo.ejecutar(clave, funcion)
+
+
+def init_app(app: Flask) -> None:
+    """Crea los grupos de coalescencia de la app según COALESCENCIA_HABILITADA."""
+    habilitada = app.config.get("COALESCENCIA_HABILITADA", True)
+    app.extensions["coalescencia"] = {grupo: VueloUnico() for grupo in GRUPOS} if habilitada else {}
@@ -0,0 +1,255 @@
+# src/services/exportacion_cliente.py
+"""
+Archivos de exportación de un cliente (CSV, TXT, Excel).
+
+Compartido por el endpoint Flask /clientes/exportar y por la API asíncrona
+(src/api/asincrono.py). Recibe la fila de consultas.cliente_por_documento.
+
+Exportación por lote (/clientes/exportar-lote): un solo archivo con una fila (o
+bloque, en TXT) por cliente, o un zip con el archivo de cada cliente. Se genera
+en streaming a medida que llegan las filas de la consulta: los primeros bytes se
+envían antes de leer todos los clientes y la memoria no crece con el lote.
+"""
+import csv
+import zipfile
+from datetime import datetime
+from io import BytesIO, StringIO
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.services.xlsx import ESTILO_ENCABEZADO, EscritorXlsx
+
+FORMATOS = ("CSV", "TXT", "EXCEL")
+
+# Exportación por lote: un archivo con todos los clientes o un zip con uno por cliente
+EMPAQUETADOS = ("ARCHIVO", "ZIP")
+
+# Columnas de datos_exportacion y su ancho en el Excel del lote (escrito en streaming)
+COLUMNAS = [
+    "ID",
+    "Nombre",
+    "Apellido",
+    "Correo Electrónico",
+    "Teléfono Celular",
+    "Fecha de Nacimiento",
+    "Tipo Documento",
+    "Número Documento",
+    "Fecha Creación",
+    "Fecha Actualización",
+]
+ANCHOS_LOTE = [36, 20, 20, 30, 18, 20, 15, 18, 26, 26]
+
+# Filas por fragmento enviado en el CSV y el Excel del lote
+_FILAS_POR_FRAGMENTO = 100
+
+MIMETYPES = {
+    "CSV": "text/csv",
+    "TXT": "text/plain",
+    "EXCEL": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+EXTENSIONES = {
+    "CSV": "csv",
+    "TXT": "txt",
+    "EXCEL": "xlsx",
+}
+
+
+def datos_exportacion(cliente) -> Dict[str, str]:
+    """Campos exportados del cliente, en el orden en que aparecen en el archivo."""
+    return {
+        "ID": str(cliente.id),
+        "Nombre": cliente.nombre,
+        "Apellido": cliente.apellido,
+        "Correo Electrónico": cliente.correo_electronico,
+        "Teléfono Celular": cliente.telefono_celular,
+        "Fecha de Nacimiento": cliente.fecha_nacimiento.isoformat() if cliente.fecha_nacimiento else "N/A",
+        "Tipo Documento": cliente.tipo_documento.value,
+        "Número Documento": cliente.numero_documento,
+        "Fecha Creación": cliente.created_at.isoformat() if cliente.created_at else "N/A",
+        "Fecha Actualización": cliente.updated_at.isoformat() if cliente.updated_at else "N/A"
+    }
+
+
+def nombre_archivo(cliente, formato: str) -> str:
+    """Nombre de descarga: cliente_<nombre>_<apellido>_<fecha>.<extensión>."""
+    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"cliente_{cliente.nombre}_{cliente.apellido}_{fecha_str}.{EXTENSIONES[formato]}"
+
+
+def construir_exportacion(datos_cliente: Dict[str, str], formato: str) -> bytes:
+    """
+    Genera el contenido del archivo de exportación.
+
+    Args:
+        datos_cliente: Campos devueltos por datos_exportacion
+        formato: CSV, TXT o EXCEL
+
+    Returns:
+        Contenido del archivo
+    """
+    if formato == "CSV":
+        # Generar CSV
+        df = pd.DataFrame([datos_cliente])
+        output = BytesIO()
+        df.to_csv(output, index=False, encoding='utf-8-sig')
+        return output.getvalue()
+
+    if formato == "TXT":
+        # Generar TXT
+        output = StringIO()
+        output.write("=" * 50 + "\n")
+        output.write("INFORMACIÓN DEL CLIENTE\n")
+        output.write("=" * 50 + "\n\n")
+
+        for clave, valor in datos_cliente.items():
+            output.write(f"{clave}: {valor}\n")
+
+        output.write("\n" + "=" * 50 + "\n")
+        return output.getvalue().encode('utf-8')
+
+    if formato == "EXCEL":
+        # Generar Excel
+        df = pd.DataFrame([datos_cliente])
+        output = BytesIO()
+
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Información Cliente', index=False)
+
+            # Formatear la hoja
+            worksheet = writer.sheets['Información Cliente']
+
+            # Ajustar ancho de columnas
+            for idx, col in enumerate(df.columns, 1):
+                max_length = max(
+                    df[col].astype(str).map(len).max(),
+                    len(col)
+                ) + 2
+                col_letter = get_column_letter(idx)
+                worksheet.column_dimensions[col_letter].width = min(max_length, 50)
+
+        return output.getvalue()
+
+    raise ValueError(f"Formato inválido: {formato}")
+
+
+# --------------------------------------
+# Exportación por lote
+# --------------------------------------
+class _Flujo:
+    """Destino no seekable (zipfile escribe en modo streaming): acumula los bytes hasta extraerlos."""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def extraer(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _transmitir_csv(filas: Iterable) -> Iterator[bytes]:
+    salida = StringIO()
+    escritor = csv.writer(salida, lineterminator="\n")
+    escritor.writerow(COLUMNAS)
+    yield ("\ufeff" + salida.getvalue()).encode("utf-8")
+
+    salida.seek(0)
+    salida.truncate()
+    for numero, fila in enumerate(filas, 1):
+        escritor.writerow(datos_exportacion(fila).values())
+        if numero % _FILAS_POR_FRAGMENTO == 0:
+            yield salida.getvalue().encode("utf-8")
+            salida.seek(0)
+            salida.truncate()
+    yield salida.getvalue().encode("utf-8")
+
+
+def _transmitir_excel(filas: Iterable) -> Iterator[bytes]:
+    flujo = _Flujo()
+    with EscritorXlsx(flujo, "Clientes", numero_columnas=len(COLUMNAS), anchos_fijos=ANCHOS_LOTE) as hoja:
+        hoja.escribir_fila(COLUMNAS, estilo=ESTILO_ENCABEZADO)
+        yield flujo.extraer()
+        for numero, fila in enumerate(filas, 1):
+            hoja.escribir_fila(datos_exportacion(fila).values())
+            if numero % _FILAS_POR_FRAGMENTO == 0:
+                yield flujo.extraer()
+    yield flujo.extraer()
+
+
+def _transmitir_zip(filas: Iterable, formato: str, no_encontrados) -> Iterator[bytes]:
+    flujo = _Flujo()
+    # Los .xlsx ya vienen comprimidos: se guardan sin volver a comprimir
+    compresion = zipfile.ZIP_STORED if formato == "EXCEL" else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(flujo, "w", compression=compresion) as archivo_zip:
+        for fila in filas:
+            nombre = f"cliente_{fila.tipo_documento.value}_{fila.numero_documento_normalizado}.{EXTENSIONES[formato]}"
+            archivo_zip.writestr(nombre, construir_exportacion(datos_exportacion(fila), formato))
+            yield flujo.extraer()
+
+        faltantes = no_encontrados()
+        if faltantes:
+            archivo_zip.writestr("no_encontrados.txt", "".join(f"{documento}\n" for documento in faltantes))
+    yield flujo.extraer()
+
+
+def transmitir_lote(
+    filas: Iterable,
+    documentos: List[Tuple[TipoDocumentoEnum, str]],
+    formato: str,
+    empaquetado: str = "ARCHIVO",
+) -> Iterator[bytes]:
+    """
+    Genera en streaming la exportación de varios clientes.
+
+    Args:
+        filas: Filas de consultas.clientes_por_documentos (se consumen a medida que se escriben)
+        documentos: Documentos solicitados (tipo, número), para informar los que no tienen cliente
+        formato: CSV, TXT o EXCEL
+        empaquetado: ARCHIVO (un archivo con todos los clientes) o ZIP (un archivo por cliente)
+
+    Yields:
+        Fragmentos del archivo (csv, txt, xlsx o zip)
+
+    Los documentos sin cliente se listan al final del TXT y en no_encontrados.txt
+    dentro del zip; el CSV y el Excel solo contienen los clientes encontrados.
+    """
+    encontrados = set()
+
+    def registrar(filas: Iterable) -> Iterator:
+        for fila in filas:
+            encontrados.add((fila.tipo_documento, fila.numero_documento_normalizado))
+            yield fila
+
+    def no_encontrados() -> List[str]:
+        return [
+            f"{tipo_documento.value} {numero_documento}"
+            for tipo_documento, numero_documento in documentos
+            if (tipo_documento, normalizar_numero_documento(tipo_documento, numero_documento)) not in encontrados
+        ]
+
+    filas = registrar(filas)
+    if empaquetado == "ZIP":
+        yield from _transmitir_zip(filas, formato, no_encontrados)
+    elif formato == "CSV":
+        yield from _transmitir_csv(filas)
+    elif formato == "EXCEL":
+        yield from _transmitir_excel(filas)
+    else:
+        for fila in filas:
+            yield construir_exportacion(datos_exportacion(fila), "TXT") + b"\n"
+        faltantes = no_encontrados()
+        if faltantes:
+            texto = "DOCUMENTOS NO ENCONTRADOS\n" + "".join(f"{documento}\n" for documento in faltantes)
+            yield texto.encode("utf-8")
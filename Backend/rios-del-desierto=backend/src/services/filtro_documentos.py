@@ -0,0 +1,380 @@
+# src/services/filtro_documentos.py
+"""
+Filtro de Bloom en memoria sobre los documentos registrados (tipo + número
+normalizado), para responder 404 sin consultar la base de datos cuando el
+documento seguro no existe (clientes de paso que no están registrados).
+
+Un filtro de Bloom puede dar falsos positivos (el documento "tal vez existe" y la
+consulta no lo encuentra) pero nunca falsos negativos para lo que se le agregó:
+
+- Se construye leyendo la tabla documentos, siempre fuera de create_app (los
+  comandos de la CLI no la recorren): en el hilo de precalentamiento si
+  PRECALENTAMIENTO_HABILITADO, al arrancar la API asíncrona, o en un hilo que lanza
+  la primera búsqueda. Mientras no está construido no descarta nada.
+- Cada documento se agrega con su número normalizado guardado y con el que da la
+  regla actual de normalizar_numero_documento: durante una renormalización
+  (migración normalizar-documentos) ambos valores se encuentran.
+- crear_cliente agrega el documento nuevo en cuanto el INSERT pasa (antes del commit).
+- Los documentos creados o modificados por otros procesos (otros workers, seed, CLI)
+  se agregan con un refresco incremental: ante un descarte, si el último refresco
+  tiene más de FILTRO_DOCUMENTOS_REFRESCO_SEGUNDOS, se leen primero los cambios de
+  clientes de la bandeja de salida (models/cambio.py) posteriores al cursor, con la
+  foto del documento de cada cliente. El cursor (id autoincremental) no depende del
+  formato de los ids de documentos ni de los relojes, y retrocede
+  MARGEN_REFRESCO_SEGUNDOS para no saltar transacciones que se confirman tarde.
+
+Configuración: FILTRO_DOCUMENTOS_HABILITADO, FILTRO_DOCUMENTOS_TASA_FP (tasa de
+falsos positivos objetivo), FILTRO_DOCUMENTOS_CAPACIDAD (documentos previstos) y
+FILTRO_DOCUMENTOS_MEMORIA_MAX_MB (tope de memoria; si se alcanza, la tasa real sube).
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.extensions import db
+from src.models.cambio import Cambio
+from src.models.documento import Documento, normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+
+_documentos = Documento.__table__
+_cambios = Cambio.__table__
+
+# Margen del refresco incremental: cubre transacciones largas y relojes desfasados
+# entre procesos (un cambio puede confirmarse después de que otro con id mayor)
+MARGEN_REFRESCO_SEGUNDOS = 60
+
+DOCUMENTOS = select(
+    _documentos.c.tipo_documento,
+    _documentos.c.numero_documento,
+    _documentos.c.numero_documento_normalizado,
+)
+
+# Altas y modificaciones de clientes (la foto incluye su documento)
+CAMBIOS_CLIENTES = select(_cambios.c.id, _cambios.c.creado_en, _cambios.c.datos).where(
+    _cambios.c.entidad == "cliente",
+    _cambios.c.operacion != "eliminar",
+)
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom con k funciones hash derivadas de un solo blake2b (doble hashing).
+
+    Args:
+        capacidad: Elementos previstos
+        tasa_falsos_positivos: Tasa objetivo con `capacidad` elementos
+        memoria_max_bytes: Tope de tamaño del arreglo de bits (opcional)
+    """
+
+    def __init__(self, capacidad: int, tasa_falsos_positivos: float, memoria_max_bytes: Optional[int] = None):
+        capacidad = max(capacidad, 1)
+        bits = math.ceil(-capacidad * math.log(tasa_falsos_positivos) / (math.log(2) ** 2))
+        if memoria_max_bytes:
+            bits = min(bits, memoria_max_bytes * 8)
+        self.numero_bits = max(bits, 64)
+        self.funciones_hash = max(1, round(self.numero_bits / capacidad * math.log(2)))
+        self.capacidad = capacidad
+        self.tasa_objetivo = tasa_falsos_positivos
+        self.elementos = 0
+        self._bits = bytearray((self.numero_bits + 7) // 8)
+
+    def _posiciones(self, clave: bytes):
+        digest = hashlib.blake2b(clave, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.numero_bits
+        return [(h1 + i * h2) % m for i in range(self.funciones_hash)]
+
+    def agregar(self, clave: bytes) -> None:
+        """Agrega una clave (el llamador serializa las escrituras)."""
+        bits = self._bits
+        for posicion in self._posiciones(clave):
+            bits[posicion >> 3] |= 1 << (posicion & 7)
+        self.elementos += 1
+
+    def __contains__(self, clave: bytes) -> bool:
+        bits = self._bits
+        return all(bits[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(clave))
+
+    @property
+    def bytes_memoria(self) -> int:
+        return len(self._bits)
+
+    def tasa_estimada(self) -> float:
+        """Tasa de falsos positivos esperada con los elementos agregados hasta ahora."""
+        k, m = self.funciones_hash, self.numero_bits
+        return (1 - math.exp(-k * self.elementos / m)) ** k
+
+
+def _clave(tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> bytes:
+    return f"{tipo_documento.value}\x1f{numero_normalizado}".encode("utf-8")
+
+
+def _claves(tipo_documento: TipoDocumentoEnum, numero_documento: str, numero_normalizado: Optional[str]) -> Iterator[bytes]:
+    """Claves de un documento: su número normalizado guardado y el de la regla actual."""
+    actual = normalizar_numero_documento(tipo_documento, numero_documento)
+    yield _clave(tipo_documento, actual)
+    if numero_normalizado and numero_normalizado != actual:
+        yield _clave(tipo_documento, numero_normalizado)
+
+
+class FiltroDocumentos:
+    """Filtro de Bloom de los documentos de una app, con refresco incremental y métricas."""
+
+    def __init__(
+        self,
+        tasa_falsos_positivos: float = 0.01,
+        capacidad: int = 1_000_000,
+        memoria_max_bytes: Optional[int] = None,
+        refresco_segundos: float = 1.0,
+    ):
+        self.tasa_falsos_positivos = tasa_falsos_positivos
+        self.capacidad = capacidad
+        self.memoria_max_bytes = memoria_max_bytes
+        self.refresco_segundos = refresco_segundos
+
+        self._filtro: Optional[FiltroBloom] = None
+        self._candado = threading.Lock()
+        self._candado_refresco = threading.Lock()
+        # Documentos agregados mientras se construye un filtro nuevo
+        self._pendientes: Optional[List[bytes]] = None
+        self._ultimo_refresco = 0.0
+        self._ultimo_intento = 0.0
+        self._construyendo = False
+        # Último cambio (models/cambio.py) ya incorporado sin margen
+        self._cursor = 0
+
+        self.consultas = 0
+        self.descartes = 0
+        self.falsos_positivos = 0
+        self.refrescos = 0
+        self.duracion_construccion_ms: Optional[float] = None
+
+    @property
+    def construido(self) -> bool:
+        return self._filtro is not None
+
+    def construir(self) -> int:
+        """
+        Construye el filtro leyendo todos los documentos y reemplaza el actual.
+
+        Returns:
+            Número de documentos cargados
+        """
+        inicio = time.perf_counter()
+        instante = time.time()
+        with self._candado:
+            self._pendientes = []
+        try:
+            with db.engine.connect() as conexion:
+                # Antes de recorrer los documentos: lo posterior lo cubre el refresco
+                cursor = Cambio.cursor_asentado(conexion, MARGEN_REFRESCO_SEGUNDOS)
+                total = conexion.execute(select(func.count()).select_from(_documentos)).scalar() or 0
+                # Holgura para los documentos que se creen hasta la próxima construcción
+                filtro = FiltroBloom(
+                    max(self.capacidad, total * 2),
+                    self.tasa_falsos_positivos,
+                    self.memoria_max_bytes,
+                )
+                filas = conexion.execution_options(yield_per=10_000).execute(DOCUMENTOS)
+                for tipo_documento, numero_documento, numero_normalizado in filas:
+                    for clave in _claves(tipo_documento, numero_documento, numero_normalizado):
+                        filtro.agregar(clave)
+            with self._candado:
+                for clave in self._pendientes:
+                    if clave not in filtro:
+                        filtro.agregar(clave)
+                self._filtro = filtro
+                self._cursor = cursor
+                self._ultimo_refresco = instante
+        finally:
+            with self._candado:
+                self._pendientes = None
+        self.duracion_construccion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        return filtro.elementos
+
+    def refrescar(self) -> int:
+        """
+        Agrega los documentos de los clientes creados o modificados (por cualquier
+        proceso) desde el cursor. El cursor solo avanza hasta los cambios con más de
+        MARGEN_REFRESCO_SEGUNDOS: los recientes se releen en el siguiente refresco.
+
+        Returns:
+            Número de cambios leídos
+        """
+        instante = time.time()
+        limite = datetime.utcnow() - timedelta(seconds=MARGEN_REFRESCO_SEGUNDOS)
+        with db.engine.connect() as conexion:
+            filas = conexion.execute(
+                CAMBIOS_CLIENTES.where(_cambios.c.id > self._cursor).order_by(_cambios.c.id)
+            ).all()
+        with self._candado:
+            filtro = self._filtro
+            for fila in filas:
+                documento = (fila.datos or {}).get("documento")
+                if documento:
+                    tipo_documento = TipoDocumentoEnum(documento["tipoDocumento"])
+                    # Con el margen se releen cambios ya agregados: no se cuentan dos veces
+                    for clave in _claves(tipo_documento, documento["numeroDocumento"], None):
+                        if clave not in filtro:
+                            filtro.agregar(clave)
+                if fila.creado_en < limite:
+                    self._cursor = max(self._cursor, fila.id)
+            self._ultimo_refresco = instante
+        self.refrescos += 1
+        return len(filas)
+
+    def agregar(self, tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> None:
+        """Agrega un documento recién creado en este proceso."""
+        clave = _clave(tipo_documento, numero_normalizado)
+        with self._candado:
+            if self._filtro is not None:
+                self._filtro.agregar(clave)
+            if self._pendientes is not None:
+                self._pendientes.append(clave)
+
+    def descarta(self, tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> bool:
+        """
+        Indica si el documento seguro no existe (se puede responder 404 sin consultar).
+
+        Si el filtro no está construido lanza su construcción en un hilo (como mucho
+        una vez por intervalo de refresco, p. ej. si la base de datos aún no está
+        migrada) y no descarta nada mientras tanto.
+        """
+        if self._filtro is None:
+            self._construir_en_segundo_plano()
+            return False
+
+        self.consultas += 1
+        clave = _clave(tipo_documento, numero_normalizado)
+        if clave in self._filtro:
+            return False
+
+        # Antes de descartar, incorporar lo que hayan creado otros procesos
+        if time.time() - self._ultimo_refresco > self.refresco_segundos:
+            with self._candado_refresco:
+                if time.time() - self._ultimo_refresco > self.refresco_segundos:
+                    self.refrescar()
+            if clave in self._filtro:
+                return False
+
+        self.descartes += 1
+        return True
+
+    def registrar_falso_positivo(self) -> None:
+        """El filtro dijo "tal vez existe" y la consulta no encontró el documento."""
+        if self._filtro is not None:
+            self.falsos_positivos += 1
+
+    def _construir_en_segundo_plano(self) -> None:
+        ahora = time.time()
+        with self._candado:
+            if self._construyendo or ahora - self._ultimo_intento < self.refresco_segundos:
+                return
+            self._construyendo = True
+            self._ultimo_intento = ahora
+        threading.Thread(
+            target=self._construir_en_hilo,
+            args=(current_app._get_current_object(),),
+            name="filtro-documentos",
+            daemon=True,
+        ).start()
+
+    def _construir_en_hilo(self, app: Flask) -> None:
+        try:
+            with app.app_context():
+                self.construir()
+        except SQLAlchemyError as e:
+            # Base de datos sin migrar (p. ej. antes de `flask db upgrade`): se reintenta
+            app.logger.warning("Filtro de documentos no construido: %s", e.__class__.__name__)
+        finally:
+            self._construyendo = False
+
+    def metricas(self) -> Dict:
+        filtro = self._filtro
+        metricas = {
+            "construido": filtro is not None,
+            "consultas": self.consultas,
+            "descartes": self.descartes,
+            "falsosPositivos": self.falsos_positivos,
+            "refrescos": self.refrescos,
+            "tasaFalsosPositivosObjetivo": self.tasa_falsos_positivos,
+        }
+        if filtro is not None:
+            consultadas_en_bd = self.consultas - self.descartes
+            metricas.update({
+                "elementos": filtro.elementos,
+                "capacidad": filtro.capacidad,
+                "bits": filtro.numero_bits,
+                "funcionesHash": filtro.funciones_hash,
+                "bytesMemoria": filtro.bytes_memoria,
+                "tasaFalsosPositivosEstimada": round(filtro.tasa_estimada(), 6),
+                "tasaFalsosPositivosObservada": (
+                    round(self.falsos_positivos / consultadas_en_bd, 6) if consultadas_en_bd else None
+                ),
+                "duracionConstruccionMs": self.duracion_construccion_ms,
+            })
+        return metricas
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def _filtro_app() -> Optional[FiltroDocumentos]:
+    return current_app.extensions.get("filtro_documentos")
+
+
+def descarta(tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> bool:
+    """True si el documento seguro no existe; False si hay que consultar (o no hay filtro)."""
+    filtro = _filtro_app()
+    return filtro is not None and filtro.descarta(tipo_documento, numero_normalizado)
+
+
+def agregar(tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> None:
+    filtro = _filtro_app()
+    if filtro is not None:
+        filtro.agregar(tipo_documento, numero_normalizado)
+
+
+def registrar_falso_positivo() -> None:
+    filtro = _filtro_app()
+    if filtro is not None:
+        filtro.registrar_falso_positivo()
+
+
+def preparar() -> None:
+    """Construye el filtro de la app si aún no está construido (recorre la tabla documentos)."""
+    filtro = _filtro_app()
+    if filtro is not None and not filtro.construido:
+        filtro.construir()
+
+
+def metricas() -> Dict:
+    filtro = _filtro_app()
+    if filtro is None:
+        return {"habilitado": False}
+    return {"habilitado": True, **filtro.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """
+    Crea el filtro de la app si FILTRO_DOCUMENTOS_HABILITADO. No lo construye: ver
+    preparar y FiltroDocumentos.descarta.
+    """
+    if not app.config.get("FILTRO_DOCUMENTOS_HABILITADO", True):
+        return
+
+    filtro = FiltroDocumentos(
+        tasa_falsos_positivos=app.config["FILTRO_DOCUMENTOS_TASA_FP"],
+        capacidad=app.config["FILTRO_DOCUMENTOS_CAPACIDAD"],
+        memoria_max_bytes=int(app.config["FILTRO_DOCUMENTOS_MEMORIA_MAX_MB"] * 1024 * 1024) or None,
+        refresco_segundos=app.config["FILTRO_DOCUMENTOS_REFRESCO_SEGUNDOS"],
+    )
+    app.extensions["filtro_documentos"] = filtro
@@ -0,0 +1,204 @@
+# src/services/indice_memoria.py
+"""
+Índice completo en memoria de clientes por documento (PRECALENTAMIENTO_INDICE_COMPLETO).
+
+Diccionario hash (tipo, número normalizado) -> fila de consultas.CLIENTES_CON_DOCUMENTO
+con todos los clientes, cargado por el precalentamiento. A diferencia de la caché de
+búsquedas no tiene tope de entradas ni vencimiento: ocupa memoria proporcional al
+número de clientes (del orden de cientos de bytes por cliente).
+
+Para no servir datos viejos, cada PRECALENTAMIENTO_INDICE_REFRESCO_SEGUNDOS (al
+buscar) lee los cambios de clientes de la bandeja de salida (models/cambio.py)
+posteriores a su cursor y vuelve a leer esos clientes: los creados se agregan, los
+modificados se reemplazan (también si cambió su documento) y los eliminados se
+quitan. Como el filtro de documentos, el cursor solo avanza hasta los cambios con
+más de filtro_documentos.MARGEN_REFRESCO_SEGUNDOS, para no saltar transacciones
+tardías; los cambios recientes ya aplicados se recuerdan y no se vuelven a leer.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+from flask import Flask, current_app
+from sqlalchemy import select
+
+from src.extensions import db
+from src.models import consultas
+from src.models.cambio import Cambio
+from src.models.cliente import Cliente
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+from src.services.filtro_documentos import MARGEN_REFRESCO_SEGUNDOS
+
+_cambios = Cambio.__table__
+_clientes = Cliente.__table__
+
+# Clientes releídos por consulta en el refresco
+TAMANO_LOTE_REFRESCO = 500
+
+# Clientes creados, modificados o eliminados (un cambio de documento es un cambio del cliente)
+CAMBIOS_CLIENTES = select(_cambios.c.id, _cambios.c.creado_en, _cambios.c.entidad_id).where(
+    _cambios.c.entidad == "cliente",
+)
+
+
+def _clave(fila) -> Hashable:
+    return (
+        fila.tipo_documento,
+        fila.numero_documento_normalizado or normalizar_numero_documento(fila.tipo_documento, fila.numero_documento),
+    )
+
+
+def _leer_clientes(conexion, clientes: Iterable[uuid.UUID]) -> List:
+    """Filas actuales de los clientes (los eliminados no aparecen)."""
+    clientes = list(clientes)
+    filas = []
+    for inicio in range(0, len(clientes), TAMANO_LOTE_REFRESCO):
+        lote = clientes[inicio:inicio + TAMANO_LOTE_REFRESCO]
+        filas.extend(conexion.execute(consultas.CLIENTES_CON_DOCUMENTO.where(_clientes.c.id.in_(lote))))
+    return filas
+
+
+class IndiceMemoria:
+    """
+    Índice documento -> fila de cliente, sin vencimiento, seguro entre hilos.
+
+    Args:
+        refresco_segundos: Intervalo mínimo entre lecturas de la bandeja de cambios
+    """
+
+    def __init__(self, refresco_segundos: float = 1.0):
+        self.refresco_segundos = refresco_segundos
+        self._filas: Dict[Hashable, object] = {}
+        self._claves_por_cliente: Dict[uuid.UUID, Hashable] = {}
+        self._candado = threading.Lock()
+        self._candado_refresco = threading.Lock()
+        self._cursor = 0
+        # Cambios posteriores al cursor ya aplicados (dentro del margen)
+        self._aplicados: Set[int] = set()
+        self._ultimo_refresco = 0.0
+        self.cargado = False
+        self.aciertos = 0
+        self.fallos = 0
+        self.actualizados = 0
+        self.duracion_carga_ms: Optional[float] = None
+
+    def cargar(self) -> int:
+        """
+        Lee todos los clientes con documento y reemplaza el índice.
+
+        Returns:
+            Número de clientes cargados
+        """
+        inicio = time.perf_counter()
+        filas: Dict[Hashable, object] = {}
+        claves_por_cliente: Dict[uuid.UUID, Hashable] = {}
+        with db.engine.connect() as conexion:
+            # Antes de leer los clientes: los cambios posteriores los relee el refresco
+            cursor = Cambio.cursor_asentado(conexion, MARGEN_REFRESCO_SEGUNDOS)
+            resultado = conexion.execution_options(yield_per=10_000).execute(consultas.CLIENTES_CON_DOCUMENTO)
+            for fila in resultado:
+                clave = _clave(fila)
+                filas[clave] = fila
+                claves_por_cliente[fila.id] = clave
+        with self._candado:
+            self._filas = filas
+            self._claves_por_cliente = claves_por_cliente
+            self._cursor = cursor
+            self._aplicados = set()
+            self._ultimo_refresco = time.time()
+            self.cargado = True
+        self.duracion_carga_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        return len(filas)
+
+    def refrescar(self) -> int:
+        """
+        Vuelve a leer los clientes con cambios posteriores al cursor que aún no se
+        aplicaron.
+
+        Returns:
+            Número de clientes releídos
+        """
+        limite = datetime.utcnow() - timedelta(seconds=MARGEN_REFRESCO_SEGUNDOS)
+        with db.engine.connect() as conexion:
+            cambios = [
+                fila for fila in conexion.execute(
+                    CAMBIOS_CLIENTES.where(_cambios.c.id > self._cursor).order_by(_cambios.c.id)
+                )
+                if fila.id not in self._aplicados
+            ]
+            clientes = list({fila.entidad_id for fila in cambios})
+            filas = _leer_clientes(conexion, clientes)
+
+        with self._candado:
+            for cliente_id in clientes:
+                clave = self._claves_por_cliente.pop(cliente_id, None)
+                if clave is not None:
+                    self._filas.pop(clave, None)
+            for fila in filas:
+                clave = _clave(fila)
+                self._filas[clave] = fila
+                self._claves_por_cliente[fila.id] = clave
+            for fila in cambios:
+                self._aplicados.add(fila.id)
+                if fila.creado_en < limite:
+                    self._cursor = max(self._cursor, fila.id)
+            self._aplicados = {cambio_id for cambio_id in self._aplicados if cambio_id > self._cursor}
+            self._ultimo_refresco = time.time()
+        self.actualizados += len(clientes)
+        return len(clientes)
+
+    def obtener(self, tipo_documento: TipoDocumentoEnum, numero_normalizado: str):
+        """Fila del cliente, o None si no está (o el índice aún no se cargó)."""
+        if not self.cargado:
+            return None
+        if time.time() - self._ultimo_refresco > self.refresco_segundos:
+            with self._candado_refresco:
+                if time.time() - self._ultimo_refresco > self.refresco_segundos:
+                    self.refrescar()
+        fila = self._filas.get((tipo_documento, numero_normalizado))
+        if fila is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return fila
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def metricas(self) -> Dict:
+        total = self.aciertos + self.fallos
+        return {
+            "cargado": self.cargado,
+            "entradas": len(self._filas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasaAciertos": round(self.aciertos / total, 4) if total else None,
+            "actualizados": self.actualizados,
+            "duracionCargaMs": self.duracion_carga_ms,
+        }
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def indice_app() -> Optional[IndiceMemoria]:
+    return current_app.extensions.get("indice_memoria")
+
+
+def metricas() -> Dict:
+    indice = indice_app()
+    if indice is None:
+        return {"habilitado": False}
+    return {"habilitado": True, **indice.metricas()}
+
+
+def init_app(app: Flask) -> None:
+    """Crea el índice (vacío) si PRECALENTAMIENTO_HABILITADO y PRECALENTAMIENTO_INDICE_COMPLETO."""
+    if not (app.config.get("PRECALENTAMIENTO_HABILITADO") and app.config.get("PRECALENTAMIENTO_INDICE_COMPLETO")):
+        return
+    app.extensions["indice_memoria"] = IndiceMemoria(
+        refresco_segundos=app.config["PRECALENTAMIENTO_INDICE_REFRESCO_SEGUNDOS"],
+    )
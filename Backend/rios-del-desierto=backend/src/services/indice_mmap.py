@@ -0,0 +1,356 @@
+# src/services/indice_mmap.py
+"""
+Índice binario de solo lectura de clientes por documento, leído con mmap.
+
+Pensado para las tiendas: las búsquedas se resuelven en microsegundos desde un
+archivo local y siguen funcionando si la base de datos no está disponible. Todos
+los workers abren el mismo archivo con mmap, así que comparten las mismas páginas
+del page cache del sistema operativo (sin copiar el índice a cada proceso).
+
+Formato:
+
+    Cabecera (64 bytes, little endian)
+        magic "RDDIDX01", versión de formato (u32), tamaño de entrada (u32),
+        número de entradas (u64), inicio del heap (u64), fecha de generación (f64)
+    Entradas (16 bytes cada una, big endian, ordenadas por clave)
+        clave: 8 bytes de blake2b("TIPO\\x1fnúmero normalizado"), comparada como
+        bytes; offset (u32) y largo (u32) del registro en el heap
+    Heap de cadenas
+        un registro por cliente: campos UTF-8 precedidos por su largo (u16), en el
+        orden de CAMPOS
+
+La búsqueda es binaria sobre las entradas; como la clave es un hash, se compara
+además el tipo y el número del registro (colisiones).
+
+`flask exportar-indice` genera el archivo en un temporal y lo reemplaza con
+os.replace (atómico): los lectores detectan el archivo nuevo (otro inode o mtime)
+como mucho cada INDICE_MMAP_VERIFICAR_SEGUNDOS y abren la nueva versión; los que
+estaban leyendo la anterior terminan sobre el mmap viejo.
+
+Modos (INDICE_MMAP_MODO):
+    no       No se usa el índice (por defecto)
+    primero  Se busca en el índice; si no está (clientes creados después de
+             exportar) se consulta la base de datos
+    solo     Solo el índice: un documento que no está responde 404 sin consultar
+             la base de datos (mientras el archivo no exista, se usa la base de datos)
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from flask import Flask, current_app
+
+from src.extensions import db
+from src.models import consultas
+from src.models.documento import normalizar_numero_documento
+from src.models.enums import TipoDocumentoEnum
+
+MAGIC = b"RDDIDX01"
+VERSION_FORMATO = 1
+CABECERA = struct.Struct("<8sIIQQd")
+TAMANO_CABECERA = 64
+ENTRADA = struct.Struct(">8sII")
+_OFFSET_LARGO = struct.Struct(">II")
+_LARGO_CAMPO = struct.Struct("<H")
+
+CAMPOS = (
+    "tipo_documento",
+    "numero_documento_normalizado",
+    "numero_documento",
+    "id",
+    "nombre",
+    "apellido",
+    "correo_electronico",
+    "telefono_celular",
+    "fecha_nacimiento",
+    "created_at",
+    "updated_at",
+)
+
+MODOS = ("no", "primero", "solo")
+
+
+class FilaIndice(NamedTuple):
+    """Cliente leído del índice; mismos atributos que consultas.CLIENTE_POR_DOCUMENTO."""
+    id: uuid.UUID
+    nombre: str
+    apellido: str
+    correo_electronico: str
+    telefono_celular: str
+    fecha_nacimiento: Optional[date]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    tipo_documento: TipoDocumentoEnum
+    numero_documento: str
+
+
+def clave_documento(tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> bytes:
+    """Clave de 8 bytes de un documento (tipo + número normalizado)."""
+    return hashlib.blake2b(
+        f"{tipo_documento.value}\x1f{numero_normalizado}".encode("utf-8"),
+        digest_size=8,
+    ).digest()
+
+
+def _normalizado(fila) -> str:
+    return fila.numero_documento_normalizado or normalizar_numero_documento(fila.tipo_documento, fila.numero_documento)
+
+
+def _codificar_registro(fila) -> bytes:
+    valores = (
+        fila.tipo_documento.value,
+        _normalizado(fila),
+        fila.numero_documento,
+        fila.id.hex,
+        fila.nombre,
+        fila.apellido,
+        fila.correo_electronico,
+        fila.telefono_celular,
+        fila.fecha_nacimiento.isoformat() if fila.fecha_nacimiento else "",
+        fila.created_at.isoformat() if fila.created_at else "",
+        fila.updated_at.isoformat() if fila.updated_at else "",
+    )
+    partes = []
+    for valor in valores:
+        datos = (valor or "").encode("utf-8")
+        partes.append(_LARGO_CAMPO.pack(len(datos)))
+        partes.append(datos)
+    return b"".join(partes)
+
+
+def exportar_indice(destino: Path) -> int:
+    """
+    Escribe el índice de todos los clientes con documento en `destino` (reemplazo atómico).
+
+    Args:
+        destino: Ruta del archivo de índice
+
+    Returns:
+        Número de entradas escritas
+    """
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+
+    claves = []
+    offsets = array("Q")
+    largos = array("I")
+    with tempfile.TemporaryFile() as heap, db.engine.connect() as conexion:
+        posicion = 0
+        filas = conexion.execution_options(yield_per=10_000).execute(consultas.CLIENTES_CON_DOCUMENTO)
+        for fila in filas:
+            registro = _codificar_registro(fila)
+            claves.append(clave_documento(fila.tipo_documento, _normalizado(fila)))
+            offsets.append(posicion)
+            largos.append(len(registro))
+            heap.write(registro)
+            posicion += len(registro)
+        if posicion > 0xFFFF_FFFF:
+            raise ValueError("El heap del índice supera 4 GiB")
+
+        orden = sorted(range(len(claves)), key=claves.__getitem__)
+        inicio_heap = TAMANO_CABECERA + ENTRADA.size * len(claves)
+
+        # Temporal en la misma carpeta: os.replace es atómico dentro del mismo sistema de archivos
+        descriptor, temporal = tempfile.mkstemp(prefix=f".{destino.name}.", dir=destino.parent)
+        try:
+            with os.fdopen(descriptor, "wb") as salida:
+                salida.write(CABECERA.pack(
+                    MAGIC, VERSION_FORMATO, ENTRADA.size, len(claves), inicio_heap, time.time(),
+                ).ljust(TAMANO_CABECERA, b"\0"))
+                salida.write(b"".join(
+                    ENTRADA.pack(claves[i], offsets[i], largos[i]) for i in orden
+                ))
+                heap.seek(0)
+                while bloque := heap.read(1 << 20):
+                    salida.write(bloque)
+                salida.flush()
+                os.fsync(salida.fileno())
+            os.replace(temporal, destino)
+        except BaseException:
+            Path(temporal).unlink(missing_ok=True)
+            raise
+    return len(claves)
+
+
+class _Version:
+    """Un archivo de índice abierto con mmap."""
+
+    def __init__(self, ruta: Path):
+        with open(ruta, "rb") as archivo:
+            estado = os.fstat(archivo.fileno())
+            self.mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identidad = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        magic, version, tamano_entrada, self.entradas, self.inicio_heap, self.generado_en = (
+            CABECERA.unpack_from(self.mapa, 0)
+        )
+        if magic != MAGIC or version != VERSION_FORMATO or tamano_entrada != ENTRADA.size:
+            raise ValueError(f"Archivo de índice inválido: {ruta}")
+
+    def buscar(self, tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> Optional[FilaIndice]:
+        mapa = self.mapa
+        clave = clave_documento(tipo_documento, numero_normalizado)
+
+        # Primera entrada con clave >= buscada
+        bajo, alto = 0, self.entradas
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            inicio = TAMANO_CABECERA + medio * ENTRADA.size
+            if mapa[inicio:inicio + 8] < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+
+        tipo = tipo_documento.value
+        while bajo < self.entradas:
+            inicio = TAMANO_CABECERA + bajo * ENTRADA.size
+            if mapa[inicio:inicio + 8] != clave:
+                return None
+            offset, largo = _OFFSET_LARGO.unpack_from(mapa, inicio + 8)
+            valores = self._leer_registro(self.inicio_heap + offset)
+            if valores[0] == tipo and valores[1] == numero_normalizado:
+                return _fila(valores)
+            bajo += 1
+        return None
+
+    def _leer_registro(self, posicion: int):
+        mapa = self.mapa
+        valores = []
+        for _ in CAMPOS:
+            (largo,) = _LARGO_CAMPO.unpack_from(mapa, posicion)
+            posicion += 2
+            valores.append(mapa[posicion:posicion + largo].decode("utf-8"))
+            posicion += largo
+        return valores
+
+
+def _fila(valores) -> FilaIndice:
+    (tipo, _normalizado, numero, id_hex, nombre, apellido, correo, telefono,
+     fecha_nacimiento, created_at, updated_at) = valores
+    return FilaIndice(
+        id=uuid.UUID(hex=id_hex),
+        nombre=nombre,
+        apellido=apellido,
+        correo_electronico=correo,
+        telefono_celular=telefono,
+        fecha_nacimiento=date.fromisoformat(fecha_nacimiento) if fecha_nacimiento else None,
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+        updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+        tipo_documento=TipoDocumentoEnum(tipo),
+        numero_documento=numero,
+    )
+
+
+class IndiceClientes:
+    """
+    Lector del índice con recarga atómica al aparecer una versión nueva del archivo.
+
+    Args:
+        ruta: Archivo generado por exportar_indice
+        modo: "primero" o "solo" (ver docstring del módulo)
+        verificar_segundos: Cada cuánto se mira si el archivo cambió
+    """
+
+    def __init__(self, ruta: Path, modo: str = "primero", verificar_segundos: float = 1.0):
+        self.ruta = Path(ruta)
+        self.modo = modo
+        self.verificar_segundos = verificar_segundos
+        self._version: Optional[_Version] = None
+        self._candado = threading.Lock()
+        self._ultima_verificacion = float("-inf")
+        self.busquedas = 0
+        self.aciertos = 0
+        self.recargas = 0
+        self.error: Optional[str] = None
+
+    @property
+    def solo(self) -> bool:
+        return self.modo == "solo"
+
+    def version(self) -> Optional[_Version]:
+        """Versión vigente del archivo (recargándola si hay una nueva)."""
+        ahora = time.monotonic()
+        if ahora - self._ultima_verificacion >= self.verificar_segundos:
+            with self._candado:
+                if ahora - self._ultima_verificacion >= self.verificar_segundos:
+                    self._ultima_verificacion = ahora
+                    self._recargar_si_cambio()
+        return self._version
+
+    def _recargar_si_cambio(self) -> None:
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return
+        identidad = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        if self._version is not None and self._version.identidad == identidad:
+            return
+        try:
+            # El mmap anterior se libera cuando terminan las búsquedas que lo usan
+            self._version = _Version(self.ruta)
+            self.recargas += 1
+            self.error = None
+        except (OSError, ValueError, struct.error) as e:
+            self.error = str(e)
+
+    def buscar(self, tipo_documento: TipoDocumentoEnum, numero_normalizado: str) -> Optional[FilaIndice]:
+        version = self.version()
+        if version is None:
+            return None
+        self.busquedas += 1
+        fila = version.buscar(tipo_documento, numero_normalizado)
+        if fila is not None:
+            self.aciertos += 1
+        return fila
+
+    def metricas(self) -> Dict:
+        version = self._version
+        return {
+            "modo": self.modo,
+            "ruta": str(self.ruta),
+            "cargado": version is not None,
+            "entradas": version.entradas if version else 0,
+            "generadoEn": (
+                datetime.fromtimestamp(version.generado_en).isoformat(timespec="seconds") if version else None
+            ),
+            "busquedas": self.busquedas,
+            "aciertos": self.aciertos,
+            "recargas": self.recargas,
+            "error": self.error,
+        }
+
+
+# --------------------------------------
+# Acceso desde la app Flask
+# --------------------------------------
+def indice_app() -> Optional[IndiceClientes]:
+    return current_app.extensions.get("indice_clientes")
+
+
+def metricas() -> Dict:
+    indice = indice_app()
+    if indice is None:
+        return {"modo": "no"}
+    return indice.metricas()
+
+
+def init_app(app: Flask) -> None:
+    """Crea el lector del índice si INDICE_MMAP_MODO es "primero" o "solo"."""
+    modo = app.config.get("INDICE_MMAP_MODO", "no")
+    if modo not in MODOS:
+        raise ValueError(f"INDICE_MMAP_MODO inválido: {modo}. Valores válidos: {', '.join(MODOS)}")
+    if modo == "no":
+        return
+    app.extensions["indice_clientes"] = IndiceClientes(
+        app.config["INDICE_MMAP_RUTA"],
+        modo=modo,
+        verificar_segundos=app.config["INDICE_MMAP_VERIFICAR_SEGUNDOS"],
+    )
@@ -0,0 +1,351 @@
+# src/services/migraciones_datos.py
+"""
+Migraciones de datos en línea, por lotes y reanudables.
+
+Las migraciones de Alembic (migrations/versions) cambian el esquema; los rellenos
+de datos sobre tablas grandes (columnas nuevas, normalizaciones, claves nuevas) se
+hacen aquí, con la API en línea:
+
+    1. Una migración de Alembic agrega la columna (nullable, sin default: no copia
+       la tabla) y el código de la app empieza a escribirla en las filas nuevas.
+    2. `flask migrar-datos <nombre>` rellena las filas existentes.
+    3. Una migración de Alembic posterior agrega el NOT NULL / índice / restricción.
+
+El ejecutor recorre la tabla en orden de clave (keyset, sin OFFSET sobre la
+tabla): cada lote toma las siguientes `tamano_lote` claves después de la última
+procesada, aplica la migración a ese rango y guarda la nueva posición en la tabla
+migraciones_datos, todo en una transacción corta. Si el proceso se interrumpe, la
+siguiente ejecución continúa desde la última posición confirmada.
+
+Para no competir con la API:
+    - El tamaño del lote se ajusta para que cada transacción dure cerca de
+      `segundos_por_lote` (los bloqueos se liberan en cada confirmación).
+    - `pausa_segundos` deja libre la base de datos entre lotes.
+
+Las migraciones escriben con SQLAlchemy Core: no generan cambios en el feed
+(src/models/cambio.py) ni disparan validaciones del ORM.
+"""
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import Table, and_, bindparam, func, insert, or_, select, true, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.extensions import db
+from src.models.migracion_datos import MigracionDatos
+
+
+class MigracionEnCurso(Exception):
+    """Otro proceso tiene el arriendo vigente de la migración."""
+
+
+class ArriendoPerdido(Exception):
+    """Otro proceso tomó la migración mientras se ejecutaba un lote."""
+
+
+class Migracion(ABC):
+    """
+    Migración de datos de una tabla, por rangos de su clave.
+
+    Las subclases definen:
+        nombre: Identificador (flask migrar-datos <nombre>)
+        descripcion: Texto para `flask migraciones-datos`
+        clave: Columna única y ordenable de la tabla (normalmente la PK)
+        tabla(): Tabla recorrida
+        pendientes(tabla): Condición opcional de las filas que aún requieren la
+            migración (permite reejecutarla sin repetir trabajo)
+        migrar_lote(conn, tabla, condicion): Aplica la migración a las filas que
+            cumplen `condicion` (un rango de claves) y devuelve cuántas procesó
+    """
+    nombre: str = ""
+    descripcion: str = ""
+    clave: str = "id"
+
+    @abstractmethod
+    def tabla(self) -> Table:
+        ...
+
+    def pendientes(self, tabla: Table) -> Optional[ColumnElement]:
+        return None
+
+    @abstractmethod
+    def migrar_lote(self, conn: Connection, tabla: Table, condicion: ColumnElement) -> int:
+        ...
+
+
+MIGRACIONES: Dict[str, Migracion] = {}
+
+
+def registrar(clase):
+    """Decorador: registra la migración para `flask migrar-datos`."""
+    migracion = clase()
+    MIGRACIONES[migracion.nombre] = migracion
+    return clase
+
+
+def _clave_desde_texto(columna, texto: Optional[str]):
+    if texto is None:
+        return None
+    return columna.type.python_type(texto)
+
+
+def _tomar(engine: Engine, nombre: str, propietario: str, reiniciar: bool, arriendo_segundos: float):
+    """
+    Crea (si no existe) y toma el arriendo de la migración.
+
+    Returns:
+        Fila de migraciones_datos tomada, o None si ya está completada
+
+    Raises:
+        MigracionEnCurso: Si otro proceso tiene el arriendo vigente
+    """
+    progreso = MigracionDatos.__table__
+    ahora = datetime.utcnow()
+
+    with engine.begin() as conn:
+        fila = conn.execute(select(progreso).where(progreso.c.nombre == nombre)).first()
+        if fila is None:
+            try:
+                conn.execute(insert(progreso).values(
+                    nombre=nombre, estado="pendiente", filas_procesadas=0, lotes=0,
+                ))
+            except IntegrityError:
+                raise MigracionEnCurso(f"La migración '{nombre}' se está creando en otro proceso")
+            fila = conn.execute(select(progreso).where(progreso.c.nombre == nombre)).first()
+
+        if fila.estado == "completada" and not reiniciar:
+            return None
+
+        valores = {
+            "estado": "en_curso",
+            "propietario": propietario,
+            "bloqueada_hasta": ahora + timedelta(seconds=arriendo_segundos),
+            "actualizada_en": ahora,
+            "error": None,
+        }
+        if reiniciar:
+            valores.update(ultima_clave=None, filas_procesadas=0, lotes=0,
+                           iniciada_en=ahora, completada_en=None)
+        elif fila.iniciada_en is None:
+            valores["iniciada_en"] = ahora
+
+        resultado = conn.execute(
+            update(progreso)
+            .where(
+                progreso.c.nombre == nombre,
+                or_(progreso.c.propietario.is_(None), progreso.c.bloqueada_hasta < ahora),
+            )
+            .values(**valores)
+        )
+        if resultado.rowcount != 1:
+            raise MigracionEnCurso(
+                f"La migración '{nombre}' se está ejecutando en otro proceso "
+                f"(arriendo hasta {fila.bloqueada_hasta})"
+            )
+        return conn.execute(select(progreso).where(progreso.c.nombre == nombre)).first()
+
+
+def _liberar(engine: Engine, nombre: str, propietario: str, estado: str, error: Optional[str] = None) -> None:
+    progreso = MigracionDatos.__table__
+    ahora = datetime.utcnow()
+    valores = {"estado": estado, "propietario": None, "bloqueada_hasta": None,
+               "actualizada_en": ahora, "error": error}
+    if estado == "completada":
+        valores["completada_en"] = ahora
+    with engine.begin() as conn:
+        conn.execute(
+            update(progreso)
+            .where(progreso.c.nombre == nombre, progreso.c.propietario == propietario)
+            .values(**valores)
+        )
+
+
+def ejecutar(
+    migracion: Migracion,
+    engine: Optional[Engine] = None,
+    tamano_lote: int = 5000,
+    segundos_por_lote: float = 0.25,
+    pausa_segundos: float = 0.0,
+    max_lotes: Optional[int] = None,
+    reiniciar: bool = False,
+    arriendo_segundos: float = 60.0,
+    al_avanzar: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Ejecuta (o reanuda) una migración de datos por lotes.
+
+    Args:
+        migracion: Migración a ejecutar
+        engine: Engine de la base de datos (por defecto el de la app)
+        tamano_lote: Filas por lote (máximo; se reduce si los lotes tardan más de
+            `segundos_por_lote`)
+        segundos_por_lote: Duración objetivo de cada transacción (0: tamaño fijo)
+        pausa_segundos: Pausa entre lotes
+        max_lotes: Detenerse tras este número de lotes (queda pendiente y se reanuda
+            en la siguiente ejecución)
+        reiniciar: Empezar desde el principio aunque haya progreso o esté completada
+        arriendo_segundos: Vida del arriendo; se renueva en cada lote
+        al_avanzar: Función llamada después de cada lote con el progreso
+
+    Returns:
+        Diccionario con el estado final y las filas y lotes de esta ejecución
+
+    Raises:
+        MigracionEnCurso: Si otro proceso la está ejecutando
+        ArriendoPerdido: Si otro proceso la tomó durante la ejecución
+    """
+    engine = engine or db.engine
+    propietario = uuid.uuid4().hex
+    progreso = MigracionDatos.__table__
+
+    fila = _tomar(engine, migracion.nombre, propietario, reiniciar, arriendo_segundos)
+    if fila is None:
+        return {"estado": "completada", "filas": 0, "lotes": 0, "segundos": 0.0}
+
+    tabla = migracion.tabla()
+    clave = tabla.c[migracion.clave]
+    desde = _clave_desde_texto(clave, fila.ultima_clave)
+    tamano_minimo = min(100, tamano_lote)
+    tamano = tamano_lote
+
+    filas = 0
+    lotes = 0
+    estado = "pendiente"
+    inicio = time.monotonic()
+
+    try:
+        while max_lotes is None or lotes < max_lotes:
+            inicio_lote = time.monotonic()
+            with engine.begin() as conn:
+                condicion = clave > desde if desde is not None else true()
+                pendientes = migracion.pendientes(tabla)
+                if pendientes is not None:
+                    condicion = and_(condicion, pendientes)
+
+                # Fin del rango: la clave número `tamano` (o la última si quedan menos)
+                hasta = conn.scalar(
+                    select(clave).where(condicion).order_by(clave).offset(tamano - 1).limit(1)
+                )
+                if hasta is None:
+                    hasta = conn.scalar(select(func.max(clave)).where(condicion))
+                if hasta is None:
+                    estado = "completada"
+                    break
+
+                procesadas = migracion.migrar_lote(conn, tabla, and_(condicion, clave <= hasta))
+
+                # Posición en la misma transacción que los cambios del lote
+                resultado = conn.execute(
+                    update(progreso)
+                    .where(progreso.c.nombre == migracion.nombre, progreso.c.propietario == propietario)
+                    .values(
+                        ultima_clave=str(hasta),
+                        filas_procesadas=progreso.c.filas_procesadas + procesadas,
+                        lotes=progreso.c.lotes + 1,
+                        bloqueada_hasta=datetime.utcnow() + timedelta(seconds=arriendo_segundos),
+                        actualizada_en=datetime.utcnow(),
+                    )
+                )
+                if resultado.rowcount != 1:
+                    raise ArriendoPerdido(f"Otro proceso tomó la migración '{migracion.nombre}'")
+
+            desde = hasta
+            filas += procesadas
+            lotes += 1
+
+            duracion = time.monotonic() - inicio_lote
+            if segundos_por_lote:
+                if duracion > segundos_por_lote * 2 and tamano > tamano_minimo:
+                    tamano = max(tamano_minimo, tamano // 2)
+                elif duracion < segundos_por_lote / 2 and tamano < tamano_lote:
+                    tamano = min(tamano_lote, tamano * 2)
+
+            if al_avanzar is not None:
+                al_avanzar({
+                    "filas": filas,
+                    "lotes": lotes,
+                    "tamanoLote": tamano,
+                    "segundosLote": duracion,
+                    "segundos": time.monotonic() - inicio,
+                })
+
+            if pausa_segundos:
+                time.sleep(pausa_segundos)
+    except ArriendoPerdido:
+        raise
+    except Exception as error:
+        _liberar(engine, migracion.nombre, propietario, "fallida", error=repr(error))
+        raise
+    except BaseException:
+        # Interrupción (Ctrl+C): queda pendiente para reanudarla
+        _liberar(engine, migracion.nombre, propietario, "pendiente")
+        raise
+
+    _liberar(engine, migracion.nombre, propietario, estado)
+    segundos = time.monotonic() - inicio
+    return {"estado": estado, "filas": filas, "lotes": lotes, "segundos": segundos}
+
+
+def ejecutar_por_nombre(nombre: str, **opciones) -> Dict:
+    """
+    Ejecuta una migración registrada.
+
+    Raises:
+        KeyError: Si no hay una migración registrada con ese nombre
+    """
+    return ejecutar(MIGRACIONES[nombre], **opciones)
+
+
+def estado() -> Dict[str, Optional[Dict]]:
+    """Progreso guardado de cada migración registrada (None: nunca ejecutada)."""
+    guardadas = {
+        fila.nombre: fila.to_dict()
+        for fila in db.session.scalars(select(MigracionDatos)).all()
+    }
+    return {nombre: guardadas.get(nombre) for nombre in MIGRACIONES}
+
+
+# --------------------------------------
+# Migraciones registradas
+# --------------------------------------
+@registrar
+class NormalizarDocumentos(Migracion):
+    """
+    Recalcula numero_documento_normalizado con la regla actual de
+    normalizar_numero_documento (p. ej. tras cambiarla para un tipo de documento).
+    Solo escribe las filas cuyo valor cambia; los números que quedan vacíos se
+    guardan como NULL (ck_doc_numero_normalizado_no_vacio).
+    """
+    nombre = "normalizar-documentos"
+    descripcion = "Recalcula el número de documento normalizado de todos los documentos"
+
+    def tabla(self) -> Table:
+        from src.models.documento import Documento
+        return Documento.__table__
+
+    def migrar_lote(self, conn: Connection, tabla: Table, condicion: ColumnElement) -> int:
+        from src.models.documento import normalizar_numero_documento
+
+        filas = conn.execute(
+            select(tabla.c.id, tabla.c.tipo_documento, tabla.c.numero_documento,
+                   tabla.c.numero_documento_normalizado).where(condicion)
+        ).all()
+        cambios = []
+        for fila in filas:
+            # Vacío (sin dígitos o sin letras ni dígitos): NULL, como en f1c7d3a9e5b0
+            normalizado = normalizar_numero_documento(fila.tipo_documento, fila.numero_documento) or None
+            if normalizado != fila.numero_documento_normalizado:
+                cambios.append({"b_id": fila.id, "b_normalizado": normalizado})
+        if cambios:
+            conn.execute(
+                update(tabla)
+                .where(tabla.c.id == bindparam("b_id"))
+                .values(numero_documento_normalizado=bindparam("b_normalizado")),
+                cambios,
+            )
+        return len(filas)
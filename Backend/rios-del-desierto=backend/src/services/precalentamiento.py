@@ -0,0 +1,101 @@
+# src/services/precalentamiento.py
+"""
+Precalentamiento al iniciar un worker (PRECALENTAMIENTO_HABILITADO).
+
+Corre en un hilo en segundo plano para no retrasar el arranque:
+    1. Construye el filtro de documentos (services/filtro_documentos.py)
+    2. Carga en la caché de búsquedas los PRECALENTAMIENTO_CLIENTES clientes con la
+       compra más reciente (hasta CACHE_BUSQUEDAS_MAX_ENTRADAS), lo que de paso
+       calienta las páginas de los índices de clientes y documentos en la base de datos
+    3. Con PRECALENTAMIENTO_INDICE_COMPLETO, carga todos los clientes en el índice
+       en memoria sin vencimiento (services/indice_memoria.py)
+
+Mientras tanto /health (liveness) responde ok y /ready (readiness) responde 503,
+para que el balanceador no envíe tráfico POS a un worker frío. Si un paso falla,
+el worker queda listo igual (con la caché fría) y el error se reporta en /ready.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.extensions import db
+from src.models import consultas
+from src.services import cache_busquedas, filtro_documentos, indice_memoria
+
+
+class EstadoPrecalentamiento:
+    """Estado del precalentamiento de una app (lo lee /ready)."""
+
+    def __init__(self, habilitado: bool):
+        self.habilitado = habilitado
+        self.listo = threading.Event()
+        self.clientes_cargados = 0
+        self.clientes_indice = 0
+        self.error: Optional[str] = None
+        self.duracion_ms: Optional[float] = None
+        if not habilitado:
+            self.listo.set()
+
+    def to_dict(self) -> Dict:
+        return {
+            "habilitado": self.habilitado,
+            "listo": self.listo.is_set(),
+            "clientesCargados": self.clientes_cargados,
+            "clientesIndice": self.clientes_indice,
+            "duracionMs": self.duracion_ms,
+            "error": self.error,
+        }
+
+
+def precalentar(app: Flask, estado: EstadoPrecalentamiento) -> None:
+    """Ejecuta los pasos del precalentamiento y marca la app como lista."""
+    inicio = time.perf_counter()
+    try:
+        with app.app_context():
+            filtro_documentos.preparar()
+
+            cache = cache_busquedas.cache_app()
+            if cache is not None:
+                estado.clientes_cargados = _cargar_clientes(cache)
+
+            indice = indice_memoria.indice_app()
+            if indice is not None:
+                estado.clientes_indice = indice.cargar()
+    except SQLAlchemyError as e:
+        estado.error = f"{e.__class__.__name__}: {getattr(e, 'orig', None) or e}"
+        app.logger.warning("Precalentamiento incompleto: %s", estado.error)
+    finally:
+        estado.duracion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        estado.listo.set()
+
+
+def _cargar_clientes(cache: cache_busquedas.CacheBusquedas) -> int:
+    with db.engine.connect() as conexion:
+        filas = conexion.execute(
+            consultas.CLIENTES_RECIENTES,
+            {"limite": min(current_app.config["PRECALENTAMIENTO_CLIENTES"], cache.max_entradas)},
+        )
+        return cache.precargar(
+            ((fila.tipo_documento, fila.numero_documento_normalizado), fila)
+            for fila in filas
+        )
+
+
+def estado_app() -> EstadoPrecalentamiento:
+    return current_app.extensions["precalentamiento"]
+
+
+def init_app(app: Flask) -> None:
+    """Lanza el hilo de precalentamiento si PRECALENTAMIENTO_HABILITADO."""
+    estado = EstadoPrecalentamiento(app.config.get("PRECALENTAMIENTO_HABILITADO", False))
+    app.extensions["precalentamiento"] = estado
+    if estado.habilitado:
+        threading.Thread(
+            target=precalentar,
+            args=(app, estado),
+            name="precalentamiento",
+            daemon=True,
+        ).start()
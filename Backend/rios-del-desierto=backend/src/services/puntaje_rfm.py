@@ -0,0 +1,203 @@
+# src/services/puntaje_rfm.py
+"""
+Motor de puntaje RFM vectorizado.
+
+1. Una sola consulta de proyección (cliente_id, fecha, monto en centavos) sobre
+   las compras completadas de la ventana, incluidas las archivadas (vista
+   `compras_historico`), leída en bloques a arreglos NumPy.
+2. Agregados por cliente con sort-and-reduce (argsort + np.*.reduceat), sin
+   objetos ORM ni bucles de Python por compra.
+3. Puntajes por quintil (los valores empatados reciben el mismo puntaje) y escritura masiva en `cliente_puntajes_rfm`.
+"""
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import BigInteger, DateTime, Integer, String, column, delete, insert, select, table
+
+from src.extensions import db
+from src.models.enums import EstadoCompraEnum
+from src.models.cliente_puntaje_rfm import ClientePuntajeRFM
+
+TAMANO_BLOQUE = 100_000
+
+
+def cargar_compras_columnar(fecha_desde: datetime) -> Dict[str, np.ndarray]:
+    """
+    Lee las compras completadas desde `fecha_desde` como arreglos columnares.
+
+    Lee la vista `compras_historico`: con una ventana mayor que el horizonte de
+    archivo (ARCHIVO_HORIZONTE_DIAS) las compras archivadas también cuentan.
+
+    Los ids se leen en su representación cruda de la base de datos (sin construir
+    objetos uuid.UUID) y se escriben de vuelta igual.
+
+    Returns:
+        Diccionario con los arreglos `cliente_id`, `fecha` (datetime64[s]) y `monto` (int64, centavos)
+    """
+    compras = table(
+        "compras_historico",
+        column("cliente_id", String),
+        column("fecha", DateTime),
+        column("monto_total_centavos", BigInteger),
+        column("status"),
+    )
+    stmt = (
+        select(compras.c.cliente_id, compras.c.fecha, compras.c.monto_total_centavos)
+        .where(
+            compras.c.status == EstadoCompraEnum.COMPLETADA.value,
+            compras.c.fecha >= fecha_desde,
+        )
+        .execution_options(stream_results=True)
+    )
+
+    ids, fechas, montos = [], [], []
+    resultado = db.session.execute(stmt)
+    for bloque in resultado.partitions(TAMANO_BLOQUE):
+        cliente_ids, fechas_bloque, montos_bloque = zip(*bloque)
+        ids.append(np.array(cliente_ids, dtype=str))
+        fechas.append(np.array(fechas_bloque, dtype="datetime64[s]"))
+        montos.append(np.array(montos_bloque, dtype=np.int64))
+
+    if not ids:
+        return {
+            "cliente_id": np.array([], dtype=str),
+            "fecha": np.array([], dtype="datetime64[s]"),
+            "monto": np.array([], dtype=np.int64),
+        }
+
+    return {
+        "cliente_id": np.concatenate(ids),
+        "fecha": np.concatenate(fechas),
+        "monto": np.concatenate(montos),
+    }
+
+
+def _quintil(valores: np.ndarray) -> np.ndarray:
+    """
+    Puntaje 1-5 según el quintil del valor (mayor valor, mayor puntaje).
+
+    Usa el rango promedio de cada valor (searchsorted sobre los valores ordenados):
+    los empates (p. ej. muchos clientes con frecuencia 1) reciben el mismo puntaje
+    en lugar de repartirse entre quintiles según el orden de lectura.
+    """
+    n = len(valores)
+    ordenados = np.sort(valores)
+    # Doble del rango promedio (0-based) del grupo de empates: primero + último
+    rangos_dobles = (
+        np.searchsorted(ordenados, valores, side="left")
+        + np.searchsorted(ordenados, valores, side="right") - 1
+    )
+    return (rangos_dobles * 5 // (2 * n) + 1).astype(np.int64)
+
+
+def calcular_puntajes(columnas: Dict[str, np.ndarray], ahora: datetime) -> Dict[str, np.ndarray]:
+    """
+    Agrega por cliente y calcula los puntajes RFM.
+
+    Returns:
+        Diccionario de arreglos alineados por cliente: cliente_id, recencia_dias,
+        frecuencia, monto, puntaje_r, puntaje_f, puntaje_m, puntaje_total
+    """
+    cliente_ids = columnas["cliente_id"]
+    if len(cliente_ids) == 0:
+        return {}
+
+    # Sort-and-reduce: códigos enteros por cliente, orden por código y reduceat por grupo
+    unicos, codigos = np.unique(cliente_ids, return_inverse=True)
+    orden = np.argsort(codigos, kind="stable")
+    codigos_ordenados = codigos[orden]
+    inicios = np.flatnonzero(np.r_[True, codigos_ordenados[1:] != codigos_ordenados[:-1]])
+
+    monto = np.add.reduceat(columnas["monto"][orden], inicios)
+    ultima_fecha = np.maximum.reduceat(columnas["fecha"][orden].astype(np.int64), inicios)
+    frecuencia = np.diff(np.r_[inicios, len(orden)])
+
+    ahora_s = np.datetime64(ahora, "s").astype(np.int64)
+    recencia_dias = (ahora_s - ultima_fecha) // 86_400
+
+    # Recencia: menos días desde la última compra es mejor
+    puntaje_r = _quintil(-recencia_dias)
+    puntaje_f = _quintil(frecuencia)
+    puntaje_m = _quintil(monto)
+
+    return {
+        "cliente_id": unicos,
+        "recencia_dias": recencia_dias,
+        "frecuencia": frecuencia,
+        "monto": monto,
+        "puntaje_r": puntaje_r,
+        "puntaje_f": puntaje_f,
+        "puntaje_m": puntaje_m,
+        "puntaje_total": puntaje_r + puntaje_f + puntaje_m,
+    }
+
+
+def calcular_puntajes_rfm(dias: int = 365, tamano_lote_escritura: int = 10_000) -> int:
+    """
+    Recalcula el puntaje RFM de todos los clientes con compras en la ventana y
+    reemplaza la tabla `cliente_puntajes_rfm` en una sola transacción.
+
+    Args:
+        dias: Ventana (en días) de compras consideradas
+        tamano_lote_escritura: Filas por INSERT masivo
+
+    Returns:
+        Número de clientes con puntaje
+    """
+    ahora = datetime.utcnow()
+    columnas = cargar_compras_columnar(ahora - timedelta(days=dias))
+    puntajes = calcular_puntajes(columnas, ahora)
+
+    # Vista "cruda" de la tabla: el id y el monto ya vienen en su representación
+    # de base de datos (id sin convertir a uuid.UUID, monto en centavos)
+    tabla_cruda = table(
+        ClientePuntajeRFM.__tablename__,
+        column("cliente_id", String),
+        column("recencia_dias", Integer),
+        column("frecuencia", Integer),
+        column("monto_centavos", BigInteger),
+        column("puntaje_r", Integer),
+        column("puntaje_f", Integer),
+        column("puntaje_m", Integer),
+        column("puntaje_total", Integer),
+        column("calculado_en", DateTime),
+    )
+
+    try:
+        db.session.execute(delete(ClientePuntajeRFM.__table__))
+
+        total = len(puntajes.get("cliente_id", ()))
+        for inicio in range(0, total, tamano_lote_escritura):
+            fin = inicio + tamano_lote_escritura
+            filas = [
+                {
+                    "cliente_id": cliente_id,
+                    "recencia_dias": recencia,
+                    "frecuencia": frecuencia,
+                    "monto_centavos": monto,
+                    "puntaje_r": r,
+                    "puntaje_f": f,
+                    "puntaje_m": m,
+                    "puntaje_total": t,
+                    "calculado_en": ahora,
+                }
+                for cliente_id, recencia, frecuencia, monto, r, f, m, t in zip(
+                    puntajes["cliente_id"][inicio:fin].tolist(),
+                    puntajes["recencia_dias"][inicio:fin].tolist(),
+                    puntajes["frecuencia"][inicio:fin].tolist(),
+                    puntajes["monto"][inicio:fin].tolist(),
+                    puntajes["puntaje_r"][inicio:fin].tolist(),
+                    puntajes["puntaje_f"][inicio:fin].tolist(),
+                    puntajes["puntaje_m"][inicio:fin].tolist(),
+                    puntajes["puntaje_total"][inicio:fin].tolist(),
+                )
+            ]
+            db.session.execute(insert(tabla_cruda), filas)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return total
@@ -0,0 +1,258 @@
+# src/services/reporte_fidelizacion.py
+"""
+Construcción del reporte de fidelización (Excel / CSV).
+
+Modo paralelo: los clientes elegibles se reparten en shards por hash del
+cliente_id y cada shard se renderiza (filas + bloques de subtotal + serialización)
+en un proceso del ProcessPoolExecutor. Las partes se entregan en un zip. Hay un
+solo pool por proceso, de REPORTE_TRABAJADORES_MAX procesos, creado al primer uso
+y cerrado al salir; el número de shards de cada reporte no crea pools nuevos.
+
+El Excel se escribe con src/services/xlsx.py (XML en streaming), sin pandas ni openpyxl.
+En modo normal las filas se leen de la base de datos en lotes (yield_per), ya en
+el orden del reporte, y se escriben directamente en el archivo de destino: ni las
+filas ni el archivo generado están completos en memoria.
+"""
+import atexit
+import csv
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from itertools import groupby
+from operator import attrgetter, itemgetter
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+from src.services.xlsx import ESTILO_ENCABEZADO, ESTILO_NORMAL, ESTILO_TOTAL, EscritorXlsx
+
+TITULO = "Reporte de Fidelización Clientes - Rios del Desierto S.A.S."
+NOMBRE_HOJA = "Clientes Fidelización"
+
+COLUMNAS = [
+    "Nombre",
+    "Apellido",
+    "Correo Electrónico",
+    "Teléfono",
+    "Tipo Documento",
+    "Número Documento",
+    "Fecha Compra",
+    "Producto",
+    "Cantidad",
+    "Precio Unitario (COP)",
+    "Subtotal (COP)",
+]
+
+# Pool reutilizado entre requests (crear procesos en cada reporte es costoso)
+_pool: Optional[ProcessPoolExecutor] = None
+_candado_pool = threading.Lock()
+
+
+def iterar_filas(monto_minimo_total: float = 5_000_000) -> Iterator[Tuple[int, Dict]]:
+    """
+    Lee en streaming los detalles de compra de los clientes elegibles y los
+    convierte en filas planas del reporte, en el orden de ordenar_con_totales
+    (cliente, fecha de compra descendente y nombre del producto).
+
+    Yields:
+        Tuplas (hash del cliente_id, fila) donde la fila es un dict con COLUMNAS
+    """
+    from src.models.compra import Compra
+    from src.services import catalogo_productos
+
+    detalles = Compra.iterar_detalles_ultimo_mes(monto_minimo_total=monto_minimo_total)
+
+    # La consulta ordena por cliente y fecha; el nombre del producto viene del
+    # catálogo en memoria (sin JOIN con productos), así que el último criterio se
+    # aplica aquí, dentro de cada grupo de igual cliente y fecha
+    for _, grupo in groupby(detalles, key=attrgetter("nombre", "apellido", "fecha")):
+        grupo = sorted(
+            ((detalle, catalogo_productos.nombre(detalle.producto_id)) for detalle in grupo),
+            key=itemgetter(1),
+        )
+        for detalle, nombre_producto in grupo:
+            tipo_documento = detalle.tipo_documento.value if detalle.tipo_documento else "N/A"
+            numero_documento = detalle.numero_documento if detalle.tipo_documento else "N/A"
+
+            yield detalle.cliente_id.int, {
+                "Nombre": detalle.nombre,
+                "Apellido": detalle.apellido,
+                "Correo Electrónico": detalle.correo_electronico,
+                "Teléfono": detalle.telefono_celular,
+                "Tipo Documento": tipo_documento,
+                "Número Documento": numero_documento,
+                "Fecha Compra": detalle.fecha.strftime("%Y-%m-%d %H:%M:%S"),
+                "Producto": nombre_producto,
+                "Cantidad": detalle.cantidad_compra,
+                "Precio Unitario (COP)": detalle.precio_unitario,
+                "Subtotal (COP)": detalle.cantidad_compra * detalle.precio_unitario,
+            }
+
+
+def obtener_filas(monto_minimo_total: float = 5_000_000) -> List[Tuple[int, Dict]]:
+    """
+    Todas las filas de iterar_filas en una lista (modo paralelo: se reparten en
+    shards entre procesos).
+
+    Returns:
+        Lista de tuplas (hash del cliente_id, fila) donde la fila es un dict con COLUMNAS
+    """
+    return list(iterar_filas(monto_minimo_total))
+
+
+def con_totales(filas: Iterable[Dict]) -> Iterator[Tuple[List, bool]]:
+    """
+    Agrega una fila de total después de cada cliente a filas ya ordenadas por
+    cliente (ver ordenar_con_totales).
+
+    Yields:
+        (valores de la fila en el orden de COLUMNAS, True si es una fila de total)
+    """
+    # Agrupar por cliente (usando Nombre + Apellido como identificador único)
+    for (nombre, apellido), grupo in groupby(filas, key=itemgetter("Nombre", "Apellido")):
+        total_cliente = 0
+        for fila in grupo:
+            total_cliente += fila["Subtotal (COP)"]
+            yield [fila[columna] for columna in COLUMNAS], False
+
+        fila_total = [""] * len(COLUMNAS)
+        fila_total[COLUMNAS.index("Producto")] = f"TOTAL {nombre} {apellido}"
+        fila_total[COLUMNAS.index("Subtotal (COP)")] = total_cliente
+        yield fila_total, True
+
+
+def ordenar_con_totales(datos_reporte: List[Dict]) -> Iterator[Tuple[List, bool]]:
+    """
+    Ordena las filas por cliente (fecha de compra descendente dentro de cada cliente)
+    y agrega una fila de total después de cada cliente.
+
+    Yields:
+        (valores de la fila en el orden de COLUMNAS, True si es una fila de total)
+    """
+    # Dos ordenamientos estables: primero por fecha descendente, luego por cliente
+    filas = sorted(datos_reporte, key=itemgetter("Fecha Compra"), reverse=True)
+    filas.sort(key=itemgetter("Nombre", "Apellido"))
+    return con_totales(filas)
+
+
+def escribir_excel(filas: Iterable[Tuple[List, bool]], destino: IO[bytes]) -> int:
+    """
+    Escribe el archivo Excel (.xlsx) del reporte en `destino` a medida que llegan las filas.
+
+    Fila 1: título combinado, fila 2: en blanco, fila 3: encabezados, fila 4 en adelante: datos.
+
+    Args:
+        filas: Filas de con_totales / ordenar_con_totales
+        destino: Archivo binario de destino
+
+    Returns:
+        Número de filas de detalle escritas (sin contar los totales)
+    """
+    escritas = 0
+    with EscritorXlsx(destino, NOMBRE_HOJA, numero_columnas=len(COLUMNAS)) as hoja:
+        hoja.escribir_titulo(TITULO, alto=30)
+        hoja.escribir_fila_vacia()
+        hoja.escribir_fila(COLUMNAS, estilo=ESTILO_ENCABEZADO)
+        for valores, es_total in filas:
+            hoja.escribir_fila(valores, estilo=ESTILO_TOTAL if es_total else ESTILO_NORMAL)
+            escritas += not es_total
+    return escritas
+
+
+def escribir_reporte_excel(destino: IO[bytes], monto_minimo_total: float = 5_000_000) -> int:
+    """
+    Reporte del modo normal: lee las filas en streaming y las escribe en `destino`.
+
+    Returns:
+        Número de filas de detalle escritas (0 si ningún cliente cumple el criterio)
+    """
+    filas = (fila for _, fila in iterar_filas(monto_minimo_total))
+    return escribir_excel(con_totales(filas), destino)
+
+
+def construir_excel(datos_reporte: List[Dict]) -> bytes:
+    """Genera en memoria el archivo Excel (.xlsx) de un shard a partir de las filas planas."""
+    output = BytesIO()
+    escribir_excel(ordenar_con_totales(datos_reporte), output)
+    return output.getvalue()
+
+
+def construir_csv(datos_reporte: List[Dict]) -> bytes:
+    """Genera el reporte en CSV (UTF-8 con BOM para Excel), con filas de total por cliente."""
+    output = StringIO()
+    escritor = csv.writer(output, lineterminator="\n")
+    escritor.writerow(COLUMNAS)
+    escritor.writerows(valores for valores, _ in ordenar_con_totales(datos_reporte))
+    return output.getvalue().encode("utf-8-sig")
+
+
+def _renderizar_shard(args: Tuple[int, str, List[Dict]]) -> Tuple[str, bytes]:
+    """Tarea de un proceso del pool: renderiza un shard completo."""
+    numero_shard, formato, datos_reporte = args
+    if formato == "CSV":
+        return f"clientes_fidelizacion_shard_{numero_shard:02d}.csv", construir_csv(datos_reporte)
+    return f"clientes_fidelizacion_shard_{numero_shard:02d}.xlsx", construir_excel(datos_reporte)
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """Pool compartido de REPORTE_TRABAJADORES_MAX procesos (uno solo aunque lo pidan varios hilos)."""
+    global _pool
+    with _candado_pool:
+        if _pool is None:
+            # spawn: no se heredan conexiones a la base de datos ni hilos del servidor
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config["REPORTE_TRABAJADORES_MAX"],
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(cerrar_pool)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Cierra el pool de procesos (al salir del proceso, registrado con atexit)."""
+    global _pool
+    with _candado_pool:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def dividir_en_shards(filas: List[Tuple[int, Dict]], numero_shards: int) -> List[List[Dict]]:
+    """Reparte las filas por hash del cliente_id: todas las filas de un cliente quedan en el mismo shard."""
+    shards: List[List[Dict]] = [[] for _ in range(numero_shards)]
+    for hash_cliente, fila in filas:
+        shards[hash_cliente % numero_shards].append(fila)
+    return shards
+
+
+def construir_zip_paralelo(filas: List[Tuple[int, Dict]], trabajadores: int, formato: str = "EXCEL") -> bytes:
+    """
+    Renderiza el reporte en paralelo (un shard por trabajador) y empaqueta las partes en un zip.
+
+    Args:
+        filas: Filas devueltas por obtener_filas
+        trabajadores: Número de shards (se renderizan en el pool compartido, como
+            mucho REPORTE_TRABAJADORES_MAX a la vez)
+        formato: "EXCEL" (un .xlsx por shard) o "CSV" (un .csv por shard)
+
+    Returns:
+        Contenido del archivo zip
+    """
+    shards = dividir_en_shards(filas, trabajadores)
+    tareas = [(numero, formato, datos) for numero, datos in enumerate(shards) if datos]
+
+    if trabajadores == 1:
+        partes = [_renderizar_shard(tarea) for tarea in tareas]
+    else:
+        partes = list(_obtener_pool().map(_renderizar_shard, tareas))
+
+    output = BytesIO()
+    # Los .xlsx ya vienen comprimidos: se guardan sin volver a comprimir
+    compresion = zipfile.ZIP_DEFLATED if formato == "CSV" else zipfile.ZIP_STORED
+    with zipfile.ZipFile(output, "w", compression=compresion) as archivo_zip:
+        for nombre, contenido in partes:
+            archivo_zip.writestr(nombre, contenido)
+
+    return output.getvalue()
@@ -0,0 +1,400 @@
+# src/services/reporte_fidelizacion_delta.py
+"""
+Reporte de fidelización incremental (delta).
+
+El reporte completo recorre las compras de los últimos 30 días en cada
+generación. El modo delta guarda el total de la ventana y la elegibilidad de
+cada cliente (tabla fidelizacion_clientes) y una marca de agua
+(fidelizacion_marca: cursor del feed de cambios y fecha de inicio de la ventana).
+En cada generación solo se recalculan los clientes afectados desde la marca:
+
+    - Clientes con compras creadas, modificadas o borradas desde el cursor (tabla
+      cambios, ver models/cambio.py), y clientes creados o borrados.
+    - Clientes con compras que salieron de la ventana (fecha entre el inicio de la
+      ventana anterior y el actual), también si ya se archivaron: con una marca
+      vieja esas fechas pueden ser anteriores al horizonte de archivo.
+
+El reporte contiene solo los clientes cuya elegibilidad cambió (ALTA / BAJA) o
+que siguen siendo elegibles con otro total (ACTUALIZACION).
+
+Se recalculan todos los clientes (generación completa) la primera vez, cuando se
+pide, cuando cambia el monto mínimo, cuando la marca es más antigua que la
+retención del feed (CAMBIOS_RETENCION_DIAS) y cuando no se puede saber el cliente
+de una compra borrada.
+
+La marca avanza con compare-and-set: si dos generaciones corren a la vez, la
+segunda falla con ConflictoMarca y no se pierde ni se duplica ningún cambio.
+"""
+import csv
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, union, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from src.extensions import db
+from src.models.archivo import CompraArchivo
+from src.models.cambio import Cambio
+from src.models.cliente import Cliente
+from src.models.compra import Compra
+from src.models.consultas import parametros_fidelizacion
+from src.models.enums import EstadoCompraEnum
+from src.models.reporte_fidelizacion_delta import FidelizacionCliente, FidelizacionMarca
+from src.services.reporte_fidelizacion import TITULO
+from src.services.xlsx import ESTILO_ENCABEZADO, ESTILO_NORMAL, EscritorXlsx
+
+NOMBRE_HOJA = "Cambios Fidelización"
+
+COLUMNAS = [
+    "Cambio",
+    "Id Cliente",
+    "Nombre",
+    "Apellido",
+    "Correo Electrónico",
+    "Teléfono",
+    "Tipo Documento",
+    "Número Documento",
+    "Total Anterior (COP)",
+    "Total Actual (COP)",
+    "Fidelizado",
+]
+
+# Ids por consulta con IN
+_TAMANO_LOTE = 500
+
+
+class ConflictoMarca(Exception):
+    """Otra generación del reporte delta avanzó la marca de agua al mismo tiempo."""
+
+
+class ResultadoDelta(NamedTuple):
+    # Contenido del archivo (xlsx o csv)
+    contenido: bytes
+    # Una fila (dict con COLUMNAS) por cliente cambiado
+    filas: List[Dict]
+    # Generación completa (se recalcularon todos los clientes)
+    completo: bool
+    clientes_recalculados: int
+    # Marca anterior (None en la primera generación) y nueva
+    desde: Optional[datetime]
+    generado_en: datetime
+    cursor: int
+    # Lo que devolvió `guardar` (p. ej. el artefacto en disco), si se pasó
+    guardado: Any = None
+
+
+def _lotes(valores: Iterable, tamano: int = _TAMANO_LOTE) -> Iterable[List]:
+    valores = list(valores)
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+
+def _cursor_seguro(margen_segundos: float) -> int:
+    """
+    Último cursor del feed que ya no puede tener huecos de transacciones en curso
+    (cambios con más de `margen_segundos`, ver Cambio.leer).
+    """
+    limite = datetime.utcnow() - timedelta(seconds=margen_segundos)
+    return db.session.scalar(select(func.max(Cambio.id)).where(Cambio.creado_en <= limite)) or 0
+
+
+def _clientes_de_compras(compra_ids: Set[uuid.UUID]) -> Dict[uuid.UUID, Set[uuid.UUID]]:
+    """Clientes de cada compra según las fotos del feed (incluye los anteriores si cambió de cliente)."""
+    clientes: Dict[uuid.UUID, Set[uuid.UUID]] = {}
+    for lote in _lotes(compra_ids):
+        filas = db.session.execute(
+            select(Cambio.entidad_id, Cambio.datos).where(
+                Cambio.entidad == "compra",
+                Cambio.entidad_id.in_(lote),
+            )
+        )
+        for compra_id, datos in filas:
+            # Las eliminaciones no tienen foto (JSON null)
+            if datos is None:
+                continue
+            clientes.setdefault(compra_id, set()).add(uuid.UUID(datos["clienteId"]))
+    return clientes
+
+
+def _clientes_afectados(
+    cursor_anterior: int,
+    cursor: int,
+    fecha_limite_anterior: datetime,
+    fecha_limite: datetime,
+) -> Optional[Set[uuid.UUID]]:
+    """
+    Clientes cuyo total de la ventana pudo cambiar desde la marca anterior.
+
+    Returns:
+        Ids de clientes, o None si hay una compra borrada cuyo cliente no se
+        conoce (se debe recalcular todo)
+    """
+    afectados: Set[uuid.UUID] = set()
+    # Compras modificadas o borradas: también el cliente anterior (si cambió de cliente)
+    compras_historia: Set[uuid.UUID] = set()
+
+    cambios = db.session.execute(
+        select(Cambio.entidad, Cambio.entidad_id, Cambio.operacion, Cambio.datos)
+        .where(Cambio.id > cursor_anterior, Cambio.id <= cursor)
+        .execution_options(yield_per=1000)
+    )
+    for entidad, entidad_id, operacion, datos in cambios:
+        if entidad == "cliente":
+            afectados.add(entidad_id)
+            continue
+        if datos is not None:
+            afectados.add(uuid.UUID(datos["clienteId"]))
+        if operacion != "crear":
+            compras_historia.add(entidad_id)
+
+    if compras_historia:
+        clientes = _clientes_de_compras(compras_historia)
+        if len(clientes) < len(compras_historia):
+            return None
+        for ids in clientes.values():
+            afectados.update(ids)
+
+    # Compras que salieron de la ventana, en ambas particiones (cada una por su
+    # índice de fecha; la vista compras_historico no los usa)
+    if fecha_limite > fecha_limite_anterior:
+        afectados.update(db.session.scalars(union(*(
+            select(compras.cliente_id).where(
+                compras.status == EstadoCompraEnum.COMPLETADA,
+                compras.fecha >= fecha_limite_anterior,
+                compras.fecha < fecha_limite,
+            )
+            for compras in (Compra, CompraArchivo)
+        ))))
+
+    return afectados
+
+
+def _totales(fecha_limite: datetime, cliente_ids: Optional[Set[uuid.UUID]]) -> Dict[uuid.UUID, Decimal]:
+    """Total de compras completadas desde `fecha_limite` por cliente (todos si cliente_ids es None)."""
+    stmt = (
+        select(Compra.cliente_id, func.sum(Compra.monto_total))
+        .where(Compra.fecha >= fecha_limite, Compra.status == EstadoCompraEnum.COMPLETADA)
+        .group_by(Compra.cliente_id)
+    )
+    if cliente_ids is None:
+        return dict(db.session.execute(stmt).all())
+
+    totales = {}
+    for lote in _lotes(cliente_ids):
+        totales.update(db.session.execute(stmt.where(Compra.cliente_id.in_(lote))).all())
+    return totales
+
+
+def _guardados(cliente_ids: Optional[Set[uuid.UUID]]) -> Dict[uuid.UUID, FidelizacionCliente]:
+    """Totales de la generación anterior (todos si cliente_ids es None)."""
+    if cliente_ids is None:
+        return {fila.cliente_id: fila for fila in db.session.scalars(select(FidelizacionCliente))}
+
+    guardados = {}
+    for lote in _lotes(cliente_ids):
+        guardados.update(
+            (fila.cliente_id, fila)
+            for fila in db.session.scalars(
+                select(FidelizacionCliente).where(FidelizacionCliente.cliente_id.in_(lote))
+            )
+        )
+    return guardados
+
+
+def _filas_reporte(cambiados: List[tuple]) -> List[Dict]:
+    """Filas del reporte (COLUMNAS) de los clientes cambiados que son o eran elegibles."""
+    clientes = {}
+    for lote in _lotes([cliente_id for cliente_id, *_ in cambiados]):
+        clientes.update(
+            (cliente.id, cliente)
+            for cliente in db.session.scalars(
+                select(Cliente).options(selectinload(Cliente.documento)).where(Cliente.id.in_(lote))
+            )
+        )
+
+    filas = []
+    for cliente_id, total_anterior, fidelizado_anterior, total, fidelizado in cambiados:
+        if fidelizado and not fidelizado_anterior:
+            cambio = "ALTA"
+        elif fidelizado_anterior and not fidelizado:
+            cambio = "BAJA"
+        else:
+            cambio = "ACTUALIZACION"
+
+        # Cliente borrado: solo se conoce el id
+        cliente = clientes.get(cliente_id)
+        documento = cliente.documento if cliente is not None else None
+        filas.append({
+            "Cambio": cambio,
+            "Id Cliente": str(cliente_id),
+            "Nombre": cliente.nombre if cliente is not None else "",
+            "Apellido": cliente.apellido if cliente is not None else "",
+            "Correo Electrónico": cliente.correo_electronico if cliente is not None else "",
+            "Teléfono": cliente.telefono_celular if cliente is not None else "",
+            "Tipo Documento": documento.tipo_documento.value if documento else "N/A",
+            "Número Documento": documento.numero_documento if documento else "N/A",
+            "Total Anterior (COP)": total_anterior,
+            "Total Actual (COP)": total,
+            "Fidelizado": "SI" if fidelizado else "NO",
+        })
+
+    filas.sort(key=itemgetter("Nombre", "Apellido", "Id Cliente"))
+    return filas
+
+
+def construir_excel(filas: List[Dict], desde: Optional[datetime], generado_en: datetime) -> bytes:
+    """Archivo Excel (.xlsx) del reporte delta: título, periodo, encabezados y una fila por cliente."""
+    output = BytesIO()
+    with EscritorXlsx(output, NOMBRE_HOJA, numero_columnas=len(COLUMNAS)) as hoja:
+        hoja.escribir_titulo(f"{TITULO} - Cambios", alto=30)
+        if desde is None:
+            hoja.escribir_fila([f"Generación completa al {generado_en:%Y-%m-%d %H:%M:%S} UTC"])
+        else:
+            hoja.escribir_fila([f"Cambios del {desde:%Y-%m-%d %H:%M:%S} al {generado_en:%Y-%m-%d %H:%M:%S} UTC"])
+        hoja.escribir_fila(COLUMNAS, estilo=ESTILO_ENCABEZADO)
+        for fila in filas:
+            hoja.escribir_fila([fila[columna] for columna in COLUMNAS], estilo=ESTILO_NORMAL)
+    return output.getvalue()
+
+
+def construir_csv(filas: List[Dict]) -> bytes:
+    """Reporte delta en CSV (UTF-8 con BOM para Excel)."""
+    output = StringIO()
+    escritor = csv.writer(output, lineterminator="\n")
+    escritor.writerow(COLUMNAS)
+    escritor.writerows([fila[columna] for columna in COLUMNAS] for fila in filas)
+    return output.getvalue().encode("utf-8-sig")
+
+
+def generar_delta(
+    monto_minimo_total: float = 5_000_000,
+    formato: str = "EXCEL",
+    completo: bool = False,
+    guardar: Optional[Callable[[bytes, int], Any]] = None,
+) -> ResultadoDelta:
+    """
+    Genera el reporte de los clientes de fidelización que cambiaron desde la última
+    generación, actualiza los totales guardados y avanza la marca de agua (commit).
+
+    El archivo se construye, y se guarda con `guardar`, antes del commit: si algo
+    falla, la marca no avanza y los cambios salen en la siguiente generación. Sin
+    `guardar`, un archivo que se pierde después del commit no se puede regenerar.
+
+    Args:
+        monto_minimo_total: Monto mínimo (COP) de compras del cliente en el último mes
+        formato: "EXCEL" o "CSV"
+        completo: Recalcular todos los clientes aunque la marca permita un delta
+        guardar: Función (contenido, cursor) que persiste el archivo (disco, almacén de
+            artefactos) una vez confirmado que la marca puede avanzar
+
+    Returns:
+        ResultadoDelta
+
+    Raises:
+        ConflictoMarca: Otra generación avanzó la marca al mismo tiempo
+    """
+    config = current_app.config
+    generado_en = datetime.utcnow()
+    fecha_limite = parametros_fidelizacion(monto_minimo_total)["fecha_limite"]
+    monto_minimo = Decimal(str(monto_minimo_total))
+    cursor = _cursor_seguro(config["CAMBIOS_MARGEN_SEGUNDOS"])
+
+    marca = db.session.get(FidelizacionMarca, 1)
+    retencion = timedelta(days=config["CAMBIOS_RETENCION_DIAS"]) - timedelta(seconds=config["CAMBIOS_MARGEN_SEGUNDOS"])
+    completo = (
+        completo
+        or marca is None
+        or marca.monto_minimo != monto_minimo
+        or marca.generado_en < generado_en - retencion
+    )
+
+    afectados = None
+    if not completo:
+        afectados = _clientes_afectados(marca.cursor_cambios, cursor, marca.fecha_limite, fecha_limite)
+        completo = afectados is None
+
+    totales = _totales(fecha_limite, afectados)
+    guardados = _guardados(afectados)
+    cliente_ids = set(totales) | set(guardados) if afectados is None else afectados
+
+    cambiados = []
+    for cliente_id in cliente_ids:
+        guardado = guardados.get(cliente_id)
+        total_anterior = guardado.total if guardado is not None else Decimal("0.00")
+        fidelizado_anterior = guardado.es_fidelizado if guardado is not None else False
+        total = totales.get(cliente_id, Decimal("0.00"))
+        fidelizado = total > monto_minimo
+        if total != total_anterior or fidelizado != fidelizado_anterior:
+            cambiados.append((cliente_id, total_anterior, fidelizado_anterior, total, fidelizado))
+
+    # Solo se informan los clientes que son o eran elegibles
+    filas = _filas_reporte([cambio for cambio in cambiados if cambio[2] or cambio[4]])
+    desde = marca.generado_en if marca is not None else None
+    if formato == "CSV":
+        contenido = construir_csv(filas)
+    else:
+        contenido = construir_excel(filas, desde, generado_en)
+
+    # Totales guardados: solo los clientes cambiados (sin fila si ya no tienen compras en la ventana)
+    tabla = FidelizacionCliente.__table__
+    for lote in _lotes(cambiados):
+        db.session.execute(delete(tabla).where(tabla.c.cliente_id.in_([cambio[0] for cambio in lote])))
+        nuevas = [
+            {"cliente_id": cliente_id, "total_centavos": total, "es_fidelizado": fidelizado, "actualizado_en": generado_en}
+            for cliente_id, _, _, total, fidelizado in lote
+            if total
+        ]
+        if nuevas:
+            db.session.execute(insert(tabla), nuevas)
+
+    # Avanzar la marca (compare-and-set)
+    valores = {
+        "cursor_cambios": cursor,
+        "fecha_limite": fecha_limite,
+        "monto_minimo": monto_minimo,
+        "generado_en": generado_en,
+    }
+    try:
+        if marca is None:
+            db.session.add(FidelizacionMarca(id=1, **valores))
+            db.session.flush()
+        else:
+            resultado = db.session.execute(
+                update(FidelizacionMarca)
+                .where(
+                    FidelizacionMarca.id == 1,
+                    FidelizacionMarca.cursor_cambios == marca.cursor_cambios,
+                    FidelizacionMarca.generado_en == marca.generado_en,
+                )
+                .values(**valores)
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount != 1:
+                raise ConflictoMarca("Otra generación del reporte delta está en curso")
+        guardado = guardar(contenido, cursor) if guardar is not None else None
+        db.session.commit()
+    except (ConflictoMarca, IntegrityError) as error:
+        db.session.rollback()
+        if isinstance(error, IntegrityError):
+            raise ConflictoMarca("Otra generación del reporte delta está en curso") from error
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return ResultadoDelta(
+        contenido=contenido,
+        filas=filas,
+        completo=completo,
+        clientes_recalculados=len(cliente_ids),
+        desde=desde,
+        generado_en=generado_en,
+        cursor=cursor,
+        guardado=guardado,
+    )
@@ -0,0 +1,314 @@
+# src/services/xlsx.py
+"""
+Escritor XLSX de bajo nivel para reportes.
+
+Escribe directamente el XML de SpreadsheetML dentro del zip, fila por fila:
+- Estilos compartidos precalculados (título, encabezados, totales) en styles.xml;
+  cada celda solo referencia el índice del estilo.
+- Anchos de columna calculados de forma incremental mientras se escriben las filas.
+- Fila de título combinada escrita en su lugar desde el inicio (sin insertar filas).
+- Las filas se acumulan en un archivo temporal (en disco a partir de 1 MB), así
+  que la memoria no crece con el tamaño del reporte.
+- Con `anchos_fijos`, las filas se escriben directamente en el zip de destino a
+  medida que llegan (sin archivo temporal): el destino puede ser un flujo no
+  seekable cuyos bytes se envían mientras se escribe (exportación por lote).
+
+Uso:
+    with EscritorXlsx(destino, "Hoja", numero_columnas=3) as hoja:
+        hoja.escribir_titulo("Reporte", alto=30)
+        hoja.escribir_fila(["A", "B", "C"], estilo=ESTILO_ENCABEZADO)
+        hoja.escribir_fila(["x", 1, 2.5])
+"""
+import re
+import shutil
+import tempfile
+import zipfile
+from decimal import Decimal
+from typing import IO, Iterable, List, Optional, Union
+from xml.sax.saxutils import escape
+
+# Índices en cellXfs de styles.xml
+ESTILO_NORMAL = 0
+ESTILO_TITULO = 1
+ESTILO_ENCABEZADO = 2
+ESTILO_TOTAL = 3
+
+ANCHO_MAXIMO = 50
+MARGEN_ANCHO = 2
+
+# Caracteres de control no permitidos en XML 1.0
+_CARACTERES_ILEGALES = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nombre}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+# Fuentes: 0 normal, 1 negrita, 2 negrita 18 (título)
+# Rellenos: 0 y 1 obligatorios por la especificación, 2 gris claro (totales)
+# Bordes: 0 sin borde, 1 borde fino (encabezados)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="3">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="18"/><name val="Calibri"/><family val="2"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFD3D3D3"/><bgColor rgb="FFD3D3D3"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def letra_columna(numero: int) -> str:
+    """Convierte un número de columna (1 = A) a su letra de Excel (A, B, ..., Z, AA, ...)."""
+    letras = ""
+    while numero:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+class EscritorXlsx:
+    """
+    Escribe un libro con una sola hoja en modo streaming.
+
+    Las filas solo se pueden agregar en orden; el archivo queda completo al
+    llamar a `cerrar()` (o al salir del bloque `with`).
+    """
+
+    def __init__(
+        self,
+        destino: Union[str, IO[bytes]],
+        nombre_hoja: str,
+        numero_columnas: int,
+        anchos_fijos: Optional[List[int]] = None,
+    ):
+        """
+        Args:
+            destino: Ruta o archivo binario (p. ej. BytesIO) donde se escribe el .xlsx
+            nombre_hoja: Nombre de la hoja (máximo 31 caracteres en Excel)
+            numero_columnas: Número de columnas de la tabla (define el rango combinado del título)
+            anchos_fijos: Ancho (caracteres) de cada columna. Si se indica, las filas se
+                escriben directamente en el destino (modo streaming) en lugar de
+                calcular los anchos al final
+        """
+        self.destino = destino
+        self.nombre_hoja = nombre_hoja[:31]
+        self.numero_columnas = numero_columnas
+        self.letras = [letra_columna(i) for i in range(1, numero_columnas + 1)]
+        self.anchos = list(anchos_fijos) if anchos_fijos is not None else [0] * numero_columnas
+        self.combinadas: List[str] = []
+        self.fila_actual = 0
+        self._cerrado = False
+        self._zip: Optional[zipfile.ZipFile] = None
+        if anchos_fijos is None:
+            self._filas = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        else:
+            self._zip = self._abrir_zip()
+            self._filas = self._zip.open("xl/worksheets/sheet1.xml", "w")
+            self._filas.write(self._encabezado_hoja().encode("utf-8"))
+
+    def __enter__(self) -> "EscritorXlsx":
+        return self
+
+    def __exit__(self, tipo_excepcion, excepcion, traza) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        else:
+            self._filas.close()
+            if self._zip is not None:
+                self._zip.close()
+
+    def escribir_titulo(self, texto: str, alto: Optional[float] = None) -> None:
+        """Escribe una fila de título combinada sobre todas las columnas (no cuenta para el ancho)."""
+        self.fila_actual += 1
+        fila = self.fila_actual
+        self.combinadas.append(f"A{fila}:{self.letras[-1]}{fila}")
+        self._escribir(
+            f'<row r="{fila}"{self._atributos_alto(alto)}>'
+            f'<c r="A{fila}" s="{ESTILO_TITULO}" t="inlineStr"><is><t>{_texto_xml(texto)}</t></is></c>'
+            f'</row>'
+        )
+
+    def escribir_fila_vacia(self) -> None:
+        """Deja una fila en blanco."""
+        self.fila_actual += 1
+
+    def escribir_fila(self, valores: Iterable, estilo: int = ESTILO_NORMAL, alto: Optional[float] = None) -> None:
+        """
+        Escribe una fila de celdas.
+
+        Los números (int, float, Decimal) se escriben como valores numéricos y el
+        resto como texto. Las celdas vacías (None o "") se omiten, salvo que la fila
+        tenga estilo: en ese caso se escriben para que el estilo cubra toda la fila.
+
+        Args:
+            valores: Valores de la fila, en orden de columna
+            estilo: Índice de estilo compartido (ESTILO_*)
+            alto: Alto de la fila en puntos (opcional)
+        """
+        self.fila_actual += 1
+        fila = self.fila_actual
+        atributo_estilo = f' s="{estilo}"' if estilo else ""
+        anchos = self.anchos
+        partes = [f'<row r="{fila}"{self._atributos_alto(alto)}>']
+
+        for indice, valor in enumerate(valores):
+            referencia = f"{self.letras[indice]}{fila}"
+            if valor is None or valor == "":
+                if estilo:
+                    partes.append(f'<c r="{referencia}"{atributo_estilo}/>')
+                continue
+
+            if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+                texto = str(valor)
+                partes.append(f'<c r="{referencia}"{atributo_estilo}><v>{texto}</v></c>')
+            else:
+                texto = str(valor)
+                partes.append(
+                    f'<c r="{referencia}"{atributo_estilo} t="inlineStr"><is><t xml:space="preserve">'
+                    f'{_texto_xml(texto)}</t></is></c>'
+                )
+
+            if len(texto) > anchos[indice]:
+                anchos[indice] = len(texto)
+
+        partes.append("</row>")
+        self._escribir("".join(partes))
+
+    def cerrar(self) -> None:
+        """Ensambla la hoja (dimensiones, anchos, filas y celdas combinadas) y cierra el zip."""
+        if self._cerrado:
+            return
+        self._cerrado = True
+
+        if self._zip is not None:
+            # Modo streaming: las filas ya están en el zip
+            self._filas.write(self._pie_hoja().encode("utf-8"))
+            self._filas.close()
+            self._zip.close()
+            return
+
+        with self._abrir_zip() as archivo_zip:
+            with archivo_zip.open("xl/worksheets/sheet1.xml", "w") as hoja:
+                hoja.write(self._encabezado_hoja().encode("utf-8"))
+                self._filas.seek(0)
+                shutil.copyfileobj(self._filas, hoja)
+                hoja.write(self._pie_hoja().encode("utf-8"))
+
+        self._filas.close()
+
+    def _abrir_zip(self) -> zipfile.ZipFile:
+        """Abre el zip de destino con todas las partes del libro salvo la hoja."""
+        archivo_zip = zipfile.ZipFile(self.destino, "w", compression=zipfile.ZIP_DEFLATED)
+        archivo_zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archivo_zip.writestr("_rels/.rels", _RELS)
+        archivo_zip.writestr("xl/workbook.xml", _WORKBOOK.format(nombre=_texto_xml(self.nombre_hoja, comillas=True)))
+        archivo_zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archivo_zip.writestr("xl/styles.xml", _STYLES)
+        return archivo_zip
+
+    def _escribir(self, xml: str) -> None:
+        self._filas.write(xml.encode("utf-8"))
+
+    @staticmethod
+    def _atributos_alto(alto: Optional[float]) -> str:
+        return f' ht="{alto}" customHeight="1"' if alto else ""
+
+    def _encabezado_hoja(self) -> str:
+        # En modo streaming aún no se conoce la última fila: <dimension> es opcional
+        dimension = "" if self._zip is not None else f'<dimension ref="A1:{self.letras[-1]}{max(self.fila_actual, 1)}"/>'
+        columnas = "".join(
+            f'<col min="{i}" max="{i}" width="{min(ancho + MARGEN_ANCHO, ANCHO_MAXIMO)}" customWidth="1"/>'
+            for i, ancho in enumerate(self.anchos, 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'{dimension}'
+            '<sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+            '<sheetFormatPr defaultRowHeight="15"/>'
+            f'<cols>{columnas}</cols>'
+            '<sheetData>'
+        )
+
+    def _pie_hoja(self) -> str:
+        combinadas = ""
+        if self.combinadas:
+            combinadas = (
+                f'<mergeCells count="{len(self.combinadas)}">'
+                + "".join(f'<mergeCell ref="{rango}"/>' for rango in self.combinadas)
+                + "</mergeCells>"
+            )
+        return (
+            '</sheetData>'
+            f'{combinadas}'
+            '<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/>'
+            '</worksheet>'
+        )
+
+
+def _texto_xml(texto: str, comillas: bool = False) -> str:
+    """Escapa el texto para XML y elimina caracteres de control inválidos."""
+    texto = _CARACTERES_ILEGALES.sub("", texto)
+    if comillas:
+        return escape(texto, {'"': "&quot;"})
+    return escape(texto)
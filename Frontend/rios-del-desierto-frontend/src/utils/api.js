@@ -30,11 +30,56 @@ export async function exportCliente(
   return resp.data;
 }
 
+// Descarga del reporte por partes (Range): si falla una parte se reintenta solo
+// esa parte, no el archivo completo
+const TAMANO_PARTE = 1024 * 1024;
+const REINTENTOS_PARTE = 3;
+
+function esperar(ms) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+async function pedirParte(url, inicio, fin, etag) {
+  const headers = { Range: `bytes=${inicio}-${fin}` };
+  // Si el archivo cambió, el servidor ignora el Range y envía el archivo completo
+  if (etag) headers["If-Range"] = etag;
+
+  for (let intento = 0; ; intento++) {
+    try {
+      return await api.get(url, { responseType: "blob", headers });
+    } catch (err) {
+      // Solo se reintentan los errores de red y del servidor (5xx)
+      const status = err?.response?.status;
+      if (intento >= REINTENTOS_PARTE || (status && status < 500)) throw err;
+      await esperar(500 * 2 ** intento);
+    }
+  }
+}
+
 export async function descargarReporteFidelizacion() {
-  const resp = await api.get("/reportes/clientes-fidelizacion", {
-    responseType: "blob",
-  });
-  return resp.data;
+  const primera = await pedirParte(
+    "/reportes/clientes-fidelizacion",
+    0,
+    TAMANO_PARTE - 1
+  );
+  const rango = primera.headers["content-range"];
+  // Respuesta completa (servidor sin Range): no hay más partes
+  if (primera.status !== 206 || !rango) return primera.data;
+
+  // Las partes siguientes se piden a la URL del archivo ya generado
+  const total = Number(rango.split("/")[1]);
+  const base = new URL(api.defaults.baseURL, window.location.href);
+  const url = new URL(primera.headers["content-location"], base).toString();
+  const etag = primera.headers["etag"];
+
+  const partes = [primera.data];
+  for (let inicio = TAMANO_PARTE; inicio < total; inicio += TAMANO_PARTE) {
+    const fin = Math.min(inicio + TAMANO_PARTE, total) - 1;
+    const resp = await pedirParte(url, inicio, fin, etag);
+    if (resp.status !== 206) return resp.data;
+    partes.push(resp.data);
+  }
+  return new Blob(partes, { type: primera.headers["content-type"] });
 }
 
 export default api;